@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Construction and serialization time of the driver models.
+
+Builds a `DriverInfo` session info section for a full field, then times the
+ways of building a `Driver` from it, `DriverInfo.from_iracing`, serializing
+the result, and a loop tick where the session info has not changed and
+`State.check_drivers` reuses the drivers it already built.
+
+Usage:
+    python benchmarks/driver_models.py
+    python benchmarks/driver_models.py --drivers 64 --number 500
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from iracing import State
+from models.driver_info import Driver, DriverInfo
+from models.telemetry import TelemetryHandler
+
+
+def driver_section(idx: int) -> dict:
+    """One entry of `DriverInfo.Drivers` as the sim reports it"""
+    return {
+        'CarIdx': idx,
+        'UserName': f'Driver Number {idx}',
+        'AbbrevName': f'Number, D{idx}',
+        'Initials': 'DN',
+        'UserID': 100000 + idx,
+        'TeamID': 0,
+        'TeamName': f'Team {idx} Racing',
+        'CarNumber': str(idx + 1),
+        'CarNumberRaw': idx + 1,
+        'CarPath': 'mx5 mx52016',
+        'CarClassID': 74,
+        'CarID': 67,
+        'CarIsPaceCar': 0,
+        'CarIsAI': 0,
+        'CarIsElectric': 0,
+        'CarScreenName': 'Global Mazda MX-5 Cup',
+        'CarScreenNameShort': 'MX-5 Cup',
+        'CarCfg': -1,
+        'CarCfgName': None,
+        'CarCfgCustomPaintExt': None,
+        'CarClassShortName': 'MX5',
+        'CarClassRelSpeed': 0,
+        'CarClassLicenseLevel': 0,
+        'CarClassMaxFuelPct': '1.000 %',
+        'CarClassWeightPenalty': '0.000 kg',
+        'CarClassPowerAdjust': '0.000 %',
+        'CarClassDryTireSetLimit': '0 %',
+        'CarClassColor': 16777215,
+        'CarClassEstLapTime': 98.1234,
+        'IRating': 1500 + idx * 37,
+        'LicLevel': 18,
+        'LicSubLevel': 499,
+        'LicString': 'A 4.99',
+        'LicColor': '0x0153db',
+        'IsSpectator': 0,
+        'CarDesignStr': '1,ff0000,00ff00,0000ff',
+        'HelmetDesignStr': '2,ffffff,000000,ff0000',
+        'SuitDesignStr': '3,000000,ffffff,00ff00',
+        'BodyType': 0,
+        'FaceType': 0,
+        'HelmetType': 0,
+        'CarNumberDesignStr': '0,0,ffffff,777777,000000',
+        'CarSponsor_1': 0,
+        'CarSponsor_2': 0,
+        # Keys the sim reports that the model does not declare
+        'ClubName': 'Northern European',
+        'ClubID': 32,
+        'DivisionName': 'Division 1',
+        'DivisionID': 0,
+        'CurDriverIncidentCount': idx % 5,
+        'TeamIncidentCount': idx % 5,
+    }
+
+
+class SessionInfoSource(TelemetryHandler):
+    """Telemetry source that only serves a fixed `DriverInfo` section"""
+
+    def __init__(self, drivers: int):
+        super().__init__()
+        self.data = {
+            'DriverInfo': {
+                'DriverCarIdx': 0,
+                'Drivers': [driver_section(idx) for idx in range(drivers)],
+            },
+        }
+
+    def get_data(self, key):
+        return self.data.get(key)
+
+    def get_session_info_version(self):
+        return 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark driver model construction and serialization')
+    parser.add_argument('--drivers', type=int, default=64, help='Drivers in the session. Default: 64')
+    parser.add_argument('--number', type=int, default=200, help='Runs per measurement. Default: 200')
+    args = parser.parse_args()
+
+    ir = SessionInfoSource(args.drivers)
+    entries = ir['DriverInfo']['Drivers']
+    info = DriverInfo.from_iracing(ir)
+
+    state = State()
+    state.check_drivers(ir)
+
+    cases = {
+        'Driver(**d) per car': lambda: [Driver(**d) for d in entries],
+        'model_construct per car': lambda: [Driver.model_construct(**d) for d in entries],
+        'model_validate per car': lambda: [Driver.model_validate(d) for d in entries],
+        'from_iracing': lambda: DriverInfo.from_iracing(ir),
+        'check_drivers, unchanged': lambda: state.check_drivers(ir),
+        'model_dump': lambda: info.model_dump(),
+        'model_dump_json': lambda: info.model_dump_json(),
+        'to_json_bytes, cached': lambda: info.to_json_bytes(),
+    }
+
+    print(f'\nDriverInfo ({args.drivers} drivers)')
+    print(f"{'case':<28}{'us':>12}")
+    for label, fn in cases.items():
+        seconds = min(timeit.repeat(fn, number=args.number, repeat=3)) / args.number
+        print(f'{label:<28}{seconds * 1e6:>12.1f}')
+
+
+if __name__ == '__main__':
+    main()
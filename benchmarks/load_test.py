@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Local load generator for the telemetry HTTP API.
+
+Spawns a number of concurrent pollers that each keep one HTTP/1.1
+connection open and repeatedly request an endpoint, then reports request
+throughput and latency percentiles.
+
+Usage:
+    python benchmarks/load_test.py                       # 50 pollers against localhost:9000/api/driver
+    python benchmarks/load_test.py --clients 100 --duration 30
+    python benchmarks/load_test.py --self-test           # start a server with fake telemetry and test it
+    python benchmarks/load_test.py --self-test --cache   # same, with the response cache enabled
+"""
+
+import argparse
+import http.client
+import os
+import sys
+import threading
+import time
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not values:
+        return 0.0
+    rank = max(0, min(len(values) - 1, int(round(pct / 100 * len(values))) - 1))
+    return values[rank]
+
+
+def poller(host: str, port: int, path: str, deadline: float, interval: float, results: dict, lock: threading.Lock):
+    """Poll a single endpoint over one persistent connection until the deadline"""
+    latencies = []
+    errors = 0
+    reconnects = 0
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            conn.request('GET', path)
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 500:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            reconnects += 1
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=10)
+
+        if interval > 0:
+            time.sleep(interval)
+
+    conn.close()
+
+    with lock:
+        results['latencies'].extend(latencies)
+        results['errors'] += errors
+        results['reconnects'] += reconnects
+
+
+def run_load_test(host: str, port: int, path: str, clients: int, duration: float, interval: float) -> dict:
+    results = {'latencies': [], 'errors': 0, 'reconnects': 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    threads = [
+        threading.Thread(target=poller, args=(host, port, path, deadline, interval, results, lock), daemon=True)
+        for _ in range(clients)
+    ]
+
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(results['latencies'])
+    return {
+        'requests': len(latencies),
+        'errors': results['errors'],
+        'reconnects': results['reconnects'],
+        'elapsed': elapsed,
+        'rps': len(latencies) / elapsed if elapsed else 0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'max_ms': (latencies[-1] * 1000) if latencies else 0,
+    }
+
+
+def start_self_test_server(port: int, workers: int, server_type: str = 'threaded', cache: bool = False):
+    """Start the API server with a fake telemetry source for local testing"""
+    from unittest.mock import Mock
+    from logger import setup_logger
+    from models.driver_info import DriverInfo, Driver
+    from server import ServerContext, SnapshotHub, cached_endpoint, start_server, start_async_server, handle_driver
+
+    values = {
+        'PlayerCarDriverIncidentCount': 2,
+        'PlayerCarTeamIncidentCount': 4,
+        'LapCompleted': 12,
+        'RaceLaps': 40,
+    }
+    ir = Mock()
+    ir.__getitem__ = Mock(side_effect=lambda key: values.get(key))
+
+    player = Driver(CarIdx=0, UserName='Load Test', CarNumber='7', LicString='A 4.99', IRating=3000)
+    state = Mock()
+    state.ir_connected = True
+    state.drivers = DriverInfo(**player.model_dump(), Drivers=[player])
+
+    # Publish a snapshot per second like the telemetry loop does
+    snapshots = SnapshotHub()
+
+    def tick():
+        while True:
+            snapshots.publish({})
+            time.sleep(1)
+
+    threading.Thread(target=tick, daemon=True).start()
+
+    context = ServerContext(
+        get_ir=lambda: ir,
+        get_state=lambda: state,
+        logger=setup_logger('iracing.loadtest', console_output=False, level=50),
+        snapshots=snapshots
+    )
+    endpoint = cached_endpoint(handle_driver) if cache else handle_driver
+    server_factory = start_async_server if server_type == 'asyncio' else start_server
+    return server_factory({'/api/driver': endpoint}, context, port=port, max_workers=workers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the telemetry HTTP API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9000)
+    parser.add_argument('--path', default='/api/driver')
+    parser.add_argument('--clients', type=int, default=50, help='Concurrent pollers. Default: 50')
+    parser.add_argument('--duration', type=float, default=10.0, help='Test duration in seconds. Default: 10')
+    parser.add_argument('--interval', type=float, default=0.0,
+                        help='Delay between requests per poller in seconds (0 = as fast as possible)')
+    parser.add_argument('--self-test', action='store_true',
+                        help='Start a local server with fake telemetry instead of using a running instance')
+    parser.add_argument('--workers', type=int, default=16, help='Worker threads for --self-test. Default: 16')
+    parser.add_argument('--server', default='threaded', choices=['threaded', 'asyncio'],
+                        help='Server implementation for --self-test. Default: threaded')
+    parser.add_argument('--cache', action='store_true',
+                        help='Wrap the endpoint with the tick-keyed response cache for --self-test')
+    args = parser.parse_args()
+
+    httpd = None
+    if args.self_test:
+        httpd = start_self_test_server(args.port, args.workers, args.server, args.cache)
+
+    print(f'Load testing http://{args.host}:{args.port}{args.path} '
+          f'with {args.clients} clients for {args.duration:.0f}s...')
+
+    try:
+        stats = run_load_test(args.host, args.port, args.path, args.clients, args.duration, args.interval)
+    finally:
+        if httpd:
+            httpd.shutdown()
+            httpd.server_close()
+
+    print('')
+    print(f"Requests:   {stats['requests']} ({stats['rps']:.1f} req/s)")
+    print(f"Errors:     {stats['errors']} (reconnects: {stats['reconnects']})")
+    print(f"Latency:    p50 {stats['p50_ms']:.2f} ms | p99 {stats['p99_ms']:.2f} ms | max {stats['max_ms']:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
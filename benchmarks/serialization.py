@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Bytes on the wire and encode time for the API response encodings.
+
+Builds the `/api/driver` payload and the `/api/driver?full=true` payload for a
+full field of drivers, then encodes each with every encoding the server can
+negotiate (see `server.encoding`).
+
+Usage:
+    python benchmarks/serialization.py
+    python benchmarks/serialization.py --drivers 60 --number 2000
+"""
+
+import argparse
+import os
+import sys
+import timeit
+from unittest.mock import Mock
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from models.driver_info import DriverInfo, Driver
+from server.driver import build_driver_payload
+from server.encoding import JSON, MSGPACK, encode_body, encode_json
+
+
+def build_payloads(drivers: int) -> dict[str, dict]:
+    values = {
+        'PlayerCarDriverIncidentCount': 2,
+        'PlayerCarTeamIncidentCount': 4,
+        'LapCompleted': 12,
+        'RaceLaps': 40,
+    }
+    ir = Mock()
+    ir.__getitem__ = Mock(side_effect=lambda key: values.get(key))
+
+    field = [
+        Driver(
+            CarIdx=idx,
+            UserName=f'Driver Number {idx}',
+            AbbrevName=f'Number, D{idx}',
+            Initials='DN',
+            UserID=100000 + idx,
+            TeamName=f'Team {idx} Racing',
+            CarNumber=str(idx + 1),
+            CarNumberRaw=idx + 1,
+            CarPath='mx5 mx52016',
+            CarScreenName='Global Mazda MX-5 Cup',
+            CarScreenNameShort='MX-5 Cup',
+            CarClassShortName='MX5',
+            CarClassEstLapTime=98.1234,
+            LicString='A 4.99',
+            LicColor='0x0153db',
+            IRating=1500 + idx * 37,
+            CarDesignStr='1,ff0000,00ff00,0000ff',
+            HelmetDesignStr='2,ffffff,000000,ff0000',
+            SuitDesignStr='3,000000,ffffff,00ff00',
+        )
+        for idx in range(drivers)
+    ]
+    player = DriverInfo(**field[0].model_dump(), Drivers=field)
+
+    return {
+        'driver': build_driver_payload(ir, player),
+        'driver?full=true': build_driver_payload(ir, player, full=True),
+    }
+
+
+ENCODINGS = {
+    'json (indent=2, before)': lambda data: encode_json(data, pretty=True),
+    'json compact': lambda data: encode_body(data, JSON)[0],
+    'json compact + gzip': lambda data: encode_body(data, JSON, allow_gzip=True)[0],
+    'msgpack': lambda data: encode_body(data, MSGPACK)[0],
+    'msgpack + gzip': lambda data: encode_body(data, MSGPACK, allow_gzip=True)[0],
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark API response encodings')
+    parser.add_argument('--drivers', type=int, default=60, help='Drivers in the session. Default: 60')
+    parser.add_argument('--number', type=int, default=1000, help='Encodes per measurement. Default: 1000')
+    args = parser.parse_args()
+
+    for name, payload in build_payloads(args.drivers).items():
+        print(f'\n/api/{name} ({args.drivers} drivers)')
+        print(f"{'encoding':<26}{'bytes':>10}{'vs before':>11}{'encode us':>12}")
+
+        baseline = None
+        for label, encode in ENCODINGS.items():
+            size = len(encode(payload))
+            baseline = baseline or size
+            seconds = min(timeit.repeat(lambda: encode(payload), number=args.number, repeat=3)) / args.number
+            print(f'{label:<26}{size:>10}{size / baseline:>10.0%}{seconds * 1e6:>12.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,191 @@
+"""Tests for the asyncio HTTP server and adopted stream connections"""
+import http.client
+import logging
+import socket
+import threading
+from email.message import Message
+
+import pytest
+
+from server.async_server import AsyncHTTPServer, AsyncRequest, EventLoopThread
+from server.helpers import send_json_response
+from server.recorder import ResponseRecorder
+
+
+class FakeContext:
+    logger = logging.getLogger('async_http.spec')
+
+
+def handle_driver(handler, ctx):
+    send_json_response(handler, {'thread': threading.current_thread().name})
+
+
+async def handle_push(request, ctx):
+    await request.send_head(200, {'Content-Type': 'text/plain'})
+    request.writer.write(b'pushed')
+    await request.writer.drain()
+
+
+@pytest.fixture
+def server(tmp_path):
+    (tmp_path / 'page.html').write_text('<p>hi</p>')
+    httpd = AsyncHTTPServer(
+        {'GET /api/driver': handle_driver, '/api/push': handle_push},
+        FakeContext(),
+        host='127.0.0.1',
+        port=0,
+        keep_alive_timeout=1.0,
+        static_dir=str(tmp_path)
+    )
+    httpd.start()
+    httpd.port = httpd._server.sockets[0].getsockname()[1]
+    yield httpd
+    httpd.shutdown()
+
+
+def connect(httpd) -> http.client.HTTPConnection:
+    return http.client.HTTPConnection('127.0.0.1', httpd.port, timeout=5)
+
+
+def read_all(sock) -> bytes:
+    received = b''
+    while chunk := sock.recv(4096):
+        received += chunk
+    return received
+
+
+class TestAsyncHTTPServer:
+    """Test request parsing and dispatch"""
+
+    def test_sync_handler_runs_on_thread_pool(self, server):
+        connection = connect(server)
+        connection.request('GET', '/api/driver')
+        response = connection.getresponse()
+        assert response.status == 200
+        assert b'async-http-worker' in response.read()
+        connection.close()
+
+    def test_head_has_headers_without_body(self, server):
+        connection = connect(server)
+        connection.request('HEAD', '/page.html')
+        response = connection.getresponse()
+        assert response.status == 200
+        assert response.getheader('Content-Length') == '9'
+        assert response.read() == b''
+
+        connection.request('GET', '/page.html')
+        assert connection.getresponse().read() == b'<p>hi</p>'
+        connection.close()
+
+    def test_keep_alive_serves_several_requests(self, server):
+        connection = connect(server)
+        for _ in range(3):
+            connection.request('GET', '/api/driver')
+            response = connection.getresponse()
+            response.read()
+            assert response.status == 200
+        assert server.connections == 1
+        connection.close()
+
+    def test_connection_close_and_http_1_0(self, server):
+        for request in (b'GET /api/driver HTTP/1.1\r\nConnection: close\r\n\r\n',
+                        b'GET /api/driver HTTP/1.0\r\n\r\n'):
+            sock = socket.create_connection(('127.0.0.1', server.port), timeout=5)
+            sock.sendall(request)
+            assert read_all(sock).startswith(b'HTTP/1.1 200')
+            sock.close()
+
+    def test_malformed_request_line_closes_connection(self, server):
+        sock = socket.create_connection(('127.0.0.1', server.port), timeout=5)
+        sock.sendall(b'NONSENSE\r\n\r\n')
+        assert read_all(sock) == b''
+        sock.close()
+
+    def test_not_found_and_method_not_allowed(self, server):
+        connection = connect(server)
+        connection.request('GET', '/missing.html')
+        response = connection.getresponse()
+        response.read()
+        assert response.status == 404
+
+        connection.request('POST', '/api/driver', body=b'{}')
+        response = connection.getresponse()
+        response.read()
+        assert response.status == 405
+        connection.close()
+
+    def test_coroutine_handler_owns_connection(self, server):
+        sock = socket.create_connection(('127.0.0.1', server.port), timeout=5)
+        sock.sendall(b'GET /api/push HTTP/1.1\r\n\r\n')
+        received = read_all(sock)
+        assert received.startswith(b'HTTP/1.1 200 OK\r\nContent-Type: text/plain\r\n\r\n')
+        assert received.endswith(b'pushed')
+        sock.close()
+
+
+class TestEventLoopThread:
+    """Test serving coroutine endpoints on sockets accepted elsewhere"""
+
+    def setup_method(self):
+        self.loop_thread = EventLoopThread(name='adopt-spec')
+        self.server_sock, self.client_sock = socket.socketpair()
+        self.client_sock.settimeout(5)
+
+    def teardown_method(self):
+        self.loop_thread.stop()
+        self.client_sock.close()
+
+    def adopt(self, handler, command: str = 'GET'):
+        request = AsyncRequest(command, '/api/push', Message(), b'', None, None)
+        return self.loop_thread.adopt(self.server_sock, request, handler, FakeContext())
+
+    def test_adopted_stream(self):
+        self.adopt(handle_push).result(timeout=5)
+        assert read_all(self.client_sock).endswith(b'\r\n\r\npushed')
+
+    def test_adopted_handler_response(self):
+        async def handle(request, ctx):
+            recorder = ResponseRecorder(request.command, request.path)
+            send_json_response(recorder, {'ok': True})
+            return recorder
+
+        self.adopt(handle).result(timeout=5)
+        received = read_all(self.client_sock)
+        assert received.startswith(b'HTTP/1.1 200')
+        assert b'Connection: close' in received
+        assert received.endswith(b'{"ok":true}')
+
+    def test_adopted_handler_error_closes_connection(self):
+        async def handle(request, ctx):
+            raise RuntimeError('boom')
+
+        self.adopt(handle).result(timeout=5)
+        assert read_all(self.client_sock) == b''
+
+    def test_adopted_keep_alive_hands_socket_back(self):
+        async def handle(request, ctx):
+            recorder = ResponseRecorder(request.command, request.path)
+            send_json_response(recorder, {'ok': True})
+            return recorder
+
+        outcomes = []
+        request = AsyncRequest('GET', '/api/poll', Message(), b'', None, None)
+        self.loop_thread.adopt(self.server_sock, request, handle, FakeContext(),
+                               keep_alive=True, done=outcomes.append).result(timeout=5)
+
+        assert outcomes == [True]
+        received = self.client_sock.recv(4096)
+        assert b'Connection: keep-alive' in received
+        # The caller still owns a working socket
+        self.server_sock.setblocking(True)
+        self.client_sock.sendall(b'next')
+        assert self.server_sock.recv(4) == b'next'
+        self.server_sock.close()
+
+    def test_adopted_stream_reports_finished_connection(self):
+        outcomes = []
+        request = AsyncRequest('GET', '/api/push', Message(), b'', None, None)
+        self.loop_thread.adopt(self.server_sock, request, handle_push, FakeContext(),
+                               keep_alive=True, done=outcomes.append).result(timeout=5)
+        assert outcomes == [False]
+        self.server_sock.close()
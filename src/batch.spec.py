@@ -0,0 +1,209 @@
+"""Tests for the batch endpoint"""
+import json
+import logging
+import threading
+import time
+from email.message import Message
+from types import SimpleNamespace
+
+from server import snapshot as snapshot_module
+from server.batch import BATCH_RESOURCES, handle_batch
+from server.recorder import ResponseRecorder
+from server.router import Router
+from server.snapshot import SnapshotHub, build_snapshot
+
+router = Router({'GET,POST /api/batch': handle_batch})
+
+
+class TelemetryDict(dict):
+    """Telemetry values, None for variables the sim does not have"""
+
+    def __missing__(self, key):
+        return None
+
+
+class FakeState:
+    ir_connected = True
+
+
+class FakeContext:
+    def __init__(self, hub):
+        self.snapshots = hub
+        self.state = FakeState()
+        self.logger = logging.getLogger('batch.spec')
+
+
+def call(ctx, target: str, body: dict | None = None) -> tuple[int, dict]:
+    headers = Message()
+    data = b''
+    if body is not None:
+        data = json.dumps(body).encode()
+        headers['Content-Length'] = str(len(data))
+
+    method = 'GET' if body is None else 'POST'
+    recorder = router.match(method, target).bind(ResponseRecorder(method, target, headers, data))
+    handle_batch(recorder, ctx)
+    return recorder.status, json.loads(recorder.body)
+
+
+def publish(hub: SnapshotHub, driver_name: str):
+    return hub.publish({
+        'session_time': 12.5,
+        'driver': {'driver_name': driver_name},
+        'camera': {'current_camera': 'TV1'},
+        'standings': None,
+        'vars': {},
+    })
+
+
+class TestBatch:
+    """Test building several resources from one snapshot"""
+
+    def setup_method(self):
+        self.hub = SnapshotHub()
+        self.ctx = FakeContext(self.hub)
+
+    def test_resources_come_from_one_snapshot(self):
+        publish(self.hub, 'A')
+        status, data = call(self.ctx, '/api/batch?resources=driver,camera')
+
+        assert status == 200
+        assert data['version'] == 1
+        assert data['session_time'] == 12.5
+        assert data['resources'] == {
+            'driver': {'driver_name': 'A'},
+            'camera': {'current_camera': 'TV1'},
+        }
+
+    def test_post_body_and_unavailable_resource(self):
+        publish(self.hub, 'A')
+        status, data = call(self.ctx, '/api/batch', {'resources': ['driver', 'standings']})
+
+        assert status == 200
+        assert list(data['resources']) == ['driver']
+        assert data['errors']['standings']['status'] == 503
+
+    def test_resources_are_built_once_per_tick(self):
+        calls = []
+        BATCH_RESOURCES['counted'] = lambda ctx, snapshot: calls.append(snapshot.version) or len(calls)
+        try:
+            publish(self.hub, 'A')
+            call(self.ctx, '/api/batch?resources=counted')
+            call(self.ctx, '/api/batch?resources=counted')
+            publish(self.hub, 'B')
+            _, data = call(self.ctx, '/api/batch?resources=counted')
+        finally:
+            del BATCH_RESOURCES['counted']
+
+        assert calls == [1, 2]
+        assert data['resources']['counted'] == 2
+
+    def test_unknown_resource_is_rejected(self):
+        publish(self.hub, 'A')
+        status, data = call(self.ctx, '/api/batch?resources=driver,nope')
+        assert status == 400
+        assert 'nope' in data['error']
+
+    def test_raw_vars_are_not_a_resource(self):
+        # They would depend on what unrelated streaming clients watch
+        publish(self.hub, 'A')
+        status, data = call(self.ctx, '/api/batch?resources=vars')
+        assert status == 400
+        assert data['error'] == 'Unknown resources: vars'
+
+    def test_no_snapshot_yet(self):
+        status, _ = call(self.ctx, '/api/batch?resources=driver')
+        assert status == 503
+
+
+class TestOnDemandSections:
+    """Test dashboard and diagnostics built by the telemetry loop"""
+
+    def setup_method(self):
+        self.hub = SnapshotHub()
+        self.ctx = FakeContext(self.hub)
+
+    def test_request_waits_for_loop_to_build_section(self):
+        publish(self.hub, 'A')
+
+        def loop():
+            # Stands in for the telemetry loop's next tick
+            while 'diagnostics' not in self.hub.requested_sections():
+                time.sleep(0.005)
+            self.hub.publish({'session_time': 12.6, 'diagnostics': {'validation': {'overall_valid': True}}})
+
+        thread = threading.Thread(target=loop)
+        thread.start()
+        status, data = call(self.ctx, '/api/batch?resources=diagnostics')
+        thread.join()
+
+        assert status == 200
+        assert data['version'] == 2
+        assert data['resources']['diagnostics'] == {'validation': {'overall_valid': True}}
+
+    def test_section_unavailable_without_loop(self, monkeypatch):
+        monkeypatch.setattr('server.batch.SECTION_WAIT', 0.01)
+        publish(self.hub, 'A')
+        status, data = call(self.ctx, '/api/batch?resources=driver,dashboard')
+
+        assert status == 200
+        assert data['resources'] == {'driver': {'driver_name': 'A'}}
+        assert data['errors']['dashboard']['status'] == 503
+
+    def test_requested_sections_expire(self, monkeypatch):
+        now = [100.0]
+        monkeypatch.setattr(snapshot_module.time, 'monotonic', lambda: now[0])
+        self.hub.request_sections(['dashboard', 'driver'])
+        assert self.hub.requested_sections() == ('dashboard',)
+
+        now[0] += snapshot_module.SECTION_TTL + 1
+        assert self.hub.requested_sections() == ()
+
+    def test_build_snapshot_adds_requested_sections(self):
+        built = []
+        snapshot_module.ON_DEMAND_SECTIONS['probe'] = lambda ir, state: built.append(ir) or {'ok': True}
+        try:
+            state = SimpleNamespace(
+                ir_connected=True, drivers=None, show_pit_cams=False, driver_in_pits=False,
+                current_camera=lambda ir: 'TV1', current_camera_target=lambda ir: None, camera_groups=lambda ir: [],
+            )
+            # A plain dict: building a snapshot must not freeze the telemetry buffer itself
+            ir = {'SessionTime': 12.5}
+
+            assert 'probe' not in build_snapshot(ir, state)
+            assert build_snapshot(ir, state, sections=('probe',))['probe'] == {'ok': True}
+            assert built == [ir]
+        finally:
+            del snapshot_module.ON_DEMAND_SECTIONS['probe']
+
+    def test_failing_sections_do_not_stop_the_snapshot(self, caplog):
+        def fail(ir, state):
+            raise ValueError('bad value')
+
+        def camera_cache_error(ir):
+            raise OSError('camera_cache is not a directory')
+
+        snapshot_module.ON_DEMAND_SECTIONS['probe'] = fail
+        try:
+            state = SimpleNamespace(
+                ir_connected=True, drivers=None, show_pit_cams=False, driver_in_pits=False,
+                current_camera=camera_cache_error, current_camera_target=lambda ir: None, camera_groups=lambda ir: [],
+            )
+            with caplog.at_level('ERROR', logger='iracing.snapshot'):
+                data = build_snapshot({'SessionTime': 12.5}, state, sections=('probe',))
+        finally:
+            del snapshot_module.ON_DEMAND_SECTIONS['probe']
+
+        assert data['session_time'] == 12.5
+        assert data['camera'] is None and data['probe'] is None
+        assert sorted(record.section for record in caplog.records) == ['camera', 'probe']
+
+    def test_dashboard_without_fuel_percentage(self):
+        state = SimpleNamespace(
+            ir_connected=True, show_pit_cams=False, driver_in_pits=False,
+            drivers=SimpleNamespace(UserName='Pat', CarNumber='7', LicString='A 4.99', IRating=3000),
+            current_camera=lambda ir: None, current_camera_target=lambda ir: None, camera_groups=lambda ir: [],
+        )
+        ir = {'FuelLevel': 20.0}
+        data = build_snapshot(TelemetryDict(ir), state, sections=('dashboard',))
+        assert data['dashboard']['fuel']['level'] == '20.00L'
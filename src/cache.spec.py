@@ -0,0 +1,124 @@
+"""Tests for the tick-keyed response cache"""
+import threading
+import time
+from email.message import Message
+
+from server.cache import CachedResponse, ResponseCache, cached_endpoint
+from server.recorder import ResponseRecorder
+
+
+class FakeHub:
+    def __init__(self, version: int = 1):
+        self.version = version
+
+
+class FakeState:
+    ir_connected = True
+
+
+class FakeContext:
+    def __init__(self, hub):
+        self.snapshots = hub
+        self.state = FakeState()
+
+
+def request(path: str = '/api/driver', if_none_match: str | None = None) -> ResponseRecorder:
+    headers = Message()
+    if if_none_match:
+        headers['If-None-Match'] = if_none_match
+    return ResponseRecorder('GET', path, headers)
+
+
+class TestResponseCache:
+    """Test versioned entries and single-flight computation"""
+
+    def test_computes_once_per_version(self):
+        cache = ResponseCache()
+        calls = []
+
+        def compute(version):
+            calls.append(version)
+            return CachedResponse(version, 200, [], b'body')
+
+        first = cache.get(('/a',), 1, lambda: compute(1))
+        assert cache.get(('/a',), 1, lambda: compute(1)) is first
+        assert cache.get(('/a',), 2, lambda: compute(2)) is not first
+        assert calls == [1, 2]
+
+    def test_errors_are_not_stored(self):
+        cache = ResponseCache()
+        cache.get(('/a',), 1, lambda: CachedResponse(1, 503, [], b'error'))
+        response = cache.get(('/a',), 1, lambda: CachedResponse(1, 200, [], b'ok'))
+        assert response.status == 200
+
+    def test_concurrent_requests_share_one_computation(self):
+        cache = ResponseCache()
+        calls = []
+        results = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.05)
+            return CachedResponse(1, 200, [], b'body')
+
+        threads = [threading.Thread(target=lambda: results.append(cache.get(('/a',), 1, compute))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert len({id(result) for result in results}) == 1
+
+    def test_evicts_least_recently_used(self):
+        cache = ResponseCache(max_entries=2)
+        for path in ('/a', '/b', '/c'):
+            cache.get((path,), 1, lambda: CachedResponse(1, 200, [], b''))
+        assert list(cache._entries) == [('/b',), ('/c',)]
+
+
+class TestCachedEndpoint:
+    """Test the endpoint wrapper and conditional GET"""
+
+    def setup_method(self):
+        self.calls = 0
+
+        def endpoint(handler, ctx):
+            self.calls += 1
+            handler.send_response(200)
+            handler.send_header('Content-Type', 'application/json')
+            handler.end_headers()
+            handler.wfile.write(b'{"calls": %d}' % self.calls)
+
+        self.hub = FakeHub()
+        self.ctx = FakeContext(self.hub)
+        self.handle = cached_endpoint(endpoint)
+
+    def test_serves_cached_body_within_a_tick(self):
+        first, second = request(), request()
+        self.handle(first, self.ctx)
+        self.handle(second, self.ctx)
+        assert first.body == second.body == b'{"calls": 1}'
+        assert first.get_header('ETag') == second.get_header('ETag')
+
+    def test_new_tick_recomputes(self):
+        self.handle(request(), self.ctx)
+        self.hub.version = 2
+        response = request()
+        self.handle(response, self.ctx)
+        assert response.body == b'{"calls": 2}'
+
+    def test_if_none_match_returns_304(self):
+        first = request()
+        self.handle(first, self.ctx)
+
+        second = request(if_none_match=first.get_header('ETag'))
+        self.handle(second, self.ctx)
+        assert second.status == 304
+        assert second.body == b''
+
+    def test_bypasses_cache_before_first_snapshot(self):
+        self.hub.version = 0
+        self.handle(request(), self.ctx)
+        self.handle(request(), self.ctx)
+        assert self.calls == 2
@@ -1,100 +1,164 @@
 import json
+import logging
+from pathlib import Path
 from models.telemetry import TelemetryHandler, FileTelemetryHandler
+from metrics import SESSION_INFO_REPARSES
+
+logger = logging.getLogger('iracing.camera')
 
 class iRacingCamera:
     def __init__(self, id: int, name: str):
         self.id = id
         self.name = name
 
+    def to_dict(self) -> dict:
+        return {'id': self.id, 'name': self.name}
+
 class iRacingCameraGroup:
-    def __init__(self, id: int, name: str, cameras: list[iRacingCamera] = []):
+    def __init__(self, id: int, name: str, cameras: list[iRacingCamera] | None = None):
         self.id = id
         self.name = name
-        self.cameras = cameras
+        # Each group owns its own list (a shared mutable default would leak
+        # cameras between groups)
+        self.cameras = cameras if cameras is not None else []
 
     def add_camera(self, camera: iRacingCamera):
         self.cameras.append(camera)
 
+    @staticmethod
     def from_config(config: dict):
         group = iRacingCameraGroup(config['GroupNum'], config['GroupName'])
 
-        for camera in config['Cameras']:
+        for camera in config.get('Cameras') or []:
             group.add_camera(iRacingCamera(camera['CameraNum'], camera['CameraName']))
-        
+
         return group
 
+    def to_dict(self) -> dict:
+        return {
+            'id': self.id,
+            'name': self.name,
+            'cameras': [camera.to_dict() for camera in self.cameras]
+        }
+
 class CameraManager:
-    def __init__(self, ir: TelemetryHandler):
-        self.cameras = self.__get_cameras(ir)
-        self.current_camera = self.__selected_camera(ir)
-        self.last_camera = self.current_camera
+    """
+    Tracks the camera groups available in the current session.
+
+    Camera groups only change when iRacing publishes a new session info
+    update, so the groups are rebuilt from `CameraInfo` only when the
+    session info version changes.  The currently selected group is looked
+    up from `CamGroupNumber` on every refresh, which is a dictionary hit.
+    """
+
+    def __init__(self, ir: TelemetryHandler, cache_dir: str = 'camera_cache'):
+        self.cache_dir = Path(cache_dir)
+
+        self.cameras: list[iRacingCameraGroup] = []
+        self.groups_by_id: dict[int, iRacingCameraGroup] = {}
+        self.groups_by_name: dict[str, iRacingCameraGroup] = {}
+
+        self.current_camera: iRacingCameraGroup | None = None
+        self.last_camera: iRacingCameraGroup | None = None
+
+        # Session info version the groups were built from (None = never built)
+        self.session_info_version = None
+        self.track_id = None
 
         self.isNotUsed = isinstance(ir, FileTelemetryHandler)
 
+        self.refresh(ir)
+        self.last_camera = self.current_camera
+
+    def cache_path(self, track_id) -> Path:
+        return self.cache_dir / f'camera_config_{track_id}.json'
+
     def document_cameras(self, ir: TelemetryHandler):
         """
-        Creates a document from the current camera configuration
+        Writes the current camera configuration to the per-track camera
+        cache, a reference of each track's camera groups.  Nothing reads it
+        back: CameraInfo arrives with WeekendInfo, so live data is always
+        at hand by the time the groups are needed.
+
+        :returns: The cache file, or None when it could not be written
         """
 
         # Get the Weekend Headers
         weekend = ir['WeekendInfo']
 
+        if not weekend:
+            return None
+
         tId = weekend['TrackID']
         tName = weekend['TrackDisplayName']
 
         output = dict({
             'trackId': tId,
             'trackName': tName,
-            'cameras': self.cameras
+            'cameras': [group.to_dict() for group in self.cameras]
         })
 
-        with open(f'camera_config_{tId}.json', 'w') as f:
-            json.dump(output, f, indent=4)
+        path = self.cache_path(tId)
 
-        pass
+        # Runs from the telemetry loop; a cache that can't be written must not stop it
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with open(path, 'w') as f:
+                json.dump(output, f, indent=4)
+        except OSError as e:
+            logger.warning('Camera cache not written', extra={'path': str(path), 'error': str(e)})
+            return None
+
+        return path
 
     def find_group(self, name=None, id=None) -> iRacingCameraGroup | None:
         if name:
-            return next((cam for cam in self.cameras if cam.name == name), None)
-        
-        if id:
-            return next((cam for cam in self.cameras if cam.id == id), None)
-        
+            return self.groups_by_name.get(name)
+
+        if id is not None:
+            return self.groups_by_id.get(id)
+
         return None
 
     def refresh(self, ir: TelemetryHandler):
         if self.isNotUsed:
             return
 
-        self.cameras = self.__get_cameras(ir)
+        version = ir.get_session_info_version()
+
+        if version != self.session_info_version:
+            self.session_info_version = version
+            groups = self.__get_cameras(ir)
+            SESSION_INFO_REPARSES.inc('CameraInfo')
+
+            # Session info updates are frequent (results, weather, ...) but
+            # the camera groups rarely change, so only swap and re-document
+            # them when their content differs.  The last groups are kept
+            # while the sim has not published CameraInfo
+            if groups and [g.to_dict() for g in groups] != [g.to_dict() for g in self.cameras]:
+                self.__set_groups(groups)
+                self.document_cameras(ir)
+
         self.current_camera = self.__selected_camera(ir)
 
+    def __set_groups(self, groups: list[iRacingCameraGroup]):
+        self.cameras = groups
+        self.groups_by_id = {group.id: group for group in groups}
+        self.groups_by_name = {group.name: group for group in groups}
+
     def __get_cameras(self, ir: TelemetryHandler) -> list[iRacingCameraGroup]:
       if isinstance(ir, FileTelemetryHandler):
           return []
 
       camInfo = ir['CameraInfo']
 
-      groups: list[iRacingCameraGroup] = []
-      for group in camInfo['Groups']:
-          groups.append(iRacingCameraGroup.from_config(group))
+      if not camInfo:
+          return []
+
+      return [iRacingCameraGroup.from_config(group) for group in camInfo['Groups']]
 
-      return groups
-    
     def __selected_camera(self, ir: TelemetryHandler) -> iRacingCameraGroup | None:
       if isinstance(ir, FileTelemetryHandler):
           return None
-      
-      cameras = self.__get_cameras(ir)
-      camId = ir['CamGroupNumber']
-
-      if not cameras or not camId:
-          return None
-      
-      current_camera = next((cam for cam in cameras if cam.id == camId), None)
-
-      if current_camera:
-          return current_camera
-      
-      return None
 
+      return self.groups_by_id.get(ir['CamGroupNumber'])
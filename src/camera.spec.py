@@ -0,0 +1,124 @@
+"""Tests for CameraManager caching and group lookup"""
+import json
+import pytest
+from camera import CameraManager, iRacingCameraGroup
+from models.telemetry import TelemetryHandler
+
+
+class FakeTelemetry(TelemetryHandler):
+    """Dictionary backed telemetry handler that counts CameraInfo reads"""
+
+    def __init__(self, data: dict):
+        super().__init__()
+        self.data = data
+        self.version = 1
+        self.camera_info_reads = 0
+
+    def get_data(self, key):
+        if key == 'CameraInfo':
+            self.camera_info_reads += 1
+        return self.data.get(key)
+
+    def get_session_info_version(self):
+        return self.version
+
+
+def camera_info(*groups):
+    return {
+        'Groups': [
+            {
+                'GroupNum': group_id,
+                'GroupName': name,
+                'Cameras': [{'CameraNum': 1, 'CameraName': f'{name} 1'}]
+            } for group_id, name in groups
+        ]
+    }
+
+
+@pytest.fixture
+def ir():
+    return FakeTelemetry({
+        'WeekendInfo': {'TrackID': 123, 'TrackDisplayName': 'Test Track'},
+        'CameraInfo': camera_info((1, 'Nose'), (2, 'TV1'), (3, 'Chase')),
+        'CamGroupNumber': 2,
+    })
+
+
+class TestCameraManager:
+    """Test CameraManager caching behaviour"""
+
+    def test_groups_do_not_share_camera_lists(self):
+        """Test that groups created without cameras get their own list"""
+        a = iRacingCameraGroup(1, 'A')
+        b = iRacingCameraGroup(2, 'B')
+        a.cameras.append('camera')
+        assert b.cameras == []
+
+    def test_current_camera_from_group_number(self, ir, tmp_path):
+        """Test that the selected group comes from CamGroupNumber"""
+        manager = CameraManager(ir, cache_dir=tmp_path)
+        assert manager.current_camera.name == 'TV1'
+
+        ir.data['CamGroupNumber'] = 3
+        manager.refresh(ir)
+        assert manager.current_camera.name == 'Chase'
+
+    def test_refresh_skips_rebuild_without_session_update(self, ir, tmp_path):
+        """Test that CameraInfo is only read when the session info changes"""
+        manager = CameraManager(ir, cache_dir=tmp_path)
+        reads = ir.camera_info_reads
+
+        for _ in range(10):
+            manager.refresh(ir)
+        assert ir.camera_info_reads == reads
+
+        ir.version += 1
+        manager.refresh(ir)
+        assert ir.camera_info_reads == reads + 1
+
+    def test_find_group_by_name_and_id(self, ir, tmp_path):
+        """Test dictionary lookups for groups"""
+        manager = CameraManager(ir, cache_dir=tmp_path)
+        assert manager.find_group(name='Nose').id == 1
+        assert manager.find_group(id=3).name == 'Chase'
+        assert manager.find_group(id=99) is None
+        assert manager.find_group() is None
+
+    def test_document_cameras_writes_track_cache(self, ir, tmp_path):
+        """Test that building groups writes a per-track cache file"""
+        CameraManager(ir, cache_dir=tmp_path)
+
+        with open(tmp_path / 'camera_config_123.json') as f:
+            cached = json.load(f)
+
+        assert cached['trackName'] == 'Test Track'
+        assert [g['name'] for g in cached['cameras']] == ['Nose', 'TV1', 'Chase']
+
+    def test_groups_kept_without_camera_info(self, ir, tmp_path):
+        """Test that a session info update without CameraInfo keeps the groups"""
+        manager = CameraManager(ir, cache_dir=tmp_path)
+        ir.data.pop('CameraInfo')
+        ir.version += 1
+        manager.refresh(ir)
+        assert [g.name for g in manager.cameras] == ['Nose', 'TV1', 'Chase']
+
+    def test_changed_groups_rewrite_track_cache(self, ir, tmp_path):
+        """Test that new CameraInfo replaces the groups and the cache file"""
+        manager = CameraManager(ir, cache_dir=tmp_path)
+        ir.data['CameraInfo'] = camera_info((1, 'Nose'), (2, 'TV1'), (4, 'Blimp'))
+        ir.version += 1
+        manager.refresh(ir)
+        assert manager.find_group(name='Blimp').id == 4
+        assert manager.find_group(name='Chase') is None
+
+        with open(tmp_path / 'camera_config_123.json') as f:
+            assert [g['name'] for g in json.load(f)['cameras']] == ['Nose', 'TV1', 'Blimp']
+
+    def test_unwritable_cache_is_not_fatal(self, ir, tmp_path):
+        """Test that a cache directory that can't be created only skips the cache"""
+        blocked = tmp_path / 'camera_cache'
+        blocked.write_text('not a directory')
+
+        manager = CameraManager(ir, cache_dir=blocked)
+        assert manager.current_camera.name == 'TV1'
+        assert manager.document_cameras(ir) is None
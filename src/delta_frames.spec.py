@@ -0,0 +1,187 @@
+"""Tests for delta-encoded telemetry frames"""
+import json
+
+from server.delta import DeltaDecoder, DeltaEncoder, diff_values
+from server.snapshot import Snapshot
+from server.stream import encode_frame
+from server.websocket import WebSocketClient
+
+
+def snapshot(version: int, lap_pct=None, speed=50.0, **extra) -> Snapshot:
+    lap_pct = lap_pct or [idx / 100 for idx in range(64)]
+    return Snapshot(version, {
+        'session_time': version / 60,
+        'driver': {'driver_name': 'Pat', 'driver_incidents': 0},
+        'vars': {'Speed': speed, 'CarIdxLapDistPct': lap_pct},
+        **extra,
+    })
+
+
+def frame(body: str) -> dict:
+    return json.loads(f'{{{body}}}')
+
+
+def ops(old, new) -> dict:
+    changes = diff_values(old, new)
+    return {name: [json.loads(item) for item in items] for name, items in zip(('set', 'idx', 'del'), changes) if items}
+
+
+class TestDiff:
+    """Test the operations between two values"""
+
+    def test_nested_changes_and_removals(self):
+        old = {'driver': {'name': 'A', 'inc': 1, 'team': 'X'}, 'time': 1.0}
+        new = {'driver': {'name': 'A', 'inc': 2}, 'time': 1.0, 'flag': True}
+        assert ops(old, new) == {
+            'set': [[['driver', 'inc'], 2], [['flag'], True]],
+            'del': [['driver', 'team']],
+        }
+
+    def test_sparse_list_update(self):
+        old = [0.0] * 64
+        new = list(old)
+        new[3], new[17] = 0.5, 0.25
+        assert ops(old, new) == {'idx': [[[], [3, 0.5, 17, 0.25]]]}
+
+    def test_mostly_changed_or_resized_list_is_replaced(self):
+        assert ops([1, 2, 3, 4], [5, 6, 7, 4]) == {'set': [[[], [5, 6, 7, 4]]]}
+        assert ops([1, 2], [1, 2, 3]) == {'set': [[[], [1, 2, 3]]]}
+
+    def test_timestamp_alone_is_not_a_change(self):
+        old = {'driver': {'name': 'A', 'timestamp': 1.0}, 'camera': {'group': 1, 'timestamp': 1.0}}
+        new = {'driver': {'name': 'A', 'timestamp': 2.0}, 'camera': {'group': 2, 'timestamp': 2.0}}
+        assert ops(old, new) == {'set': [[['camera', 'group'], 2], [['camera', 'timestamp'], 2.0]]}
+        assert ops({'timestamp': 1.0}, {'timestamp': 2.0}) == {}
+
+    def test_type_change_is_a_change(self):
+        assert ops({'on': 1}, {'on': True}) == {'set': [[['on'], True]]}
+        assert ops({'on': 1}, {'on': 1}) == {}
+
+
+class TestEncoder:
+    """Test keyframes, deltas and sequence numbers"""
+
+    def test_keyframe_then_deltas(self):
+        encoder = DeltaEncoder()
+        first = snapshot(1)
+        key = frame(encoder.encode(first, first.data, now=0.0))
+        assert key == {'seq': 0, 'key': True, 'data': first.data}
+
+        lap_pct = list(first.data['vars']['CarIdxLapDistPct'])
+        lap_pct[5] = 0.9
+        second = snapshot(2, lap_pct, speed=51.0)
+        delta = frame(encoder.encode(second, second.data, now=1.0))
+        assert delta == {
+            'seq': 1,
+            'set': [[['session_time'], 2 / 60], [['vars', 'Speed'], 51.0]],
+            'idx': [[['vars', 'CarIdxLapDistPct'], [5, 0.9]]],
+        }
+
+    def test_no_frame_without_changes(self):
+        encoder = DeltaEncoder()
+        first = snapshot(1)
+        encoder.encode(first, {'driver': first.data['driver']}, now=0.0)
+        second = snapshot(2)
+        assert encoder.encode(second, {'driver': second.data['driver']}, now=1.0) is None
+        assert encoder.seq == 1
+
+    def test_no_frame_when_only_timestamps_change(self):
+        encoder = DeltaEncoder()
+        first = snapshot(1)
+        encoder.encode(first, {'driver': {**first.data['driver'], 'timestamp': 1.0}}, now=0.0)
+        second = snapshot(2)
+        assert encoder.encode(second, {'driver': {**second.data['driver'], 'timestamp': 2.0}}, now=1.0) is None
+
+    def test_periodic_and_requested_keyframes(self):
+        encoder = DeltaEncoder(keyframe_interval=5.0)
+        for version, now in enumerate((0.0, 1.0, 5.0, 6.0), start=1):
+            current = snapshot(version)
+            encoder.encode(current, current.data, now=now)
+        assert encoder.keyframes == 2
+
+        encoder.request_keyframe()
+        current = snapshot(5)
+        assert frame(encoder.encode(current, current.data, now=7.0))['key'] is True
+
+    def test_added_and_removed_sections(self):
+        encoder = DeltaEncoder()
+        first = snapshot(1)
+        encoder.encode(first, {'driver': first.data['driver']}, now=0.0)
+        second = snapshot(2)
+        delta = frame(encoder.encode(second, {'camera': {'group': 12}}, now=1.0))
+        assert delta == {'seq': 1, 'set': [[['camera'], {'group': 12}]], 'del': [['driver']]}
+
+    def test_diffs_shared_between_streams(self):
+        first, second = snapshot(1), snapshot(2, speed=60.0)
+        streams = [DeltaEncoder(scope='test') for _ in range(3)]
+        for encoder in streams:
+            encoder.encode(first, first.data, now=0.0)
+        bodies = [encoder.encode(second, second.data, now=1.0) for encoder in streams]
+        assert len(set(bodies)) == 1
+        assert len([key for key in second.encoded if key[0] == 'delta']) == len(second.data)
+
+
+class TestDecoder:
+    """Test applying frames and detecting gaps"""
+
+    def test_decoder_follows_encoder(self):
+        encoder, decoder = DeltaEncoder(), DeltaDecoder()
+        lap_pct = [idx / 100 for idx in range(64)]
+        for version in range(1, 200):
+            lap_pct = list(lap_pct)
+            lap_pct[version % 64] += 0.001
+            extra = {'flag': 'green'} if version % 50 < 25 else {}
+            current = snapshot(version, lap_pct, speed=float(version % 7), **extra)
+            body = encoder.encode(current, current.data, now=version / 60)
+            if body is not None:
+                assert decoder.apply(frame(body))
+            assert decoder.data == current.data
+        assert encoder.keyframes == 1
+
+    def test_gap_waits_for_keyframe(self):
+        encoder, decoder = DeltaEncoder(), DeltaDecoder()
+        frames = []
+        for version in range(1, 5):
+            current = snapshot(version, speed=float(version))
+            frames.append(frame(encoder.encode(current, current.data, now=version)))
+
+        assert decoder.apply(frames[0])
+        assert not decoder.apply(frames[2])
+        assert not decoder.synced
+        assert not decoder.apply(frames[3])
+
+        encoder.request_keyframe()
+        current = snapshot(5, speed=5.0)
+        assert decoder.apply(frame(encoder.encode(current, current.data, now=5.0)))
+        assert decoder.data['vars']['Speed'] == 5.0
+
+
+class TestStreams:
+    """Test frames mode on the SSE and WebSocket streams"""
+
+    def test_sse_frame_event(self):
+        encoder = DeltaEncoder(scope=('sse', ('vars',)))
+        first, second = snapshot(1), snapshot(2, speed=52.0)
+        assert encode_frame(first, ('vars',), encoder).startswith(b'id: 1\nevent: frame\ndata: {"seq":0,"key":true,')
+        assert encode_frame(second, ('vars',), encoder) == (
+            b'id: 2\nevent: frame\ndata: {"seq":1,"set":[[["vars","Speed"],52.0]]}\n\n'
+        )
+        assert encode_frame(snapshot(3, speed=52.0), ('vars',), encoder) == b''
+
+    def test_websocket_keyframe_carries_every_channel(self):
+        client = WebSocketClient(connection=None, frames=True)
+        client.subscriptions = {'driver': None, 'var:Speed': None}
+
+        channels, message = client.encode(snapshot(1), ('var:Speed',), now=0.0)
+        assert channels == ('driver', 'var:Speed')
+        assert json.loads(message)['data'] == {'driver': {'driver_name': 'Pat', 'driver_incidents': 0}, 'var:Speed': 50.0}
+
+        channels, message = client.encode(snapshot(2, speed=53.0), ('var:Speed',), now=1.0)
+        assert channels == ('var:Speed',)
+        assert json.loads(message) == {'type': 'frame', 'version': 2, 'seq': 1, 'set': [[['var:Speed'], 53.0]]}
+
+    def test_websocket_update_mode_unchanged(self):
+        client = WebSocketClient(connection=None)
+        client.subscriptions = {'var:Speed': None}
+        channels, message = client.encode(snapshot(1), ('var:Speed',), now=0.0)
+        assert json.loads(message) == {'type': 'update', 'version': 1, 'channels': {'var:Speed': 50.0}}
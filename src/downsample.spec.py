@@ -0,0 +1,83 @@
+"""Tests for telemetry history range queries and downsampling"""
+import math
+
+from history.buffer import TelemetryHistory
+from history.downsample import lttb, minmax
+
+
+class FakeIR:
+    def __init__(self):
+        self.values = {'SessionNum': 0, 'SessionTime': 0.0, 'Speed': 0.0, 'OnPitRoad': False, 'CarIdxLap': [1, 2]}
+
+    def keys(self):
+        return list(self.values)
+
+    def __getitem__(self, key):
+        return self.values[key]
+
+
+def trace(length: int):
+    times = [i / 60 for i in range(length)]
+    values = [math.sin(i / 50) for i in range(length)]
+    values[1234] = 10.0
+    return times, values
+
+
+class TestDownsample:
+    """Test reducing a trace to a point budget"""
+
+    def test_short_trace_is_returned_unchanged(self):
+        assert minmax([0, 1], [5, 6], 100) == ([0, 1], [5, 6])
+        assert lttb([0, 1], [5, 6], 100) == ([0, 1], [5, 6])
+
+    def test_minmax_keeps_extremes_in_order(self):
+        times, values = trace(10000)
+        out_times, out_values = minmax(times, values, 200)
+
+        assert len(out_values) <= 200
+        assert out_times == sorted(out_times)
+        assert max(out_values) == 10.0
+        assert min(out_values) == min(values)
+
+    def test_lttb_keeps_endpoints_and_spike(self):
+        times, values = trace(10000)
+        out_times, out_values = lttb(times, values, 200)
+
+        assert len(out_values) == 200
+        assert out_times[0] == times[0] and out_times[-1] == times[-1]
+        assert 10.0 in out_values
+
+
+class TestTelemetryHistory:
+    """Test the live history buffer"""
+
+    def record(self, history, ir, ticks):
+        for tick in range(ticks):
+            ir.values['SessionTime'] = float(tick)
+            ir.values['Speed'] = tick * 2.0
+            history.record(ir)
+
+    def test_records_scalar_variables_only(self):
+        history = TelemetryHistory(capacity=10)
+        self.record(history, FakeIR(), 1)
+        assert sorted(history.keys()) == ['OnPitRoad', 'SessionNum', 'SessionTime', 'Speed']
+
+    def test_time_range(self):
+        history = TelemetryHistory(capacity=100)
+        self.record(history, FakeIR(), 50)
+
+        times, columns = history.query(['Speed'], 10, 12.5)
+        assert list(times) == [10.0, 11.0, 12.0]
+        assert list(columns['Speed']) == [20.0, 22.0, 24.0]
+
+    def test_capacity_drops_oldest(self):
+        history = TelemetryHistory(capacity=10)
+        self.record(history, FakeIR(), 25)
+
+        times, _ = history.query(['Speed'])
+        assert len(history) == 10
+        assert list(times) == [float(tick) for tick in range(15, 25)]
+
+        # Frames keep counting from the first recorded tick
+        times, _ = history.query(['Speed'], 20, 21, unit='frame')
+        assert list(times) == [20.0, 21.0]
@@ -0,0 +1,102 @@
+"""Tests for response encoding negotiation, the MessagePack encoder and model splicing"""
+import gzip
+import json
+from email.message import Message
+
+from models.driver_info import Driver, DriverInfo
+from server.encoding import JSON, MSGPACK, GZIP_MIN_SIZE, encode_body, encode_json, encode_msgpack, negotiate
+from server.recorder import ResponseRecorder
+
+
+def request(path: str = '/api/driver', **headers) -> ResponseRecorder:
+    message = Message()
+    for key, value in headers.items():
+        message[key.replace('_', '-')] = value
+    return ResponseRecorder('GET', path, message)
+
+
+class TestMsgpack:
+    """Test MessagePack output against the format spec"""
+
+    def test_scalars(self):
+        assert encode_msgpack(None) == b'\xc0'
+        assert encode_msgpack(True) == b'\xc3'
+        assert encode_msgpack(5) == b'\x05'
+        assert encode_msgpack(-1) == b'\xff'
+        assert encode_msgpack(300) == b'\xcd\x01\x2c'
+        assert encode_msgpack(-200) == b'\xd1\xff\x38'
+        assert encode_msgpack(1.5) == b'\xcb\x3f\xf8\x00\x00\x00\x00\x00\x00'
+
+    def test_strings_and_containers(self):
+        assert encode_msgpack('abc') == b'\xa3abc'
+        assert encode_msgpack('x' * 40) == b'\xd9\x28' + b'x' * 40
+        assert encode_msgpack([1, 2]) == b'\x92\x01\x02'
+        assert encode_msgpack({'a': 1}) == b'\x81\xa1a\x01'
+        assert encode_msgpack(list(range(16)))[:3] == b'\xdc\x00\x10'
+
+
+class TestNegotiation:
+    """Test picking the encoding from the request"""
+
+    def test_defaults_to_compact_json(self):
+        assert negotiate(request()) == (JSON, False, False)
+
+    def test_pretty_query_parameter(self):
+        assert negotiate(request('/api/driver?pretty=true'))[1] is True
+        assert negotiate(request('/api/driver?pretty=0'))[1] is False
+
+    def test_msgpack_and_gzip_from_headers(self):
+        handler = request(Accept='application/msgpack', Accept_Encoding='gzip, deflate')
+        assert negotiate(handler) == (MSGPACK, False, True)
+
+    def test_zero_quality_is_refused(self):
+        assert negotiate(request(Accept_Encoding='gzip;q=0'))[2] is False
+
+    def test_gzip_only_above_threshold(self):
+        small, encoding = encode_body({'a': 1}, JSON, allow_gzip=True)
+        assert encoding is None and small == b'{"a":1}'
+
+        data = {'a': 'x' * GZIP_MIN_SIZE}
+        body, encoding = encode_body(data, JSON, allow_gzip=True)
+        assert encoding == 'gzip'
+        assert json.loads(gzip.decompress(body)) == data
+
+
+class TestModelBytes:
+    """Test cached model JSON and splicing it into payloads"""
+
+    def setup_method(self):
+        self.driver = Driver(CarIdx=3, UserName='Driver', LicColor=0x0153db)
+
+    def test_json_bytes_are_cached_until_assignment(self):
+        body = self.driver.to_json_bytes()
+        assert self.driver.to_json_bytes() is body
+        assert json.loads(body) == self.driver.model_dump()
+
+        self.driver.UserName = 'Renamed'
+        assert json.loads(self.driver.to_json_bytes())['UserName'] == 'Renamed'
+
+    def test_cache_does_not_leak_into_copies_or_equality(self):
+        self.driver.to_json_bytes()
+        copy = self.driver.model_copy(update={'UserName': 'Copy'})
+
+        assert json.loads(copy.to_json_bytes())['UserName'] == 'Copy'
+        assert self.driver == Driver(CarIdx=3, UserName='Driver', LicColor=0x0153db)
+
+    def test_models_are_spliced_into_compact_json(self):
+        info = DriverInfo(**self.driver.model_dump(), Drivers=[self.driver])
+        payload = {'driver': info, 'cars': [self.driver], 'text': '\0json0123456789abcdef:0'}
+
+        body = encode_json(payload)
+        assert info.to_json_bytes() in body
+        assert json.loads(body) == {
+            'driver': info.model_dump(),
+            'cars': [self.driver.model_dump()],
+            'text': '\0json0123456789abcdef:0',
+        }
+
+    def test_models_in_pretty_json_and_msgpack(self):
+        expected = json.loads(encode_json({'driver': self.driver}))
+
+        assert json.loads(encode_json({'driver': self.driver}, pretty=True)) == expected
+        assert encode_msgpack({'driver': self.driver}) == encode_msgpack(expected)
@@ -0,0 +1,6 @@
+from .buffer import TelemetryHistory
+from .ibt import IbtHistory
+from .ring import RingBuffer, WindowStats, window_stats
+from .downsample import DOWNSAMPLERS, minmax, lttb
+
+__all__ = ['TelemetryHistory', 'IbtHistory', 'RingBuffer', 'WindowStats', 'window_stats', 'DOWNSAMPLERS', 'minmax', 'lttb']
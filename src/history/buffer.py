@@ -0,0 +1,124 @@
+"""
+In-memory history of live telemetry.
+
+The telemetry loop calls `TelemetryHistory.record(ir)` once per tick; the
+HTTP layer reads time or frame ranges back with `query()`. Only scalar
+numeric variables are kept, in a `RingBuffer` allocated on the first tick.
+The history starts over when the session changes or SessionTime goes
+backwards (a replay jumping back), and the loop clears it on disconnect.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+
+from .ring import RingBuffer, WindowStats
+
+TIME_KEY = 'SessionTime'
+SESSION_KEY = 'SessionNum'
+
+# Two hours of ticks at the main loop's 1 Hz
+DEFAULT_CAPACITY = 7200
+
+
+def scalar_keys(ir) -> list[str]:
+    """Telemetry variables with a single numeric value"""
+    keys = []
+    for key in ir.keys() or ():
+        value = ir[key]
+        if isinstance(value, (bool, int, float)):
+            keys.append(key)
+    return keys
+
+
+class TelemetryHistory:
+    """Fixed-size columnar history of the live session"""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        # Created on the first tick, once the session's variables are known
+        self.ring: RingBuffer | None = None
+        # SessionNum and SessionTime of the last tick recorded
+        self._session_num = None
+        self._time = None
+
+    def record(self, ir):
+        """Append the current tick's scalar variables"""
+        session_num, time = ir[SESSION_KEY], ir[TIME_KEY]
+        if self.ring is not None and (
+            session_num != self._session_num
+            or (time is not None and self._time is not None and time < self._time)
+        ):
+            # Times would no longer be sorted, or belong to another session
+            self.clear()
+        self._session_num, self._time = session_num, time
+
+        ring = self.ring
+        if ring is None:
+            names = scalar_keys(ir)
+            if TIME_KEY not in names:
+                return
+            ring = self.ring = RingBuffer(names, self.capacity, TIME_KEY)
+        ring.append(ir)
+
+    def clear(self):
+        self.ring = None
+        self._session_num = None
+        self._time = None
+
+    def keys(self) -> list[str]:
+        ring = self.ring
+        return ring.keys() if ring else []
+
+    def __len__(self) -> int:
+        ring = self.ring
+        return len(ring) if ring else 0
+
+    def query(self, names, start=None, end=None, unit: str = 'time'):
+        """
+        Read a range of the history.
+
+        Args:
+            names: Variables to return (must be in `keys()`)
+            start: First SessionTime (or frame, with unit='frame') to include
+            end: Last SessionTime (or frame) to include
+            unit: 'time' or 'frame'
+
+        Returns:
+            (times, {name: values}) copies of the selected rows
+        """
+        ring = self.ring
+        if ring is None:
+            return array('d'), {name: array('d') for name in names}
+        return ring.window(names, start, end, unit)
+
+    def value_at(self, name: str, time: float):
+        """Value of a variable at a SessionTime (the last tick at or before it)"""
+        ring = self.ring
+        return ring.value_at(name, time) if ring else None
+
+    def stats(self, name: str, start=None, end=None, unit: str = 'time') -> WindowStats:
+        """min / max / mean of a variable over a range"""
+        ring = self.ring
+        return ring.stats(name, start, end, unit) if ring else WindowStats(0, None, None, None)
+
+    def span(self, unit: str = 'time') -> tuple[float, float] | None:
+        """Oldest and newest SessionTime (or frame) held"""
+        ring = self.ring
+        return ring.span(unit) if ring else None
+
+
+def time_range(times, start=None, end=None, low: int = 0) -> tuple[int, int]:
+    """Row slice for a SessionTime range over a sorted time column"""
+    high = len(times)
+    if start is not None:
+        low = bisect_left(times, start, low, high)
+    if end is not None:
+        high = bisect_right(times, end, low, high)
+    return low, high
+
+
+def frame_range(first: int, length: int, start=None, end=None) -> tuple[int, int]:
+    """Row slice for an inclusive frame range over rows numbered from `first`"""
+    low = 0 if start is None else int(start) - first
+    high = length if end is None else int(end) - first + 1
+    return max(low, 0), max(min(high, length), 0)
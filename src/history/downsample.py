@@ -0,0 +1,98 @@
+"""
+Downsampling for telemetry traces.
+
+Both functions take a time column and a value column (any sequence: list or
+`array`) and return `(times, values)` lists of at most `points` samples.
+Traces already at or under the requested size are returned unchanged.
+"""
+
+# Below this many points neither algorithm has room to work
+MIN_POINTS = 3
+
+
+def minmax(times, values, points: int) -> tuple[list, list]:
+    """
+    Keep the minimum and maximum of each bucket.
+
+    Splits the trace into `points // 2` equal buckets and keeps both extremes
+    of each, in their original order, so spikes survive the reduction. The
+    min/max/index scans run in C, which makes this the cheap default.
+    """
+    length = len(values)
+    if points >= length or points < MIN_POINTS:
+        return list(times), list(values)
+
+    buckets = points // 2
+    out_times, out_values = [], []
+
+    for bucket in range(buckets):
+        start = bucket * length // buckets
+        end = (bucket + 1) * length // buckets
+        chunk = values[start:end]
+
+        low = start + chunk.index(min(chunk))
+        high = start + chunk.index(max(chunk))
+
+        for index in sorted({low, high}):
+            out_times.append(times[index])
+            out_values.append(values[index])
+
+    return out_times, out_values
+
+
+def lttb(times, values, points: int) -> tuple[list, list]:
+    """
+    Largest-Triangle-Three-Buckets.
+
+    Keeps the first and last sample and, from each bucket in between, the one
+    forming the largest triangle with the previously kept sample and the
+    average of the next bucket. Visually closer to the original trace than
+    min/max buckets at the same point count, at the cost of a Python loop
+    over every sample.
+    """
+    length = len(values)
+    if points >= length or points < MIN_POINTS:
+        return list(times), list(values)
+
+    out_times, out_values = [times[0]], [values[0]]
+    every = (length - 2) / (points - 2)
+    kept = 0
+
+    for bucket in range(points - 2):
+        start = int(bucket * every) + 1
+        end = int((bucket + 1) * every) + 1
+
+        # Average of the next bucket is the third vertex
+        next_start = end
+        next_end = min(int((bucket + 2) * every) + 1, length)
+        span = next_end - next_start
+        avg_time = sum(times[next_start:next_end]) / span
+        avg_value = sum(values[next_start:next_end]) / span
+
+        kept_time = times[kept]
+        kept_value = values[kept]
+        best_area = -1.0
+        best = start
+
+        for index in range(start, end):
+            area = abs(
+                (kept_time - avg_time) * (values[index] - kept_value)
+                - (kept_time - times[index]) * (avg_value - kept_value)
+            )
+            if area > best_area:
+                best_area = area
+                best = index
+
+        out_times.append(times[best])
+        out_values.append(values[best])
+        kept = best
+
+    out_times.append(times[length - 1])
+    out_values.append(values[length - 1])
+    return out_times, out_values
+
+
+DOWNSAMPLERS = {
+    'minmax': minmax,
+    'lttb': lttb,
+}
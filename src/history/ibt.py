@@ -0,0 +1,94 @@
+"""
+History of a telemetry (.ibt) file.
+
+Gives the whole recording the same `keys()` / `query()` interface as the
+live `TelemetryHistory`. Columns are read from the file on first use and
+kept as `array('d')` so repeated chart requests do not walk the file again.
+"""
+
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from threading import Lock
+
+from .buffer import TIME_KEY, time_range, frame_range
+from .ring import WindowStats, window_stats
+
+# Decoded columns kept in memory (8 bytes per frame each)
+MAX_CACHED_COLUMNS = 32
+
+
+class IbtHistory:
+    """Columnar access to every frame of an IBT file"""
+
+    def __init__(self, ibt, max_columns: int = MAX_CACHED_COLUMNS):
+        self.ibt = ibt
+        self.max_columns = max_columns
+        self._columns: OrderedDict[str, array] = OrderedDict()
+        self._lock = Lock()
+
+    def keys(self) -> list[str]:
+        """Scalar variables in the file"""
+        headers = self.ibt._var_headers_dict or {}
+        # Type 0 is char; everything else is numeric
+        return [name for name, header in headers.items() if header.count == 1 and header.type != 0]
+
+    def __len__(self) -> int:
+        disk_header = self.ibt._disk_header
+        return disk_header.session_record_count if disk_header else 0
+
+    def column(self, name: str) -> array:
+        """All frames of one variable"""
+        with self._lock:
+            column = self._columns.get(name)
+            if column is not None:
+                self._columns.move_to_end(name)
+                return column
+
+        values = self.ibt.get_all(name)
+        column = array('d', values or ())
+
+        with self._lock:
+            self._columns[name] = column
+            while len(self._columns) > self.max_columns:
+                self._columns.popitem(last=False)
+        return column
+
+    def query(self, names, start=None, end=None, unit: str = 'time'):
+        """
+        Read a range of the file.
+
+        Args:
+            names: Variables to return (must be in `keys()`)
+            start: First SessionTime (or frame, with unit='frame') to include
+            end: Last SessionTime (or frame) to include
+            unit: 'time' or 'frame'
+
+        Returns:
+            (times, {name: values}) for the selected frames
+        """
+        low, high = self._rows(start, end, unit)
+        return self.column(TIME_KEY)[low:high], {name: self.column(name)[low:high] for name in names}
+
+    def _rows(self, start, end, unit: str) -> tuple[int, int]:
+        times = self.column(TIME_KEY)
+        if unit == 'frame':
+            return frame_range(0, len(times), start, end)
+        return time_range(times, start, end)
+
+    def value_at(self, name: str, time: float):
+        """Value of a variable at a SessionTime (the last frame at or before it)"""
+        index = bisect_right(self.column(TIME_KEY), time) - 1
+        return self.column(name)[index] if index >= 0 else None
+
+    def stats(self, name: str, start=None, end=None, unit: str = 'time') -> WindowStats:
+        """min / max / mean of a variable over a range"""
+        low, high = self._rows(start, end, unit)
+        return window_stats(memoryview(self.column(name))[low:high])
+
+    def span(self, unit: str = 'time') -> tuple[float, float] | None:
+        """First and last SessionTime (or frame) of the file"""
+        times = self.column(TIME_KEY)
+        if not times:
+            return None
+        return (0, len(times) - 1) if unit == 'frame' else (times[0], times[-1])
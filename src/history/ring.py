@@ -0,0 +1,184 @@
+"""
+Fixed-size ring buffer of telemetry columns.
+
+Every column is an `array('d')` of `capacity` slots allocated up front, so
+memory is `8 * capacity * (columns + 1)` bytes from the first tick on, and an
+append writes one slot per column without allocating.  Rows are ordered by
+the time column, which lets time lookups bisect the two halves of the ring
+instead of copying it.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from threading import Lock
+from typing import NamedTuple
+
+
+class WindowStats(NamedTuple):
+    """Summary of one variable over a window"""
+
+    count: int
+    min: float | None
+    max: float | None
+    mean: float | None
+
+
+def window_stats(*parts) -> WindowStats:
+    """Stats over one or more value sequences taken as one"""
+    parts = [part for part in parts if len(part)]
+    count = sum(len(part) for part in parts)
+    if not count:
+        return WindowStats(0, None, None, None)
+    return WindowStats(
+        count,
+        min(min(part) for part in parts),
+        max(max(part) for part in parts),
+        sum(sum(part) for part in parts) / count,
+    )
+
+
+class RingBuffer:
+    """
+    The last `capacity` rows of a time column and named value columns.
+
+    One thread appends; any thread can query.  Queries return copies.
+    """
+
+    def __init__(self, names, capacity: int, time_key: str = 'SessionTime'):
+        if capacity < 1:
+            raise ValueError('capacity must be at least 1')
+        self.capacity = capacity
+        self.time_key = time_key
+        self.names = [name for name in dict.fromkeys(names) if name != time_key]
+        self._lock = Lock()
+        self._times = array('d', bytes(8 * capacity))
+        self._columns = {name: array('d', bytes(8 * capacity)) for name in self.names}
+        self._pairs = tuple(self._columns.items())
+        # Slot the next row goes into
+        self._head = 0
+        self._count = 0
+        # Rows ever appended; the frame number of the next row
+        self._total = 0
+
+    @property
+    def nbytes(self) -> int:
+        return 8 * self.capacity * (len(self.names) + 1)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def keys(self) -> list[str]:
+        return [self.time_key, *self.names]
+
+    def append(self, row):
+        """
+        Append one row.
+
+        Args:
+            row: Anything indexable by column name (a telemetry handler, a
+                dict); missing values are stored as 0
+        """
+        with self._lock:
+            head = self._head
+            self._times[head] = row[self.time_key] or 0.0
+            for name, column in self._pairs:
+                column[head] = row[name] or 0.0
+
+            self._head = head + 1 if head + 1 < self.capacity else 0
+            if self._count < self.capacity:
+                self._count += 1
+            self._total += 1
+
+    def clear(self):
+        """Drop every row; the columns stay allocated"""
+        with self._lock:
+            self._head = self._count = self._total = 0
+
+    # Positions below are logical: 0 is the oldest row held
+
+    def _start(self) -> int:
+        return (self._head - self._count) % self.capacity
+
+    def _segments(self, low: int, high: int):
+        """Physical (start, end) slices holding logical rows [low, high)"""
+        if low >= high:
+            return ()
+        start = (self._start() + low) % self.capacity
+        end = start + (high - low)
+        if end <= self.capacity:
+            return ((start, end),)
+        return ((start, self.capacity), (0, end - self.capacity))
+
+    def _bisect(self, value: float, right: bool) -> int:
+        find = bisect_right if right else bisect_left
+        start = self._start()
+        first = min(self._count, self.capacity - start)
+        position = find(self._times, value, start, start + first) - start
+        if position < first or first == self._count:
+            return position
+        return first + find(self._times, value, 0, self._count - first)
+
+    def _time_rows(self, start=None, end=None) -> tuple[int, int]:
+        low = 0 if start is None else self._bisect(start, right=False)
+        high = self._count if end is None else self._bisect(end, right=True)
+        return low, max(low, high)
+
+    def _frame_rows(self, start=None, end=None) -> tuple[int, int]:
+        first = self._total - self._count
+        low = 0 if start is None else int(start) - first
+        high = self._count if end is None else int(end) - first + 1
+        low = max(low, 0)
+        return low, max(min(high, self._count), low)
+
+    def _rows(self, start, end, unit: str) -> tuple[int, int]:
+        return self._frame_rows(start, end) if unit == 'frame' else self._time_rows(start, end)
+
+    def _copy(self, column: array, low: int, high: int) -> array:
+        out = array('d')
+        for a, b in self._segments(low, high):
+            out += column[a:b]
+        return out
+
+    def window(self, names, start=None, end=None, unit: str = 'time'):
+        """
+        Rows in a SessionTime (or, with unit='frame', frame number) range,
+        both ends inclusive.
+
+        Returns:
+            (times, {name: values}) copies of the selected rows
+        """
+        with self._lock:
+            low, high = self._rows(start, end, unit)
+            return self._copy(self._times, low, high), {
+                name: self._copy(self._column(name), low, high) for name in names
+            }
+
+    def value_at(self, name: str, time: float):
+        """Value of the last row at or before `time`, None before the oldest row"""
+        with self._lock:
+            position = self._bisect(time, right=True) - 1
+            if position < 0:
+                return None
+            return self._column(name)[(self._start() + position) % self.capacity]
+
+    def stats(self, name: str, start=None, end=None, unit: str = 'time') -> WindowStats:
+        """min / max / mean of a variable over a range, without copying it"""
+        with self._lock:
+            low, high = self._rows(start, end, unit)
+            column = self._column(name)
+            return window_stats(*(memoryview(column)[a:b] for a, b in self._segments(low, high)))
+
+    def span(self, unit: str = 'time') -> tuple[float, float] | None:
+        """Oldest and newest SessionTime (or frame number) held, None when empty"""
+        with self._lock:
+            if not self._count:
+                return None
+            if unit == 'frame':
+                return self._total - self._count, self._total - 1
+            start = self._start()
+            return self._times[start], self._times[(start + self._count - 1) % self.capacity]
+
+    def _column(self, name: str) -> array:
+        if name == self.time_key:
+            return self._times
+        return self._columns[name]
@@ -3,6 +3,8 @@ from irsdk import CameraState
 from models.driver_info import Driver, DriverInfo
 from models.telemetry import LiveTelemetryHandler, TelemetryHandler, FileTelemetryHandler
 from camera import CameraManager
+from setup_tracker import SetupTracker
+from metrics import SESSION_INFO_REPARSES, CAMERA_SWITCH_SECONDS
 
 class State:
     """
@@ -15,7 +17,10 @@ class State:
 
     def __init__(self):
         self.ir_connected = False
-        self.last_car_setup_tick = -1
+        self.setup_tracker = SetupTracker()
+
+        # Session info version the drivers were built from (None = never built)
+        self.drivers_version = None
 
         self.camera_manager: CameraManager | None = None
 
@@ -34,7 +39,8 @@ class State:
         if self.ir_connected and not ir.connected:
             self.ir_connected = False
             # don't forget to reset your State variables
-            self.last_car_setup_tick = -1
+            self.setup_tracker.reset()
+            self.drivers_version = None
             # we are shutting down ir library (clearing all internal variables)
             ir.disconnect()
             # print('irsdk disconnected')
@@ -45,7 +51,20 @@ class State:
         self.ir_connected = ir.connected
 
     def check_drivers(self, ir: TelemetryHandler):
+        """Rebuild the drivers when the session info version changes"""
+        version = ir.get_session_info_version()
+        if version == self.drivers_version:
+            return
+
         self.drivers = DriverInfo.from_iracing(ir)
+        SESSION_INFO_REPARSES.inc('DriverInfo')
+
+        # Keep retrying until the session info has drivers in it
+        self.drivers_version = version if self.drivers.Drivers else None
+
+    def check_car_setup(self, ir: TelemetryHandler) -> bool:
+        """Track the player's setup; True when it changed"""
+        return self.setup_tracker.refresh(ir)
 
     def current_camera(self, ir: TelemetryHandler):
         """
@@ -59,8 +78,8 @@ class State:
         
         if not self.camera_manager:
             self.camera_manager = CameraManager(ir)
-
-        self.camera_manager.refresh(ir)
+        else:
+            self.camera_manager.refresh(ir)
 
         self.camera = self.camera_manager.current_camera
 
@@ -79,7 +98,13 @@ class State:
             # Not used for replays
             return -1
 
-        self.camera_manager.refresh(ir)
+        if not self.camera_manager:
+            self.camera_manager = CameraManager(ir)
+        else:
+            self.camera_manager.refresh(ir)
+
+        if not self.camera_manager.current_camera:
+            return -1
 
         return self.camera_manager.current_camera.id
 
@@ -129,7 +154,7 @@ class State:
             # Save the camera we were using before the pit stop so we can
             # return to it after the pit stop
             self.last_camera = current_camera
-            ir.source.cam_switch_num(driver.car_number_int(), 16)
+            self.switch_camera(ir, driver.car_number_int(), 16, 'pit_road')
             return True
         
         # Next the driver will go to the pit stall.  Here we will want to switch
@@ -137,7 +162,7 @@ class State:
         if driver.driver_in_pit_stall(ir) and self.driver_in_pits and not self.driver_in_stall:
             # Switch to Pit Stall
             self.driver_in_stall = True
-            ir.source.cam_switch_num(driver.car_number_int(), 21)
+            self.switch_camera(ir, driver.car_number_int(), 21, 'pit_stall')
             return True
 
         # After the pit stop is complete, we will want to go to the pit exit camera
@@ -147,7 +172,7 @@ class State:
             # Switch to Pit Exit
             self.driver_exit_pits = True
             
-            self.set_camera(driver.car_number_int(), 14, ir)
+            self.switch_camera(ir, driver.car_number_int(), 14, 'pit_exit')
             return True
 
         # Once the driver is back on track, we will want to return to the camera
@@ -157,7 +182,7 @@ class State:
             self.driver_in_pits = False
             self.driver_in_stall = False
             self.driver_exit_pits = False
-            ir.source.cam_switch_num(driver.car_number_int(), self.last_camera)
+            self.switch_camera(ir, driver.car_number_int(), self.last_camera, 'track')
             return True
         
         return False
@@ -166,9 +191,18 @@ class State:
         if not isinstance(ir, LiveTelemetryHandler):
             return False # Not used for replays
 
-        ir.source.cam_switch_num(carNumber, cameraId)
+        self.switch_camera(ir, carNumber, cameraId, 'manual')
         return True
 
+    def switch_camera(self, ir: TelemetryHandler, carNumber: int, cameraId: int, reason: str):
+        """
+        Send a camera switch to the simulator, timing how long it takes.
+
+        :param reason: What triggered the switch, used as the metric label
+        """
+        with CAMERA_SWITCH_SECONDS.time(reason):
+            ir.source.cam_switch_num(carNumber, cameraId)
+
     def toggle_pit_cams(self):
         """
         Toggles the show_pit_cams flag and returns the new state.
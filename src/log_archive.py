@@ -0,0 +1,404 @@
+"""
+Compressed JSON Lines log archives and a query tool for them.
+
+Rotated log files are written as gzip archives made of independent members
+of about `BLOCK_SIZE` bytes of log lines each.  An archive is still an
+ordinary .gz file (`zcat` reads it), and a sidecar index (`<file>.idx`)
+records where each member starts along with the time range, levels and
+loggers of its lines.  A query reads the index and only decompresses the
+members that can match, so finding one minute of a 12 hour session touches
+a few hundred kilobytes instead of every archive.
+
+Plain .jsonl files (the one being written, or a rotated file that was not
+compressed yet) are indexed the same way by byte offset.
+
+    python src/log_archive.py logs --since 2026-10-19T14:02 --until 2026-10-19T14:03
+    python src/log_archive.py logs --level WARNING --logger iracing.api
+    python src/log_archive.py logs/iracing_2026-10-19.jsonl --field extra.lap=3 --grep pit
+"""
+
+import argparse
+import gzip
+import json
+import math
+import os
+import sys
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple
+
+# Uncompressed bytes of log lines per gzip member / index block
+BLOCK_SIZE = 256 * 1024
+
+COMPRESS_LEVEL = 6
+
+INDEX_SUFFIX = '.idx'
+INDEX_VERSION = 1
+
+# Leading bytes kept in an index to tell a file from a newer one of the same
+# name (the live log after a rotation)
+HEAD_BYTES = 64
+
+LEVELS = {'DEBUG': 10, 'INFO': 20, 'WARNING': 30, 'ERROR': 40, 'CRITICAL': 50}
+
+
+class Block(NamedTuple):
+    """One indexed run of log lines"""
+
+    # Where the block is in the file: a gzip member in an archive, a byte
+    # range of whole lines in a plain file
+    offset: int
+    length: int
+    lines: int
+    # Earliest and latest timestamp in the block (epoch seconds), None when
+    # no line had one
+    start: float | None
+    end: float | None
+    levels: tuple[str, ...]
+    loggers: tuple[str, ...]
+
+
+def parse_time(text: str) -> float | None:
+    """Epoch seconds of an ISO timestamp as written by JSONLinesFormatter"""
+    try:
+        return datetime.fromisoformat(text).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+class _BlockStats:
+    """Collects the index fields of a block while its lines go by"""
+
+    def __init__(self):
+        self.lines = 0
+        self.start = None
+        self.end = None
+        self.levels = set()
+        self.loggers = set()
+
+    def add(self, line: bytes):
+        self.lines += 1
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            return
+        if not isinstance(entry, dict):
+            return
+
+        created = parse_time(entry.get('timestamp'))
+        if created is not None:
+            self.start = created if self.start is None else min(self.start, created)
+            self.end = created if self.end is None else max(self.end, created)
+        self.levels.add(entry.get('level'))
+        self.loggers.add(entry.get('logger'))
+
+    def block(self, offset: int, length: int) -> Block:
+        return Block(
+            offset, length, self.lines, self.start, self.end,
+            tuple(sorted(str(level) for level in self.levels)),
+            tuple(sorted(str(name) for name in self.loggers)),
+        )
+
+
+def _chunks(lines: Iterable[bytes]) -> Iterator[tuple[bytes, _BlockStats]]:
+    """Group lines into blocks of about BLOCK_SIZE bytes"""
+    chunk = []
+    size = 0
+    stats = _BlockStats()
+    for line in lines:
+        chunk.append(line)
+        stats.add(line)
+        size += len(line)
+        if size >= BLOCK_SIZE:
+            yield b''.join(chunk), stats
+            chunk, size, stats = [], 0, _BlockStats()
+    if chunk:
+        yield b''.join(chunk), stats
+
+
+def index_path(path: str | Path) -> Path:
+    return Path(f'{path}{INDEX_SUFFIX}')
+
+
+def is_archive(path: str | Path) -> bool:
+    return str(path).endswith('.gz')
+
+
+def _head(path: str | Path) -> str:
+    with open(path, 'rb') as f:
+        return f.read(HEAD_BYTES).hex()
+
+
+def save_index(path: str | Path, blocks: list[Block]):
+    """Write the sidecar index of a log file, replacing any old one atomically"""
+    target = index_path(path)
+    tmp = target.with_name(f'{target.name}.tmp')
+    tmp.write_text(json.dumps({
+        'version': INDEX_VERSION,
+        'size': os.path.getsize(path),
+        'head': _head(path),
+        'blocks': [block._asdict() for block in blocks],
+    }))
+    os.replace(tmp, target)
+
+
+def _read_index(path: str | Path) -> tuple[int, list[Block]] | None:
+    try:
+        data = json.loads(index_path(path).read_text())
+        if data.get('version') != INDEX_VERSION or data.get('head') != _head(path):
+            return None
+        return data['size'], [
+            Block(**{**block, 'levels': tuple(block['levels']), 'loggers': tuple(block['loggers'])})
+            for block in data['blocks']
+        ]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def write_archive(source: str | Path, archive: str | Path) -> list[Block]:
+    """
+    Compress a JSON Lines file into an indexed gzip archive and write its
+    index.  The source file is left in place.
+
+    Returns:
+        The blocks of the archive
+    """
+    archive = Path(archive)
+    tmp = archive.with_name(f'{archive.name}.tmp')
+    blocks = []
+    offset = 0
+    with open(source, 'rb') as src, open(tmp, 'wb') as dst:
+        for chunk, stats in _chunks(src):
+            member = gzip.compress(chunk, COMPRESS_LEVEL, mtime=0)
+            dst.write(member)
+            blocks.append(stats.block(offset, len(member)))
+            offset += len(member)
+
+    # Archive before index: an archive without an index is re-indexed by
+    # scanning it, an index without its archive would be stale
+    os.replace(tmp, archive)
+    save_index(archive, blocks)
+    return blocks
+
+
+def compress_file(source: str | Path) -> Path:
+    """Replace a rotated `.jsonl` file with an indexed `.jsonl.gz` archive"""
+    archive = Path(f'{source}.gz')
+    write_archive(source, archive)
+    os.remove(source)
+    index_path(source).unlink(missing_ok=True)
+    return archive
+
+
+def _index_archive(path: Path) -> list[Block]:
+    """Blocks of an archive without a usable index, found by decompressing it once"""
+    data = path.read_bytes()
+    blocks = []
+    offset = 0
+    while offset < len(data):
+        decompressor = zlib.decompressobj(31)
+        chunk = decompressor.decompress(data[offset:])
+        length = len(data) - offset - len(decompressor.unused_data)
+        stats = _BlockStats()
+        for line in chunk.splitlines(keepends=True):
+            stats.add(line)
+        blocks.append(stats.block(offset, length))
+        offset += length
+    return blocks
+
+
+def _index_plain(path: Path, blocks: list[Block], start: int) -> list[Block]:
+    """Extend the blocks of a plain file with the whole lines written after `start`"""
+    blocks = list(blocks)
+    offset = start
+    with open(path, 'rb') as f:
+        f.seek(start)
+        # A line still being written has no newline yet; leave it for next time
+        lines = (line for line in f if line.endswith(b'\n'))
+        for chunk, stats in _chunks(lines):
+            blocks.append(stats.block(offset, len(chunk)))
+            offset += len(chunk)
+    return blocks
+
+
+def load_index(path: str | Path) -> list[Block]:
+    """
+    Blocks of a log file from its sidecar index, building or extending the
+    index first when the file is new or has grown since it was indexed.
+    """
+    path = Path(path)
+    size = path.stat().st_size
+    cached = _read_index(path)
+    if cached is not None and cached[0] == size:
+        return cached[1]
+
+    if is_archive(path):
+        blocks = _index_archive(path)
+    elif cached is not None and cached[0] < size and cached[1]:
+        # Appended to since: only index the new lines
+        last = cached[1][-1]
+        blocks = _index_plain(path, cached[1], last.offset + last.length)
+    else:
+        blocks = _index_plain(path, [], 0)
+
+    try:
+        save_index(path, blocks)
+    except OSError:
+        pass
+    return blocks
+
+
+def read_block(path: str | Path, block: Block) -> list[bytes]:
+    """The lines of one block, decompressing only that block"""
+    with open(path, 'rb') as f:
+        f.seek(block.offset)
+        data = f.read(block.length)
+    if is_archive(path):
+        data = zlib.decompress(data, 31)
+    return data.splitlines()
+
+
+def log_files(paths: Iterable[str | Path]) -> list[Path]:
+    """Log files and archives named directly or found in directories, oldest first"""
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files.extend(p for p in path.iterdir() if p.name.endswith(('.jsonl', '.jsonl.gz')))
+        else:
+            files.append(path)
+    return sorted(files, key=lambda p: (p.stat().st_mtime, p.name))
+
+
+def _field(entry: dict, path: str):
+    value = entry
+    for key in path.split('.'):
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+
+def _matches_value(value, expected: str) -> bool:
+    if value is None:
+        return False
+    if str(value) == expected:
+        return True
+    try:
+        return value == json.loads(expected)
+    except ValueError:
+        return False
+
+
+def _logger_matches(name, loggers: tuple[str, ...]) -> bool:
+    return any(name == logger or str(name).startswith(f'{logger}.') for logger in loggers)
+
+
+class Query(NamedTuple):
+    """Filters of a log search; empty fields match everything"""
+
+    since: float | None = None
+    until: float | None = None
+    # Minimum level name
+    level: str | None = None
+    # Logger names, children included ('iracing' matches 'iracing.api')
+    loggers: tuple[str, ...] = ()
+    # (dotted path, expected value) pairs, e.g. ('extra.lap', '3')
+    fields: tuple[tuple[str, str], ...] = ()
+    # Substring of the message
+    text: str | None = None
+
+    def block_matches(self, block: Block) -> bool:
+        """Whether a block can hold a matching line, from its index entry alone"""
+        if block.start is not None:
+            if self.until is not None and block.start > self.until:
+                return False
+            if self.since is not None and block.end < self.since:
+                return False
+        if self.level is not None:
+            minimum = LEVELS.get(self.level, 0)
+            if not any(LEVELS.get(level, 0) >= minimum for level in block.levels):
+                return False
+        if self.loggers and not any(_logger_matches(name, self.loggers) for name in block.loggers):
+            return False
+        return True
+
+    def matches(self, entry: dict) -> bool:
+        if self.since is not None or self.until is not None:
+            created = parse_time(entry.get('timestamp'))
+            if created is None:
+                return False
+            if self.since is not None and created < self.since:
+                return False
+            if self.until is not None and created > self.until:
+                return False
+        if self.level is not None and LEVELS.get(entry.get('level'), 0) < LEVELS.get(self.level, 0):
+            return False
+        if self.loggers and not _logger_matches(entry.get('logger'), self.loggers):
+            return False
+        if self.text is not None and self.text not in str(entry.get('message', '')):
+            return False
+        return all(_matches_value(_field(entry, path), expected) for path, expected in self.fields)
+
+
+def search(paths: Iterable[str | Path], query: Query) -> Iterator[dict]:
+    """Log entries matching a query, file by file in the order they were written"""
+    indexed = [(path, load_index(path)) for path in log_files(paths)]
+    # Archives are written after the file that replaced them started, so
+    # order by the first timestamp rather than the modification time
+    indexed.sort(key=lambda item: min((b.start for b in item[1] if b.start is not None), default=math.inf))
+
+    for path, blocks in indexed:
+        for block in blocks:
+            if not query.block_matches(block):
+                continue
+            for line in read_block(path, block):
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(entry, dict) and query.matches(entry):
+                    yield entry
+
+
+def _time_arg(text: str) -> float:
+    created = parse_time(text)
+    if created is None:
+        raise argparse.ArgumentTypeError(f'Not an ISO timestamp: {text}')
+    return created
+
+
+def _field_arg(text: str) -> tuple[str, str]:
+    path, sep, expected = text.partition('=')
+    if not sep or not path:
+        raise argparse.ArgumentTypeError(f'Expected PATH=VALUE: {text}')
+    return path, expected
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Search JSON Lines logs and their compressed archives')
+    parser.add_argument('paths', nargs='*', default=['logs'], help='Log files or directories. Default: logs')
+    parser.add_argument('--since', type=_time_arg, help='Earliest timestamp, e.g. 2026-10-19T14:02')
+    parser.add_argument('--until', type=_time_arg, help='Latest timestamp')
+    parser.add_argument('--level', type=str.upper, choices=LEVELS, help='Minimum level')
+    parser.add_argument('--logger', action='append', default=[], help='Logger name, children included (repeatable)')
+    parser.add_argument('--field', action='append', default=[], type=_field_arg,
+                        help='PATH=VALUE on a dotted field, e.g. extra.lap=3 (repeatable)')
+    parser.add_argument('--grep', help='Substring of the message')
+    parser.add_argument('--limit', type=int, help='Stop after this many entries')
+    args = parser.parse_args()
+
+    query = Query(args.since, args.until, args.level, tuple(args.logger), tuple(args.field), args.grep)
+    try:
+        for count, entry in enumerate(search(args.paths, query), 1):
+            sys.stdout.write(json.dumps(entry, default=str) + '\n')
+            if args.limit is not None and count >= args.limit:
+                break
+    except BrokenPipeError:
+        pass
+    except OSError as e:
+        parser.error(str(e))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Tests for queued, non-blocking logging"""
+import json
+import logging
+import queue
+import threading
+
+import pytest
+
+from logger import BoundedQueueHandler, _listeners, setup_logger, stop_listeners
+
+
+def record(message: str) -> logging.LogRecord:
+    return logging.LogRecord('spec', logging.INFO, __file__, 1, message, None, None)
+
+
+class ThreadRecorder(logging.Handler):
+    """Remembers the thread each record was formatted on"""
+
+    def __init__(self):
+        super().__init__()
+        self.threads = []
+
+    def emit(self, record):
+        self.format(record)
+        self.threads.append(threading.current_thread().name)
+
+
+class TestBoundedQueueHandler:
+    """Test the drop policies"""
+
+    def test_drop_new(self):
+        handler = BoundedQueueHandler(queue.Queue(maxsize=2))
+        for message in ('a', 'b', 'c'):
+            handler.handle(record(message))
+
+        assert handler.dropped == 1
+        assert [handler.queue.get_nowait().msg for _ in range(2)] == ['a', 'b']
+
+    def test_drop_oldest(self):
+        handler = BoundedQueueHandler(queue.Queue(maxsize=2), 'drop_oldest')
+        for message in ('a', 'b', 'c'):
+            handler.handle(record(message))
+
+        assert handler.dropped == 1
+        assert [handler.queue.get_nowait().msg for _ in range(2)] == ['b', 'c']
+
+    def test_records_are_not_formatted_when_queued(self):
+        handler = BoundedQueueHandler(queue.Queue())
+        handler.handle(logging.LogRecord('spec', logging.INFO, __file__, 1, 'lap %d', (3,), None))
+
+        queued = handler.queue.get_nowait()
+        assert queued.msg == 'lap %d' and queued.args == (3,)
+
+    def test_unknown_policy(self):
+        with pytest.raises(ValueError):
+            BoundedQueueHandler(queue.Queue(), 'drop_everything')
+
+
+class TestQueuedLogger:
+    """Test setup_logger(use_queue=True)"""
+
+    def test_records_are_written_by_the_listener_thread(self, tmp_path):
+        logger = setup_logger('spec_queue', log_dir=str(tmp_path), console_output=False, use_queue=True)
+        recorder = ThreadRecorder()
+        _listeners['spec_queue'].handlers += (recorder,)
+
+        logger.info('lap %d', 3)
+        logger.warning('pit')
+        stop_listeners()
+
+        lines = [json.loads(line) for line in next(tmp_path.iterdir()).read_text().splitlines()]
+        assert [line['message'] for line in lines] == ['lap 3', 'pit']
+        assert recorder.threads and threading.current_thread().name not in recorder.threads
+        assert isinstance(logger.handlers[0], BoundedQueueHandler)
@@ -0,0 +1,132 @@
+"""Tests for sampled logging and repeated message suppression"""
+import json
+import logging
+
+from logger import JSONLinesFormatter, RepeatFilter, SampledLogger
+
+
+class Recorder(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def make_logger(name: str, level: int = logging.DEBUG) -> tuple[logging.Logger, Recorder]:
+    logger = logging.getLogger(f'spec.sampling.{name}')
+    logger.handlers.clear()
+    logger.propagate = False
+    logger.setLevel(level)
+    recorder = Recorder()
+    logger.addHandler(recorder)
+    return logger, recorder
+
+
+def record(message: str, created: float, level: int = logging.INFO) -> logging.LogRecord:
+    rec = logging.LogRecord('spec', level, __file__, 1, message, None, None)
+    rec.created = created
+    return rec
+
+
+class TestSampledLogger:
+    """Test per call site sampling"""
+
+    def test_every_n(self):
+        logger, recorder = make_logger('every')
+        sampled = SampledLogger(logger, every=3)
+        for _ in range(7):
+            sampled.info('tick')
+
+        assert [r.suppressed for r in recorder.records] == [0, 2, 2]
+
+    def test_interval(self, monkeypatch):
+        logger, recorder = make_logger('interval')
+        sampled = SampledLogger(logger, interval=10)
+        now = [100.0]
+        monkeypatch.setattr('logger.time.monotonic', lambda: now[0])
+
+        for step in range(25):
+            now[0] = 100.0 + step
+            sampled.info('tick')
+
+        assert [r.suppressed for r in recorder.records] == [0, 9, 9]
+
+    def test_call_sites_sampled_separately(self):
+        logger, recorder = make_logger('sites')
+        sampled = SampledLogger(logger, every=100)
+        for _ in range(3):
+            sampled.info('first')
+            sampled.info('second')
+
+        assert [r.getMessage() for r in recorder.records] == ['first', 'second']
+
+    def test_records_point_at_caller(self):
+        logger, recorder = make_logger('caller')
+        SampledLogger(logger).warning('here')
+
+        assert recorder.records[0].funcName == 'test_records_point_at_caller'
+        assert recorder.records[0].pathname == __file__
+
+    def test_disabled_level_is_skipped(self):
+        logger, recorder = make_logger('disabled', logging.INFO)
+        sampled = SampledLogger(logger, every=2)
+        for _ in range(5):
+            sampled.debug('hidden')
+
+        assert recorder.records == []
+        assert sampled._sites == {}
+
+    def test_extra_and_args(self):
+        logger, recorder = make_logger('extra')
+        SampledLogger(logger).info('lap %d', 3, extra={'data': 1})
+
+        assert recorder.records[0].getMessage() == 'lap 3'
+        assert recorder.records[0].data == 1
+
+    def test_suppressed_in_json(self):
+        logger, recorder = make_logger('json')
+        sampled = SampledLogger(logger, every=2)
+        for _ in range(3):
+            sampled.info('tick')
+
+        lines = [json.loads(JSONLinesFormatter().format(r)) for r in recorder.records]
+        assert 'suppressed' not in lines[0]
+        assert lines[1]['suppressed'] == 1
+
+
+class TestRepeatFilter:
+    """Test collapsing repeated messages"""
+
+    def setup_method(self):
+        self.recorder = Recorder()
+        self.recorder.addFilter(RepeatFilter(self.recorder, window=60))
+
+    def test_repeats_summarized(self):
+        for i in range(4):
+            self.recorder.handle(record('same', 100 + i))
+        self.recorder.handle(record('other', 110))
+
+        messages = [r.getMessage() for r in self.recorder.records]
+        assert messages == ['same', 'Previous message repeated 3 times', 'other']
+        assert self.recorder.records[1].suppressed == 3
+
+    def test_repeat_let_through_after_window(self):
+        for created in (100, 120, 150, 161, 170):
+            self.recorder.handle(record('same', created))
+
+        assert [r.created for r in self.recorder.records] == [100, 161]
+        assert self.recorder.records[1].suppressed == 2
+
+    def test_level_distinguishes_messages(self):
+        self.recorder.handle(record('same', 100, logging.INFO))
+        self.recorder.handle(record('same', 101, logging.WARNING))
+
+        assert len(self.recorder.records) == 2
+
+    def test_no_summary_without_repeats(self):
+        self.recorder.handle(record('a', 100))
+        self.recorder.handle(record('b', 101))
+
+        assert [r.getMessage() for r in self.recorder.records] == ['a', 'b']
@@ -0,0 +1,209 @@
+"""Tests for compressed log archives and searching them"""
+import gzip
+import json
+import logging
+from datetime import datetime, timedelta
+
+import pytest
+
+import log_archive
+import logger as logger_module
+from log_archive import Query, compress_file, index_path, load_index, parse_time, read_block, search
+from logger import CompressedRotatingFileHandler, JSONLinesFormatter
+
+START = datetime(2026, 10, 19, 14, 0, 0)
+
+
+def entry(i: int, level: str = 'INFO', logger: str = 'iracing') -> dict:
+    return {
+        'timestamp': (START + timedelta(seconds=i)).isoformat(),
+        'level': level,
+        'logger': logger,
+        'message': f'message {i}',
+        'extra': {'lap': i // 60},
+    }
+
+
+def write_log(path, count: int, **kwargs):
+    with open(path, 'w') as f:
+        for i in range(count):
+            f.write(json.dumps(entry(i, **kwargs)) + '\n')
+
+
+@pytest.fixture
+def small_blocks(monkeypatch):
+    monkeypatch.setattr(log_archive, 'BLOCK_SIZE', 2048)
+
+
+class TestArchive:
+    """Test writing and indexing archives"""
+
+    def test_archive_is_plain_gzip(self, tmp_path, small_blocks):
+        source = tmp_path / 'iracing.1.jsonl'
+        write_log(source, 500)
+        original = source.read_bytes()
+
+        archive = compress_file(source)
+
+        assert not source.exists()
+        assert gzip.decompress(archive.read_bytes()) == original
+        assert len(load_index(archive)) > 1
+
+    def test_blocks_decompress_alone(self, tmp_path, small_blocks):
+        source = tmp_path / 'iracing.1.jsonl'
+        write_log(source, 500)
+        archive = compress_file(source)
+
+        blocks = load_index(archive)
+        lines = [line for block in blocks for line in read_block(archive, block)]
+        assert len(lines) == sum(block.lines for block in blocks) == 500
+        assert json.loads(lines[-1])['message'] == 'message 499'
+        assert blocks[0].start == parse_time(entry(0)['timestamp'])
+
+    def test_missing_index_rebuilt(self, tmp_path, small_blocks):
+        source = tmp_path / 'iracing.1.jsonl'
+        write_log(source, 500)
+        archive = compress_file(source)
+        blocks = load_index(archive)
+
+        index_path(archive).unlink()
+        assert load_index(archive) == blocks
+        assert index_path(archive).exists()
+
+    def test_plain_index_extended(self, tmp_path, small_blocks):
+        path = tmp_path / 'iracing.jsonl'
+        write_log(path, 100)
+        first = load_index(path)
+
+        with open(path, 'a') as f:
+            f.write(json.dumps(entry(100)) + '\n')
+            f.write('{"partial')
+        blocks = load_index(path)
+
+        assert blocks[:len(first)] == first
+        assert sum(block.lines for block in blocks) == 101
+
+    def test_replaced_plain_file_reindexed(self, tmp_path):
+        path = tmp_path / 'iracing.jsonl'
+        write_log(path, 10)
+        load_index(path)
+
+        write_log(path, 20, level='ERROR')
+        blocks = load_index(path)
+
+        assert blocks[0].levels == ('ERROR',)
+        assert blocks[0].lines == 20
+
+
+class TestSearch:
+    """Test queries"""
+
+    def test_time_range_reads_few_blocks(self, tmp_path, small_blocks, monkeypatch):
+        source = tmp_path / 'iracing.1.jsonl'
+        write_log(source, 3600)
+        compress_file(source)
+
+        reads = []
+        original = log_archive.read_block
+        monkeypatch.setattr(log_archive, 'read_block', lambda path, block: reads.append(block) or original(path, block))
+
+        since = parse_time((START + timedelta(minutes=30)).isoformat())
+        results = list(search([tmp_path], Query(since=since, until=since + 59)))
+
+        assert [r['message'] for r in results] == [f'message {i}' for i in range(1800, 1860)]
+        # One minute of an hour: the blocks holding it and at most one either side
+        blocks = load_index(tmp_path / 'iracing.1.jsonl.gz')
+        assert sum(block.lines for block in reads) <= 60 + 2 * max(block.lines for block in blocks)
+        assert len(reads) < len(blocks) / 10
+
+    def test_level_skips_blocks(self, tmp_path, small_blocks, monkeypatch):
+        write_log(tmp_path / 'info.jsonl', 200)
+        write_log(tmp_path / 'error.jsonl', 5, level='ERROR')
+        monkeypatch.setattr(log_archive, 'read_block', lambda path, block: pytest.fail('info block read') if 'info' in str(path) else [
+            json.dumps(entry(0, level='ERROR')).encode()
+        ])
+
+        assert len(list(search([tmp_path], Query(level='WARNING')))) == 1
+
+    def test_logger_and_fields(self, tmp_path):
+        path = tmp_path / 'iracing.jsonl'
+        with open(path, 'w') as f:
+            for i in range(120):
+                f.write(json.dumps(entry(i, logger='iracing.api' if i % 2 else 'iracing')) + '\n')
+
+        results = list(search([path], Query(loggers=('iracing.api',), fields=(('extra.lap', '1'),))))
+        assert len(results) == 30
+        assert all(r['logger'] == 'iracing.api' and r['extra']['lap'] == 1 for r in results)
+        assert len(list(search([path], Query(loggers=('iracing',))))) == 120
+
+    def test_text(self, tmp_path):
+        path = tmp_path / 'iracing.jsonl'
+        write_log(path, 20)
+
+        assert [r['message'] for r in search([path], Query(text='message 1'))] == [
+            'message 1', *(f'message {i}' for i in range(10, 20))
+        ]
+
+
+class TestCompressedRotatingFileHandler:
+    """Test rotation into archives"""
+
+    def make_handler(self, tmp_path, backups: int = 2) -> CompressedRotatingFileHandler:
+        handler = CompressedRotatingFileHandler(tmp_path / 'spec_2026-10-19.jsonl', maxBytes=2000, backupCount=backups)
+        handler.setFormatter(JSONLinesFormatter())
+        return handler
+
+    def log(self, handler, count: int):
+        for i in range(count):
+            handler.handle(logging.LogRecord('spec', logging.INFO, __file__, 1, f'message {i:04}', None, None))
+
+    def test_rotated_files_compressed(self, tmp_path):
+        handler = self.make_handler(tmp_path, backups=50)
+        self.log(handler, 100)
+        handler.close()
+
+        archives = sorted(tmp_path.glob('spec_2026-10-19.*.jsonl.gz'))
+        assert archives
+        assert not list(tmp_path.glob('spec_2026-10-19.*.jsonl'))
+        assert all(index_path(archive).exists() for archive in archives)
+
+        messages = [r['message'] for r in search([tmp_path], Query())]
+        assert messages == [f'message {i:04}' for i in range(100)]
+
+    def test_backup_count(self, tmp_path):
+        handler = self.make_handler(tmp_path, backups=2)
+        for _ in range(5):
+            self.log(handler, 30)
+            handler.wait()
+        handler.close()
+
+        assert len(list(tmp_path.glob('spec_2026-10-19.*.jsonl.gz'))) == 2
+        assert len(list(tmp_path.glob('*.gz.idx'))) == 2
+
+    def test_backup_count_across_midnight(self, tmp_path, monkeypatch):
+        times = iter([datetime(2026, 10, 19, 23, 50), datetime(2026, 10, 20, 0, 10)])
+
+        class Clock(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return next(times)
+
+        monkeypatch.setattr(logger_module, 'datetime', Clock)
+        handler = self.make_handler(tmp_path, backups=1)
+        for _ in range(2):
+            self.log(handler, 5)
+            handler.doRollover()
+            handler.wait()
+        handler.close()
+
+        archives = [path.name for path in tmp_path.glob('spec_2026-10-19.*.jsonl.gz')]
+        assert archives == ['spec_2026-10-19.20261020-001000000000.jsonl.gz']
+
+    def test_leftovers_compressed_on_start(self, tmp_path):
+        write_log(tmp_path / 'spec_2026-10-19.120000000000.jsonl', 10)
+
+        handler = self.make_handler(tmp_path)
+        handler.close()
+
+        assert (tmp_path / 'spec_2026-10-19.120000000000.jsonl.gz').exists()
+        assert not (tmp_path / 'spec_2026-10-19.120000000000.jsonl').exists()
@@ -1,10 +1,31 @@
+import atexit
 import json
 import logging
+import os
+import queue
+import sys
+import threading
+import time
 from datetime import datetime
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 from typing import Any, Dict
 
+from log_archive import compress_file, index_path
+from metrics import LOG_RECORDS_DROPPED, QUEUE_DEPTH
+
+# What a BoundedQueueHandler does with a record when its queue is full
+DROP_POLICIES = ('drop_new', 'drop_oldest', 'block')
+
+# Records buffered per queued logger before the drop policy applies
+DEFAULT_QUEUE_SIZE = 10000
+
+# Longest a 'block' policy waits for room before dropping the record
+BLOCK_TIMEOUT = 1.0
+
+# Seconds a repeated message stays suppressed before it is let through again
+REPEAT_WINDOW = 60.0
+
 
 class JSONLinesFormatter(logging.Formatter):
     """
@@ -40,20 +61,301 @@ class JSONLinesFormatter(logging.Formatter):
         if hasattr(record, 'extra_data'):
             log_data['extra'] = record.extra_data
 
+        # Records skipped by SampledLogger or RepeatFilter since the last one
+        if getattr(record, 'suppressed', 0):
+            log_data['suppressed'] = record.suppressed
+
         return json.dumps(log_data, default=str)
 
 
+class BoundedQueueHandler(QueueHandler):
+    """
+    QueueHandler for a bounded queue that does not block the logging thread.
+
+    Records are queued as they are: formatting, `json.dumps` and file I/O
+    all happen on the QueueListener thread.  When the queue is full the
+    drop policy decides:
+
+    - 'drop_new': discard the incoming record
+    - 'drop_oldest': discard the oldest queued record to make room
+    - 'block': wait up to BLOCK_TIMEOUT for room, then discard the record
+
+    Dropped records are counted in `dropped` and the
+    `log_records_dropped_total` metric.
+    """
+
+    def __init__(self, log_queue: queue.Queue, drop_policy: str = 'drop_new'):
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f'drop_policy must be one of: {", ".join(DROP_POLICIES)}')
+        super().__init__(log_queue)
+        self.drop_policy = drop_policy
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # QueueHandler formats the record here; leave that to the listener
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+
+        if self.drop_policy == 'drop_oldest':
+            try:
+                self.queue.get_nowait()
+                self.queue.task_done()
+            except queue.Empty:
+                pass
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                pass
+        elif self.drop_policy == 'block':
+            try:
+                self.queue.put(record, timeout=BLOCK_TIMEOUT)
+                return
+            except queue.Full:
+                pass
+
+        self.dropped += 1
+        LOG_RECORDS_DROPPED.inc(self.name or 'unknown')
+
+
+class _Listener(QueueListener):
+    """QueueListener whose stop() still works when the queue is full"""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+class CompressedRotatingFileHandler(RotatingFileHandler):
+    """
+    RotatingFileHandler that compresses rotated files in the background.
+
+    A full log is renamed to `<name>.<rotation date and time>.jsonl` and a thread
+    writes it out as an indexed gzip archive (see log_archive), so the
+    thread that triggered the rollover only pays for a rename.  Archives are
+    named by rotation time instead of numbered, so they are never renamed
+    and their indexes stay valid; only the newest `backupCount` are kept.
+    Rotated files left uncompressed by an earlier run are compressed when
+    the handler starts.
+    """
+
+    def __init__(self, filename, maxBytes: int = 0, backupCount: int = 0, encoding: str | None = None):
+        super().__init__(filename, maxBytes=maxBytes, backupCount=backupCount, encoding=encoding)
+        self._compressing: list[threading.Thread] = []
+        for rotated in self._rotated('.jsonl'):
+            self._compress(str(rotated))
+
+    def _rotated(self, suffix: str) -> list[Path]:
+        base = Path(self.baseFilename)
+        stem = base.name.removesuffix('.jsonl')
+        return sorted(
+            path for path in base.parent.glob(f'{stem}.*{suffix}')
+            if path != base and path.name.count('.') == base.name.count('.') + suffix.count('.')
+        )
+
+    def doRollover(self):
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+
+        if self.backupCount > 0 and os.path.exists(self.baseFilename):
+            # The full date: the base name keeps the day the process started,
+            # and archives are pruned by name
+            rotated = f"{self.baseFilename.removesuffix('.jsonl')}.{datetime.now():%Y%m%d-%H%M%S%f}.jsonl"
+            os.replace(self.baseFilename, rotated)
+            index_path(self.baseFilename).unlink(missing_ok=True)
+            self._compress(rotated)
+
+        if not self.delay:
+            self.stream = self._open()
+
+    def _compress(self, path: str):
+        self._compressing = [thread for thread in self._compressing if thread.is_alive()]
+        thread = threading.Thread(target=self._archive, args=(path,), name='log-compress', daemon=True)
+        thread.start()
+        self._compressing.append(thread)
+
+    def _archive(self, path: str):
+        try:
+            compress_file(path)
+            for old in self._rotated('.jsonl.gz')[:-self.backupCount]:
+                old.unlink(missing_ok=True)
+                index_path(old).unlink(missing_ok=True)
+        except OSError as e:
+            sys.stderr.write(f'--- Failed to compress log {path}: {e}\n')
+
+    def wait(self, timeout: float | None = None):
+        """Wait for rotated files still being compressed"""
+        for thread in self._compressing:
+            thread.join(timeout)
+
+    def close(self):
+        super().close()
+        self.wait()
+
+
+class _Site:
+    """Sampling state of one call site"""
+
+    __slots__ = ('calls', 'skipped', 'last')
+
+    def __init__(self):
+        self.calls = 0
+        self.skipped = 0
+        self.last = float('-inf')
+
+
+class SampledLogger:
+    """
+    Logger wrapper that samples each call site.
+
+    For messages logged every tick, where one line in N, or one per T
+    seconds, tells the same story:
+
+        loop_log = SampledLogger(logger, interval=60)
+        loop_log.debug('Loop: iRacing Connected')
+
+    A call is let through when it is the first at its call site, or both
+    `every` calls and `interval` seconds have passed since the last one
+    that was.  The record that is let through carries the number of calls
+    skipped before it in `suppressed`.  A call that is skipped costs a level
+    check, a frame lookup and a dict hit; no record is created.
+    """
+
+    def __init__(self, logger: logging.Logger, every: int = 1, interval: float = 0.0):
+        self.logger = logger
+        self.every = max(int(every), 1)
+        self.interval = interval
+        self._sites: dict[tuple, _Site] = {}
+
+    def _log(self, level: int, msg, args, kwargs):
+        if not self.logger.isEnabledFor(level):
+            return
+
+        frame = sys._getframe(2)
+        key = (frame.f_code, frame.f_lineno)
+        site = self._sites.get(key)
+        if site is None:
+            site = self._sites[key] = _Site()
+
+        site.calls += 1
+        if site.calls > 1:
+            if site.calls <= self.every or (self.interval and time.monotonic() - site.last < self.interval):
+                site.skipped += 1
+                return
+
+        extra = kwargs.pop('extra', None) or {}
+        extra['suppressed'] = site.skipped
+        site.calls = 1
+        site.skipped = 0
+        site.last = time.monotonic()
+        self.logger.log(level, msg, *args, extra=extra, stacklevel=3, **kwargs)
+
+    def debug(self, msg, *args, **kwargs):
+        self._log(logging.DEBUG, msg, args, kwargs)
+
+    def info(self, msg, *args, **kwargs):
+        self._log(logging.INFO, msg, args, kwargs)
+
+    def warning(self, msg, *args, **kwargs):
+        self._log(logging.WARNING, msg, args, kwargs)
+
+    def error(self, msg, *args, **kwargs):
+        self._log(logging.ERROR, msg, args, kwargs)
+
+
+class RepeatFilter(logging.Filter):
+    """
+    Handler filter that collapses runs of the same message.
+
+    A record with the same logger, level and message as the one before is
+    dropped, except once per `window` seconds, when it is let through with
+    the number of copies dropped in `suppressed`.  When a different message
+    arrives after dropped copies, a "Previous message repeated N times"
+    record is written first.  Attached to the handlers, so on a queued
+    logger it runs on the listener thread.
+    """
+
+    def __init__(self, handler: logging.Handler, window: float = REPEAT_WINDOW):
+        super().__init__()
+        self.handler = handler
+        self.window = window
+        self._last_key = None
+        self._last_record: logging.LogRecord | None = None
+        self._last_emitted = 0.0
+        self._repeats = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, 'repeat_summary', False):
+            return True
+
+        key = (record.name, record.levelno, record.getMessage())
+        if key == self._last_key:
+            if record.created - self._last_emitted < self.window:
+                self._repeats += 1
+                return False
+            record.suppressed = getattr(record, 'suppressed', 0) + self._repeats
+        else:
+            if self._repeats:
+                self.handler.handle(self._summary())
+            self._last_key = key
+
+        self._last_record = record
+        self._last_emitted = record.created
+        self._repeats = 0
+        return True
+
+    def _summary(self) -> logging.LogRecord:
+        last = self._last_record
+        summary = logging.LogRecord(
+            last.name, last.levelno, last.pathname, last.lineno,
+            'Previous message repeated %d times', (self._repeats,), None, last.funcName
+        )
+        summary.repeat_summary = True
+        summary.suppressed = self._repeats
+        return summary
+
+
+# Listeners started by setup_logger, stopped at exit so queued records are written
+_listeners: dict[str, QueueListener] = {}
+
+
+def stop_listeners():
+    """Write out every queued record and stop the listener threads"""
+    while _listeners:
+        _, listener = _listeners.popitem()
+        listener.stop()
+
+
+atexit.register(stop_listeners)
+
+
 def setup_logger(
     name: str = 'iracing',
     log_dir: str = 'logs',
     max_bytes: int = 10 * 1024 * 1024,  # 10 MB
     backup_count: int = 5,
     level: int = logging.DEBUG,
-    console_output: bool = True
+    console_output: bool = True,
+    use_queue: bool = False,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    drop_policy: str = 'drop_new',
+    suppress_repeats: bool = False,
+    repeat_window: float = REPEAT_WINDOW,
+    compress: bool = False
 ) -> logging.Logger:
     """
     Set up a JSON Lines logger with rotating file handler.
 
+    With `use_queue`, the logger only gets a BoundedQueueHandler and the
+    file (and console) handlers run on a QueueListener thread, so logging
+    from the main loop or an HTTP worker never formats, rotates or writes
+    files on that thread.
+
     Args:
         name: Name of the logger
         log_dir: Directory to store log files (relative to project root)
@@ -61,6 +363,12 @@ def setup_logger(
         backup_count: Number of backup files to keep (default: 5)
         level: Logging level (default: INFO)
         console_output: Whether to also output to console (default: True)
+        use_queue: Hand records to a background thread (default: False)
+        queue_size: Records buffered before the drop policy applies
+        drop_policy: 'drop_new', 'drop_oldest' or 'block' (see BoundedQueueHandler)
+        suppress_repeats: Collapse runs of the same message (see RepeatFilter)
+        repeat_window: Seconds between copies of a repeated message that are let through
+        compress: Keep rotated files as indexed gzip archives (see CompressedRotatingFileHandler)
 
     Returns:
         Configured logger instance
@@ -82,7 +390,8 @@ def setup_logger(
     log_file = log_path / f'{name}_{date_str}.jsonl'
 
     # Create rotating file handler
-    file_handler = RotatingFileHandler(
+    handler_class = CompressedRotatingFileHandler if compress else RotatingFileHandler
+    file_handler = handler_class(
         filename=log_file,
         maxBytes=max_bytes,
         backupCount=backup_count,
@@ -90,9 +399,7 @@ def setup_logger(
     )
     file_handler.setLevel(level)
     file_handler.setFormatter(JSONLinesFormatter())
-
-    # Add file handler to logger
-    logger.addHandler(file_handler)
+    handlers: list[logging.Handler] = [file_handler]
 
     # Optionally add console handler for human-readable output
     if console_output:
@@ -104,7 +411,26 @@ def setup_logger(
             datefmt='%Y-%m-%d %H:%M:%S'
         )
         console_handler.setFormatter(console_formatter)
-        logger.addHandler(console_handler)
+        handlers.append(console_handler)
+
+    if suppress_repeats:
+        for handler in handlers:
+            handler.addFilter(RepeatFilter(handler, repeat_window))
+
+    if not use_queue:
+        for handler in handlers:
+            logger.addHandler(handler)
+        return logger
+
+    log_queue = queue.Queue(maxsize=queue_size)
+    queue_handler = BoundedQueueHandler(log_queue, drop_policy)
+    queue_handler.set_name(name)
+    logger.addHandler(queue_handler)
+
+    listener = _Listener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    _listeners[name] = listener
+    QUEUE_DEPTH.set_function(log_queue.qsize, f'log:{name}')
 
     return logger
 
@@ -124,13 +450,9 @@ def log_telemetry(logger: logging.Logger, telemetry_data: Dict[str, Any]) -> Non
     )
 
 
-# Create a default logger instance
-logger = setup_logger()
-
-
 if __name__ == '__main__':
     # Example usage
-    logger = setup_logger('test_logger', level=logging.DEBUG)
+    logger = setup_logger('test_logger', level=logging.DEBUG, use_queue=True)
 
     logger.debug('This is a debug message')
     logger.info('This is an info message')
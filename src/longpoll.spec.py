@@ -0,0 +1,129 @@
+"""Tests for long polling on snapshot changes"""
+import asyncio
+import json
+import logging
+from email.message import Message
+
+from server.async_server import AsyncRequest
+from server.helpers import send_json_response
+from server.longpoll import VERSION_HEADER, long_poll
+from server.router import Router, coroutine_handler
+from server.snapshot import SnapshotHub
+
+
+class FakeContext:
+    def __init__(self, hub):
+        self.snapshots = hub
+        self.logger = logging.getLogger('longpoll.spec')
+
+
+class FakeWriter:
+    def get_extra_info(self, name):
+        return ('127.0.0.1', 50000)
+
+
+def handle_driver(handler, ctx):
+    send_json_response(handler, ctx.snapshots.latest.data['driver'])
+
+
+router = Router({'/api/driver': long_poll(handle_driver, fields=('driver',))})
+
+
+def request(target: str) -> tuple[AsyncRequest, object]:
+    match = router.match('GET', target)
+    return match.bind(AsyncRequest('GET', target, Message(), b'', None, FakeWriter())), coroutine_handler(match)
+
+
+class TestChangedVersion:
+    """Test per-field change tracking in the hub"""
+
+    def test_timestamp_only_changes_are_ignored(self):
+        hub = SnapshotHub()
+        hub.publish({'driver': {'name': 'A', 'timestamp': '1'}, 'camera': 1})
+        hub.publish({'driver': {'name': 'A', 'timestamp': '2'}, 'camera': 2})
+
+        assert hub.changed_version(('driver',)) == 1
+        assert hub.changed_version(('camera',)) == 2
+        assert hub.changed_version(('driver', 'camera')) == 2
+        assert hub.changed_version() == 2
+
+
+class TestAsyncWaiters:
+    """Test that waiters never outlive their wait"""
+
+    def test_timed_out_waiters_are_released(self):
+        hub = SnapshotHub()
+
+        async def run():
+            for _ in range(5):
+                assert (await hub.wait_async(0, 0.01)).version == 0
+
+        asyncio.run(run())
+        assert hub.waiter_count() == 0
+
+    def test_cancelled_waiter_is_released(self):
+        hub = SnapshotHub()
+
+        async def run():
+            task = asyncio.create_task(hub.wait_async(0))
+            await asyncio.sleep(0)
+            assert hub.waiter_count() == 1
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+        asyncio.run(run())
+        assert hub.waiter_count() == 0
+
+    def test_published_snapshot_still_wakes_waiters(self):
+        hub = SnapshotHub()
+
+        async def run():
+            task = asyncio.create_task(hub.wait_async(0, 5))
+            await asyncio.sleep(0)
+            hub.publish({'driver': None})
+            return await task
+
+        assert asyncio.run(run()).version == 1
+        assert hub.waiter_count() == 0
+
+
+class TestLongPoll:
+    """Test waiting for the next change"""
+
+    def setup_method(self):
+        self.hub = SnapshotHub()
+        self.ctx = FakeContext(self.hub)
+        self.hub.publish({'driver': {'name': 'A'}})
+
+    def test_plain_request_is_served_normally(self):
+        _, coroutine = request('/api/driver')
+        assert coroutine is None
+
+    def test_waits_for_a_change(self):
+        async def scenario():
+            req, coroutine = request('/api/driver?since=1')
+            task = asyncio.ensure_future(coroutine(req, self.ctx))
+
+            await asyncio.sleep(0.05)
+            self.hub.publish({'driver': {'name': 'A'}})
+            await asyncio.sleep(0.05)
+            assert not task.done()
+
+            self.hub.publish({'driver': {'name': 'B'}})
+            return await asyncio.wait_for(task, 1)
+
+        response = asyncio.run(scenario())
+        assert response.status == 200
+        assert response.get_header(VERSION_HEADER) == '3'
+        assert json.loads(response.body) == {'name': 'B'}
+
+    def test_timeout_returns_no_content(self):
+        req, coroutine = request('/api/driver?since=1&timeout=0.05')
+        response = asyncio.run(coroutine(req, self.ctx))
+        assert response.status == 204
+        assert response.get_header(VERSION_HEADER) == '1'
+
+    def test_version_from_before_restart_returns_immediately(self):
+        req, coroutine = request('/api/driver?since=99')
+        response = asyncio.run(coroutine(req, self.ctx))
+        assert response.status == 200
@@ -1,19 +1,39 @@
 import argparse
+from contextlib import contextmanager
 from datetime import datetime
+from pathlib import Path
 import time
 import os
-from server import ServerContext, start_server, handle_root, handle_driver, handle_camera, handle_set_camera, handle_toggle_pit_cams, handle_dashboard, handle_diagnostics, handle_driver_overlay_view
+from server import ServerContext, SnapshotHub, build_snapshot, cached_endpoint, long_poll, start_server, start_async_server, start_websocket_server, handle_root, handle_driver, handle_camera, handle_standings, handle_setup, handle_car, handle_telemetry_var, handle_telemetry_query, handle_set_camera, handle_toggle_pit_cams, handle_dashboard, handle_dashboard_data, handle_diagnostics, handle_driver_overlay_view, handle_stream, handle_batch, handle_metrics, handle_profile
 from iracing import State
-from models.telemetry import TelemetryHandler, FileTelemetryHandler, LiveTelemetryHandler
-from logger import setup_logger
+from history import TelemetryHistory, IbtHistory
+from models.telemetry import TelemetryHandler, FileTelemetryHandler, LiveTelemetryHandler, RecordedTelemetryHandler
+from logger import SampledLogger, setup_logger
+from metrics import LOOP_STAGE_SECONDS, LOOP_TICKS, LOOP_TICKS_DROPPED, LOOP_TICK_RATE, QUEUE_DEPTH
+from profiling import PROFILER, MODES as PROFILE_MODES, DEFAULT_SECONDS as PROFILE_SECONDS
+from recording import SUFFIX as RECORDING_SUFFIX, TelemetryRecorder
 from models.driver_info import DriverInfo
 
-logger = setup_logger(console_output=False)
+# Records are written by a background thread, off the loop and HTTP threads;
+# rotated files become indexed archives for src/log_archive.py
+logger = setup_logger(console_output=False, use_queue=True, suppress_repeats=True, compress=True)
+# Per-tick messages: one line a minute per call site, with the count skipped
+loop_logger = SampledLogger(logger, interval=60)
 debug = False
 
 lastCamera = None
 startTime = datetime.now()
 
+# Seconds the main loop sleeps between ticks
+TICK_INTERVAL = 1.0
+
+
+@contextmanager
+def loop_stage(name: str):
+    """Time a main loop stage for /api/metrics and, when enabled, the profiler"""
+    with LOOP_STAGE_SECONDS.time(name), PROFILER.timer(f'loop.{name}'):
+        yield
+
 
 # function to clear the terminal screen
 def clear_screen():
@@ -179,7 +199,7 @@ if __name__ == '__main__':
 
     # Parse command line arguments
     parser = argparse.ArgumentParser(description='iRacing telemetry parser and monitor')
-    parser.add_argument('--file', help='Path to iRacing telemetry file (e.g., replay.ibt)')
+    parser.add_argument('--file', help=f'Path to iRacing telemetry file (e.g., replay.ibt) or a recording (e.g., session{RECORDING_SUFFIX})')
     parser.add_argument('--debug', help='Enable debugging', action='store_true')
     parser.add_argument('--playback-speed',
                         type=str,
@@ -190,14 +210,60 @@ if __name__ == '__main__':
                         type=float,
                         default=0.0,
                         help='Skip to position in replay (0.0 = start, 0.5 = middle, 1.0 = end). Default: 0.0')
+    parser.add_argument('--server',
+                        type=str,
+                        default='threaded',
+                        choices=['threaded', 'asyncio'],
+                        help='HTTP server implementation. Default: threaded')
+    parser.add_argument('--http-workers',
+                        type=int,
+                        default=16,
+                        help='Number of HTTP worker threads. Default: 16')
+    parser.add_argument('--http-backlog',
+                        type=int,
+                        default=64,
+                        help='Listen backlog for pending HTTP connections. Default: 64')
+    parser.add_argument('--keep-alive-timeout',
+                        type=float,
+                        default=5.0,
+                        help='Seconds before an idle keep-alive connection is closed. Default: 5.0')
+    parser.add_argument('--ws-port',
+                        type=int,
+                        default=9001,
+                        help='Port for the WebSocket broadcaster (0 to disable). Default: 9001')
+    parser.add_argument('--profile-timers',
+                        action='store_true',
+                        help='Enable hot path timers at startup (see /api/profile)')
+    parser.add_argument('--profile',
+                        choices=PROFILE_MODES,
+                        help='Run a cProfile or sampling session at startup')
+    parser.add_argument('--profile-seconds',
+                        type=float,
+                        default=PROFILE_SECONDS,
+                        help=f'Length of the --profile session. Default: {PROFILE_SECONDS:g}')
+    parser.add_argument('--profile-dir',
+                        default='profiles',
+                        help='Directory profiling results are written to. Default: profiles')
+    parser.add_argument('--record',
+                        help=f'Record live telemetry to a file for --file replay (e.g., session{RECORDING_SUFFIX})')
+    parser.add_argument('--record-vars',
+                        help='Comma separated variables to record. Default: all')
     args = parser.parse_args()
 
     # Validate skip argument
     if not 0.0 <= args.skip <= 1.0:
         parser.error('--skip must be between 0.0 and 1.0')
 
+    if args.record and args.file:
+        parser.error('--record only applies to live sessions')
+
     logger.debug('Setup: Arguments Parsed')
 
+    PROFILER.output_dir = Path(args.profile_dir)
+    PROFILER.enable_timers(args.profile_timers)
+    if args.profile:
+        PROFILER.start(args.profile, args.profile_seconds)
+
     # Initializing State
     state = State()
     debug = args.debug
@@ -210,9 +276,11 @@ if __name__ == '__main__':
         print(f'Playback speed: {args.playback_speed}')
         if args.skip > 0.0:
             print(f'Skipping to: {args.skip * 100:.1f}% of replay')
-        ir = FileTelemetryHandler(args.file, playback_speed=args.playback_speed, skip_to=args.skip)
-
-        logger.info('FileTelemetryHandler: SessionTime', extra={'data': ir.ibt.get_all('SessionTime')})
+        if args.file.endswith(RECORDING_SUFFIX):
+            ir = RecordedTelemetryHandler(args.file, playback_speed=args.playback_speed, skip_to=args.skip)
+        else:
+            ir = FileTelemetryHandler(args.file, playback_speed=args.playback_speed, skip_to=args.skip)
+            logger.info('FileTelemetryHandler: SessionTime', extra={'data': ir.ibt.get_all('SessionTime')})
         ir.connect()
 
         
@@ -223,63 +291,160 @@ if __name__ == '__main__':
     logger.debug('Setup: Telemetry Handler Created', extra={'file': args.file})
 
     # Create API logger for HTTP endpoints
-    api_logger = setup_logger('iracing.api', console_output=False)
+    api_logger = setup_logger('iracing.api', console_output=False, use_queue=True, compress=True)
+
+    # Snapshots published by the loop for the HTTP layer
+    snapshots = SnapshotHub()
+
+    # IBT files are queried in place; live sessions and recordings keep a rolling history
+    history = IbtHistory(ir.ibt) if isinstance(ir, FileTelemetryHandler) else TelemetryHistory()
+
+    # Live frames and session info appended to a file, written by a background thread
+    recorder = None
+    if args.record:
+        names = [name.strip() for name in args.record_vars.split(',')] if args.record_vars else None
+        recorder = TelemetryRecorder(args.record, names)
+        try:
+            recorder.open()
+        except OSError as e:
+            parser.error(f'--record: cannot write {args.record}: {e.strerror}')
+        print(f'Recording telemetry to: {args.record}')
 
     # Create server context with dependencies
     context = ServerContext(
         get_ir=lambda: ir,
         get_state=lambda: state,
-        logger=api_logger
+        logger=api_logger,
+        snapshots=snapshots,
+        history=history
     )
 
     # Start HTTP Server with context
-    http_server = start_server(
+    server_factory = start_async_server if args.server == 'asyncio' else start_server
+    http_server = server_factory(
         endpoints={
             '/': handle_dashboard,
             '/driver-overlay': handle_driver_overlay_view,
             '/api': handle_root,
-            '/api/driver': handle_driver,
-            '/api/camera': handle_camera,
-            '/api/camera/set': handle_set_camera,
-            '/api/camera/toggle-pit-cams': handle_toggle_pit_cams,
+            '/api/dashboard': long_poll(cached_endpoint(handle_dashboard_data)),
+            '/api/driver': long_poll(cached_endpoint(handle_driver), fields=('driver',)),
+            '/api/camera': long_poll(cached_endpoint(handle_camera), fields=('camera',)),
+            'POST /api/camera/set': handle_set_camera,
+            'POST /api/camera/toggle-pit-cams': handle_toggle_pit_cams,
+            '/api/standings': long_poll(cached_endpoint(handle_standings), fields=('standings',)),
+            'GET /api/car/{idx:int}': long_poll(cached_endpoint(handle_car), fields=('standings',)),
+            'GET /api/setup': cached_endpoint(handle_setup),
+            'GET /api/telemetry': cached_endpoint(handle_telemetry_query),
+            'GET /api/telemetry/{var}': cached_endpoint(handle_telemetry_var),
             '/api/diagnostics': handle_diagnostics,
+            'GET /api/metrics': handle_metrics,
+            'GET,POST /api/profile': handle_profile,
+            '/api/stream': handle_stream,
+            'GET,POST /api/batch': cached_endpoint(handle_batch),
         },
         context=context,
-        port=9000
+        port=9000,
+        max_workers=args.http_workers,
+        backlog=args.http_backlog,
+        keep_alive_timeout=args.keep_alive_timeout
     )
 
+    # Start WebSocket broadcaster for push subscribers
+    ws_server = start_websocket_server(context, port=args.ws_port) if args.ws_port else None
+
+    # Queue depths are read when /api/metrics is rendered
+    if hasattr(http_server, 'queue_depth'):
+        QUEUE_DEPTH.set_function(http_server.queue_depth, 'http_pending')
+        QUEUE_DEPTH.set_function(http_server.parked_connections, 'http_parked')
+    if hasattr(http_server, 'connections'):
+        QUEUE_DEPTH.set_function(lambda: http_server.connections, 'http_connections')
+    if ws_server:
+        QUEUE_DEPTH.set_function(lambda: len(ws_server.clients), 'websocket_clients')
+    QUEUE_DEPTH.set_function(snapshots.waiter_count, 'snapshot_waiters')
+    if recorder:
+        QUEUE_DEPTH.set_function(recorder.pending, 'recorder')
+
     try:
         retry = 0
+        last_tick = None
 
         # application loop
         logger.debug('Setup: Starting Loop')
         while True:
+            now = time.perf_counter()
+            if last_tick is not None:
+                interval = now - last_tick
+                LOOP_TICK_RATE.set(1.0 / interval)
+                # Work that overran the interval pushed out whole ticks
+                missed = int(interval / TICK_INTERVAL) - 1
+                if missed > 0:
+                    LOOP_TICKS_DROPPED.inc(amount=missed)
+            last_tick = now
+            LOOP_TICKS.inc()
+            PROFILER.on_tick()
+
             # check if we are connected to iracing
-            logger.debug('Loop: Checking iRacing Connection')
-            state.check_iracing(ir)
+            loop_logger.debug('Loop: Checking iRacing Connection')
+            with loop_stage('check_iracing'):
+                state.check_iracing(ir)
             # if we are, then process data
             if state.ir_connected:
                 # Check drivers to start
-                state.check_drivers(ir)
+                with loop_stage('check_drivers'):
+                    state.check_drivers(ir)
+
+                with loop_stage('check_car_setup'):
+                    if state.check_car_setup(ir):
+                        logger.info(f'Car setup updated ({len(state.setup_tracker.changes)} changes)')
 
                 # Reset retry
                 retry = 0
 
                 # Loop over data
-                logger.debug('Loop: iRacing Connected')
-                loop(
-                  ir = ir,
-                  state = state
-                )
+                loop_logger.debug('Loop: iRacing Connected')
+                with loop_stage('loop'):
+                    loop(
+                      ir = ir,
+                      state = state
+                    )
+
+                if isinstance(history, TelemetryHistory):
+                    with loop_stage('history'):
+                        history.record(ir)
+
+                if recorder and not recorder.recording:
+                    # The recorded variables are fixed by the first connected tick
+                    try:
+                        recorder.start(ir)
+                    except ValueError as e:
+                        print(f'Recording disabled: {e}')
+                        logger.error('Recording disabled', extra={'error': str(e), 'path': args.record})
+                        recorder.stop()
+                        recorder = None
+                    else:
+                        if recorder.missing:
+                            print(f'Not recording unknown variables: {", ".join(recorder.missing)}')
+                            logger.warning('Recording: unknown variables', extra={'missing': recorder.missing})
+
+                if recorder:
+                    with loop_stage('record'):
+                        recorder.record(ir)
+
+                # Hand this tick's data to the HTTP layer
+                with loop_stage('publish'):
+                    snapshots.publish(build_snapshot(ir, state, snapshots.watched_vars(), snapshots.requested_sections()))
             else:
-                logger.debug('Loop: iRacing Not Connected')
+                loop_logger.debug('Loop: iRacing Not Connected')
+                # A reconnect may be another session with its times starting over
+                if isinstance(history, TelemetryHistory):
+                    history.clear()
                 retry += 1
                 if retry > 5:
                     raise Exception('Failed to connect to iRacing after 5 retries')
             # sleep for 1 second
             # maximum you can use is 1/60
             # cause iracing updates data with 60 fps
-            time.sleep(1)
+            time.sleep(TICK_INTERVAL)
 
     except KeyboardInterrupt:
         # press ctrl+c to exit
@@ -295,6 +460,12 @@ if __name__ == '__main__':
         # shutting down HTTP server
         print('Shutting down HTTP server...')
         http_server.shutdown()
+        if ws_server:
+            ws_server.shutdown()
+
+        # writing out buffered frames
+        if recorder:
+            recorder.stop()
 
         # shutting down ir library
         ir.disconnect()
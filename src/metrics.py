@@ -0,0 +1,282 @@
+"""
+In-process metrics with Prometheus text exposition.
+
+Counters, gauges and fixed-bucket histograms, cheap enough to record on
+every loop stage and every request:
+
+    from metrics import LOOP_STAGE_SECONDS
+
+    with LOOP_STAGE_SECONDS.time('check_drivers'):
+        state.check_drivers(ir)
+
+Each labelled series holds a few integers behind its own lock, taken only
+for the increment itself, so recording never contends with rendering or
+with other series.  `REGISTRY.render()` returns every metric in the
+Prometheus text format served by `/api/metrics`.
+"""
+
+import math
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Iterable
+
+# Seconds; from sub-millisecond handler work to multi-second stalls
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Response sizes in bytes
+SIZE_BUCKETS = (128, 512, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+
+class _Series:
+    """Value of one label combination"""
+
+    __slots__ = ('lock', 'value')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.value = 0.0
+
+
+class _HistogramSeries:
+    """Bucket counts of one label combination"""
+
+    __slots__ = ('lock', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets: int):
+        self.lock = threading.Lock()
+        # One count per bucket plus +Inf; cumulated when rendered
+        self.counts = [0] * (buckets + 1)
+        self.sum = 0.0
+        self.count = 0
+
+
+class Metric:
+    """Base class for a named metric with optional labels"""
+
+    kind = 'untyped'
+
+    def __init__(self, name: str, help: str, label_names: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self._series: dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def _new_series(self):
+        return _Series()
+
+    def _get(self, labels: tuple):
+        series = self._series.get(labels)
+        if series is None:
+            if len(labels) != len(self.label_names):
+                raise ValueError(f'{self.name} expects labels {self.label_names}, got {labels}')
+            with self._lock:
+                series = self._series.setdefault(labels, self._new_series())
+        return series
+
+    def _label_text(self, labels: tuple, extra: str = '') -> str:
+        pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(self.label_names, labels)]
+        if extra:
+            pairs.append(extra)
+        return '{' + ','.join(pairs) + '}' if pairs else ''
+
+    def samples(self) -> list[str]:
+        lines = []
+        for labels, series in sorted(self._series.items()):
+            lines.append(f'{self.name}{self._label_text(labels)} {_number(series.value)}')
+        return lines
+
+    def render(self) -> str:
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.kind}']
+        lines.extend(self.samples())
+        return '\n'.join(lines)
+
+
+class Counter(Metric):
+    """A value that only goes up"""
+
+    kind = 'counter'
+
+    def inc(self, *labels, amount: float = 1.0):
+        series = self._get(labels)
+        with series.lock:
+            series.value += amount
+
+    def value(self, *labels) -> float:
+        series = self._series.get(labels)
+        return series.value if series else 0.0
+
+
+class Gauge(Metric):
+    """A value that is set, or read from a callback when rendered"""
+
+    kind = 'gauge'
+
+    def __init__(self, name: str, help: str, label_names: Iterable[str] = ()):
+        super().__init__(name, help, label_names)
+        self._callbacks: dict[tuple, Callable[[], float]] = {}
+
+    def set(self, value: float, *labels):
+        self._get(labels).value = value
+
+    def set_function(self, fn: Callable[[], float], *labels):
+        """Read the value from `fn` whenever metrics are rendered"""
+        self._get(labels)
+        self._callbacks[labels] = fn
+
+    def value(self, *labels) -> float:
+        fn = self._callbacks.get(labels)
+        if fn is not None:
+            return fn()
+        series = self._series.get(labels)
+        return series.value if series else 0.0
+
+    def samples(self) -> list[str]:
+        lines = []
+        for labels in sorted(self._series):
+            try:
+                value = self.value(*labels)
+            except Exception:
+                continue
+            lines.append(f'{self.name}{self._label_text(labels)} {_number(value)}')
+        return lines
+
+
+class Histogram(Metric):
+    """Observations counted into fixed buckets"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, help: str, label_names: Iterable[str] = (), buckets: Iterable[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_series(self):
+        return _HistogramSeries(len(self.buckets))
+
+    def observe(self, value: float, *labels):
+        series = self._get(labels)
+        index = bisect_left(self.buckets, value)
+        with series.lock:
+            series.counts[index] += 1
+            series.sum += value
+            series.count += 1
+
+    @contextmanager
+    def time(self, *labels):
+        """Observe the duration of a `with` block in seconds"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def count(self, *labels) -> int:
+        series = self._series.get(labels)
+        return series.count if series else 0
+
+    def samples(self) -> list[str]:
+        lines = []
+        for labels, series in sorted(self._series.items()):
+            with series.lock:
+                counts = list(series.counts)
+                total, count = series.sum, series.count
+
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, math.inf), counts):
+                cumulative += bucket_count
+                le = 'le="+Inf"' if bound == math.inf else f'le="{_number(bound)}"'
+                lines.append(f'{self.name}_bucket{self._label_text(labels, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{self._label_text(labels)} {_number(total)}')
+            lines.append(f'{self.name}_count{self._label_text(labels)} {count}')
+        return lines
+
+
+class MetricsRegistry:
+    """A set of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help: str, label_names: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, help, label_names))
+
+    def gauge(self, name: str, help: str, label_names: Iterable[str] = ()) -> Gauge:
+        return self.register(Gauge(name, help, label_names))
+
+    def histogram(self, name: str, help: str, label_names: Iterable[str] = (), buckets: Iterable[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, label_names, buckets))
+
+    def get(self, name: str) -> Metric | None:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return '\n'.join(metric.render() for metric in metrics) + '\n'
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+REGISTRY = MetricsRegistry()
+
+# Main loop
+LOOP_STAGE_SECONDS = REGISTRY.histogram(
+    'iracing_loop_stage_seconds', 'Time spent in each main loop stage', ('stage',))
+LOOP_TICKS = REGISTRY.counter(
+    'iracing_loop_ticks_total', 'Main loop iterations')
+LOOP_TICKS_DROPPED = REGISTRY.counter(
+    'iracing_loop_ticks_dropped_total', 'Loop ticks missed because the previous iteration overran its interval')
+LOOP_TICK_RATE = REGISTRY.gauge(
+    'iracing_loop_tick_rate_hz', 'Main loop iterations per second, from the last interval')
+
+# Telemetry source
+SESSION_INFO_REPARSES = REGISTRY.counter(
+    'iracing_session_info_reparses_total', 'Session info sections parsed into models', ('section',))
+CAMERA_SWITCH_SECONDS = REGISTRY.histogram(
+    'iracing_camera_switch_seconds', 'Time to issue a camera switch to the simulator', ('reason',))
+
+# HTTP
+HTTP_REQUESTS = REGISTRY.counter(
+    'http_requests_total', 'HTTP requests served', ('route', 'method', 'status'))
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    'http_request_seconds', 'HTTP request handling time', ('route',))
+HTTP_RESPONSE_BYTES = REGISTRY.histogram(
+    'http_response_bytes', 'HTTP response body size', ('route',), SIZE_BUCKETS)
+
+# Logging
+LOG_RECORDS_DROPPED = REGISTRY.counter(
+    'log_records_dropped_total', 'Log records discarded because the logging queue was full', ('logger',))
+
+# Queues and connections, read from callbacks when rendered
+QUEUE_DEPTH = REGISTRY.gauge(
+    'iracing_queue_depth', 'Items waiting in internal queues', ('queue',))
+
+
+def observe_request(route: str, method: str, status: int, seconds: float, size: int):
+    """Record one served HTTP request"""
+    HTTP_REQUESTS.inc(route, method, str(status))
+    HTTP_REQUEST_SECONDS.observe(seconds, route)
+    HTTP_RESPONSE_BYTES.observe(size, route)
@@ -1,5 +1,5 @@
 from .weekend import Weekend, WeekendOptions, TelemetryOptions
-from .session import Session, SessionInfo, ResultsPosition, ResultsFastestLap
+from .session import Session, SessionInfo, ResultsPosition, ResultsFastestLap, LazySession, ResultsTable
 from .driver_info import DriverInfo, Driver
 from .car_setup import (
     CarSetup,
@@ -27,6 +27,8 @@ __all__ = [
     "SessionInfo",
     "ResultsPosition",
     "ResultsFastestLap",
+    "LazySession",
+    "ResultsTable",
     # Driver models
     "DriverInfo",
     "Driver",
@@ -1,5 +1,12 @@
+from array import array
+from functools import cached_property
 from pydantic import BaseModel
 from typing import Optional
+from .serialization import JsonBytesModel
+from .units import Quantity, numeric_fields, values_array, list_array
+
+# Corner order of the arrays in CarSetup.arrays
+CORNERS = ('LeftFront', 'RightFront', 'LeftRear', 'RightRear')
 
 
 # Reusable models (used multiple times)
@@ -96,9 +103,35 @@ class Dampers(BaseModel):
     RearDampers: DamperSettings
 
 
-class CarSetup(BaseModel):
+class CarSetup(JsonBytesModel):
     UpdateCount: int
     TiresAero: TiresAero
     Chassis: Chassis
     Dampers: Dampers
 
+    @cached_property
+    def numeric(self) -> dict[str, Quantity]:
+        """Every single-value field as a Quantity, by dotted path ("Chassis.LeftFront.RideHeight")"""
+        return numeric_fields(self.model_dump())
+
+    @cached_property
+    def arrays(self) -> dict[str, array]:
+        """
+        Tire and ride height values as float arrays, corners in CORNERS order
+        and NaN where a value is missing.  The arrays support the buffer
+        protocol, e.g. `numpy.frombuffer(setup.arrays['ride_height'])`.
+
+        - starting_pressure, last_hot_pressure, ride_height: one per corner
+        - last_temps, tread_remaining: three per corner, in the order the
+          sim reports them (LastTempsOMI or LastTempsIMO)
+        """
+        tires = [getattr(self.TiresAero, corner) for corner in CORNERS]
+        corners = [getattr(self.Chassis, corner) for corner in CORNERS]
+        return {
+            'starting_pressure': values_array(tire.StartingPressure for tire in tires),
+            'last_hot_pressure': values_array(tire.LastHotPressure for tire in tires),
+            'last_temps': list_array(tire.LastTempsOMI or tire.LastTempsIMO or 'nan, nan, nan' for tire in tires),
+            'tread_remaining': list_array(tire.TreadRemaining for tire in tires),
+            'ride_height': values_array(corner.RideHeight for corner in corners),
+        }
+
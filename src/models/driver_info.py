@@ -1,10 +1,12 @@
-from pydantic import BaseModel, Field, ConfigDict, computed_field
+from pydantic import Field, ConfigDict, computed_field
 from typing import Optional, Union
+from .serialization import JsonBytesModel
 from .telemetry import TelemetryHandler
 from irsdk import TrkLoc
+from profiling import PROFILER
 
 
-class Driver(BaseModel):
+class Driver(JsonBytesModel):
     """
     The Driver model provides details about a specific driver in the current
     iRacing session.
@@ -130,7 +132,7 @@ class Driver(BaseModel):
 
     def to_json(self) -> str:
         """Convert to JSON string"""
-        return self.model_dump_json()
+        return self.to_json_bytes().decode()
 
 
 class DriverInfo(Driver):
@@ -143,6 +145,7 @@ class DriverInfo(Driver):
     Drivers: list[Driver] = Field(default_factory=list, description='List of drivers in the session')
 
     @staticmethod
+    @PROFILER.timed('DriverInfo.from_iracing')
     def from_iracing(ir: TelemetryHandler):
         if (ir['DriverInfo'] is None):
             return DriverInfo()
@@ -150,18 +153,19 @@ class DriverInfo(Driver):
         data = ir['DriverInfo']
 
         playerIdx = data['DriverCarIdx']
-        # Convert to list to avoid generator exhaustion
-        drivers = [Driver(**d) for d in ir['DriverInfo']['Drivers']]
-        player = next((d for d in drivers if d.is_player(playerIdx)), None)
+        # model_validate on the session info dicts is the fastest way to build
+        # the models; unpacking them as keyword arguments or model_construct
+        # are both slower (see benchmarks/driver_models.py)
+        entries = list(data['Drivers'])
+        drivers = [Driver.model_validate(d) for d in entries]
+        player = next((d for d in entries if d.get('CarIdx') == playerIdx), None)
 
         if player is None:
             # If no player found, return default DriverInfo
             return DriverInfo(Drivers=drivers)
 
-        return DriverInfo(
-            **player.model_dump(),
-            Drivers=drivers
-        )
+        # Driver instances in the list are not validated again
+        return DriverInfo.model_validate({**player, 'Drivers': drivers})
     
     def get_driver(self, idx: int) -> Driver | None:
         return next((d for d in self.Drivers if d.CarIdx == idx), None)
@@ -175,4 +179,4 @@ class DriverInfo(Driver):
 
     def to_json(self) -> str:
         """Convert to JSON string"""
-        return self.model_dump_json()
\ No newline at end of file
+        return self.to_json_bytes().decode()
\ No newline at end of file
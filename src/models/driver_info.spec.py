@@ -1,6 +1,8 @@
 """Tests for Driver model lic_color_hex computed field"""
 import pytest
-from models.driver_info import Driver
+from models.driver_info import Driver, DriverInfo
+from models.telemetry import TelemetryHandler
+from iracing import State
 
 
 class TestDriverLicColorHex:
@@ -78,3 +80,53 @@ class TestDriverLicColorHex:
         assert driver.lic_color_hex == "#000001"
         assert len(driver.lic_color_hex) == 7  # # + 6 hex digits
 
+
+class FakeSessionInfo(TelemetryHandler):
+    def __init__(self, drivers):
+        super().__init__()
+        self.version = 1
+        self.reads = 0
+        self.data = {'DriverCarIdx': 1, 'Drivers': drivers}
+
+    def get_data(self, key):
+        if key == 'DriverInfo':
+            self.reads += 1
+            return self.data
+        return None
+
+    def get_session_info_version(self):
+        return self.version
+
+
+class TestDriverInfoFromIracing:
+    """Test building DriverInfo from the session info"""
+
+    def setup_method(self):
+        self.ir = FakeSessionInfo([
+            {'CarIdx': 0, 'UserName': 'Pace Car', 'CarIsPaceCar': 1},
+            {'CarIdx': 1, 'UserName': 'Player', 'CarNumber': '7', 'ClubName': 'Not a field'},
+        ])
+
+    def test_player_fields_are_copied_to_the_root(self):
+        info = DriverInfo.from_iracing(self.ir)
+
+        assert info.UserName == 'Player'
+        assert info.CarNumber == '7'
+        assert [d.UserName for d in info.Drivers] == ['Pace Car', 'Player']
+        assert info.get_driver(1).CarNumber == '7'
+
+    def test_invalid_session_info_is_rejected(self):
+        self.ir.data['Drivers'][1]['CarIdx'] = 'one'
+        with pytest.raises(ValueError):
+            DriverInfo.from_iracing(self.ir)
+
+    def test_drivers_are_rebuilt_only_when_the_version_changes(self):
+        state = State()
+        state.check_drivers(self.ir)
+        first = state.drivers
+        state.check_drivers(self.ir)
+        assert state.drivers is first
+
+        self.ir.version = 2
+        state.check_drivers(self.ir)
+        assert state.drivers is not first
@@ -0,0 +1,110 @@
+"""Tests for unit-suffixed value parsing and the numeric setup views"""
+import math
+
+from models.car_setup import CarSetup
+from models.units import Quantity, parse_quantity, parse_quantities, numeric_fields
+
+
+def tire(pressure: float, temps: str, side: str) -> dict:
+    return {
+        'StartingPressure': f'{pressure:.1f} kPa',
+        'LastHotPressure': f'{pressure + 20:.1f} kPa',
+        f'LastTemps{side}': temps,
+        'TreadRemaining': '100%, 99%, 98%',
+    }
+
+
+def corner(ride_height: str) -> dict:
+    return {
+        'CornerWeight': '2900 N', 'RideHeight': ride_height, 'BumpRubberGap': '15.0 mm',
+        'SpringRate': '200 N/mm', 'Camber': '-2.8 deg',
+    }
+
+
+def car_setup() -> CarSetup:
+    return CarSetup(
+        UpdateCount=3,
+        TiresAero={
+            'TireType': {'TireType': 'Dry'},
+            'LeftFront': tire(172.4, '31C, 30C, 29C', 'OMI'),
+            'RightFront': tire(172.5, '32C, 31C, 30C', 'IMO'),
+            'LeftRear': tire(170.0, '28C, 27C, 26C', 'OMI'),
+            'RightRear': tire(170.1, '29C, 28C, 27C', 'IMO'),
+            'AeroBalanceCalc': {'FrontRhAtSpeed': '40.0 mm', 'RearRhAtSpeed': '70.0 mm', 'WingSetting': '4 degrees', 'FrontDownforce': '42.10%'},
+        },
+        Chassis={
+            'FrontBrakes': {'ArbBlades': 2, 'TotalToeIn': '+1.0 mm', 'FrontMasterCyl': '19.1 mm', 'RearMasterCyl': '20.6 mm', 'BrakePads': 'Medium friction', 'CenterFrontSplitterHeight': '55.0 mm'},
+            'LeftFront': corner('50.1 mm'), 'RightFront': corner('50.2 mm'),
+            'LeftRear': corner('60.1 mm'), 'RightRear': {**corner('60.2 mm'), 'ToeIn': '+1.5 mm'},
+            'Rear': {'FuelLevel': '50.0 L', 'ArbBlades': 1, 'WingAngle': '8.0 deg'},
+            'InCarAdjustments': {'BrakePressureBias': '54.5%', 'AbsSetting': '5 (ABS)', 'TcSetting': 'Off', 'FWtdist': '47.5%', 'CrossWeight': '50.0%'},
+            'GearsDifferential': {'GearStack': 'Short', 'FrictionFaces': 8, 'DiffPreload': '45 Nm'},
+        },
+        Dampers={
+            'FrontDampers': {'LowSpeedCompressionDamping': '4 clicks', 'HighSpeedCompressionDamping': '4 clicks', 'LowSpeedReboundDamping': '6 clicks', 'HighSpeedReboundDamping': '6 clicks'},
+            'RearDampers': {'LowSpeedCompressionDamping': '4 clicks', 'HighSpeedCompressionDamping': '4 clicks', 'LowSpeedReboundDamping': '6 clicks', 'HighSpeedReboundDamping': '6 clicks'},
+        },
+    )
+
+
+class TestParsing:
+    """Test the unit parser"""
+
+    def test_values_and_units(self):
+        assert parse_quantity('3.70 km') == Quantity(3.7, 'km')
+        assert parse_quantity('26.0 C') == Quantity(26.0, 'C')
+        assert parse_quantity('+1.0 mm') == Quantity(1.0, 'mm')
+        assert parse_quantity('-2.8 deg') == Quantity(-2.8, 'deg')
+        assert parse_quantity('54.5%') == Quantity(54.5, '%')
+        assert parse_quantity('1.16 kg/m^3') == Quantity(1.16, 'kg/m^3')
+        assert parse_quantity('12') == Quantity(12.0, '')
+
+    def test_non_quantities(self):
+        for text in ('unlimited', 'N', 'Short', '2024-05-01', '1:50 pm', '31C, 30C', '2024.03.12.01', None):
+            assert parse_quantity(text) is None
+
+    def test_lists(self):
+        assert parse_quantities('31C, 30C, 29C') == (Quantity(31.0, 'C'), Quantity(30.0, 'C'), Quantity(29.0, 'C'))
+
+    def test_strings_are_parsed_once(self):
+        parse_quantity('123.4 units-spec')
+        hits = parse_quantity.cache_info().hits
+        parse_quantity('123.4 units-spec')
+        assert parse_quantity.cache_info().hits == hits + 1
+
+    def test_numeric_fields_flattens_nested_dicts(self):
+        values = numeric_fields({'TrackLength': '3.70 km', 'TrackName': 'spa', 'Options': {'WindSpeed': '3.22 km/h'}})
+        assert values == {'TrackLength': Quantity(3.7, 'km'), 'Options.WindSpeed': Quantity(3.22, 'km/h')}
+
+
+class TestCarSetupViews:
+    """Test the numeric views of a setup"""
+
+    def setup_method(self):
+        self.setup = car_setup()
+
+    def test_numeric_by_path(self):
+        numeric = self.setup.numeric
+        assert numeric['Chassis.LeftFront.RideHeight'] == Quantity(50.1, 'mm')
+        assert numeric['Chassis.Rear.FuelLevel'] == Quantity(50.0, 'L')
+        assert 'Chassis.GearsDifferential.GearStack' not in numeric
+        assert self.setup.numeric is numeric
+
+    def test_arrays_in_corner_order(self):
+        arrays = self.setup.arrays
+        assert arrays['starting_pressure'].typecode == 'd'
+        assert list(arrays['starting_pressure']) == [172.4, 172.5, 170.0, 170.1]
+        assert list(arrays['ride_height']) == [50.1, 50.2, 60.1, 60.2]
+        assert list(arrays['last_temps'][:6]) == [31.0, 30.0, 29.0, 32.0, 31.0, 30.0]
+        assert len(arrays['tread_remaining']) == 12
+        assert memoryview(arrays['ride_height']).format == 'd'
+
+    def test_views_are_rebuilt_after_assignment(self):
+        assert self.setup.arrays['ride_height'][0] == 50.1
+
+        chassis = self.setup.Chassis.model_copy(deep=True)
+        chassis.LeftFront.RideHeight = 'n/a'
+        self.setup.Chassis = chassis
+
+        assert math.isnan(self.setup.arrays['ride_height'][0])
+        assert 'Chassis.LeftFront.RideHeight' not in self.setup.numeric
@@ -0,0 +1,61 @@
+import json
+from pydantic import BaseModel
+
+# __dict__ keys of the cached JSON.  Not fields, so they are left out of
+# model_dump(), equality and validation.
+_JSON_CACHE = '_json_bytes'
+_VALUE_CACHE = '_json_value'
+
+
+class JsonBytesModel(BaseModel):
+    """
+    Base for root models that are served by the API.
+
+    `to_json_bytes()` serializes the model straight to compact JSON bytes
+    with the model's compiled pydantic serializer and keeps the result on the
+    instance, so a model that is served many times between session info
+    updates is only serialized once.  `to_json_value()` is the same JSON
+    decoded, for encoders that cannot use the bytes.  Both, and any
+    `functools.cached_property` values of the model, are dropped whenever
+    a field is assigned or the model is copied.
+
+    Changes made inside nested models or lists (`info.Drivers[0].UserName =
+    ...`, `info.Drivers.append(...)`) are not seen by the parent; call
+    `invalidate_json()` after changing a model that way.
+    """
+
+    def to_json_bytes(self) -> bytes:
+        """Compact JSON of the model, cached until the model changes"""
+        body = self.__dict__.get(_JSON_CACHE)
+        if body is None:
+            body = self.__pydantic_serializer__.to_json(self)
+            self.__dict__[_JSON_CACHE] = body
+        return body
+
+    def to_json_value(self):
+        """`to_json_bytes()` decoded, cached the same way; do not modify it"""
+        value = self.__dict__.get(_VALUE_CACHE)
+        if value is None:
+            value = json.loads(self.to_json_bytes())
+            self.__dict__[_VALUE_CACHE] = value
+        return value
+
+    def invalidate_json(self):
+        """Drop the cached JSON, and any `cached_property` values derived from the fields"""
+        fields = type(self).model_fields
+        for key in [key for key in self.__dict__ if key not in fields]:
+            del self.__dict__[key]
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        self.invalidate_json()
+
+    def __copy__(self):
+        copied = super().__copy__()
+        copied.invalidate_json()
+        return copied
+
+    def __deepcopy__(self, memo=None):
+        copied = super().__deepcopy__(memo)
+        copied.invalidate_json()
+        return copied
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
 from typing import Optional, Union
 from .telemetry import TelemetryHandler
+from .serialization import JsonBytesModel
 
 
 class ResultsPosition(BaseModel):
@@ -55,7 +56,7 @@ class SessionInfo(BaseModel):
     ResultsOfficial: int = Field(description="Whether results are official (0=no, 1=yes)", default=0)
 
 
-class Session(BaseModel):
+class Session(JsonBytesModel):
     """Container for all session information"""
 
     CurrentSessionNum: int = Field(description="Currently active session number", default=0)
@@ -63,7 +64,12 @@ class Session(BaseModel):
 
     @staticmethod
     def from_iracing(ir: TelemetryHandler):
-        """Create a Session instance from iRacing telemetry data"""
+        """
+        Create a Session instance from iRacing telemetry data.
+
+        This validates every session and results list; use
+        `LazySession.from_iracing` when only part of it is needed.
+        """
         if ir['SessionInfo'] is None:
             return Session()
 
@@ -86,4 +92,149 @@ class Session(BaseModel):
         
         f = Session.get_session_flags(ir)
         
-        return f"{ir.decode_session_flags(f)} ({f})"
\ No newline at end of file
+        return f"{ir.decode_session_flags(f)} ({f})"
+
+
+class ResultsTable:
+    """
+    `ResultsPositions` of one session as columns.
+
+    Built straight from the session info rows without validating each one,
+    with indexes by CarIdx and by Position.  `row()` and `by_car()` build
+    a validated `ResultsPosition` for a single row when one is needed.
+    """
+
+    COLUMNS = tuple(ResultsPosition.model_fields)
+    _DEFAULTS = {name: field.default for name, field in ResultsPosition.model_fields.items()}
+
+    def __init__(self, rows: list[dict] | None):
+        rows = rows or []
+        self._rows = rows
+        self.columns: dict[str, list] = {
+            name: [row.get(name, default) for row in rows]
+            for name, default in self._DEFAULTS.items()
+        }
+        self._by_car = {car: i for i, car in enumerate(self.columns['CarIdx'])}
+        self._by_position = {position: i for i, position in enumerate(self.columns['Position'])}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def column(self, name: str) -> list:
+        return self.columns[name]
+
+    def index_of_car(self, car_idx: int) -> int | None:
+        return self._by_car.get(car_idx)
+
+    def value(self, car_idx: int, name: str, default=None):
+        """One column value for a car, without building its row"""
+        i = self._by_car.get(car_idx)
+        return default if i is None else self.columns[name][i]
+
+    def row(self, i: int) -> ResultsPosition:
+        return ResultsPosition.model_validate(self._rows[i])
+
+    def by_car(self, car_idx: int) -> ResultsPosition | None:
+        i = self._by_car.get(car_idx)
+        return None if i is None else self.row(i)
+
+    def by_position(self, position: int) -> ResultsPosition | None:
+        i = self._by_position.get(position)
+        return None if i is None else self.row(i)
+
+    def to_dict(self) -> dict[str, list]:
+        return self.columns
+
+
+class LazySession:
+    """
+    Session info that is parsed only as far as it is read.
+
+    `Session.from_iracing` validates every session and all of its results,
+    which is a lot of work to throw away when a caller only wants
+    `CurrentSessionNum`.  Here each session entry, results table and fastest
+    lap list is built the first time it is accessed and kept for as long as
+    the session info version stays the same:
+
+        session = LazySession.from_iracing(ir, previous=session)
+        race = session.current
+        leader = session.results(race.SessionNum).by_position(1)
+    """
+
+    def __init__(self, data: dict | None = None, version=None):
+        self.version = version
+        self._data = data or {}
+        self._entries = {entry.get('SessionNum', i): entry for i, entry in enumerate(self._data.get('Sessions') or [])}
+        self._sessions: dict[int, SessionInfo] = {}
+        self._results: dict[int, ResultsTable] = {}
+        self._fastest: dict[int, list[ResultsFastestLap]] = {}
+
+    @staticmethod
+    def from_iracing(ir: TelemetryHandler, previous: 'LazySession | None' = None) -> 'LazySession':
+        """
+        Wrap the session info, reusing `previous` (and everything it has
+        parsed) when the session info version has not changed.
+        """
+        version = ir.get_session_info_version()
+        if previous is not None and previous.version == version and previous._data:
+            return previous
+
+        return LazySession(ir['SessionInfo'], version)
+
+    @property
+    def CurrentSessionNum(self) -> int:
+        return self._data.get('CurrentSessionNum', 0)
+
+    def session_numbers(self) -> list[int]:
+        return list(self._entries)
+
+    def session(self, num: int) -> SessionInfo | None:
+        """
+        Validated session entry.  Its results lists are left empty; read
+        them through `results()` and `fastest_laps()`.
+        """
+        session = self._sessions.get(num)
+        if session is None:
+            entry = self._entries.get(num)
+            if entry is None:
+                return None
+            session = SessionInfo.model_validate({**entry, 'ResultsPositions': [], 'ResultsFastestLap': []})
+            self._sessions[num] = session
+        return session
+
+    @property
+    def current(self) -> SessionInfo | None:
+        return self.session(self.CurrentSessionNum)
+
+    def get(self, num: int, name: str, default=None):
+        """One raw field of a session entry, without validating anything"""
+        entry = self._entries.get(num)
+        return default if entry is None else entry.get(name, default)
+
+    def results(self, num: int) -> ResultsTable:
+        """`ResultsPositions` of a session as a columnar table"""
+        table = self._results.get(num)
+        if table is None:
+            table = ResultsTable(self.get(num, 'ResultsPositions'))
+            self._results[num] = table
+        return table
+
+    def fastest_laps(self, num: int) -> list[ResultsFastestLap]:
+        laps = self._fastest.get(num)
+        if laps is None:
+            laps = [ResultsFastestLap.model_validate(lap) for lap in self.get(num, 'ResultsFastestLap') or []]
+            self._fastest[num] = laps
+        return laps
+
+    def to_model(self) -> Session:
+        """The fully validated Session"""
+        return Session(
+            CurrentSessionNum=self.CurrentSessionNum,
+            Sessions=[
+                self.session(num).model_copy(update={
+                    'ResultsPositions': [self.results(num).row(i) for i in range(len(self.results(num)))],
+                    'ResultsFastestLap': self.fastest_laps(num),
+                })
+                for num in self._entries
+            ],
+        )
@@ -0,0 +1,109 @@
+"""Tests for lazy session info parsing and the columnar results table"""
+from models.session import LazySession, ResultsPosition, Session
+from models.telemetry import TelemetryHandler
+
+
+def results(cars: int) -> list[dict]:
+    return [
+        {'Position': pos + 1, 'ClassPosition': pos, 'CarIdx': 10 + pos, 'Lap': 5,
+         'FastestTime': 90.0 + pos, 'LapsLed': 5 if pos == 0 else 0, 'Incidents': pos % 3}
+        for pos in range(cars)
+    ]
+
+
+def session_info(cars: int = 3) -> dict:
+    return {
+        'CurrentSessionNum': 2,
+        'Sessions': [
+            {'SessionNum': 0, 'SessionType': 'Practice', 'ResultsPositions': results(cars), 'ResultsFastestLap': []},
+            {'SessionNum': 1, 'SessionType': 'Lone Qualify', 'ResultsPositions': None, 'ResultsFastestLap': None},
+            {'SessionNum': 2, 'SessionType': 'Race', 'SessionLaps': 'unlimited', 'ResultsPositions': results(cars),
+             'ResultsFastestLap': [{'CarIdx': 11, 'FastestLap': 3, 'FastestTime': 89.5}]},
+        ],
+    }
+
+
+class FakeSessionInfo(TelemetryHandler):
+    def __init__(self):
+        super().__init__()
+        self.version = 1
+        self.data = session_info()
+
+    def get_data(self, key):
+        return self.data if key == 'SessionInfo' else None
+
+    def get_session_info_version(self):
+        return self.version
+
+
+class TestLazySession:
+    """Test parsing sessions only as they are read"""
+
+    def setup_method(self):
+        self.session = LazySession(session_info(), version=1)
+
+    def test_nothing_is_validated_up_front(self):
+        assert self.session.CurrentSessionNum == 2
+        assert self.session.get(0, 'SessionType') == 'Practice'
+        assert self.session.session_numbers() == [0, 1, 2]
+        assert self.session._sessions == {} and self.session._results == {}
+
+    def test_sessions_are_validated_once_on_access(self):
+        race = self.session.current
+
+        assert race.SessionType == 'Race'
+        assert race.SessionLaps == 'unlimited'
+        assert self.session.session(2) is race
+        assert list(self.session._sessions) == [2]
+
+    def test_session_entry_skips_results_lists(self):
+        race = self.session.session(2)
+        assert race.ResultsPositions == [] and race.ResultsFastestLap == []
+        assert self.session._results == {} and self.session._fastest == {}
+        assert len(self.session.results(2)) > 0
+
+    def test_empty_results_lists(self):
+        assert self.session.session(1).ResultsPositions == []
+        assert len(self.session.results(1)) == 0
+        assert self.session.fastest_laps(1) == []
+        assert self.session.session(9) is None
+
+    def test_to_model_matches_the_eager_session(self):
+        data = session_info()
+        for entry in data['Sessions']:
+            entry['ResultsPositions'] = entry['ResultsPositions'] or []
+            entry['ResultsFastestLap'] = entry['ResultsFastestLap'] or []
+
+        assert self.session.to_model() == Session(**data)
+
+    def test_reused_until_the_version_changes(self):
+        ir = FakeSessionInfo()
+        first = LazySession.from_iracing(ir)
+        assert LazySession.from_iracing(ir, previous=first) is first
+
+        ir.version = 2
+        assert LazySession.from_iracing(ir, previous=first) is not first
+
+
+class TestResultsTable:
+    """Test the columnar ResultsPositions"""
+
+    def setup_method(self):
+        self.table = LazySession(session_info(cars=60), version=1).results(2)
+
+    def test_columns_and_defaults(self):
+        assert len(self.table) == 60
+        assert self.table.column('CarIdx')[:3] == [10, 11, 12]
+        assert self.table.column('ReasonOutStr')[0] == ''
+        assert sum(self.table.column('LapsLed')) == 5
+
+    def test_indexes(self):
+        assert self.table.index_of_car(12) == 2
+        assert self.table.value(12, 'FastestTime') == 92.0
+        assert self.table.value(99, 'FastestTime', 0.0) == 0.0
+
+        leader = self.table.by_position(1)
+        assert isinstance(leader, ResultsPosition)
+        assert leader.CarIdx == 10
+        assert self.table.by_car(69).Position == 60
+        assert self.table.by_car(99) is None
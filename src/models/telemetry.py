@@ -1,6 +1,9 @@
 import decoders
 from irsdk import IRSDK, IBT
 from enum import Enum
+from time import perf_counter
+from profiling import PROFILER
+from recording import RecordingReader
 
 # Base telemetry handler
 class TelemetryHandler:
@@ -35,9 +38,23 @@ class TelemetryHandler:
     def get_next_tick(self):
         return 0
 
+    def get_session_info_version(self):
+        """
+        Return a counter that changes whenever the session info (YAML) changes.
+        Callers can compare it to skip re-reading session info sections.
+        """
+        return 0
+
     def __getitem__(self, key):
         """Enable dictionary-style access: ir['SessionTime']"""
-        return self.get_data(key)
+        if not PROFILER.enabled:
+            return self.get_data(key)
+
+        start = perf_counter()
+        try:
+            return self.get_data(key)
+        finally:
+            PROFILER.record('TelemetryHandler.get_data', perf_counter() - start)
     
     def get_playback_display(self):
         return ''
@@ -108,6 +125,11 @@ class LiveTelemetryHandler(TelemetryHandler):
 
     def get_session_info_update_by_key(self, key):
         return self.ir.get_session_info_update_by_key(key)
+
+    def get_session_info_version(self):
+        if not self.ir.is_initialized:
+            return 0
+        return self.ir.session_info_update
     
     def get_playback_display(self):
         return 'LIVE'
@@ -126,14 +148,10 @@ class LiveTelemetryHandler(TelemetryHandler):
     def keys(self):
         return self.ir.var_headers_names
 
-# File-based telemetry handler
-class FileTelemetryHandler(TelemetryHandler):
-    name = 'File'
-
+# Base for handlers that play back a recorded file frame by frame
+class PlaybackTelemetryHandler(TelemetryHandler):
     def __init__(self, file_path, playback_speed='normal', skip_to=0.0):
         super().__init__()
-        self.ibt = IBT()
-        self.source = self.ibt
         self.file_path = file_path
 
         # Convert string to PlaybackSpeed enum if needed
@@ -153,37 +171,14 @@ class FileTelemetryHandler(TelemetryHandler):
         self.total_frames = 0
         self.tick_rate = 60  # Default iRacing tick rate (60 Hz)
 
-    def connect(self):
-        self.ibt.open(self.file_path)
-        self.connected = self.ibt._header is not None
-
-        if self.connected:
-            # Get total number of frames in the recording
-            self.total_frames = self.ibt._disk_header.session_record_count
-            # Get the actual tick rate from the file header
-            self.tick_rate = self.ibt._header.tick_rate
-            # Calculate starting frame based on skip_to (0.0 to 1.0)
-            self.current_frame = int(self.total_frames * self.skip_to)
-
-    def disconnect(self):
-        self.ibt.close()
-        self.connected = False
-        self.current_frame = 0
-        self.total_frames = 0
-
-    def to_json(self):
-        frames = []
-
-        for i in range(self.total_frames):
-            frames.append(self.ibt.get(i, 'SessionTime'))
-        
-        return frames
+    def get_frame_data(self, frame, key):
+        raise NotImplementedError("Subclasses must implement get_frame_data()")
 
     def get_data(self, key):
         # Get data from the current frame instead of the last frame
         if not self.connected or self.current_frame >= self.total_frames:
             return None
-        return self.ibt.get(int(self.current_frame), key)
+        return self.get_frame_data(int(self.current_frame), key)
 
     def get_next_tick(self):
         """Increment the current frame and return the current SessionTime"""
@@ -200,7 +195,7 @@ class FileTelemetryHandler(TelemetryHandler):
             self.current_frame = 0
 
         # Return the SessionTime for the current frame
-        return self.ibt.get(int(self.current_frame), 'SessionTime') or 0
+        return self.get_frame_data(int(self.current_frame), 'SessionTime') or 0
 
     def get_playback_display(self):
         playback = self.get_playback_info()
@@ -218,6 +213,85 @@ class FileTelemetryHandler(TelemetryHandler):
             'skip_to': self.skip_to,
             'progress_percent': (self.current_frame / self.total_frames * 100) if self.total_frames > 0 else 0
         }
-    
+
+# File-based telemetry handler
+class FileTelemetryHandler(PlaybackTelemetryHandler):
+    name = 'File'
+
+    def __init__(self, file_path, playback_speed='normal', skip_to=0.0):
+        super().__init__(file_path, playback_speed, skip_to)
+        self.ibt = IBT()
+        self.source = self.ibt
+
+    def connect(self):
+        self.ibt.open(self.file_path)
+        self.connected = self.ibt._header is not None
+
+        if self.connected:
+            # Get total number of frames in the recording
+            self.total_frames = self.ibt._disk_header.session_record_count
+            # Get the actual tick rate from the file header
+            self.tick_rate = self.ibt._header.tick_rate
+            # Calculate starting frame based on skip_to (0.0 to 1.0)
+            self.current_frame = int(self.total_frames * self.skip_to)
+
+    def disconnect(self):
+        self.ibt.close()
+        self.connected = False
+        self.current_frame = 0
+        self.total_frames = 0
+
+    def to_json(self):
+        frames = []
+
+        for i in range(self.total_frames):
+            frames.append(self.ibt.get(i, 'SessionTime'))
+        
+        return frames
+
+    def get_frame_data(self, frame, key):
+        return self.ibt.get(frame, key)
+
+    def keys(self):
+        return self.ibt.var_headers_names
+
+# Telemetry recorded by TelemetryRecorder (see recording.py)
+class RecordedTelemetryHandler(PlaybackTelemetryHandler):
+    name = 'Recording'
+
+    def __init__(self, file_path, playback_speed='normal', skip_to=0.0):
+        super().__init__(file_path, playback_speed, skip_to)
+        self.recording: RecordingReader | None = None
+
+    def connect(self):
+        self.recording = RecordingReader(self.file_path)
+        self.total_frames = len(self.recording)
+        self.connected = self.total_frames > 0
+        # Frames were recorded once per main loop tick
+        self.tick_rate = 60
+        self.current_frame = int(self.total_frames * self.skip_to)
+
+    def disconnect(self):
+        if self.recording:
+            self.recording.close()
+        self.recording = None
+        self.connected = False
+        self.current_frame = 0
+        self.total_frames = 0
+
+    def to_json(self):
+        return self.recording.get_all('SessionTime') if self.recording else []
+
+    def get_frame_data(self, frame, key):
+        if key in self.recording.vars:
+            return self.recording.get(frame, key)
+        session_info = self.recording.session_info(frame)
+        return session_info[key] if session_info else None
+
+    def get_session_info_version(self):
+        if not self.connected:
+            return 0
+        return self.recording.session_info_version(int(self.current_frame))
+
     def keys(self):
-        return self.ibt.var_headers_names
\ No newline at end of file
+        return self.recording.keys() if self.recording else []
@@ -0,0 +1,98 @@
+"""
+Parse the unit-suffixed strings in session info ("3.70 km", "26.0 C",
+"172.4 kPa", "31C, 30C, 29C") into numbers.
+
+Patterns are compiled once and every distinct string is parsed once: the
+same few hundred strings come back with every session info update, so the
+parsers are memoized on the string itself.
+"""
+
+import math
+import re
+from array import array
+from functools import lru_cache
+from typing import NamedTuple
+
+# A number, optionally followed by a unit starting with a letter, % or °;
+# dates ("2024-05-01"), times ("1:50 pm") and lists do not match
+_QUANTITY = re.compile(r'^\s*([-+]?(?:\d+\.?\d*|\.\d+))\s*([A-Za-z%°/][^,]*?)?\s*$')
+
+# Distinct strings kept per parser; a session info update has a few hundred
+CACHE_SIZE = 4096
+
+
+class Quantity(NamedTuple):
+    """A number and its unit ('' when the string had none)"""
+
+    value: float
+    unit: str
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_quantity(text: str) -> Quantity | None:
+    """
+    Parse one value such as "172.4 kPa", "+1.0 mm", "54.5%" or "3".
+
+    Returns:
+        Quantity, or None when the string does not start with a number
+        ("unlimited", "N", "Short")
+    """
+    if not isinstance(text, str):
+        return None
+
+    match = _QUANTITY.match(text)
+    if match is None:
+        return None
+    return Quantity(float(match.group(1)), match.group(2) or '')
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_quantities(text: str) -> tuple[Quantity | None, ...]:
+    """Parse a comma separated list such as "31C, 30C, 29C" or "100%, 99%, 98%" """
+    if not isinstance(text, str):
+        return ()
+    return tuple(parse_quantity(part) for part in text.split(','))
+
+
+def quantity_value(text: str, default: float = math.nan) -> float:
+    quantity = parse_quantity(text)
+    return default if quantity is None else quantity.value
+
+
+def numeric_fields(data: dict, prefix: str = '') -> dict[str, Quantity]:
+    """
+    Every string field of a (nested) session info dict that parses as a
+    quantity, keyed by its dotted path ("Chassis.LeftFront.RideHeight").
+    Comma separated lists and non-numeric strings are left out.
+    """
+    values = {}
+    for key, value in data.items():
+        path = f'{prefix}{key}'
+        if isinstance(value, dict):
+            values.update(numeric_fields(value, f'{path}.'))
+        elif isinstance(value, str) and ',' not in value:
+            quantity = parse_quantity(value)
+            if quantity is not None:
+                values[path] = quantity
+    return values
+
+
+def values_array(texts) -> array:
+    """Float array of the values of several strings, NaN where a string does not parse"""
+    return array('d', (quantity_value(text) for text in texts))
+
+
+def list_array(texts) -> array:
+    """Float array of the comma separated lists in several strings, concatenated"""
+    return array('d', (
+        math.nan if quantity is None else quantity.value
+        for text in texts
+        for quantity in parse_quantities(text)
+    ))
+
+
+def cache_info() -> dict:
+    return {
+        'parse_quantity': parse_quantity.cache_info()._asdict(),
+        'parse_quantities': parse_quantities.cache_info()._asdict(),
+    }
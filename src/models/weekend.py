@@ -1,5 +1,8 @@
+from functools import cached_property
 from pydantic import BaseModel
 from typing import Optional
+from .serialization import JsonBytesModel
+from .units import Quantity, numeric_fields
 
 
 class WeekendOptions(BaseModel):
@@ -39,7 +42,7 @@ class TelemetryOptions(BaseModel):
     TelemetryDiskFile: str
 
 
-class Weekend(BaseModel):
+class Weekend(JsonBytesModel):
     TrackName: str
     TrackID: int
     TrackLength: str
@@ -101,3 +104,10 @@ class Weekend(BaseModel):
     WeekendOptions: WeekendOptions
     TelemetryOptions: TelemetryOptions
 
+    @cached_property
+    def numeric(self) -> dict[str, Quantity]:
+        """
+        Every unit-suffixed field as a Quantity, parsed once per instance,
+        by dotted path ("TrackLength", "WeekendOptions.WindSpeed")
+        """
+        return numeric_fields(self.model_dump())
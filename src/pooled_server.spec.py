@@ -0,0 +1,178 @@
+"""Tests for the threaded server's worker pool and keep-alive parking"""
+import http.client
+import logging
+import socket
+import threading
+import time
+
+import pytest
+
+from server.helpers import send_json_response
+from server.recorder import ResponseRecorder
+from server.server import start_server
+
+
+class FakeContext:
+    logger = logging.getLogger('pooled_server.spec')
+
+
+def wait_until(condition, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError('Timed out')
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def server():
+    release = threading.Event()
+    started = threading.Event()
+    peers = []
+
+    def handle_slow(handler, ctx):
+        started.set()
+        release.wait(5)
+        send_json_response(handler, {'slow': True})
+
+    def handle_peer(handler, ctx):
+        peers.append(handler.client_address)
+        send_json_response(handler, {'peer': handler.client_address[1]})
+
+    async def handle_poll(request, ctx):
+        # Answers like a long poll: the server writes the response
+        peers.append(request.client_address)
+        recorder = ResponseRecorder(request.command, request.path)
+        send_json_response(recorder, {'polled': True})
+        return recorder
+
+    async def handle_push(request, ctx):
+        await request.send_head(200, {'Content-Type': 'text/plain'})
+        request.writer.write(b'pushed')
+        await request.writer.drain()
+
+    httpd = start_server(
+        {'/slow': handle_slow, '/peer': handle_peer, '/poll': handle_poll, '/push': handle_push},
+        FakeContext(),
+        port=0,
+        max_workers=1,
+        max_pending=0,
+        keep_alive_timeout=0.5
+    )
+    httpd.release, httpd.started, httpd.peers = release, started, peers
+    yield httpd
+    release.set()
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def connect(httpd) -> http.client.HTTPConnection:
+    return http.client.HTTPConnection('127.0.0.1', httpd.server_address[1], timeout=5)
+
+
+class TestPooledServer:
+    """Test the bounded pool, keep-alive reuse and idle timeout"""
+
+    def test_busy_pool_answers_503(self, server):
+        slow = connect(server)
+        slow.request('GET', '/slow')
+        assert server.started.wait(5)
+
+        busy = connect(server)
+        busy.request('GET', '/peer')
+        response = busy.getresponse()
+        assert response.status == 503
+        assert response.getheader('Retry-After') == '1'
+        assert response.read() == b'{"error": "Server busy"}\r\n'
+
+        server.release.set()
+        assert slow.getresponse().status == 200
+        slow.close()
+        busy.close()
+
+    def test_keep_alive_connection_is_reused(self, server):
+        connection = connect(server)
+        for _ in range(3):
+            connection.request('GET', '/peer')
+            response = connection.getresponse()
+            assert response.status == 200
+            response.read()
+
+        assert len(server.peers) == 3
+        assert len(set(server.peers)) == 1
+        # Between requests the idle connection is parked, not holding the worker
+        wait_until(lambda: server.parked_connections() == 1)
+        connection.close()
+
+    def test_idle_connection_closed_after_timeout(self, server):
+        sock = socket.create_connection(('127.0.0.1', server.server_address[1]), timeout=5)
+        sock.sendall(b'GET /peer HTTP/1.1\r\nHost: test\r\n\r\n')
+        assert sock.recv(4096).startswith(b'HTTP/1.1 200')
+        wait_until(lambda: server.parked_connections() == 1)
+
+        # Idle past keep_alive_timeout: the server closes its end
+        assert sock.recv(4096) == b''
+        assert server.parked_connections() == 0
+        sock.close()
+
+    def test_head_on_endpoint(self, server):
+        connection = connect(server)
+        connection.request('HEAD', '/peer')
+        response = connection.getresponse()
+        assert response.status == 200
+        assert int(response.getheader('Content-Length')) > 0
+        assert response.read() == b''
+
+        # The connection is still in step for the next request
+        connection.request('GET', '/peer')
+        response = connection.getresponse()
+        assert response.status == 200
+        assert response.read().startswith(b'{"peer":')
+        connection.close()
+
+    def test_connection_close_is_honoured(self, server):
+        sock = socket.create_connection(('127.0.0.1', server.server_address[1]), timeout=5)
+        sock.sendall(b'GET /peer HTTP/1.1\r\nHost: test\r\nConnection: close\r\n\r\n')
+        received = b''
+        while chunk := sock.recv(4096):
+            received += chunk
+        assert received.startswith(b'HTTP/1.1 200')
+        assert server.parked_connections() == 0
+        sock.close()
+
+
+class TestDetachedRequests:
+    """Test coroutine endpoints served on the stream loop"""
+
+    def test_long_poll_keeps_connection_alive(self, server):
+        connection = connect(server)
+        for target in ('/poll', '/poll', '/peer', '/poll'):
+            connection.request('GET', target)
+            response = connection.getresponse()
+            assert response.status == 200
+            response.read()
+
+        assert response.getheader('Connection') == 'keep-alive'
+        assert len(set(server.peers)) == 1
+        wait_until(lambda: server.parked_connections() == 1)
+        connection.close()
+
+    def test_long_poll_honours_connection_close(self, server):
+        sock = socket.create_connection(('127.0.0.1', server.server_address[1]), timeout=5)
+        sock.sendall(b'GET /poll HTTP/1.1\r\nHost: test\r\nConnection: close\r\n\r\n')
+        received = b''
+        while chunk := sock.recv(4096):
+            received += chunk
+        assert b'Connection: close' in received
+        assert received.endswith(b'{"polled":true}')
+        sock.close()
+
+    def test_stream_closes_connection(self, server):
+        sock = socket.create_connection(('127.0.0.1', server.server_address[1]), timeout=5)
+        sock.sendall(b'GET /push HTTP/1.1\r\nHost: test\r\n\r\n')
+        received = b''
+        while chunk := sock.recv(4096):
+            received += chunk
+        assert received.endswith(b'\r\n\r\npushed')
+        assert server.parked_connections() == 0
+        sock.close()
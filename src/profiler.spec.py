@@ -0,0 +1,74 @@
+"""Tests for the runtime profiling hooks"""
+import time
+
+import pytest
+
+from profiling import Profiler
+
+
+class TestTimers:
+    """Test the switchable hot path timers"""
+
+    def test_disabled_timers_record_nothing(self):
+        profiler = Profiler()
+        with profiler.timer('loop'):
+            pass
+        assert profiler.timer_stats() == {}
+
+    def test_enabled_timers_aggregate(self):
+        profiler = Profiler()
+        profiler.enable_timers()
+
+        @profiler.timed('work')
+        def work():
+            return 42
+
+        assert work() == 42
+        assert work() == 42
+        with profiler.timer('loop'):
+            time.sleep(0.01)
+
+        stats = profiler.timer_stats()
+        assert stats['work']['count'] == 2
+        assert stats['loop']['max_ms'] >= 10
+        # Slowest total first
+        assert list(stats) == ['loop', 'work']
+
+
+class TestSessions:
+    """Test cProfile and sampling sessions"""
+
+    def test_cprofile_runs_on_loop_ticks(self, tmp_path):
+        profiler = Profiler(tmp_path)
+        session = profiler.start('cprofile', seconds=0.1)
+        assert not session.running
+
+        profiler.on_tick()
+        assert session.running
+        sum(range(10000))
+        time.sleep(0.1)
+        profiler.on_tick()
+
+        assert not session.running
+        assert [path.rsplit('.', 1)[1] for path in session.files] == ['prof', 'txt']
+        assert any('sum' in entry['function'] for entry in session.summary)
+
+    def test_sampling_writes_collapsed_stacks(self, tmp_path):
+        profiler = Profiler(tmp_path)
+        session = profiler.start('sample', seconds=0.2, interval=0.005)
+
+        with pytest.raises(ValueError):
+            profiler.start('sample')
+
+        deadline = time.monotonic() + 5
+        while session.running and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        assert session.error is None
+        lines = open(session.files[0]).read().splitlines()
+        assert lines and all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
+        assert session.summary[0]['samples'] > 0
+
+    def test_unknown_mode(self, tmp_path):
+        with pytest.raises(ValueError):
+            Profiler(tmp_path).start('perf')
@@ -0,0 +1,306 @@
+"""
+Runtime profiling hooks.
+
+Everything here is off by default and can be switched on while the app is
+running, from `/api/profile` or from the command line, so a slow loop can
+be investigated mid-session without a restart:
+
+- Timers: named wall-clock timers around the hot paths (loop stages,
+  `TelemetryHandler.get_data`, `DriverInfo.from_iracing`, HTTP handlers).
+  While disabled a timer costs one attribute check.
+- cProfile: profiles the main loop thread for N seconds. The loop calls
+  `PROFILER.on_tick()` every iteration, which is where the profiler is
+  enabled and disabled, because cProfile only sees the thread it runs in.
+- Sampling: a background thread records the stack of every thread every few
+  milliseconds for N seconds, including HTTP workers.
+
+Session results are written to the profile directory: `.prof` (load with
+`pstats` or snakeviz) plus a text summary for cProfile, and `.folded`
+collapsed stacks (for flamegraph.pl or speedscope) for sampling.
+"""
+
+import cProfile
+import functools
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+MODES = ('cprofile', 'sample')
+
+DEFAULT_SECONDS = 30.0
+MAX_SECONDS = 600.0
+DEFAULT_SAMPLE_INTERVAL = 0.005
+
+# Functions listed in the summaries
+SUMMARY_LIMIT = 25
+
+
+class ProfileSession:
+    """One cProfile or sampling run"""
+
+    def __init__(self, mode: str, seconds: float, interval: float = DEFAULT_SAMPLE_INTERVAL):
+        self.mode = mode
+        self.seconds = seconds
+        self.interval = interval
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        self.files: list[str] = []
+        self.summary: list[dict] = []
+        self.error: str | None = None
+
+    @property
+    def running(self) -> bool:
+        return self.started_at is not None and self.finished_at is None
+
+    def to_dict(self) -> dict:
+        return {
+            'mode': self.mode,
+            'seconds': self.seconds,
+            'started_at': _iso(self.started_at),
+            'finished_at': _iso(self.finished_at),
+            'running': self.running,
+            'files': self.files,
+            'summary': self.summary,
+            'error': self.error,
+        }
+
+
+class Profiler:
+    """Runtime switchable timers and profiling sessions"""
+
+    def __init__(self, output_dir: str = 'profiles'):
+        self.output_dir = Path(output_dir)
+        self.enabled = False
+        self._timers: dict[str, list] = {}
+        self._lock = threading.Lock()
+
+        self.session: ProfileSession | None = None
+        self._cprofile: cProfile.Profile | None = None
+
+    # -- Timers ----------------------------------------------------------------
+
+    def enable_timers(self, enabled: bool = True):
+        self.enabled = enabled
+
+    def reset_timers(self):
+        with self._lock:
+            self._timers.clear()
+
+    def record(self, name: str, seconds: float):
+        with self._lock:
+            stats = self._timers.get(name)
+            if stats is None:
+                self._timers[name] = [1, seconds, seconds]
+            else:
+                stats[0] += 1
+                stats[1] += seconds
+                if seconds > stats[2]:
+                    stats[2] = seconds
+
+    @contextmanager
+    def timer(self, name: str):
+        """Time a `with` block while timers are enabled"""
+        if not self.enabled:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def timed(self, name: str):
+        """Decorator form of `timer`"""
+        def decorate(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter() - start)
+            return wrapper
+        return decorate
+
+    def timer_stats(self) -> dict[str, dict]:
+        """Count, total, mean and max milliseconds per timer, slowest first"""
+        with self._lock:
+            items = [(name, list(stats)) for name, stats in self._timers.items()]
+
+        items.sort(key=lambda item: item[1][1], reverse=True)
+        return {
+            name: {
+                'count': count,
+                'total_ms': round(total * 1000, 3),
+                'mean_ms': round(total / count * 1000, 4),
+                'max_ms': round(longest * 1000, 3),
+            }
+            for name, (count, total, longest) in items
+        }
+
+    # -- Sessions --------------------------------------------------------------
+
+    def start(self, mode: str, seconds: float = DEFAULT_SECONDS, interval: float = DEFAULT_SAMPLE_INTERVAL) -> ProfileSession:
+        """
+        Start a profiling session.
+
+        Args:
+            mode: 'cprofile' (main loop thread) or 'sample' (all threads)
+            seconds: How long to profile
+            interval: Seconds between samples in 'sample' mode
+
+        Raises:
+            ValueError: For an unknown mode or while a session is running
+        """
+        if mode not in MODES:
+            raise ValueError(f'mode must be one of: {", ".join(MODES)}')
+
+        with self._lock:
+            if self.session is not None and (self.session.running or self._pending()):
+                raise ValueError('A profiling session is already running')
+
+            session = ProfileSession(mode, min(max(seconds, 0.1), MAX_SECONDS), max(interval, 0.001))
+            self.session = session
+
+        if mode == 'sample':
+            session.started_at = time.time()
+            threading.Thread(target=self._sample, args=(session,), name='profiler-sampler', daemon=True).start()
+        # cProfile sessions start on the loop thread's next on_tick()
+
+        return session
+
+    def _pending(self) -> bool:
+        return self.session.mode == 'cprofile' and self.session.started_at is None
+
+    def on_tick(self):
+        """Called by the main loop every iteration to run cProfile sessions"""
+        session = self.session
+        if session is None or session.mode != 'cprofile' or session.finished_at is not None:
+            return
+
+        if session.started_at is None:
+            self._cprofile = cProfile.Profile()
+            session.started_at = time.time()
+            self._cprofile.enable()
+        elif time.time() - session.started_at >= session.seconds:
+            self._cprofile.disable()
+            self._finish_cprofile(session, self._cprofile)
+            self._cprofile = None
+
+    def stop(self):
+        """End the current session early (cProfile stops on the next tick)"""
+        session = self.session
+        if session is not None and session.running:
+            session.seconds = 0
+
+    def _finish_cprofile(self, session: ProfileSession, profile: cProfile.Profile):
+        try:
+            path = self._output_path('cprofile', '.prof')
+            profile.dump_stats(path)
+
+            text = io.StringIO()
+            stats = pstats.Stats(profile, stream=text)
+            stats.sort_stats('cumulative').print_stats(SUMMARY_LIMIT)
+            summary_path = path.with_suffix('.txt')
+            summary_path.write_text(text.getvalue())
+
+            session.files = [str(path), str(summary_path)]
+            session.summary = [
+                {
+                    'function': f'{func[2]} ({os.path.basename(func[0])}:{func[1]})',
+                    'calls': calls,
+                    'total_ms': round(total * 1000, 3),
+                    'cumulative_ms': round(cumulative * 1000, 3),
+                }
+                for func, (_, calls, total, cumulative, _) in sorted(
+                    stats.stats.items(), key=lambda item: item[1][3], reverse=True
+                )[:SUMMARY_LIMIT]
+            ]
+        except Exception as e:
+            session.error = str(e)
+        finally:
+            session.finished_at = time.time()
+
+    def _sample(self, session: ProfileSession):
+        stacks: Counter = Counter()
+        own = threading.get_ident()
+        names = {}
+        deadline = time.monotonic() + session.seconds
+
+        try:
+            # stop() ends the session by zeroing its length
+            while session.seconds > 0 and time.monotonic() < deadline:
+                names.update((thread.ident, thread.name) for thread in threading.enumerate())
+                for ident, frame in sys._current_frames().items():
+                    if ident == own:
+                        continue
+                    stacks[(names.get(ident, str(ident)), _stack(frame))] += 1
+                time.sleep(session.interval)
+
+            path = self._output_path('sample', '.folded')
+            with open(path, 'w') as f:
+                for (thread_name, stack), count in stacks.most_common():
+                    f.write(f'{thread_name};{stack} {count}\n')
+
+            session.files = [str(path)]
+            session.summary = _top_frames(stacks)
+        except Exception as e:
+            session.error = str(e)
+        finally:
+            session.finished_at = time.time()
+
+    def _output_path(self, mode: str, suffix: str) -> Path:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        return self.output_dir / f'{mode}_{datetime.now().strftime("%Y-%m-%d_%H-%M-%S")}{suffix}'
+
+    def status(self) -> dict:
+        return {
+            'timers_enabled': self.enabled,
+            'timers': self.timer_stats(),
+            'session': self.session.to_dict() if self.session else None,
+            'output_dir': str(self.output_dir),
+        }
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f'{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})'
+
+
+def _stack(frame) -> str:
+    """Collapsed stack, outermost frame first"""
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+def _top_frames(stacks: Counter) -> list[dict]:
+    """Innermost frames by number of samples"""
+    total = sum(stacks.values()) or 1
+    leaves: Counter = Counter()
+    for (thread_name, stack), count in stacks.items():
+        leaves[(thread_name, stack.rsplit(';', 1)[-1])] += count
+
+    return [
+        {'thread': thread_name, 'function': name, 'samples': count, 'percent': round(count / total * 100, 2)}
+        for (thread_name, name), count in leaves.most_common(SUMMARY_LIMIT)
+    ]
+
+
+def _iso(timestamp: float | None) -> str | None:
+    return datetime.fromtimestamp(timestamp).isoformat() if timestamp else None
+
+
+PROFILER = Profiler()
@@ -0,0 +1,73 @@
+"""Tests for metrics recording and the Prometheus text output"""
+import logging
+
+import pytest
+
+from metrics import MetricsRegistry, HTTP_REQUESTS, observe_request
+from server.prometheus import handle_metrics
+from server.recorder import ResponseRecorder
+
+
+class FakeContext:
+    logger = logging.getLogger('prometheus.spec')
+
+
+class TestMetrics:
+    """Test counters, gauges and histograms"""
+
+    def setup_method(self):
+        self.registry = MetricsRegistry()
+
+    def test_counter_with_labels(self):
+        counter = self.registry.counter('requests_total', 'Requests', ('route',))
+        counter.inc('/a')
+        counter.inc('/a', amount=2)
+        counter.inc('/b')
+
+        assert counter.value('/a') == 3
+        assert 'requests_total{route="/a"} 3' in self.registry.render()
+
+    def test_wrong_label_count_is_rejected(self):
+        counter = self.registry.counter('requests_total', 'Requests', ('route',))
+        with pytest.raises(ValueError):
+            counter.inc()
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = self.registry.histogram('latency_seconds', 'Latency', buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 3.0):
+            histogram.observe(value)
+
+        lines = self.registry.render().splitlines()
+        assert 'latency_seconds_bucket{le="0.1"} 1' in lines
+        assert 'latency_seconds_bucket{le="1"} 3' in lines
+        assert 'latency_seconds_bucket{le="+Inf"} 4' in lines
+        assert 'latency_seconds_count 4' in lines
+        assert 'latency_seconds_sum 4.05' in lines
+
+    def test_gauge_callback_is_read_when_rendered(self):
+        depth = [0]
+        gauge = self.registry.gauge('queue_depth', 'Depth', ('queue',))
+        gauge.set_function(lambda: depth[0], 'http')
+
+        depth[0] = 7
+        assert 'queue_depth{queue="http"} 7' in self.registry.render()
+
+    def test_registering_twice_returns_the_same_metric(self):
+        first = self.registry.counter('ticks_total', 'Ticks')
+        assert self.registry.counter('ticks_total', 'Ticks') is first
+
+
+class TestMetricsEndpoint:
+    """Test the /api/metrics handler"""
+
+    def test_renders_recorded_requests(self):
+        before = HTTP_REQUESTS.value('/api/spec', 'GET', '200')
+        observe_request('/api/spec', 'GET', 200, 0.002, 512)
+
+        recorder = ResponseRecorder('GET', '/api/metrics')
+        handle_metrics(recorder, FakeContext())
+
+        body = recorder.body.decode()
+        assert recorder.status == 200
+        assert recorder.get_header('Content-Type').startswith('text/plain; version=0.0.4')
+        assert f'http_requests_total{{route="/api/spec",method="GET",status="200"}} {int(before) + 1}' in body
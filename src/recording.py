@@ -0,0 +1,536 @@
+"""
+Compact recording of live telemetry.
+
+The sim only saves an .ibt on the driving PC, and only for the variables it
+was told to log, so a broadcast or spotter machine has nothing to replay
+after a session.  `TelemetryRecorder` appends selected variables once per
+loop tick, and the session info YAML whenever it changes, to a chunked
+binary file that `RecordedTelemetryHandler` plays back like an .ibt:
+
+    python src/main.py --record session.irrec
+    python src/main.py --file session.irrec
+
+The loop thread only copies the tick's values into a preallocated chunk
+buffer; when recording live they are copied as raw bytes straight out of
+the sim's variable buffer.  Compressing and writing full chunks, and partly
+filled ones every `flush_interval` seconds, happen on a background thread.
+
+File layout (little endian):
+
+    header   magic b'IRREC\\0', u16 version, f64 start time (epoch seconds)
+    records  u8 kind, u8 flags, u32 a, u32 b, u32 raw length, u32 length, payload
+
+    LAYOUT        a = frame size, b = variables; JSON {"vars": [[name, type, count], ...]}
+    SESSION_INFO  a = session info version, b = first frame it applies to; YAML text
+    FRAMES        a = first frame, b = frames; b frames of `frame size` bytes
+
+Payloads with FLAG_ZLIB set are zlib compressed.  A file cut short by a
+crash loses at most the records that were not written yet.
+"""
+
+import json
+import mmap
+import queue
+import struct
+import threading
+import time
+import zlib
+from bisect import bisect_right
+from typing import NamedTuple
+
+import irsdk
+import yaml
+
+MAGIC = b'IRREC\0'
+VERSION = 1
+SUFFIX = '.irrec'
+
+# Record kinds
+LAYOUT = 1
+SESSION_INFO = 2
+FRAMES = 3
+
+FLAG_ZLIB = 1
+
+_HEADER = struct.Struct('<6sHd')
+_RECORD = struct.Struct('<BBIIII')
+
+# Frames per chunk: ten minutes of the 1 Hz main loop, ten seconds at 60 Hz
+CHUNK_FRAMES = 600
+
+# Seconds a partly filled chunk waits before it is written anyway
+FLUSH_INTERVAL = 5.0
+
+# Chunk buffers allocated up front; more are only allocated if the writer falls behind
+BUFFERS = 3
+
+# Fast settings: telemetry frames compress well even at level 1
+COMPRESS_LEVEL = 1
+
+# Session info sections, in the order the sim writes them
+SESSION_INFO_SECTIONS = (
+    'WeekendInfo', 'SessionInfo', 'QualifyResultsInfo', 'CameraInfo',
+    'RadioInfo', 'DriverInfo', 'SplitTimeInfo', 'CarSetup',
+)
+
+_DEFAULTS = {'c': b'\0', '?': False}
+
+
+class Var(NamedTuple):
+    """One recorded variable"""
+
+    name: str
+    # struct type code: c ? i I f d, or q for integers from non-live sources
+    type: str
+    count: int
+    # Byte offset in the frame
+    offset: int
+
+    @property
+    def format(self) -> str:
+        return f'<{self.type * self.count}'
+
+    @property
+    def size(self) -> int:
+        return struct.calcsize(self.format)
+
+
+def _describe(ir, source, name: str) -> tuple[str, int] | None:
+    """struct type code and element count of a variable, None if it cannot be recorded"""
+    if source is not None:
+        header = source._var_headers_dict.get(name)
+        if header is not None:
+            return irsdk.VAR_TYPE_MAP[header.type], header.count
+
+    value = ir[name]
+    values = value if isinstance(value, (list, tuple)) else [value]
+    if not values:
+        return None
+    if all(isinstance(v, bool) for v in values):
+        return '?', len(values)
+    if all(isinstance(v, int) and not isinstance(v, bool) for v in values):
+        return 'q', len(values)
+    if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+        return 'd', len(values)
+    return None
+
+
+def _live_source(ir) -> irsdk.IRSDK | None:
+    """The handler's shared memory reader, when it has one that is running"""
+    source = getattr(ir, 'source', None)
+    if isinstance(source, irsdk.IRSDK) and source.is_initialized:
+        return source
+    return None
+
+
+def session_info_yaml(ir) -> bytes | None:
+    """
+    Session info of a telemetry handler as YAML text.
+
+    Live, this is the sim's own text.  Other handlers get their sections
+    dumped in the same shape, so both replay through `SessionInfoText`.
+    """
+    source = _live_source(ir)
+    if source is not None:
+        start = source._header.session_info_offset
+        return source._shared_mem[start:start + source._header.session_info_len].rstrip(b'\0')
+
+    sections = [(key, ir[key]) for key in SESSION_INFO_SECTIONS]
+    sections = [(key, value) for key, value in sections if value]
+    if not sections:
+        return None
+    text = ''.join(yaml.safe_dump({key: value}, sort_keys=False, allow_unicode=True) + '\n' for key, value in sections)
+    return f'---\n{text}...\n'.encode(irsdk.YAML_CODE_PAGE, errors='replace')
+
+
+class TelemetryRecorder:
+    """
+    Appends telemetry frames and session info to a recording.
+
+    Call `open()` up front to create the file, `record(ir)` once per tick
+    while connected and `stop()` at the end.  The variables (`names`,
+    default: every numeric variable of the source) and their types are fixed
+    by the first tick; requested names the source does not have are listed
+    in `missing`.  Variables missing later, e.g. after the sim restarts with
+    another car, are recorded as zeros.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        names: list[str] | None = None,
+        chunk_frames: int = CHUNK_FRAMES,
+        flush_interval: float = FLUSH_INTERVAL,
+        compress: bool = True
+    ):
+        self.path = path
+        self.names = names
+        self.chunk_frames = chunk_frames
+        self.flush_interval = flush_interval
+        self.compress = compress
+
+        self.vars: list[Var] = []
+        # Requested names the source did not have on the first tick
+        self.missing: list[str] = []
+        self.frame_size = 0
+        # Frames recorded so far
+        self.frames = 0
+        # Chunk buffers allocated because all preallocated ones were queued
+        self.buffers_allocated = 0
+        self.write_errors = 0
+
+        self._file = None
+        self._writer: threading.Thread | None = None
+        self._queue: queue.Queue = queue.Queue()
+        self._free: queue.SimpleQueue = queue.SimpleQueue()
+        self._buffer: bytearray | None = None
+        self._buffer_frames = 0
+        self._chunk_start = 0
+        self._last_flush = 0.0
+        self._session_info_version = None
+        self._pack: struct.Struct | None = None
+        self._defaults: list = []
+        # Raw copy plan for a live source: ((source offset, frame offset, size), ...)
+        self._runs: tuple | None = None
+        # Var headers the plan was made for; a new dict means the sim reconnected
+        self._headers = None
+
+    @property
+    def recording(self) -> bool:
+        return self._writer is not None
+
+    def pending(self) -> int:
+        """Records waiting for the writer thread"""
+        return self._queue.qsize()
+
+    def open(self):
+        """Create the file and write its header; raises OSError for a bad path"""
+        if self._file is None:
+            self._file = open(self.path, 'wb')
+            self._file.write(_HEADER.pack(MAGIC, VERSION, time.time()))
+
+    def start(self, ir):
+        """
+        Fix the recorded variables from the handler's current ones and start
+        the writer.  Raises ValueError when none of them can be recorded.
+        """
+        source = _live_source(ir)
+        recorded, missing, offset = [], [], 0
+        for name in self.names or ir.keys() or ():
+            described = _describe(ir, source, name)
+            if described is None:
+                if self.names:
+                    missing.append(name)
+                continue
+            var = Var(name, described[0], described[1], offset)
+            recorded.append(var)
+            offset += var.size
+        self.missing = missing
+        if not recorded:
+            if missing:
+                raise ValueError(f'No telemetry variables to record (unknown: {", ".join(missing)})')
+            raise ValueError('No telemetry variables to record')
+
+        self.vars = recorded
+
+        self.frame_size = offset
+        self._pack = struct.Struct('<' + ''.join(var.type * var.count for var in self.vars))
+        self._defaults = [_DEFAULTS.get(var.type, 0) for var in self.vars for _ in range(var.count)]
+        for _ in range(BUFFERS):
+            self._free.put(bytearray(self.chunk_frames * self.frame_size))
+
+        self.open()
+        layout = json.dumps({'vars': [[var.name, var.type, var.count] for var in self.vars]}).encode()
+        self._write_record(LAYOUT, self.frame_size, len(self.vars), layout)
+
+        self._last_flush = time.monotonic()
+        self._writer = threading.Thread(target=self._write_loop, name='telemetry-recorder', daemon=True)
+        self._writer.start()
+
+    def record(self, ir):
+        """Append the current tick, and the session info if it changed"""
+        if self._writer is None:
+            self.start(ir)
+
+        if self._buffer is None:
+            try:
+                self._buffer = self._free.get_nowait()
+            except queue.Empty:
+                self._buffer = bytearray(self.chunk_frames * self.frame_size)
+                self.buffers_allocated += 1
+            self._chunk_start = self.frames
+            self._buffer_frames = 0
+
+        offset = self._buffer_frames * self.frame_size
+        if not self._copy_raw(ir, offset):
+            self._pack_values(ir, offset)
+        self._buffer_frames += 1
+        self.frames += 1
+
+        version = ir.get_session_info_version()
+        if version != self._session_info_version:
+            self._session_info_version = version
+            text = session_info_yaml(ir)
+            if text:
+                self._queue.put((SESSION_INFO, version or 0, self.frames - 1, text))
+
+        if self._buffer_frames >= self.chunk_frames or time.monotonic() - self._last_flush >= self.flush_interval:
+            self._hand_off()
+
+    def _plan(self, headers: dict) -> tuple | None:
+        """Byte ranges to copy from the sim's variable buffer, adjacent ones merged"""
+        runs = []
+        for var in self.vars:
+            header = headers.get(var.name)
+            if header is None or irsdk.VAR_TYPE_MAP[header.type] != var.type or header.count != var.count:
+                return None
+            if runs and runs[-1][0] + runs[-1][2] == header.offset and runs[-1][1] + runs[-1][2] == var.offset:
+                runs[-1][2] += var.size
+            else:
+                runs.append([header.offset, var.offset, var.size])
+        return tuple(tuple(run) for run in runs)
+
+    def _copy_raw(self, ir, offset: int) -> bool:
+        source = _live_source(ir)
+        if source is None:
+            return False
+
+        headers = source._var_headers_dict
+        if headers is not self._headers:
+            self._headers = headers
+            self._runs = self._plan(headers)
+        if self._runs is None:
+            return False
+
+        var_buf = source._var_buffer_latest
+        memory = var_buf.get_memory()
+        base = var_buf.buf_offset
+        buffer = self._buffer
+        for src, dst, size in self._runs:
+            buffer[offset + dst:offset + dst + size] = memory[base + src:base + src + size]
+        return True
+
+    def _pack_values(self, ir, offset: int):
+        values = []
+        for var in self.vars:
+            value = ir[var.name]
+            if var.count == 1:
+                values.append(_DEFAULTS.get(var.type, 0) if value is None else value)
+            elif isinstance(value, (list, tuple)) and len(value) == var.count:
+                values.extend(value)
+            else:
+                values.extend([_DEFAULTS.get(var.type, 0)] * var.count)
+        try:
+            self._pack.pack_into(self._buffer, offset, *values)
+        except struct.error:
+            self._pack.pack_into(self._buffer, offset, *self._defaults)
+
+    def _hand_off(self):
+        if self._buffer is not None and self._buffer_frames:
+            self._queue.put((FRAMES, self._chunk_start, self._buffer_frames, self._buffer))
+            self._buffer = None
+        self._last_flush = time.monotonic()
+
+    def _write_record(self, kind: int, a: int, b: int, data):
+        flags = 0
+        raw_length = len(data)
+        if self.compress:
+            compressed = zlib.compress(data, COMPRESS_LEVEL)
+            if len(compressed) < raw_length:
+                data, flags = compressed, FLAG_ZLIB
+        self._file.write(_RECORD.pack(kind, flags, a, b, raw_length, len(data)))
+        self._file.write(data)
+        self._file.flush()
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            kind, a, b, payload = item
+            try:
+                if kind == FRAMES:
+                    with memoryview(payload) as view:
+                        self._write_record(kind, a, b, view[:b * self.frame_size])
+                else:
+                    self._write_record(kind, a, b, payload)
+            except (OSError, ValueError):
+                self.write_errors += 1
+            finally:
+                if kind == FRAMES:
+                    self._free.put(payload)
+
+    def stop(self):
+        """Write what is buffered and close the file"""
+        if self._file is None:
+            return
+        if self._writer is not None:
+            self._hand_off()
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
+        self._file.close()
+        self._file = None
+
+
+class Chunk(NamedTuple):
+    first: int
+    count: int
+    offset: int
+    length: int
+    compressed: bool
+
+
+class SessionInfoText:
+    """Sections of one session info YAML text, parsed on first use exactly like irsdk parses the live ones"""
+
+    def __init__(self, text: bytes, version: int):
+        self._ir = irsdk.IRSDK()
+        self._ir._shared_mem = text
+        self._ir._header = _TextHeader(len(text), version)
+
+    def __getitem__(self, key: str):
+        return self._ir._get_session_info(key)
+
+
+class _TextHeader(NamedTuple):
+    session_info_len: int
+    session_info_update: int
+    session_info_offset: int = 0
+
+
+class RecordingReader:
+    """
+    Random access to the frames of a recording.
+
+    The file is memory mapped and indexed by its record headers; frame chunks
+    are decompressed on use, keeping the last one.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f'Not a telemetry recording: {path}')
+
+        try:
+            magic, version, self.start_time = _HEADER.unpack_from(self._map, 0)
+        except struct.error:
+            magic = version = None
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f'Not a telemetry recording: {path}')
+
+        self.vars: dict[str, Var] = {}
+        self.frame_size = 0
+        self.chunks: list[Chunk] = []
+        # (first frame, version, offset, length, compressed)
+        self._session_infos: list[tuple] = []
+        self._session_texts: dict[int, SessionInfoText] = {}
+        self._cached: tuple[int, bytes] | None = None
+        self._structs: dict[str, struct.Struct] = {}
+        self._index()
+
+        self._firsts = [chunk.first for chunk in self.chunks]
+        self._session_frames = [entry[0] for entry in self._session_infos]
+
+    def _index(self):
+        offset = _HEADER.size
+        size = len(self._map)
+        while offset + _RECORD.size <= size:
+            kind, flags, a, b, _, length = _RECORD.unpack_from(self._map, offset)
+            start = offset + _RECORD.size
+            if start + length > size:
+                # Cut short while it was being written
+                break
+            compressed = bool(flags & FLAG_ZLIB)
+
+            if kind == LAYOUT and not self.vars:
+                layout = json.loads(self._payload(start, length, compressed))
+                position = 0
+                for name, type_code, count in layout['vars']:
+                    var = Var(name, type_code, count, position)
+                    self.vars[name] = var
+                    self._structs[name] = struct.Struct(var.format)
+                    position += var.size
+                self.frame_size = a
+            elif kind == SESSION_INFO:
+                self._session_infos.append((b, a, start, length, compressed))
+            elif kind == FRAMES:
+                self.chunks.append(Chunk(a, b, start, length, compressed))
+            offset = start + length
+
+        # Session info is queued when its frame is recorded, so it can be
+        # written ahead of an earlier chunk
+        self._session_infos.sort(key=lambda entry: entry[0])
+        self.chunks.sort(key=lambda chunk: chunk.first)
+
+    def _payload(self, offset: int, length: int, compressed: bool) -> bytes:
+        data = self._map[offset:offset + length]
+        return zlib.decompress(data) if compressed else data
+
+    def __len__(self) -> int:
+        if not self.chunks:
+            return 0
+        return self.chunks[-1].first + self.chunks[-1].count
+
+    def keys(self) -> list[str]:
+        return list(self.vars)
+
+    def _chunk_data(self, index: int) -> bytes:
+        if self._cached is None or self._cached[0] != index:
+            chunk = self.chunks[index]
+            self._cached = (index, self._payload(chunk.offset, chunk.length, chunk.compressed))
+        return self._cached[1]
+
+    def get(self, frame: int, key: str):
+        """Value of a variable in one frame (a list for arrays), None if unknown"""
+        var = self.vars.get(key)
+        if var is None or not 0 <= frame < len(self):
+            return None
+        index = bisect_right(self._firsts, frame) - 1
+        chunk = self.chunks[index]
+        if frame >= chunk.first + chunk.count:
+            return None
+
+        values = self._structs[key].unpack_from(self._chunk_data(index), (frame - chunk.first) * self.frame_size + var.offset)
+        return values[0] if var.count == 1 else list(values)
+
+    def get_all(self, key: str) -> list | None:
+        """Every frame of a variable"""
+        var = self.vars.get(key)
+        if var is None:
+            return None
+        unpack = self._structs[key].unpack_from
+        results = []
+        for index, chunk in enumerate(self.chunks):
+            data = self._chunk_data(index)
+            for frame in range(chunk.count):
+                values = unpack(data, frame * self.frame_size + var.offset)
+                results.append(values[0] if var.count == 1 else list(values))
+        return results
+
+    def session_info_version(self, frame: int) -> int:
+        index = bisect_right(self._session_frames, frame) - 1
+        return self._session_infos[max(index, 0)][1] if self._session_infos else 0
+
+    def session_info(self, frame: int) -> SessionInfoText | None:
+        """Session info that applied at a frame"""
+        if not self._session_infos:
+            return None
+        index = max(bisect_right(self._session_frames, frame) - 1, 0)
+        text = self._session_texts.get(index)
+        if text is None:
+            _, version, offset, length, compressed = self._session_infos[index]
+            text = self._session_texts[index] = SessionInfoText(self._payload(offset, length, compressed), version)
+        return text
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
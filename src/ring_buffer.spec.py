@@ -0,0 +1,188 @@
+"""Tests for the telemetry ring buffer and range queries on it"""
+import json
+import logging
+import tracemalloc
+from email.message import Message
+
+from history import RingBuffer, TelemetryHistory
+from server.recorder import ResponseRecorder
+from server.router import Router
+from server.telemetry import handle_telemetry_query
+
+router = Router({'GET /api/telemetry': handle_telemetry_query})
+
+
+def fill(ring: RingBuffer, ticks: int, start: int = 0):
+    for tick in range(start, start + ticks):
+        ring.append({'SessionTime': tick / 2, 'Speed': float(tick), 'Gear': tick % 6})
+
+
+class TestRingBuffer:
+    """Test appends and queries across the wrap point"""
+
+    def test_window_before_wrap(self):
+        ring = RingBuffer(['SessionTime', 'Speed'], 10)
+        fill(ring, 4)
+
+        times, columns = ring.window(['Speed'])
+        assert list(times) == [0.0, 0.5, 1.0, 1.5]
+        assert list(columns['Speed']) == [0.0, 1.0, 2.0, 3.0]
+
+    def test_window_across_wrap(self):
+        ring = RingBuffer(['Speed'], 10)
+        fill(ring, 27)
+
+        assert len(ring) == 10
+        times, columns = ring.window(['Speed'], 9.0, 11.5)
+        assert list(columns['Speed']) == [18.0, 19.0, 20.0, 21.0, 22.0, 23.0]
+        assert list(ring.window(['Speed'])[1]['Speed']) == [float(tick) for tick in range(17, 27)]
+        assert ring.window(['Speed'], 100.0)[0].tolist() == []
+
+    def test_frames_keep_counting(self):
+        ring = RingBuffer(['Speed'], 10)
+        fill(ring, 27)
+
+        times, columns = ring.window(['Speed'], 20, 22, unit='frame')
+        assert list(columns['Speed']) == [20.0, 21.0, 22.0]
+        assert ring.span('frame') == (17, 26)
+        assert ring.span() == (8.5, 13.0)
+
+    def test_value_at(self):
+        ring = RingBuffer(['Speed'], 10)
+        fill(ring, 27)
+
+        assert ring.value_at('Speed', 10.0) == 20.0
+        assert ring.value_at('Speed', 10.25) == 20.0
+        assert ring.value_at('Speed', 99.0) == 26.0
+        assert ring.value_at('Speed', 1.0) is None
+
+    def test_stats(self):
+        ring = RingBuffer(['Speed', 'Gear'], 10)
+        fill(ring, 27)
+
+        stats = ring.stats('Speed', 9.0, 11.5)
+        assert (stats.count, stats.min, stats.max, stats.mean) == (6, 18.0, 23.0, 20.5)
+        assert ring.stats('Speed').count == 10
+        assert ring.stats('Speed', 50.0).count == 0
+        assert ring.stats('Speed', 20, 25, unit='frame').max == 25.0
+
+    def test_memory_is_fixed(self):
+        ring = RingBuffer(['Speed', 'Gear'], 1000)
+        fill(ring, 1000)
+        assert ring.nbytes == 3 * 8 * 1000
+
+        row = {'SessionTime': 1.0, 'Speed': 2.0, 'Gear': 3}
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        for _ in range(5000):
+            ring.append(row)
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+        grown = sum(stat.size_diff for stat in after.compare_to(before, 'filename') if stat.size_diff > 0)
+        assert grown < 4096
+
+    def test_clear(self):
+        ring = RingBuffer(['Speed'], 10)
+        fill(ring, 5)
+        ring.clear()
+
+        assert len(ring) == 0
+        assert ring.span() is None
+        fill(ring, 2)
+        assert list(ring.window(['Speed'])[1]['Speed']) == [0.0, 1.0]
+
+
+class FakeContext:
+    def __init__(self, history):
+        self.history = history
+        self.logger = logging.getLogger('ring_buffer.spec')
+
+
+def call(ctx, target: str) -> tuple[int, dict]:
+    recorder = router.match('GET', target).bind(ResponseRecorder('GET', target, Message(), b''))
+    handle_telemetry_query(recorder, ctx)
+    return recorder.status, json.loads(recorder.body)
+
+
+class FakeTicks:
+    def __init__(self, tick: int, session_num: int = 0):
+        self.values = {'SessionNum': session_num, 'SessionTime': float(tick), 'Speed': tick * 2.0, 'OnPitRoad': False}
+
+    def keys(self):
+        return list(self.values)
+
+    def __getitem__(self, key):
+        return self.values[key]
+
+
+class TestHistoryResets:
+    """Test that the history never mixes sessions or unsorted times"""
+
+    def test_session_change_starts_over(self):
+        history = TelemetryHistory(capacity=100)
+        for tick in range(50):
+            history.record(FakeTicks(tick))
+        history.record(FakeTicks(50, session_num=1))
+
+        assert len(history) == 1
+        assert history.span() == (50.0, 50.0)
+
+    def test_time_going_backwards_starts_over(self):
+        history = TelemetryHistory(capacity=100)
+        for tick in (10, 11, 12, 0, 1):
+            history.record(FakeTicks(tick))
+
+        times, columns = history.query(['Speed'])
+        assert list(times) == [0.0, 1.0]
+        assert history.value_at('Speed', 11.0) == 2.0
+
+    def test_same_time_is_kept(self):
+        history = TelemetryHistory(capacity=100)
+        for tick in (5, 5, 6):
+            history.record(FakeTicks(tick))
+        assert len(history) == 3
+
+    def test_clear(self):
+        history = TelemetryHistory(capacity=100)
+        history.record(FakeTicks(5))
+        history.clear()
+        history.record(FakeTicks(1))
+        assert history.span() == (1.0, 1.0)
+
+
+class TestTelemetryQuery:
+    """Test last= and stats= on /api/telemetry"""
+
+    def setup_method(self):
+        history = TelemetryHistory(capacity=100)
+        for tick in range(250):
+            history.record(FakeTicks(tick))
+        self.ctx = FakeContext(history)
+
+    def test_last_seconds(self):
+        status, body = call(self.ctx, '/api/telemetry?vars=Speed&last=10')
+
+        assert status == 200
+        assert body['from'] == 239.0
+        assert body['to'] == 249.0
+        assert body['samples'] == 11
+
+    def test_last_frames(self):
+        status, body = call(self.ctx, '/api/telemetry?vars=Speed&last=10&unit=frame')
+
+        assert status == 200
+        assert body['samples'] == 10
+        assert body['from'] == 240.0
+        assert body['to'] == 249.0
+
+    def test_stats_over_full_range(self):
+        status, body = call(self.ctx, '/api/telemetry?vars=Speed&last=50&points=4&stats=true')
+
+        assert status == 200
+        assert len(body['vars']['Speed']['values']) <= 4
+        assert body['vars']['Speed']['stats'] == {'count': 51, 'min': 398.0, 'max': 498.0, 'mean': 448.0}
+
+    def test_last_with_from_rejected(self):
+        status, _ = call(self.ctx, '/api/telemetry?vars=Speed&last=10&from=5')
+        assert status == 400
@@ -0,0 +1,58 @@
+"""Tests for the precompiled request router"""
+from server.router import Router, get_query_param
+
+
+def handle_a(handler, ctx):
+    pass
+
+
+def handle_b(handler, ctx):
+    pass
+
+
+class TestRouter:
+    """Test static, parameterized and method routing"""
+
+    def setup_method(self):
+        self.router = Router({
+            '/api/driver': handle_a,
+            'POST /api/camera/set': handle_b,
+            'GET /api/car/{idx:int}': handle_a,
+            'GET /api/telemetry/{var}': handle_b,
+        })
+
+    def test_static_route_ignores_query_string(self):
+        match = self.router.match('GET', '/api/driver?full=true')
+        assert match.handler is handle_a
+        assert match.query == {'full': ['true']}
+        assert get_query_param(match, 'full') == 'true'
+
+    def test_path_parameters_are_converted(self):
+        match = self.router.match('GET', '/api/car/12')
+        assert match.handler is handle_a
+        assert match.params == {'idx': 12}
+
+        match = self.router.match('GET', '/api/telemetry/Speed?pretty')
+        assert match.params == {'var': 'Speed'}
+        assert match.query == {'pretty': ['']}
+
+    def test_converter_mismatch_does_not_match(self):
+        assert self.router.match('GET', '/api/car/abc') is None
+        assert self.router.match('GET', '/api/car/1/extra') is None
+
+    def test_unknown_path_returns_none(self):
+        assert self.router.match('GET', '/overlay.css') is None
+
+    def test_wrong_method_lists_allowed_methods(self):
+        match = self.router.match('GET', '/api/camera/set')
+        assert match.handler is None
+        assert match.allowed == ['POST']
+
+    def test_bind_sets_params_and_query(self):
+        class Handler:
+            pass
+
+        handler = self.router.match('GET', '/api/car/3?x=1').bind(Handler())
+        assert handler.params == {'idx': 3}
+        assert get_query_param(handler, 'x') == '1'
+        assert get_query_param(handler, 'missing', 'default') == 'default'
@@ -3,25 +3,56 @@ HTTP Server module for iRacing telemetry API.
 """
 
 from server.context import ServerContext
+from server.router import Router
 from server.server import start_server
+from server.async_server import start_async_server
+from server.websocket import start_websocket_server
+from server.snapshot import SnapshotHub, build_snapshot
+from server.cache import cached_endpoint
+from server.longpoll import long_poll
 from server.root import handle_root
 from server.driver import handle_driver
 from server.camera import handle_camera
+from server.standings import handle_standings
+from server.setup import handle_setup
+from server.car import handle_car
+from server.telemetry import handle_telemetry_var, handle_telemetry_query
 from server.set_camera import handle_set_camera
 from server.toggle_pit_cams import handle_toggle_pit_cams
-from server.dashboard import handle_dashboard
+from server.dashboard import handle_dashboard, handle_dashboard_data
 from server.diagnostics import handle_diagnostics
 from server.driver_overlay_view import handle_driver_overlay_view
+from server.stream import handle_stream
+from server.batch import handle_batch
+from server.prometheus import handle_metrics
+from server.profiler import handle_profile
 
 __all__ = [
     'ServerContext',
+    'Router',
     'start_server',
+    'start_async_server',
+    'start_websocket_server',
+    'SnapshotHub',
+    'build_snapshot',
+    'cached_endpoint',
+    'long_poll',
     'handle_root',
     'handle_driver',
     'handle_camera',
+    'handle_standings',
+    'handle_setup',
+    'handle_car',
+    'handle_telemetry_var',
+    'handle_telemetry_query',
     'handle_set_camera',
     'handle_toggle_pit_cams',
     'handle_dashboard',
+    'handle_dashboard_data',
     'handle_diagnostics',
-    'handle_driver_overlay_view'
+    'handle_driver_overlay_view',
+    'handle_stream',
+    'handle_batch',
+    'handle_metrics',
+    'handle_profile'
 ]
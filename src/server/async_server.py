@@ -0,0 +1,433 @@
+"""
+asyncio based HTTP server for the telemetry API.
+
+An alternative to `server.start_server` that serves every connection as a
+coroutine on a single event loop, so thousands of idle keep-alive or
+long-lived push connections cost a few kilobytes each instead of a thread.
+
+Endpoints use the same registry as the threaded server:
+
+- Regular handlers (`handle_driver`, `handle_camera`, ...) are run on a small
+  thread pool against a ResponseRecorder, so they work unchanged.
+- Coroutine handlers (`async def handler(request, ctx)`) run on the event
+  loop and own the connection, which is how push streams are served.
+"""
+
+import asyncio
+import http.client
+import io
+import mimetypes
+import os
+import posixpath
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote, urlsplit
+
+from server.context import ServerContext
+from server.helpers import send_method_not_allowed
+from server.recorder import ResponseRecorder
+from server.router import Router, coroutine_handler
+from metrics import observe_request
+from profiling import PROFILER
+
+MAX_HEADER_LINES = 100
+MAX_LINE_LENGTH = 65536
+
+
+class AsyncRequest:
+    """A parsed request passed to coroutine endpoint handlers"""
+
+    def __init__(self, command: str, path: str, headers, body: bytes, reader, writer):
+        self.command = command
+        self.path = path
+        self.headers = headers
+        self.body = body
+        self.reader = reader
+        self.writer = writer
+        # Set by the router
+        self.params: dict = {}
+        self.query: dict[str, list[str]] = {}
+
+    @property
+    def client_address(self):
+        return self.writer.get_extra_info('peername')
+
+    async def send_head(self, status: int, headers: dict[str, str]):
+        """Write the status line and headers of a streamed response"""
+        reason = http.client.responses.get(status, '')
+        lines = [f'HTTP/1.1 {status} {reason}']
+        lines.extend(f'{key}: {value}' for key, value in headers.items())
+        self.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        await self.writer.drain()
+
+
+class EventLoopThread:
+    """
+    A background thread running an asyncio event loop.
+
+    Used by the threaded server to serve coroutine (push stream) endpoints:
+    the worker thread hands the connection to this loop and is free again.
+    """
+
+    def __init__(self, name: str = 'stream-loop'):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.close()
+
+    def submit(self, coro):
+        """Schedule a coroutine on the loop from any thread"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def adopt(self, sock, request: 'AsyncRequest', handler, context: ServerContext,
+              keep_alive: bool = False, done=None):
+        """
+        Serve a coroutine endpoint on a connection accepted by another server.
+
+        Args:
+            keep_alive: Whether the client asked to keep the connection open
+            done: Called on the loop with True when the handler answered with
+                a response on a connection kept alive (the caller serves its
+                next request), or False when the connection is finished and
+                the caller should close it.  Without it, the connection is
+                closed here
+        """
+        sock.setblocking(False)
+        return self.submit(self._serve_adopted(sock, request, handler, context, keep_alive, done))
+
+    async def _serve_adopted(self, sock, request: 'AsyncRequest', handler, context: ServerContext,
+                             keep_alive: bool = False, done=None):
+        # The transport gets its own descriptor, so closing it leaves `sock`
+        # open for the caller to serve the next request on
+        reader, writer = await asyncio.open_connection(sock=sock.dup(), limit=MAX_LINE_LENGTH)
+        request.reader = reader
+        request.writer = writer
+        reuse = False
+        try:
+            response = await handler(request, context)
+            if response is not None:
+                # Leave the client's next request in the socket for the caller
+                writer.transport.pause_reading()
+                reuse = keep_alive and done is not None
+                writer.write(response.to_bytes(keep_alive=reuse, include_body=request.command != 'HEAD'))
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            reuse = False
+        except Exception as e:
+            reuse = False
+            context.logger.error(f'Stream error on {request.path}: {e}')
+        finally:
+            writer.close()
+            if done is not None:
+                done(reuse)
+            else:
+                sock.close()
+
+    def stop(self):
+        async def cancel_all():
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        if self.loop.is_closed():
+            return
+
+        try:
+            self.submit(cancel_all()).result(timeout=5)
+        except Exception:
+            pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
+
+
+class AsyncHTTPServer:
+    """HTTP/1.1 server running on its own asyncio event loop thread"""
+
+    def __init__(
+        self,
+        endpoints,
+        context: ServerContext,
+        host: str = '',
+        port: int = 8000,
+        max_workers: int = 8,
+        backlog: int = 1024,
+        keep_alive_timeout: float = 5.0,
+        static_dir: str = 'static'
+    ):
+        self.router = endpoints if isinstance(endpoints, Router) else Router(endpoints)
+        self.context = context
+        self.host = host
+        self.port = port
+        self.backlog = backlog
+        self.keep_alive_timeout = keep_alive_timeout
+        self.static_dir = os.path.abspath(static_dir)
+
+        # Endpoint handlers are synchronous and may block on telemetry reads,
+        # so they run on a bounded pool instead of the event loop
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='async-http-worker')
+
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.connections = 0
+        self._server: asyncio.AbstractServer | None = None
+        self._thread: threading.Thread | None = None
+        self._started = threading.Event()
+        self._startup_error: BaseException | None = None
+
+    # -- Lifecycle -------------------------------------------------------------
+
+    def start(self):
+        """Start the event loop thread and wait until the server is listening"""
+        self._thread = threading.Thread(target=self._run, name='async-http', daemon=True)
+        self._thread.start()
+        self._started.wait()
+
+        if self._startup_error:
+            raise self._startup_error
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+        try:
+            self._server = self.loop.run_until_complete(asyncio.start_server(
+                self._handle_connection,
+                self.host or None,
+                self.port,
+                backlog=self.backlog,
+                limit=MAX_LINE_LENGTH
+            ))
+        except BaseException as e:
+            self._startup_error = e
+            self._started.set()
+            return
+
+        self._started.set()
+
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+            self.loop.close()
+
+    def shutdown(self):
+        """Stop serving and close all connections"""
+        if not self.loop or self.loop.is_closed():
+            return
+
+        future = asyncio.run_coroutine_threadsafe(self._stop(), self.loop)
+        try:
+            future.result(timeout=5)
+        except Exception:
+            pass
+
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def server_close(self):
+        """Compatibility with socketserver based servers"""
+        self.shutdown()
+
+    async def _stop(self):
+        self._server.close()
+
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    # -- Connections -----------------------------------------------------------
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        try:
+            while True:
+                request = await self._read_request(reader, writer)
+                if request is None:
+                    break
+
+                keep_alive = self._keep_alive(request)
+                start = time.perf_counter()
+                match = self.router.match(request.command, request.path)
+                if match is not None:
+                    match.bind(request)
+
+                coroutine = coroutine_handler(match) if match is not None and match.handler else None
+                if coroutine is not None:
+                    response = await coroutine(request, self.context)
+                    if response is None:
+                        # The handler owned the connection (push streams)
+                        break
+                else:
+                    response = await self._dispatch(match, request)
+                    observe_request(
+                        match.route if match is not None else ('static' if request.command in ('GET', 'HEAD') else 'unmatched'),
+                        request.command,
+                        response.status,
+                        time.perf_counter() - start,
+                        len(response.body)
+                    )
+
+                writer.write(response.to_bytes(keep_alive, include_body=request.command != 'HEAD'))
+                await writer.drain()
+
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        except asyncio.CancelledError:
+            # Server shutting down
+            pass
+        except Exception as e:
+            self.context.logger.error(f'Async server connection error: {e}')
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> AsyncRequest | None:
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), self.keep_alive_timeout)
+        except asyncio.TimeoutError:
+            return None
+
+        if not request_line:
+            return None
+
+        parts = request_line.decode('latin-1').split()
+        if len(parts) != 3:
+            return None
+        command, path, version = parts
+
+        raw_headers = []
+        while True:
+            line = await asyncio.wait_for(reader.readline(), self.keep_alive_timeout)
+            if line in (b'\r\n', b'\n', b''):
+                break
+            raw_headers.append(line)
+            if len(raw_headers) > MAX_HEADER_LINES:
+                return None
+
+        headers = http.client.parse_headers(io.BytesIO(b''.join(raw_headers) + b'\r\n'))
+        headers.version = version
+
+        length = int(headers.get('Content-Length', 0) or 0)
+        body = await reader.readexactly(length) if length > 0 else b''
+
+        return AsyncRequest(command, path, headers, body, reader, writer)
+
+    def _keep_alive(self, request: AsyncRequest) -> bool:
+        connection = (request.headers.get('Connection') or '').lower()
+        if request.headers.version == 'HTTP/1.0':
+            return connection == 'keep-alive'
+        return connection != 'close'
+
+    # -- Dispatch --------------------------------------------------------------
+
+    async def _dispatch(self, match, request: AsyncRequest) -> ResponseRecorder:
+        recorder = ResponseRecorder(
+            request.command,
+            request.path,
+            request.headers,
+            request.body,
+            request.client_address
+        )
+
+        if match is None:
+            if request.command in ('GET', 'HEAD'):
+                await self.loop.run_in_executor(self.executor, self._serve_static, recorder)
+            else:
+                recorder.send_error(404, 'Not Found')
+            return recorder
+
+        if match.handler is None:
+            send_method_not_allowed(recorder, match.allowed)
+            return recorder
+
+        match.bind(recorder)
+        try:
+            await self.loop.run_in_executor(self.executor, self._call_handler, match, recorder)
+        except Exception as e:
+            self.context.logger.error(f'Unhandled error in {request.path}: {e}')
+            recorder = ResponseRecorder(request.command, request.path)
+            recorder.send_error(500, str(e))
+
+        return recorder
+
+    def _call_handler(self, match, recorder: ResponseRecorder):
+        with PROFILER.timer(f'http {match.route}'):
+            match.handler(recorder, self.context)
+
+    def _serve_static(self, recorder: ResponseRecorder):
+        """Serve a file from the static directory (GET only)"""
+        path = posixpath.normpath(unquote(urlsplit(recorder.path).path))
+        full_path = os.path.abspath(os.path.join(self.static_dir, *[p for p in path.split('/') if p]))
+
+        if not full_path.startswith(self.static_dir):
+            recorder.send_error(404, 'File not found')
+            return
+
+        if os.path.isdir(full_path):
+            full_path = os.path.join(full_path, 'index.html')
+
+        try:
+            with open(full_path, 'rb') as f:
+                body = f.read()
+        except OSError:
+            recorder.send_error(404, 'File not found')
+            return
+
+        content_type = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+        recorder.send_response(200)
+        recorder.send_header('Content-Type', content_type)
+        recorder.send_header('Content-Length', len(body))
+        recorder.end_headers()
+        # Kept for HEAD too: Content-Length is taken from the body, which
+        # to_bytes() then leaves out
+        recorder.wfile.write(body)
+
+
+def start_async_server(
+    endpoints,
+    context: ServerContext,
+    port=8000,
+    max_workers: int = 8,
+    backlog: int = 1024,
+    keep_alive_timeout: float = 5.0
+):
+    """
+    Start the asyncio HTTP server with custom endpoint handlers.
+
+    Args:
+        endpoints: Dictionary mapping route patterns to handler functions,
+            or a prebuilt Router (see `server.router`)
+        context: ServerContext with dependencies (ir, state, logger, snapshots)
+        port: Port number to listen on (default: 8000)
+        max_workers: Threads running synchronous endpoint handlers (default: 8)
+        backlog: Listen backlog for pending TCP connections (default: 1024)
+        keep_alive_timeout: Seconds an idle keep-alive connection is held
+            open before it is closed (default: 5.0)
+
+    Returns:
+        The AsyncHTTPServer instance
+    """
+    httpd = AsyncHTTPServer(
+        endpoints,
+        context,
+        port=port,
+        max_workers=max_workers,
+        backlog=backlog,
+        keep_alive_timeout=keep_alive_timeout
+    )
+    httpd.start()
+
+    print(f"HTTP server (asyncio) started on http://0.0.0.0:{port}")
+    context.logger.info(f"Async HTTP server started on port {port} ({max_workers} workers)")
+    return httpd
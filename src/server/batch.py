@@ -0,0 +1,146 @@
+"""
+Batch endpoint: several resources from one snapshot in one response.
+
+`GET /api/batch?resources=driver,camera,standings` (or `POST /api/batch`
+with `{"resources": [...]}`) returns every requested resource built from the
+latest snapshot the telemetry loop published, so the parts of the response
+are always from the same tick.  Each resource is built at most once per
+tick and shared by every batch request in that tick.
+
+Resources are looked up in `BATCH_RESOURCES`, a registry of builders taking
+`(ctx, snapshot)` and returning the resource payload.  Snapshot fields are
+used as-is; raw variables are not offered, since the snapshot only holds
+the ones streaming clients watch.  `dashboard` and `diagnostics` are
+on-demand snapshot sections: a batch request asks the telemetry loop to
+build them, and the first request after they went unused waits for the
+next tick.
+"""
+
+import json
+from datetime import datetime
+from typing import Callable
+
+from .helpers import send_json_response, send_error_response
+from .context import ServerContext
+from .router import get_query_param
+from .snapshot import ON_DEMAND_SECTIONS, SECTION_WAIT, Snapshot
+
+
+class ResourceError(Exception):
+    """A batch resource could not be built"""
+
+    def __init__(self, message: str, status: int = 500):
+        super().__init__(message)
+        self.status = status
+
+
+def snapshot_resource(field: str) -> Callable:
+    """Builder for a payload the telemetry loop already puts in each snapshot"""
+    def build(ctx: ServerContext, snapshot: Snapshot):
+        value = snapshot.data.get(field)
+        if value is None:
+            raise ResourceError(f'{field} data not available', 503)
+        return value
+    return build
+
+
+BATCH_RESOURCES: dict[str, Callable] = {
+    'driver': snapshot_resource('driver'),
+    'camera': snapshot_resource('camera'),
+    'standings': snapshot_resource('standings'),
+    'dashboard': snapshot_resource('dashboard'),
+    'diagnostics': snapshot_resource('diagnostics'),
+}
+
+
+def build_resource(ctx: ServerContext, snapshot: Snapshot, name: str) -> tuple[str, object]:
+    """
+    Build one resource, memoized on the snapshot.
+
+    Returns:
+        ('ok', payload) or ('error', {'status': ..., 'error': ...})
+    """
+    def build():
+        try:
+            return 'ok', BATCH_RESOURCES[name](ctx, snapshot)
+        except ResourceError as e:
+            return 'error', {'status': e.status, 'error': str(e)}
+
+    return snapshot.cached(('batch', name), build)
+
+
+def build_batch_payload(ctx: ServerContext, snapshot: Snapshot, names: list[str]) -> dict:
+    """Build the requested resources from one snapshot"""
+    resources = {}
+    errors = {}
+
+    for name in names:
+        outcome, value = build_resource(ctx, snapshot, name)
+        if outcome == 'ok':
+            resources[name] = value
+        else:
+            errors[name] = value
+
+    return {
+        'version': snapshot.version,
+        'session_time': snapshot.data.get('session_time'),
+        'resources': resources,
+        'errors': errors,
+        'timestamp': datetime.now().isoformat()
+    }
+
+
+def read_resource_names(handler) -> list[str]:
+    """
+    Requested resource names from `?resources=` or a POST JSON body.
+
+    Raises:
+        ValueError: If the POST body is not valid JSON
+    """
+    if handler.command == 'POST':
+        content_length = int(handler.headers.get('Content-Length', 0))
+        data = json.loads(handler.rfile.read(content_length).decode('utf-8')) if content_length else {}
+        names = data.get('resources', []) if isinstance(data, dict) else []
+        if isinstance(names, str):
+            names = names.split(',')
+    else:
+        names = (get_query_param(handler, 'resources') or '').split(',')
+
+    names = [str(name).strip() for name in names]
+    return list(dict.fromkeys(name for name in names if name))
+
+
+def handle_batch(handler, ctx: ServerContext):
+    """Handle batch endpoint (/api/batch?resources=driver,camera)"""
+    try:
+        ctx.logger.debug('Batch endpoint called')
+
+        try:
+            names = read_resource_names(handler)
+        except ValueError:
+            send_error_response(handler, 'Invalid JSON', 400)
+            return
+
+        if not names:
+            send_error_response(handler, f'Missing resources (available: {", ".join(BATCH_RESOURCES)})', 400)
+            return
+
+        unknown = [name for name in names if name not in BATCH_RESOURCES]
+        if unknown:
+            send_error_response(handler, f'Unknown resources: {", ".join(unknown)}', 400)
+            return
+
+        hub = ctx.snapshots
+        if hub is None or hub.version == 0 or not ctx.state.ir_connected:
+            ctx.logger.warning('Batch endpoint called but no snapshot is available')
+            send_error_response(handler, 'Not connected to iRacing', 503)
+            return
+
+        sections = [name for name in names if name in ON_DEMAND_SECTIONS]
+        snapshot = hub.wait_for_sections(sections, SECTION_WAIT) if sections else hub.latest
+
+        send_json_response(handler, build_batch_payload(ctx, snapshot, names))
+
+    except Exception as e:
+        ctx.logger.error(f'Error in batch endpoint: {e}')
+        send_error_response(handler, str(e))
@@ -0,0 +1,207 @@
+"""
+Tick-keyed response cache for endpoint handlers.
+
+Overlays poll the same endpoints many times per telemetry tick.  Wrapping an
+endpoint with `cached_endpoint` runs it at most once per (path, query,
+version) and serves the encoded response to everyone else:
+
+    endpoints = {
+        '/api/driver': cached_endpoint(handle_driver),
+        '/api/camera': cached_endpoint(handle_camera),
+    }
+
+Responses are also keyed on the negotiated encoding (see `server.encoding`).
+The version is the SnapshotHub version (one per loop tick) by default, or the
+session info version for endpoints that only depend on session info.
+Responses carry an `ETag`, so a client sending `If-None-Match` with an
+unchanged response gets an empty 304.  Concurrent identical requests wait for
+the one computation already in flight instead of starting their own.
+"""
+
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from .context import ServerContext
+from .encoding import negotiate
+from .recorder import ResponseRecorder
+
+# Response headers that depend on the request and are never replayed
+HOP_HEADERS = ('connection', 'keep-alive', 'content-length', 'etag')
+
+
+class CachedResponse:
+    """An encoded response that can be replayed to any client"""
+
+    __slots__ = ('version', 'status', 'headers', 'body', 'etag')
+
+    def __init__(self, version, status: int, headers: list[tuple[str, str]], body: bytes):
+        self.version = version
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+    def not_modified(self, if_none_match: str | None) -> bool:
+        """Check an If-None-Match request header against this response"""
+        if not if_none_match:
+            return False
+        tags = [tag.strip() for tag in if_none_match.split(',')]
+        return '*' in tags or self.etag in tags or f'W/{self.etag}' in tags
+
+    def write(self, handler):
+        """Send this response, or a 304 if the client already has it"""
+        if self.status == 200 and self.not_modified(handler.headers.get('If-None-Match')):
+            handler.send_response(304)
+            handler.send_header('ETag', self.etag)
+            handler.send_header('Access-Control-Allow-Origin', '*')
+            handler.end_headers()
+            return
+
+        handler.send_response(self.status)
+        for key, value in self.headers:
+            handler.send_header(key, value)
+        handler.send_header('ETag', self.etag)
+        handler.send_header('Content-Length', str(len(self.body)))
+        handler.end_headers()
+        if handler.command != 'HEAD':
+            handler.wfile.write(self.body)
+
+
+class ResponseCache:
+    """
+    Latest response per request key, valid for a single version.
+
+    Keys are evicted least recently used once `max_entries` is reached, so
+    the cache stays bounded no matter how many query strings clients use.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple, CachedResponse] = OrderedDict()
+        self._in_flight: dict[tuple, Future] = {}
+
+    def get(self, key: tuple, version, compute) -> CachedResponse:
+        """
+        Return the cached response for `key` at `version`, computing it once.
+
+        Args:
+            key: Request key, usually the path with query and the
+                negotiated encoding
+            version: Data version the response must match
+            compute: Callable returning a CachedResponse
+
+        Returns:
+            The response.  Error responses are shared with the requests
+            waiting on the same computation but are not stored.
+        """
+        flight_key = (key, version)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.version == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+            future = self._in_flight.get(flight_key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[flight_key] = Future()
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            entry = compute()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(flight_key, None)
+
+        if entry.status == 200:
+            with self._lock:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+        future.set_result(entry)
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def tick_version(ctx: ServerContext):
+    """Version of the latest snapshot published by the telemetry loop"""
+    hub = ctx.snapshots
+    if hub is None or hub.version == 0:
+        return None
+    # The loop stops publishing while disconnected, so the connection state
+    # is part of the version
+    return (hub.version, ctx.state.ir_connected)
+
+
+def session_info_version(ctx: ServerContext):
+    """Version of the session info, for endpoints that only depend on it"""
+    ir = ctx.ir
+    get_version = getattr(ir, 'get_session_info_version', None)
+    return get_version() if get_version else None
+
+
+def cached_endpoint(endpoint, version=tick_version, max_entries: int = 256):
+    """
+    Wrap an endpoint handler with a ResponseCache.
+
+    Args:
+        endpoint: Handler function taking (handler, ctx)
+        version: Callable taking the ServerContext and returning the data
+            version responses are keyed on; None disables caching for the
+            request (e.g. before the first snapshot)
+        max_entries: Maximum number of distinct request keys kept
+
+    Returns:
+        A handler function with the same signature
+    """
+    cache = ResponseCache(max_entries)
+
+    def compute(handler, ctx: ServerContext, current) -> CachedResponse:
+        recorder = ResponseRecorder(handler.command, handler.path, handler.headers, client_address=handler.client_address)
+        recorder.params = getattr(handler, 'params', {})
+        recorder.query = getattr(handler, 'query', {})
+        endpoint(recorder, ctx)
+
+        return CachedResponse(
+            current,
+            recorder.status,
+            [(key, value) for key, value in recorder.response_headers if key.lower() not in HOP_HEADERS],
+            recorder.body
+        )
+
+    @functools.wraps(endpoint)
+    def handle_cached(handler, ctx: ServerContext):
+        current = version(ctx)
+        if current is None or handler.command not in ('GET', 'HEAD'):
+            endpoint(handler, ctx)
+            return
+
+        # The negotiated encoding is part of the key: clients asking for
+        # JSON, MessagePack or gzip each get their own cached body
+        key = (handler.path, *negotiate(handler))
+        response = cache.get(key, current, lambda: compute(handler, ctx, current))
+        response.write(handler)
+
+    handle_cached.cache = cache
+    return handle_cached
@@ -3,6 +3,17 @@ from .context import ServerContext
 from datetime import datetime
 
 
+def build_camera_payload(ir, state) -> dict:
+    """Build the camera endpoint payload"""
+    return {
+        'current_camera': state.current_camera(ir),
+        'camera_target': state.current_camera_target(ir),
+        'camera_groups': state.camera_groups(ir),
+        'show_pit_cams': state.show_pit_cams,
+        'timestamp': datetime.now().isoformat()
+    }
+
+
 def handle_camera(handler, ctx: ServerContext):
     """Handle camera info endpoint"""
     try:
@@ -17,13 +28,7 @@ def handle_camera(handler, ctx: ServerContext):
             send_error_response(handler, 'Not connected to iRacing', 503)
             return
 
-        response = {
-            'current_camera': state.current_camera(ir),
-            'camera_target': state.current_camera_target(ir),
-            'camera_groups': state.camera_groups(ir),
-            'show_pit_cams': state.show_pit_cams,
-            'timestamp': datetime.now().isoformat()
-        }
+        response = build_camera_payload(ir, state)
 
         ctx.logger.info(f'Camera data returned: {response["current_camera"]}')
         send_json_response(handler, response)
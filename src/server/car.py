@@ -0,0 +1,58 @@
+from .helpers import send_json_response, send_error_response
+from .context import ServerContext
+from .standings import car_value
+from datetime import datetime
+
+# Per-car telemetry arrays included in the car payload
+CAR_VARS = {
+    'position': 'CarIdxPosition',
+    'class_position': 'CarIdxClassPosition',
+    'laps_completed': 'CarIdxLapCompleted',
+    'lap_dist_pct': 'CarIdxLapDistPct',
+    'last_lap_time': 'CarIdxLastLapTime',
+    'best_lap_time': 'CarIdxBestLapTime',
+    'on_pit_road': 'CarIdxOnPitRoad',
+    'track_surface': 'CarIdxTrackSurface',
+}
+
+
+def build_car_payload(ir, driver, idx: int) -> dict:
+    """Build the payload for a single car"""
+    telemetry = {key: car_value(ir[var], idx) for key, var in CAR_VARS.items()}
+
+    surface = telemetry['track_surface']
+    if surface is not None:
+        telemetry['track_surface_display'] = ir.decode_car_location(surface)
+
+    return {
+        'car_idx': idx,
+        'driver': driver,
+        'telemetry': telemetry,
+        'timestamp': datetime.now().isoformat()
+    }
+
+
+def handle_car(handler, ctx: ServerContext):
+    """Handle per-car endpoint (/api/car/{idx})"""
+    try:
+        ir = ctx.ir
+        state = ctx.state
+        idx = handler.params['idx']
+
+        ctx.logger.debug(f'Car endpoint called for CarIdx {idx}')
+
+        if not state.ir_connected:
+            ctx.logger.warning('Car endpoint called but not connected to iRacing')
+            send_error_response(handler, 'Not connected to iRacing', 503)
+            return
+
+        driver = state.drivers.get_driver(idx)
+        if driver is None:
+            send_error_response(handler, f'No car with index {idx}', 404)
+            return
+
+        send_json_response(handler, build_car_payload(ir, driver, idx))
+
+    except Exception as e:
+        ctx.logger.error(f'Error in car endpoint: {e}')
+        send_error_response(handler, str(e))
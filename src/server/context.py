@@ -21,7 +21,9 @@ class ServerContext:
         self,
         get_ir: Callable,
         get_state: Callable,
-        logger: Logger
+        logger: Logger,
+        snapshots=None,
+        history=None
     ):
         """
         Initialize the server context.
@@ -30,10 +32,17 @@ class ServerContext:
             get_ir: Callable that returns the current TelemetryHandler instance
             get_state: Callable that returns the current State instance
             logger: Logger instance for HTTP handlers
+            snapshots: Optional SnapshotHub the telemetry loop publishes
+                each tick's snapshot to
+            history: Optional telemetry history (`history.TelemetryHistory`
+                for live sessions, `history.IbtHistory` for files) used by
+                the range query endpoint
         """
         self.get_ir = get_ir
         self.get_state = get_state
         self.logger = logger
+        self.snapshots = snapshots
+        self.history = history
     
     @property
     def ir(self):
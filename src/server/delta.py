@@ -0,0 +1,255 @@
+"""
+Delta-encoded telemetry frames for push streams.
+
+A stream in frames mode sends a keyframe holding every section it carries,
+then only what changed since the previous frame, as JSON objects:
+
+    {"seq": 0, "key": true, "data": {"driver": {...}, "vars": {...}}}
+    {"seq": 1, "set": [[["vars", "Speed"], 51.2]],
+              "idx": [[["vars", "CarIdxLapDistPct"], [3, 0.41, 17, 0.92]]],
+              "del": [["driver", "driver_team"]]}
+
+- `set`: [path, value] pairs replacing the value at a key path
+- `idx`: [path, [index, value, ...]] sparse updates of a list whose length is
+  unchanged, so a 64 element CarIdx array with three cars moving costs three
+  pairs rather than the whole array
+- `del`: paths that were removed
+
+`seq` counts frames on one stream.  A client that sees a gap (or joins late)
+drops deltas until the next keyframe, which is sent every
+`KEYFRAME_INTERVAL` seconds or on request.
+
+The diff of a section between two snapshot versions is cached on the newer
+snapshot, so clients that were sent the same previous snapshot share it.
+"""
+
+import json
+import time
+from typing import Any, Iterable, NamedTuple
+
+from .snapshot import Snapshot
+
+# Seconds between keyframes on a stream
+KEYFRAME_INTERVAL = 5.0
+
+# A list with more than this share of its elements changed is sent whole
+SPARSE_RATIO = 0.5
+
+_MISSING = object()
+
+
+def _dumps(data) -> str:
+    return json.dumps(data, separators=(',', ':'), default=str)
+
+
+class Changes(NamedTuple):
+    """Encoded operations of one section's diff, as JSON fragments"""
+
+    set: list[str]
+    idx: list[str]
+    delete: list[str]
+
+
+def diff_values(old, new, path: tuple = (), changes: Changes | None = None) -> Changes:
+    """
+    Operations turning `old` into `new`.
+
+    Dicts are compared key by key, lists of the same length element by
+    element; anything else that differs is replaced.  A dict whose only
+    change is its `timestamp` counts as unchanged, as in
+    `SnapshotHub.changed_version`; otherwise the timestamp is sent along.
+    """
+    if changes is None:
+        changes = Changes([], [], [])
+
+    if isinstance(new, dict) and isinstance(old, dict):
+        before = len(changes.set) + len(changes.idx) + len(changes.delete)
+        for key, value in new.items():
+            if key == 'timestamp':
+                continue
+            previous = old.get(key, _MISSING)
+            if previous is _MISSING:
+                changes.set.append(_dumps([[*path, key], value]))
+            else:
+                diff_values(previous, value, (*path, key), changes)
+        for key in old.keys() - new.keys():
+            changes.delete.append(_dumps([*path, key]))
+
+        # Payloads are rebuilt with a new timestamp every tick
+        if 'timestamp' in new and len(changes.set) + len(changes.idx) + len(changes.delete) > before:
+            previous = old.get('timestamp', _MISSING)
+            if previous is _MISSING or previous != new['timestamp']:
+                changes.set.append(_dumps([[*path, 'timestamp'], new['timestamp']]))
+
+    elif isinstance(new, list) and isinstance(old, list) and len(new) == len(old):
+        changed = [index for index, (a, b) in enumerate(zip(old, new)) if a != b]
+        if not changed:
+            return changes
+        if len(changed) > len(new) * SPARSE_RATIO:
+            changes.set.append(_dumps([list(path), new]))
+        else:
+            pairs = []
+            for index in changed:
+                pairs += (index, new[index])
+            changes.idx.append(_dumps([list(path), pairs]))
+
+    # bool and int compare equal but encode differently
+    elif old != new or type(old) is not type(new):
+        changes.set.append(_dumps([list(path), new]))
+
+    return changes
+
+
+class DeltaEncoder:
+    """
+    Frame state of one stream.
+
+    A stream carries named sections (snapshot fields, WebSocket channels);
+    the encoder remembers the snapshot each section was last sent from and
+    diffs against it.
+    """
+
+    def __init__(self, scope=None, keyframe_interval: float = KEYFRAME_INTERVAL):
+        """
+        Args:
+            scope: Hashable key shared by every stream whose sections hold
+                the same values (e.g. the SSE field selection), so their
+                diffs are cached together
+            keyframe_interval: Seconds between keyframes
+        """
+        self.scope = scope
+        self.keyframe_interval = keyframe_interval
+        self.seq = 0
+        self.keyframes = 0
+        # Section name -> (snapshot, value) it was last sent with
+        self._sent: dict[str, tuple[Snapshot, Any]] = {}
+        self._keyframe_at: float | None = None
+
+    def request_keyframe(self):
+        """Make the next frame a keyframe, e.g. after a client saw a gap"""
+        self._keyframe_at = None
+
+    def keyframe_due(self, now: float) -> bool:
+        return self._keyframe_at is None or now - self._keyframe_at >= self.keyframe_interval
+
+    def encode(self, snapshot: Snapshot, values: dict[str, Any],
+               sections: Iterable[str] | None = None, now: float | None = None) -> str | None:
+        """
+        Encode the next frame.
+
+        Args:
+            snapshot: Snapshot the values were taken from
+            values: Every section this stream carries, by name
+            sections: Sections due in this frame (default: all).  Keyframes
+                always carry every section
+            now: time.monotonic() timestamp
+
+        Returns:
+            The frame's JSON members without the enclosing braces (so
+            callers can add their own), or None when nothing changed
+        """
+        if now is None:
+            now = time.monotonic()
+
+        if self.keyframe_due(now):
+            body = self._keyframe(snapshot, values)
+            self._keyframe_at = now
+            self.keyframes += 1
+        else:
+            body = self._delta(snapshot, values, values.keys() if sections is None else sections)
+            if body is None:
+                return None
+
+        seq = self.seq
+        self.seq += 1
+        return f'"seq":{seq},{body}'
+
+    def _keyframe(self, snapshot: Snapshot, values: dict[str, Any]) -> str:
+        parts = [
+            snapshot.cached(('delta-value', self.scope, section), lambda: f'{_dumps(section)}:{_dumps(value)}')
+            for section, value in values.items()
+        ]
+        self._sent = {section: (snapshot, value) for section, value in values.items()}
+        return f'"key":true,"data":{{{",".join(parts)}}}'
+
+    def _delta(self, snapshot: Snapshot, values: dict[str, Any], sections: Iterable[str]) -> str | None:
+        changes = Changes([], [], [])
+
+        for section in sections:
+            value = values.get(section, _MISSING)
+            if value is _MISSING:
+                continue
+
+            sent = self._sent.get(section)
+            if sent is None:
+                changes.set.append(_dumps([[section], value]))
+            elif sent[0] is not snapshot:
+                previous, old = sent
+                section_changes = snapshot.cached(
+                    ('delta', self.scope, section, previous.version),
+                    lambda: diff_values(old, value, (section,))
+                )
+                for ops, new in zip(changes, section_changes):
+                    ops += new
+            self._sent[section] = (snapshot, value)
+
+        for section in self._sent.keys() - values.keys():
+            del self._sent[section]
+            changes.delete.append(_dumps([section]))
+
+        parts = [
+            f'"{name}":[{",".join(ops)}]'
+            for name, ops in zip(('set', 'idx', 'del'), changes) if ops
+        ]
+        return ','.join(parts) or None
+
+
+class DeltaDecoder:
+    """
+    Client side of a frames stream; static/delta-decoder.js is the browser
+    counterpart.
+    """
+
+    def __init__(self):
+        self.data: dict = {}
+        # None until a keyframe arrives, and again after a gap
+        self.seq: int | None = None
+
+    @property
+    def synced(self) -> bool:
+        return self.seq is not None
+
+    def apply(self, frame: dict) -> bool:
+        """
+        Apply one decoded frame.
+
+        Returns:
+            False when the frame was dropped because a frame before it is
+            missing; `data` is stale until the next keyframe
+        """
+        if frame.get('key'):
+            self.data = frame['data']
+            self.seq = frame['seq']
+            return True
+
+        if self.seq is None or frame['seq'] != self.seq + 1:
+            self.seq = None
+            return False
+
+        for path, value in frame.get('set', ()):
+            _parent(self.data, path)[path[-1]] = value
+        for path, pairs in frame.get('idx', ()):
+            target = _parent(self.data, path)[path[-1]]
+            for position in range(0, len(pairs), 2):
+                target[pairs[position]] = pairs[position + 1]
+        for path in frame.get('del', ()):
+            _parent(self.data, path).pop(path[-1], None)
+
+        self.seq = frame['seq']
+        return True
+
+
+def _parent(data: dict, path: list) -> dict:
+    for key in path[:-1]:
+        data = data.setdefault(key, {})
+    return data
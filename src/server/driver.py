@@ -1,50 +1,76 @@
 from .helpers import send_json_response, send_error_response
 from .context import ServerContext
+from .router import get_query_param
 from models.driver_info import DriverInfo
 from datetime import datetime
 
+
+def build_driver_payload(ir, driver: DriverInfo) -> dict:
+    """
+    Build the driver endpoint payload (published in each snapshot).
+
+    Args:
+        ir: TelemetryHandler with a frozen variable buffer
+        driver: DriverInfo for the player
+    """
+    return {
+        'driver_name': driver.UserName,
+        'driver_team': driver.TeamName,
+        'driver_number': driver.CarNumber,
+        'driver_license': driver.LicString,
+        'driver_license_color': driver.lic_color_hex,
+        'driver_irating': driver.IRating,
+        'driver_incidents': ir['PlayerCarDriverIncidentCount'],
+        'team_incidents': ir['PlayerCarTeamIncidentCount'],
+        'driver_laps': ir['LapCompleted'],
+        'total_laps': ir['RaceLaps'],
+        'timestamp': datetime.now().isoformat()
+    }
+
+
+def build_full_driver_payload(driver: DriverInfo, payload: dict) -> dict:
+    """
+    Full driver object with the telemetry of a published driver payload.
+
+    The model is encoded from its cached JSON when the response is sent.
+    """
+    return {
+        'driver': driver,
+        'telemetry': {
+            'player_incidents': payload['driver_incidents'],
+            'team_incidents': payload['team_incidents'],
+            'laps_completed': payload['driver_laps'],
+            'total_laps': payload['total_laps'],
+        },
+        'timestamp': payload['timestamp']
+    }
+
+
 def handle_driver(handler, ctx: ServerContext):
     """Handle driver data endpoint"""
     try:
         ctx.logger.debug('Driver endpoint called')
 
         # Validate context has the required getters
-        if not hasattr(ctx, 'get_ir') or not callable(ctx.get_ir):
-            ctx.logger.error('Context missing get_ir callable')
-            send_error_response(handler, 'Server configuration error: missing get_ir', 500)
-            return
-
         if not hasattr(ctx, 'get_state') or not callable(ctx.get_state):
             ctx.logger.error('Context missing get_state callable')
             send_error_response(handler, 'Server configuration error: missing get_state', 500)
             return
 
+        if ctx.snapshots is None:
+            ctx.logger.error('Context missing snapshots')
+            send_error_response(handler, 'Server configuration error: missing snapshots', 500)
+            return
+
         # Get current values on demand using context
-        ir = ctx.ir
         state = ctx.state
 
         # Validate that we got valid objects back
-        if ir is None:
-            ctx.logger.error('Context.ir returned None - lambda may not be capturing ir correctly')
-            send_error_response(handler, 'Server configuration error: ir is None', 500)
-            return
-
         if state is None:
             ctx.logger.error('Context.state returned None - lambda may not be capturing state correctly')
             send_error_response(handler, 'Server configuration error: state is None', 500)
             return
 
-        # Validate ir has required methods
-        if not hasattr(ir, 'freeze_var_buffer_latest'):
-            ctx.logger.error(f'ir object missing freeze_var_buffer_latest method. Type: {type(ir).__name__}')
-            send_error_response(handler, 'Server configuration error: invalid ir object', 500)
-            return
-
-        if not hasattr(ir, '__getitem__'):
-            ctx.logger.error(f'ir object missing __getitem__ method. Type: {type(ir).__name__}')
-            send_error_response(handler, 'Server configuration error: invalid ir object', 500)
-            return
-
         # Validate state has required properties
         if not hasattr(state, 'ir_connected'):
             ctx.logger.error(f'state object missing ir_connected property. Type: {type(state).__name__}')
@@ -57,17 +83,14 @@ def handle_driver(handler, ctx: ServerContext):
             return
 
         # Log successful validation
-        ctx.logger.debug(f'Context validation passed - ir type: {type(ir).__name__}, state type: {type(state).__name__}')
-        ctx.logger.debug(f'ir.connected: {getattr(ir, "connected", "N/A")}, state.ir_connected: {state.ir_connected}')
+        ctx.logger.debug(f'Context validation passed - state type: {type(state).__name__}')
+        ctx.logger.debug(f'state.ir_connected: {state.ir_connected}')
 
         if not state.ir_connected:
             ctx.logger.warning('Driver endpoint called but not connected to iRacing')
             send_error_response(handler, 'Not connected to iRacing', 503)
             return
 
-        # Freeze buffer for consistent data
-        ir.freeze_var_buffer_latest()
-
         # Get driver info
         driver: DriverInfo = state.drivers
 
@@ -81,46 +104,24 @@ def handle_driver(handler, ctx: ServerContext):
             ctx.logger.error('state.drivers returned Unknown driver')
             send_json_response(handler, {
               'error': 'Driver data not available',
-              'info': driver.to_dict()  # Serialize the driver object
+              'info': driver  # Serialized from the driver's cached JSON
             }, 500)
             return
 
         ctx.logger.debug(f'Driver retrieved: {driver.UserName or "MISSING"} (type: {type(driver).__name__})')
 
         # Check if full driver object is requested via query parameter
-        # Parse query string from path
-        from urllib.parse import urlparse, parse_qs
-        parsed = urlparse(handler.path)
-        query_params = parse_qs(parsed.query)
-        full_response = query_params.get('full', ['false'])[0].lower() == 'true'
-
-        if full_response:
-            # Return full driver object with telemetry data
-            response = {
-                'driver': driver.to_dict(),
-                'telemetry': {
-                    'player_incidents': ir['PlayerCarDriverIncidentCount'],
-                    'team_incidents': ir['PlayerCarTeamIncidentCount'],
-                    'laps_completed': ir['LapCompleted'],
-                    'total_laps': ir['RaceLaps'],
-                },
-                'timestamp': datetime.now().isoformat()
-            }
-        else:
-            # Return simplified response (backward compatible)
-            response = {
-                'driver_name': driver.UserName,
-                'driver_team': driver.TeamName,
-                'driver_number': driver.CarNumber,
-                'driver_license': driver.LicString,
-                'driver_license_color': driver.lic_color_hex,
-                'driver_irating': driver.IRating,
-                'driver_incidents': ir['PlayerCarDriverIncidentCount'],
-                'team_incidents': ir['PlayerCarTeamIncidentCount'],
-                'driver_laps': ir['LapCompleted'],
-                'total_laps': ir['RaceLaps'],
-                'timestamp': datetime.now().isoformat()
-            }
+        full_response = get_query_param(handler, 'full', 'false').lower() == 'true'
+
+        # Telemetry values come from the loop's frozen tick: re-freezing the
+        # variable buffer from server threads would race the loop
+        payload = ctx.snapshots.latest.data.get('driver')
+        if payload is None:
+            ctx.logger.warning('Driver endpoint called before the loop published driver data')
+            send_error_response(handler, 'Driver data not available', 503)
+            return
+
+        response = build_full_driver_payload(driver, payload) if full_response else payload
 
         ctx.logger.info(f'Driver data returned: {driver.UserName} (#{driver.CarNumber}), full={full_response}')
         send_json_response(handler, response)
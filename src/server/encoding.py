@@ -0,0 +1,231 @@
+"""
+Response body encodings for the JSON API.
+
+- Compact JSON (default) and indented JSON (`?pretty=true`)
+- MessagePack (`Accept: application/msgpack`) for high-rate overlay clients
+- gzip for bodies above GZIP_MIN_SIZE when the client sends
+  `Accept-Encoding: gzip`
+
+The MessagePack encoder covers the types our payloads contain (dict, list,
+tuple, str, bytes, int, float, bool, None); anything else is sent as its
+string form, like `json.dumps(default=str)`.  Any MessagePack library can
+decode the output, e.g. `@msgpack/msgpack` in the browser.
+
+Payloads may hold API models (`JsonBytesModel`) in place of their
+`to_dict()`.  Compact JSON splices in the model's cached `to_json_bytes()`
+unchanged instead of dumping and re-encoding every field.
+"""
+
+import gzip
+import json
+import re
+import secrets
+import struct
+from urllib.parse import parse_qs, urlsplit
+
+from models.serialization import JsonBytesModel
+
+JSON = 'application/json'
+MSGPACK = 'application/msgpack'
+MSGPACK_TYPES = (MSGPACK, 'application/x-msgpack')
+
+# Smaller bodies fit in a packet or two, where gzip costs more than it saves
+GZIP_MIN_SIZE = 1024
+GZIP_LEVEL = 6
+
+_pack_double = struct.Struct('>Bd').pack
+
+# Placeholder string a model is dumped as before its JSON is spliced in:
+# "\0json<token>:<index>", with a random token per call so payload strings
+# cannot be mistaken for one
+_FRAGMENT = re.compile(rb'"\\u0000json([0-9a-f]{16}):(\d+)"')
+
+
+def _model_value(value):
+    """Plain value of a model, for the encoders that cannot splice bytes"""
+    if isinstance(value, JsonBytesModel):
+        return value.to_json_value()
+    return str(value)
+
+
+def encode_json(data, pretty: bool = False) -> bytes:
+    """Encode as compact JSON, or indented JSON when `pretty` is set"""
+    if pretty:
+        return json.dumps(data, indent=2, default=_model_value).encode()
+
+    fragments = []
+    token = None
+
+    def default(value):
+        nonlocal token
+        if isinstance(value, JsonBytesModel):
+            token = token or secrets.token_hex(8)
+            fragments.append(value.to_json_bytes())
+            return f'\0json{token}:{len(fragments) - 1}'
+        return str(value)
+
+    def splice(match):
+        if match.group(1).decode() != token:
+            return match.group(0)
+        return fragments[int(match.group(2))]
+
+    body = json.dumps(data, separators=(',', ':'), default=default).encode()
+    if fragments:
+        body = _FRAGMENT.sub(splice, body)
+    return body
+
+
+def encode_msgpack(data) -> bytes:
+    """Encode as MessagePack"""
+    out = bytearray()
+    _pack(data, out)
+    return bytes(out)
+
+
+def _pack(value, out: bytearray):
+    if value is None:
+        out.append(0xc0)
+    elif value is True:
+        out.append(0xc3)
+    elif value is False:
+        out.append(0xc2)
+    elif isinstance(value, int):
+        _pack_int(value, out)
+    elif isinstance(value, float):
+        out += _pack_double(0xcb, value)
+    elif isinstance(value, str):
+        _pack_str(value, out)
+    elif isinstance(value, dict):
+        _pack_length(len(value), out, 0x80, 0xde, 0xdf)
+        for key, item in value.items():
+            _pack(key if isinstance(key, str) else str(key), out)
+            _pack(item, out)
+    elif isinstance(value, (list, tuple)):
+        _pack_length(len(value), out, 0x90, 0xdc, 0xdd)
+        for item in value:
+            _pack(item, out)
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        size = len(value)
+        if size < 0x100:
+            out += bytes((0xc4, size))
+        elif size < 0x10000:
+            out += struct.pack('>BH', 0xc5, size)
+        else:
+            out += struct.pack('>BI', 0xc6, size)
+        out += value
+    elif isinstance(value, JsonBytesModel):
+        _pack(_model_value(value), out)
+    else:
+        _pack_str(str(value), out)
+
+
+def _pack_int(value: int, out: bytearray):
+    if 0 <= value < 0x80:
+        out.append(value)
+    elif -0x20 <= value < 0:
+        out.append(value & 0xff)
+    elif value >= 0:
+        if value < 0x100:
+            out += bytes((0xcc, value))
+        elif value < 0x10000:
+            out += struct.pack('>BH', 0xcd, value)
+        elif value < 0x100000000:
+            out += struct.pack('>BI', 0xce, value)
+        elif value < 0x10000000000000000:
+            out += struct.pack('>BQ', 0xcf, value)
+        else:
+            _pack_str(str(value), out)
+    else:
+        if value >= -0x80:
+            out += struct.pack('>Bb', 0xd0, value)
+        elif value >= -0x8000:
+            out += struct.pack('>Bh', 0xd1, value)
+        elif value >= -0x80000000:
+            out += struct.pack('>Bi', 0xd2, value)
+        elif value >= -0x8000000000000000:
+            out += struct.pack('>Bq', 0xd3, value)
+        else:
+            _pack_str(str(value), out)
+
+
+def _pack_str(value: str, out: bytearray):
+    raw = value.encode('utf-8')
+    size = len(raw)
+    if size < 0x20:
+        out.append(0xa0 | size)
+    elif size < 0x100:
+        out += bytes((0xd9, size))
+    elif size < 0x10000:
+        out += struct.pack('>BH', 0xda, size)
+    else:
+        out += struct.pack('>BI', 0xdb, size)
+    out += raw
+
+
+def _pack_length(size: int, out: bytearray, fix: int, short: int, long: int):
+    if size < 0x10:
+        out.append(fix | size)
+    elif size < 0x10000:
+        out += struct.pack('>BH', short, size)
+    else:
+        out += struct.pack('>BI', long, size)
+
+
+def _accepts(header: str | None, token: str) -> bool:
+    """Check an Accept-style header for a token with a non-zero quality"""
+    if not header:
+        return False
+
+    for part in header.split(','):
+        name, *params = part.split(';')
+        if name.strip().lower() != token:
+            continue
+
+        for param in params:
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    return float(value) > 0
+                except ValueError:
+                    return False
+        return True
+
+    return False
+
+
+def negotiate(handler) -> tuple[str, bool, bool]:
+    """
+    Pick the response encoding for a request.
+
+    Returns:
+        Tuple of (content type, pretty, gzip allowed)
+    """
+    headers = handler.headers
+    accept = headers.get('Accept')
+
+    content_type = JSON
+    if accept and any(_accepts(accept, media) for media in MSGPACK_TYPES):
+        content_type = MSGPACK
+
+    # Query parsed by the router, or parsed here for handlers it did not route
+    query = getattr(handler, 'query', None)
+    if query is None:
+        query = parse_qs(urlsplit(handler.path).query, keep_blank_values=True)
+    pretty = query.get('pretty', ['false'])[0].lower() in ('', '1', 'true', 'yes')
+
+    return content_type, pretty, _accepts(headers.get('Accept-Encoding'), 'gzip')
+
+
+def encode_body(data, content_type: str, pretty: bool = False, allow_gzip: bool = False) -> tuple[bytes, str | None]:
+    """
+    Encode a response payload.
+
+    Returns:
+        Tuple of (body, content encoding or None)
+    """
+    body = encode_msgpack(data) if content_type == MSGPACK else encode_json(data, pretty)
+
+    if allow_gzip and len(body) >= GZIP_MIN_SIZE:
+        return gzip.compress(body, GZIP_LEVEL, mtime=0), 'gzip'
+
+    return body, None
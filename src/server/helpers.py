@@ -1,15 +1,47 @@
-import json
+from .encoding import negotiate, encode_body
 
 
-def send_json_response(handler, data: dict, status_code: int = 200):
-    """Send JSON response"""
+def send_json_response(handler, data: dict, status_code: int = 200, headers: dict[str, str] | None = None):
+    """
+    Send a JSON (or negotiated binary) response.
+
+    Compact JSON by default, indented with `?pretty=true`, MessagePack when
+    the client accepts `application/msgpack`, gzipped when the client
+    accepts it and the body is large enough.
+    """
+    content_type, pretty, allow_gzip = negotiate(handler)
+    body, content_encoding = encode_body(data, content_type, pretty, allow_gzip)
+
+    handler.send_response(status_code)
+    handler.send_header('Content-Type', content_type)
+    if content_encoding:
+        handler.send_header('Content-Encoding', content_encoding)
+    handler.send_header('Vary', 'Accept, Accept-Encoding')
+    handler.send_header('Content-Length', str(len(body)))
+    handler.send_header('Access-Control-Allow-Origin', '*')
+    for key, value in (headers or {}).items():
+        handler.send_header(key, value)
+    handler.end_headers()
+    handler.wfile.write(body)
+
+
+def send_html_response(handler, html: str, status_code: int = 200):
+    """Send HTML response"""
+    body = html.encode('utf-8')
+
     handler.send_response(status_code)
-    handler.send_header('Content-Type', 'application/json')
+    handler.send_header('Content-Type', 'text/html; charset=utf-8')
+    handler.send_header('Content-Length', str(len(body)))
     handler.send_header('Access-Control-Allow-Origin', '*')
     handler.end_headers()
-    handler.wfile.write(json.dumps(data, indent=2).encode())
+    handler.wfile.write(body)
 
 
-def send_error_response(handler, message: str, status_code: int = 500):
+def send_error_response(handler, message: str, status_code: int = 500, headers: dict[str, str] | None = None):
     """Send error response"""
-    send_json_response(handler, {'error': message}, status_code)
\ No newline at end of file
+    send_json_response(handler, {'error': message}, status_code, headers)
+
+
+def send_method_not_allowed(handler, allowed: list[str]):
+    """Send a 405 listing the methods the path accepts"""
+    send_error_response(handler, 'Method Not Allowed', 405, {'Allow': ', '.join(allowed)})
@@ -0,0 +1,112 @@
+"""
+Long polling for clients that cannot use SSE or WebSockets.
+
+Wrapping an endpoint with `long_poll` keeps it a regular endpoint, but a
+request with `?since=<version>` waits until the data changes after that
+version (or `?timeout=` seconds pass) before the endpoint runs:
+
+    endpoints = {
+        '/api/driver': long_poll(cached_endpoint(handle_driver), fields=('driver',)),
+    }
+
+Change detection uses the snapshot fields the endpoint is built from (see
+`SnapshotHub.changed_version`); without fields any new snapshot counts.
+The response carries the version in `X-Data-Version`, which the client
+sends back as `since` on its next request.  Start with `since=0`.  When
+nothing changes before the timeout the response is an empty 204.
+
+Waiting requests are futures on an event loop, not threads: the asyncio
+server awaits them directly and the threaded server hands the connection to
+its stream loop, so a worker is only busy while the endpoint itself runs.
+"""
+
+import asyncio
+import functools
+
+from .context import ServerContext
+from .helpers import send_error_response
+from .recorder import ResponseRecorder
+from .router import get_query_param
+
+DEFAULT_TIMEOUT = 25.0
+MAX_TIMEOUT = 60.0
+
+VERSION_HEADER = 'X-Data-Version'
+
+
+class LongPollEndpoint:
+    """An endpoint that is served as a long poll when `since` is given"""
+
+    def __init__(self, endpoint, fields: tuple[str, ...] | None = None, timeout: float = DEFAULT_TIMEOUT):
+        functools.update_wrapper(self, endpoint)
+        self.endpoint = endpoint
+        self.fields = tuple(fields) if fields is not None else None
+        self.timeout = timeout
+
+    def __call__(self, handler, ctx: ServerContext):
+        self.endpoint(handler, ctx)
+
+    def coroutine_for(self, query: dict[str, list[str]]):
+        """Serve requests with `since` from an event loop"""
+        return self.wait if 'since' in query else None
+
+    async def wait(self, request, ctx: ServerContext) -> ResponseRecorder:
+        """
+        Wait for a change, then run the endpoint.
+
+        Returns:
+            The recorded response, for the server to write
+        """
+        recorder = ResponseRecorder(request.command, request.path, request.headers, request.body, request.client_address)
+        recorder.params = request.params
+        recorder.query = request.query
+
+        try:
+            since = int(get_query_param(request, 'since'))
+            timeout = float(get_query_param(request, 'timeout') or self.timeout)
+        except ValueError:
+            send_error_response(recorder, 'since and timeout must be numbers', 400)
+            return recorder
+
+        hub = ctx.snapshots
+        version = 0
+        if hub is not None:
+            # A version from before a restart can never be reached
+            if since > hub.version:
+                since = -1
+            version = await hub.wait_changed_async(self.fields, since, min(max(timeout, 0.0), MAX_TIMEOUT))
+
+            if version <= since:
+                recorder.send_response(204)
+                _send_version(recorder, version)
+                recorder.end_headers()
+                return recorder
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.endpoint, recorder, ctx)
+        _send_version(recorder, version)
+        return recorder
+
+
+def _send_version(recorder: ResponseRecorder, version: int):
+    recorder.send_header(VERSION_HEADER, version)
+    recorder.send_header('Access-Control-Expose-Headers', VERSION_HEADER)
+    if recorder.get_header('Access-Control-Allow-Origin') is None:
+        recorder.send_header('Access-Control-Allow-Origin', '*')
+
+
+def long_poll(endpoint, fields: tuple[str, ...] | None = None, timeout: float = DEFAULT_TIMEOUT) -> LongPollEndpoint:
+    """
+    Wrap an endpoint handler so `?since=` requests wait for the next change.
+
+    Args:
+        endpoint: Handler function taking (handler, ctx)
+        fields: Snapshot fields the endpoint's data comes from; None waits
+            for any new snapshot
+        timeout: Default seconds to wait (clients may pass `?timeout=`, up
+            to MAX_TIMEOUT)
+
+    Returns:
+        A handler with the same signature
+    """
+    return LongPollEndpoint(endpoint, fields, timeout)
@@ -0,0 +1,62 @@
+import json
+from .helpers import send_json_response, send_error_response
+from .context import ServerContext
+from profiling import PROFILER, DEFAULT_SECONDS, DEFAULT_SAMPLE_INTERVAL
+from datetime import datetime
+
+
+def handle_profile(handler, ctx: ServerContext):
+    """
+    Handle profiling endpoint.
+
+    GET returns timer statistics and the current session. POST accepts a
+    JSON body with any of:
+
+    - `timers`: true/false to switch the hot path timers on or off
+    - `reset`: true to clear the timer statistics
+    - `mode`: 'cprofile' or 'sample' to start a session, with `seconds`
+      and (for sampling) `interval_ms`
+    - `stop`: true to end the running session early
+    """
+    try:
+        ctx.logger.debug('Profile endpoint called')
+
+        if handler.command == 'POST':
+            content_length = int(handler.headers.get('Content-Length', 0))
+            try:
+                data = json.loads(handler.rfile.read(content_length).decode('utf-8')) if content_length else {}
+            except json.JSONDecodeError:
+                send_error_response(handler, 'Invalid JSON', 400)
+                return
+
+            if not isinstance(data, dict):
+                send_error_response(handler, 'Expected a JSON object', 400)
+                return
+
+            if 'timers' in data:
+                PROFILER.enable_timers(bool(data['timers']))
+                ctx.logger.info(f'Profiling timers {"enabled" if PROFILER.enabled else "disabled"}')
+
+            if data.get('reset'):
+                PROFILER.reset_timers()
+
+            if data.get('stop'):
+                PROFILER.stop()
+
+            if 'mode' in data:
+                try:
+                    seconds = float(data.get('seconds', DEFAULT_SECONDS))
+                    interval = float(data.get('interval_ms', DEFAULT_SAMPLE_INTERVAL * 1000)) / 1000
+                    PROFILER.start(data['mode'], seconds, interval)
+                except (TypeError, ValueError) as e:
+                    send_error_response(handler, str(e), 400)
+                    return
+                ctx.logger.info(f'Profiling session started: {data["mode"]} for {seconds}s')
+
+        response = PROFILER.status()
+        response['timestamp'] = datetime.now().isoformat()
+        send_json_response(handler, response)
+
+    except Exception as e:
+        ctx.logger.error(f'Error in profile endpoint: {e}')
+        send_error_response(handler, str(e))
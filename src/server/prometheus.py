@@ -0,0 +1,24 @@
+from .context import ServerContext
+from .helpers import send_error_response
+from metrics import REGISTRY
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def handle_metrics(handler, ctx: ServerContext):
+    """Handle metrics endpoint (Prometheus text exposition format)"""
+    try:
+        body = REGISTRY.render().encode('utf-8')
+
+        handler.send_response(200)
+        handler.send_header('Content-Type', CONTENT_TYPE)
+        handler.send_header('Content-Length', str(len(body)))
+        handler.send_header('Cache-Control', 'no-cache')
+        handler.send_header('Access-Control-Allow-Origin', '*')
+        handler.end_headers()
+        if handler.command != 'HEAD':
+            handler.wfile.write(body)
+
+    except Exception as e:
+        ctx.logger.error(f'Error in metrics endpoint: {e}')
+        send_error_response(handler, str(e))
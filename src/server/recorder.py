@@ -0,0 +1,93 @@
+"""
+Stand-in for `BaseHTTPRequestHandler` that records a handler's response.
+
+Endpoint handlers are written against the `http.server` handler interface
+(`send_response`, `send_header`, `end_headers`, `wfile`).  A ResponseRecorder
+provides the same interface but keeps the response in memory, so handlers can
+be reused by servers that do not own a `BaseHTTPRequestHandler`.
+"""
+
+import io
+import json
+from email.message import Message
+from http import HTTPStatus
+
+
+class ResponseRecorder:
+    """Records the status, headers and body written by an endpoint handler"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def __init__(
+        self,
+        command: str,
+        path: str,
+        headers: Message | None = None,
+        body: bytes = b'',
+        client_address=None
+    ):
+        self.command = command
+        self.path = path
+        self.headers = headers if headers is not None else Message()
+        self.client_address = client_address
+        self.request_version = 'HTTP/1.1'
+
+        self.rfile = io.BytesIO(body)
+        self.wfile = io.BytesIO()
+
+        self.status = 200
+        self.reason = 'OK'
+        self.response_headers: list[tuple[str, str]] = []
+        self.headers_ended = False
+
+    def send_response(self, code: int, message: str | None = None):
+        self.status = code
+        if message is None:
+            try:
+                message = HTTPStatus(code).phrase
+            except ValueError:
+                message = ''
+        self.reason = message
+
+    def send_header(self, keyword: str, value):
+        self.response_headers.append((keyword, str(value)))
+
+    def end_headers(self):
+        self.headers_ended = True
+
+    def send_error(self, code: int, message: str | None = None, explain: str | None = None):
+        body = json.dumps({'error': message or HTTPStatus(code).phrase}).encode()
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', len(body))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def get_header(self, keyword: str) -> str | None:
+        """Case-insensitive lookup of a recorded response header"""
+        keyword = keyword.lower()
+        for key, value in self.response_headers:
+            if key.lower() == keyword:
+                return value
+        return None
+
+    @property
+    def body(self) -> bytes:
+        return self.wfile.getvalue()
+
+    def to_bytes(self, keep_alive: bool = True, include_body: bool = True) -> bytes:
+        """Serialize the recorded response as an HTTP/1.1 message"""
+        body = self.body
+        lines = [f'HTTP/1.1 {self.status} {self.reason}']
+
+        for key, value in self.response_headers:
+            if key.lower() in ('content-length', 'connection'):
+                continue
+            lines.append(f'{key}: {value}')
+
+        if self.status not in (204, 304):
+            lines.append(f'Content-Length: {len(body)}')
+        lines.append('Connection: keep-alive' if keep_alive else 'Connection: close')
+
+        head = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+        return head + body if include_body else head
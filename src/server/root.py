@@ -11,10 +11,21 @@ def handle_root(handler, ctx: ServerContext):
         'endpoints': [
             '/ - HTML dashboard with live telemetry data',
             '/api - This endpoint (API information)',
+            '/api/dashboard - Data shown on the HTML dashboard (JSON)',
             '/api/driver - Get current driver data (JSON)',
             '/api/camera - Get current camera info with available camera groups and pit cams state (JSON)',
             '/api/camera/set - Set camera group by ID (POST with camera_group_id)',
             '/api/camera/toggle-pit-cams - Toggle automatic pit cameras on/off (POST)',
-            '/api/diagnostics - Server diagnostics and context validation (JSON)'
+            '/api/standings - Get current standings from live timing (JSON)',
+            '/api/car/{idx} - Get driver and live timing data for one car by CarIdx (JSON)',
+            '/api/setup - Current car setup and the fields each setup update changed (?measured=false&from=0&to=2)',
+            '/api/telemetry - Downsampled history of telemetry variables as columns (?vars=Speed,RPM&from=&to=|last=30&points=2000&method=minmax|lttb&unit=time|frame&stats=true)',
+            '/api/telemetry/{var} - Get the current value of a raw telemetry variable (JSON)',
+            '?since=<version> - Long-poll driver, camera, standings, car and dashboard until the data changes (X-Data-Version header)',
+            '/api/diagnostics - Server diagnostics and context validation (JSON)',
+            '/api/metrics - Loop stage, request, camera switch and queue metrics (Prometheus text format)',
+            '/api/profile - Hot path timers and cProfile/sampling sessions (GET status, POST {"timers": true} or {"mode": "sample", "seconds": 30})',
+            '/api/stream - Server-Sent Events stream of telemetry snapshots (?fields=driver,camera&rate=10&mode=delta|frames)',
+            '/api/batch - Several resources from the same tick in one response (?resources=driver,camera,standings or POST {"resources": [...]})'
         ]
     })
\ No newline at end of file
@@ -0,0 +1,219 @@
+"""
+Request router for the API servers.
+
+Routes are registered in the same endpoint dictionary `main.py` passes to
+the servers.  A key is a path, optionally prefixed by HTTP methods, and may
+contain `{name}` or `{name:int}` parameters:
+
+    endpoints = {
+        '/api/driver': handle_driver,                   # any method
+        'POST /api/camera/set': handle_set_camera,      # POST only
+        'GET /api/car/{idx:int}': handle_car,
+        'GET /api/telemetry/{var}': handle_telemetry_var,
+    }
+
+All patterns are compiled once when the router is built.  Static paths are a
+dictionary lookup; parameterized routes are indexed by their first path
+segment so only a handful of precompiled regexes are tried per request.
+
+A matched request gets `handler.params` (path parameters, converted) and
+`handler.query` (`parse_qs` of the query string) set before the endpoint is
+called, so endpoints never parse the URL themselves.
+"""
+
+import inspect
+import re
+from urllib.parse import parse_qs, urlsplit
+
+ANY_METHOD = '*'
+
+_PARAM = re.compile(r'\{([A-Za-z_][A-Za-z0-9_]*)(?::(int|float|str|path))?\}')
+
+_CONVERTERS = {
+    'str': (r'[^/]+', str),
+    'int': (r'-?\d+', int),
+    'float': (r'-?\d+(?:\.\d+)?', float),
+    'path': (r'.+', str),
+}
+
+
+class Route:
+    """A compiled route pattern and its handlers by method"""
+
+    def __init__(self, pattern: str):
+        self.pattern = pattern
+        self.handlers: dict[str, object] = {}
+        self.converters: dict[str, type] = {}
+
+        regex = []
+        position = 0
+        for match in _PARAM.finditer(pattern):
+            regex.append(re.escape(pattern[position:match.start()]))
+            name, kind = match.group(1), match.group(2) or 'str'
+            expression, converter = _CONVERTERS[kind]
+            regex.append(f'(?P<{name}>{expression})')
+            self.converters[name] = converter
+            position = match.end()
+        regex.append(re.escape(pattern[position:]))
+
+        self.regex = re.compile(''.join(regex) + r'\Z')
+
+    @property
+    def is_static(self) -> bool:
+        return not self.converters
+
+    @property
+    def prefix(self) -> str:
+        """First path segment, used to index parameterized routes"""
+        return _first_segment(self.pattern)
+
+    def handler_for(self, method: str):
+        return self.handlers.get(method) or self.handlers.get(ANY_METHOD)
+
+    @property
+    def allowed_methods(self) -> list[str]:
+        return sorted(method for method in self.handlers if method != ANY_METHOD)
+
+    def convert(self, match: re.Match) -> dict:
+        return {name: self.converters[name](value) for name, value in match.groupdict().items()}
+
+
+class RouteMatch:
+    """Result of routing a request"""
+
+    __slots__ = ('handler', 'params', 'query', 'path', 'allowed', 'route')
+
+    def __init__(
+        self,
+        handler,
+        params: dict,
+        query: dict[str, list[str]],
+        path: str,
+        allowed: list[str] | None = None,
+        route: str | None = None
+    ):
+        self.handler = handler
+        self.params = params
+        self.query = query
+        self.path = path
+        # Methods the path accepts, set when it matched but the method did not
+        self.allowed = allowed
+        # Pattern of the matched route, e.g. '/api/car/{idx:int}'
+        self.route = route if route is not None else path
+
+    def bind(self, target):
+        """Attach the parsed params and query to a request handler object"""
+        target.params = self.params
+        target.query = self.query
+        return target
+
+
+class Router:
+    """Precompiled route table"""
+
+    def __init__(self, endpoints: dict | None = None):
+        self._static: dict[str, Route] = {}
+        self._dynamic: dict[str, list[Route]] = {}
+        self._routes: dict[str, Route] = {}
+
+        for key, handler in (endpoints or {}).items():
+            self.add(key, handler)
+
+    def add(self, key: str, handler):
+        """
+        Register a handler.
+
+        Args:
+            key: Path pattern, optionally prefixed by comma separated
+                methods (e.g. 'GET /api/car/{idx:int}')
+            handler: Endpoint handler function
+        """
+        methods, _, pattern = key.strip().rpartition(' ')
+        methods = [method.strip().upper() for method in methods.split(',') if method.strip()] or [ANY_METHOD]
+
+        route = self._routes.get(pattern)
+        if route is None:
+            route = self._routes[pattern] = Route(pattern)
+            if route.is_static:
+                self._static[pattern] = route
+            else:
+                self._dynamic.setdefault(route.prefix, []).append(route)
+
+        for method in methods:
+            route.handlers[method] = handler
+
+    def match(self, method: str, target: str) -> RouteMatch | None:
+        """
+        Route a request.
+
+        Args:
+            method: HTTP method
+            target: Request target (path with optional query string)
+
+        Returns:
+            A RouteMatch (with `handler` None and `allowed` set when only the
+            method did not match), or None if no route matches the path
+        """
+        parts = urlsplit(target)
+        path = parts.path
+        query = parse_qs(parts.query, keep_blank_values=True) if parts.query else {}
+
+        route = self._static.get(path)
+        params = {}
+
+        if route is None:
+            route, params = self._match_dynamic(path)
+            if route is None:
+                return None
+
+        handler = route.handler_for(method)
+        if handler is None:
+            return RouteMatch(None, params, query, path, route.allowed_methods, route.pattern)
+
+        return RouteMatch(handler, params, query, path, route=route.pattern)
+
+    def _match_dynamic(self, path: str):
+        for candidates in (self._dynamic.get(_first_segment(path)), self._dynamic.get('')):
+            for route in candidates or ():
+                match = route.regex.match(path)
+                if match:
+                    try:
+                        return route, route.convert(match)
+                    except ValueError:
+                        continue
+        return None, {}
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._routes
+
+    def __iter__(self):
+        return iter(self._routes)
+
+
+def _first_segment(path: str) -> str:
+    """'/api/car/{idx}' -> 'api'; a parameter in the first segment -> ''"""
+    segment = path.lstrip('/').split('/', 1)[0]
+    return '' if '{' in segment else segment
+
+
+def get_query_param(handler, name: str, default: str | None = None) -> str | None:
+    """First value of a query parameter parsed by the router"""
+    values = getattr(handler, 'query', None) or {}
+    return values.get(name, [default])[0]
+
+
+def coroutine_handler(match: RouteMatch):
+    """
+    Coroutine to serve a matched request with, or None for a regular handler.
+
+    A handler is served from an event loop when it is a coroutine function,
+    or when it has a `coroutine_for(query)` method returning one for this
+    request (see `server.longpoll`).  A coroutine that returns a
+    ResponseRecorder leaves the server to write the response; one that
+    returns None has written to the connection itself.
+    """
+    handler = match.handler
+    if inspect.iscoroutinefunction(handler):
+        return handler
+    coroutine_for = getattr(handler, 'coroutine_for', None)
+    return coroutine_for(match.query) if coroutine_for else None
@@ -1,24 +1,348 @@
 from http import server
+import selectors
+import socket
 import socketserver
 import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from server.context import ServerContext
+from server.async_server import AsyncRequest, EventLoopThread
+from server.helpers import send_method_not_allowed
+from server.router import Router, coroutine_handler
+from metrics import observe_request
+from profiling import PROFILER
 
 
+class _DiscardWriter:
+    """Stands in for `wfile` once a HEAD response's headers are written"""
 
+    def write(self, data) -> int:
+        return len(data)
 
-def start_server(endpoints, context: ServerContext, port=8000):
+    def flush(self):
+        pass
+
+
+class KeepAliveHandlerMixin:
+    """
+    Request handler mixin that serves one request per worker turn.
+
+    Instead of blocking a worker thread while a keep-alive connection sits
+    idle between requests, the connection is handed back to the server which
+    parks it until the client sends its next request.
+    """
+
+    # Set when the connection is handed to the stream loop
+    detached = False
+    # (request, endpoint, context, keep_alive) for the stream loop
+    adoption = None
+
+    def handle(self):
+        self.close_connection = True
+        self.handle_one_request()
+
+    def keep_alive(self) -> bool:
+        return not self.close_connection and not self.detached and not self.server.closing
+
+    def detach(self, endpoint, context: ServerContext):
+        """
+        Hand the connection to the server's event loop to serve a coroutine
+        (push stream, long poll) endpoint, freeing this worker thread.  The
+        server adopts it once this request's turn is over.
+        """
+        self.wfile.flush()
+        keep_alive = not self.close_connection
+        self.detached = True
+        self.close_connection = True
+
+        request = AsyncRequest(self.command, self.path, self.headers, b'', None, None)
+        request.params = getattr(self, 'params', {})
+        request.query = getattr(self, 'query', {})
+        self.adoption = (request, endpoint, context, keep_alive)
+
+    def finish(self):
+        # Keep the socket files open while the connection is parked or
+        # served by the stream loop
+        if not self.keep_alive() and not self.detached:
+            super().finish()
+
+    def close(self):
+        """Close a parked connection's socket files"""
+        try:
+            super().finish()
+        except OSError:
+            pass
+
+
+class PooledHTTPServer(socketserver.TCPServer):
+    """
+    TCP server that serves requests on a bounded pool of worker threads.
+
+    A slow client only ties up one worker instead of the whole server, and
+    idle keep-alive connections are parked on a selector rather than holding
+    a worker.  When every worker is busy and `max_pending` new connections
+    are already waiting, further connections are answered with a 503 instead
+    of growing the queue without bound.
+    """
+
+    allow_reuse_address = True
+
+    def __init__(
+        self,
+        server_address,
+        RequestHandlerClass,
+        max_workers: int = 16,
+        backlog: int = 64,
+        max_pending: int | None = None,
+        keep_alive_timeout: float = 5.0
+    ):
+        # Listen backlog for connections the kernel queues before accept()
+        self.request_queue_size = backlog
+        self.max_workers = max_workers
+        self.max_pending = max_pending if max_pending is not None else max_workers * 4
+        self.keep_alive_timeout = keep_alive_timeout
+
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='http-worker')
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_pending)
+
+        self._pending_lock = threading.Lock()
+        self.pending_requests = 0
+
+        # Idle keep-alive connections: registered from worker threads and
+        # watched by a single parking thread
+        self._parked_lock = threading.Lock()
+        self._to_park: list = []
+        self._parked: dict = {}
+        self._selector = selectors.DefaultSelector()
+        self._wakeup_recv, self._wakeup_send = socket.socketpair()
+        self._wakeup_recv.setblocking(False)
+        self._selector.register(self._wakeup_recv, selectors.EVENT_READ)
+        self.closing = False
+        self._stream_loop: EventLoopThread | None = None
+        self._stream_loop_lock = threading.Lock()
+
+        super().__init__(server_address, RequestHandlerClass)
+
+        self._parking_thread = threading.Thread(target=self._watch_parked, name='http-keepalive', daemon=True)
+        self._parking_thread.start()
+
+    # -- New connections -----------------------------------------------------
+
+    def process_request(self, request, client_address):
+        if not self._slots.acquire(blocking=False):
+            self.reject_request(request)
+            return
+
+        self._submit(self.process_request_thread, request, client_address)
+
+    def process_request_thread(self, request, client_address):
+        try:
+            handler = self.RequestHandlerClass(request, client_address, self)
+            if handler.detached:
+                self.adopt(handler)
+                return
+            if handler.keep_alive():
+                self.park(handler)
+            else:
+                self.shutdown_request(request)
+        except Exception:
+            self.handle_error(request, client_address)
+            self.shutdown_request(request)
+        finally:
+            self._slots.release()
+
+    def reject_request(self, request):
+        """Answer a connection we have no capacity for and close it"""
+        try:
+            request.sendall(
+                b'HTTP/1.1 503 Service Unavailable\r\n'
+                b'Content-Type: application/json\r\n'
+                b'Content-Length: 26\r\n'
+                b'Retry-After: 1\r\n'
+                b'Connection: close\r\n\r\n'
+                b'{"error": "Server busy"}\r\n'
+            )
+        except OSError:
+            pass
+        finally:
+            self.shutdown_request(request)
+
+    # -- Keep-alive connections ----------------------------------------------
+
+    def park(self, handler):
+        """Park an idle keep-alive connection until its next request arrives"""
+        with self._parked_lock:
+            self._to_park.append(handler)
+
+        self._wakeup()
+
+    def resume_request(self, handler):
+        try:
+            handler.handle()
+            handler.finish()
+            if handler.detached:
+                self.adopt(handler)
+                return
+            if handler.keep_alive():
+                self.park(handler)
+                return
+        except Exception:
+            self.handle_error(handler.request, handler.client_address)
+
+        self.close_parked(handler)
+
+    def adopt(self, handler):
+        """
+        Serve a detached request on the stream loop.  A coroutine that
+        answers with a response (long polls) on a keep-alive connection hands
+        it back to be parked for the next request.
+        """
+        request, endpoint, context, keep_alive = handler.adoption
+        handler.adoption = None
+
+        def done(reuse: bool):
+            if reuse and not self.closing:
+                handler.detached = False
+                handler.request.settimeout(handler.timeout)
+                self.park(handler)
+            else:
+                self.close_parked(handler)
+
+        self.stream_loop.adopt(handler.request, request, endpoint, context, keep_alive=keep_alive, done=done)
+
+    def close_parked(self, handler):
+        handler.close()
+        self.shutdown_request(handler.request)
+
+    def _watch_parked(self):
+        while not self.closing:
+            with self._parked_lock:
+                to_park, self._to_park = self._to_park, []
+
+            deadline = time.monotonic() + self.keep_alive_timeout
+            for handler in to_park:
+                try:
+                    self._selector.register(handler.request, selectors.EVENT_READ, handler)
+                    self._parked[handler.request] = (handler, deadline)
+                except (ValueError, OSError):
+                    self.close_parked(handler)
+
+            for key, _ in self._selector.select(timeout=0.5):
+                if key.fileobj is self._wakeup_recv:
+                    try:
+                        self._wakeup_recv.recv(4096)
+                    except BlockingIOError:
+                        pass
+                    continue
+
+                self._selector.unregister(key.fileobj)
+                self._parked.pop(key.fileobj, None)
+                self._submit(self.resume_request, key.data)
+
+            # Close connections that stayed idle past the keep-alive timeout
+            now = time.monotonic()
+            for sock, (handler, expires) in list(self._parked.items()):
+                if expires <= now:
+                    self._selector.unregister(sock)
+                    del self._parked[sock]
+                    self.close_parked(handler)
+
+    def _wakeup(self):
+        try:
+            self._wakeup_send.send(b'\0')
+        except OSError:
+            pass
+
+    @property
+    def stream_loop(self) -> EventLoopThread:
+        """Event loop serving detached push stream connections (started lazily)"""
+        with self._stream_loop_lock:
+            if self._stream_loop is None:
+                self._stream_loop = EventLoopThread()
+            return self._stream_loop
+
+    # -- Worker pool -----------------------------------------------------------
+
+    def _submit(self, fn, *args):
+        with self._pending_lock:
+            self.pending_requests += 1
+
+        def run():
+            with self._pending_lock:
+                self.pending_requests -= 1
+            fn(*args)
+
+        self.executor.submit(run)
+
+    def queue_depth(self) -> int:
+        """Number of requests waiting for a free worker"""
+        return self.pending_requests
+
+    def parked_connections(self) -> int:
+        """Number of idle keep-alive connections"""
+        return len(self._parked)
+
+    def server_close(self):
+        self.closing = True
+        self._wakeup()
+        super().server_close()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+        if self._stream_loop is not None:
+            self._stream_loop.stop()
+
+        self._parking_thread.join(timeout=1)
+        for handler, _ in list(self._parked.values()):
+            self.close_parked(handler)
+        self._parked.clear()
+        self._selector.close()
+        self._wakeup_recv.close()
+        self._wakeup_send.close()
+
+
+def start_server(
+    endpoints,
+    context: ServerContext,
+    port=8000,
+    max_workers: int = 16,
+    backlog: int = 64,
+    keep_alive_timeout: float = 5.0,
+    max_pending: int | None = None
+):
     """
     Start an HTTP server with custom endpoint handlers.
 
     Args:
-        endpoints: Dictionary mapping paths to handler functions
+        endpoints: Dictionary mapping route patterns to handler functions,
+            or a prebuilt Router (see `server.router`)
         context: ServerContext with dependencies (ir, state, logger)
         port: Port number to listen on (default: 8000)
+        max_workers: Number of worker threads serving requests (default: 16)
+        backlog: Listen backlog for pending TCP connections (default: 64)
+        keep_alive_timeout: Seconds an idle keep-alive connection is held
+            open before it is closed (default: 5.0)
+        max_pending: Connections allowed to wait for a busy pool before new
+            ones get a 503 (default: 4 per worker)
 
     Returns:
         The HTTP server instance
     """
-    class DynamicHandler(server.SimpleHTTPRequestHandler):
+    router = endpoints if isinstance(endpoints, Router) else Router(endpoints)
+
+    class DynamicHandler(KeepAliveHandlerMixin, server.SimpleHTTPRequestHandler):
+        # HTTP/1.1 keeps connections open between requests so overlays that
+        # poll do not pay for a new TCP handshake every time.  Every response
+        # must therefore carry a Content-Length.
+        protocol_version = 'HTTP/1.1'
+
+        # Guards against clients that stall in the middle of a request
+        timeout = keep_alive_timeout
+
+        # Buffer the response so headers and body go out in one write
+        # (flushed by handle_one_request), and skip Nagle's delay
+        wbufsize = -1
+        disable_nagle_algorithm = True
+
         def __init__(self, *args, **kwargs):
             super().__init__(*args, directory="static", **kwargs)
 
@@ -26,30 +350,94 @@ def start_server(endpoints, context: ServerContext, port=8000):
             """Override to suppress default logging"""
             pass
 
+        def handle_one_request(self):
+            self.route = None
+            self.response_status = 0
+            self.response_length = 0
+            start = time.perf_counter()
+
+            super().handle_one_request()
+
+            # Detached (streamed) requests are not timed
+            if self.response_status and not self.detached:
+                observe_request(
+                    self.route or ('static' if self.command in ('GET', 'HEAD') else 'unmatched'),
+                    self.command,
+                    self.response_status,
+                    time.perf_counter() - start,
+                    self.response_length
+                )
+
+        def send_response(self, code, message=None):
+            self.response_status = code
+            super().send_response(code, message)
+
+        def send_header(self, keyword, value):
+            if keyword.lower() == 'content-length':
+                self.response_length = int(value)
+            super().send_header(keyword, value)
+
+        def dispatch(self) -> bool:
+            """
+            Route the request to an endpoint.
+
+            Returns:
+                False if no route matches the path
+            """
+            match = router.match(self.command, self.path)
+            if match is None:
+                return False
+
+            self.route = match.route
+            if match.handler is None:
+                send_method_not_allowed(self, match.allowed)
+                return True
+
+            match.bind(self)
+            coroutine = coroutine_handler(match)
+            if coroutine is not None:
+                self.detach(coroutine, context)
+            else:
+                with PROFILER.timer(f'http {match.route}'):
+                    match.handler(self, context)
+            return True
+
         def do_GET(self):
-            path = self.path
-            handler = endpoints.get(path)
-            if handler:
-                handler(self, context)
-                return
-            
-            super().do_GET()
+            if not self.dispatch():
+                super().do_GET()
+
+        def do_HEAD(self):
+            # Endpoints write the same response as for GET; everything after
+            # the headers is dropped (see end_headers)
+            wfile = self.wfile
+            try:
+                if not self.dispatch():
+                    super().do_HEAD()
+            finally:
+                self.wfile = wfile
+
+        def end_headers(self):
+            super().end_headers()
+            if self.command == 'HEAD':
+                self.wfile = _DiscardWriter()
 
         def do_POST(self):
-            path = self.path
-            handler = endpoints.get(path)
-            if handler:
-                handler(self, context)
-            else:
+            if not self.dispatch():
                 self.send_error(404, "Not Found")
 
-    httpd = socketserver.TCPServer(("", port), DynamicHandler)
+    httpd = PooledHTTPServer(
+        ("", port),
+        DynamicHandler,
+        max_workers=max_workers,
+        backlog=backlog,
+        keep_alive_timeout=keep_alive_timeout,
+        max_pending=max_pending
+    )
 
     # Start server in a background thread
     thread = threading.Thread(target=httpd.serve_forever, daemon=True)
     thread.start()
 
     print(f"HTTP server started on http://0.0.0.0:{port}")
-    context.logger.info(f"HTTP server started on port {port}")
+    context.logger.info(f"HTTP server started on port {port} ({max_workers} workers, backlog {backlog})")
     return httpd
-
@@ -4,6 +4,21 @@ from .context import ServerContext
 from datetime import datetime
 
 
+def set_player_camera(ir, state, camera_group_id: int) -> bool | None:
+    """
+    Switch the camera group while keeping the camera on the player car.
+
+    Returns:
+        The result of the camera switch, or None if the player car is unknown
+    """
+    driver = state.drivers.get_driver(ir['PlayerCarIdx'])
+
+    if driver is None:
+        return None
+
+    return state.set_camera(driver.car_number_int(), camera_group_id, ir)
+
+
 def handle_set_camera(handler, ctx: ServerContext):
     """Handle set camera endpoint - accepts POST with camera group ID"""
     try:
@@ -45,16 +60,13 @@ def handle_set_camera(handler, ctx: ServerContext):
             send_error_response(handler, 'camera_group_id must be an integer', 400)
             return
 
-        # Get the driver car number
-        driver = state.drivers.get_driver(ir['PlayerCarIdx'])
+        # Switch the camera on the player car
+        result = set_player_camera(ir, state, camera_group_id)
 
-        if driver is None:
+        if result is None:
             send_error_response(handler, 'Driver not found', 404)
             return
 
-        # Call set_camera method
-        result = state.set_camera(driver.car_number_int(), camera_group_id, ir)
-
         response = {
             'success': result,
             'camera_group_id': camera_group_id,
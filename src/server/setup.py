@@ -0,0 +1,53 @@
+from .helpers import send_json_response, send_error_response
+from .context import ServerContext
+from .router import get_query_param
+from datetime import datetime
+
+
+def handle_setup(handler, ctx: ServerContext):
+    """
+    Handle car setup endpoint.
+
+    Returns the current setup and every revision since the app started,
+    each with the fields it changed.  Query parameters:
+
+    - `measured=false`: leave out tire readings (hot pressures, temps, tread)
+    - `from=<revision>&to=<revision>`: only the changes between two
+      revisions (0 is the first setup seen), e.g. between two stints
+    """
+    try:
+        ctx.logger.debug('Setup endpoint called')
+
+        tracker = ctx.state.setup_tracker
+        include_measured = get_query_param(handler, 'measured', 'true').lower() != 'false'
+
+        start = get_query_param(handler, 'from')
+        end = get_query_param(handler, 'to')
+        if start is not None or end is not None:
+            last = len(tracker.history) - 1
+            try:
+                start = int(start) if start is not None else 0
+                end = int(end) if end is not None else last
+            except ValueError:
+                send_error_response(handler, 'from and to must be revision numbers', 400)
+                return
+            if not 0 <= start <= last or not 0 <= end <= last:
+                send_error_response(handler, f'Revisions range from 0 to {last}', 400)
+                return
+
+            changes = tracker.history.diff(start, end)
+            send_json_response(handler, {
+                'from': start,
+                'to': end,
+                'changes': [change.to_dict() for change in changes if include_measured or not change.measured],
+                'timestamp': datetime.now().isoformat()
+            })
+            return
+
+        response = tracker.to_dict(include_measured)
+        response['timestamp'] = datetime.now().isoformat()
+        send_json_response(handler, response)
+
+    except Exception as e:
+        ctx.logger.error(f'Error in setup endpoint: {e}')
+        send_error_response(handler, str(e))
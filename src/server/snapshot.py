@@ -0,0 +1,311 @@
+"""
+Thread-safe handoff of telemetry snapshots to the HTTP layer.
+
+The telemetry loop builds one snapshot per tick and publishes it to a
+SnapshotHub.  Server threads and asyncio tasks read the latest snapshot or
+wait for the next one without touching the telemetry source themselves.
+"""
+
+import asyncio
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable
+
+from .driver import build_driver_payload
+from .camera import build_camera_payload
+from .standings import build_standings_payload
+from .dashboard import build_dashboard_payload
+from .diagnostics import build_diagnostics_payload
+
+# Snapshot fields that are only built while a reader asks for them, by name:
+# builder taking (ir, state)
+ON_DEMAND_SECTIONS: dict[str, Callable] = {
+    'dashboard': build_dashboard_payload,
+    'diagnostics': build_diagnostics_payload,
+}
+
+logger = logging.getLogger('iracing.snapshot')
+
+# A raw telemetry variable name readers may watch
+VAR_NAME = re.compile(r'^[A-Za-z][A-Za-z0-9_]*$')
+
+# Seconds an on-demand section keeps being built after it was last requested
+SECTION_TTL = 10.0
+
+# Seconds a reader waits for the loop to build on-demand sections it requested
+SECTION_WAIT = 1.0
+
+
+class Snapshot:
+    """The telemetry data published for one tick"""
+
+    __slots__ = ('version', 'data', 'published_at', 'encoded')
+
+    def __init__(self, version: int, data: dict[str, Any] | None = None, published_at: float = 0.0):
+        self.version = version
+        self.data = data if data is not None else {}
+        self.published_at = published_at
+        # Serialized forms of this snapshot, shared by every reader
+        self.encoded: dict = {}
+
+    def cached(self, key, build: Callable[[], Any]):
+        """
+        Return `build()` memoized on this snapshot under `key`, so each
+        distinct encoding is produced once per tick no matter how many
+        clients receive it.
+        """
+        try:
+            return self.encoded[key]
+        except KeyError:
+            value = self.encoded[key] = build()
+            return value
+
+
+class SnapshotHub:
+    """
+    Publishes snapshots from the telemetry loop to any number of readers.
+
+    Publishing is a version bump plus a notification: blocking readers wait
+    on a condition variable and asyncio readers wait on futures that are
+    resolved on their own event loop, so no reader ever polls.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._latest = Snapshot(version=0)
+        self._async_waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self._watched_vars: Counter = Counter()
+        # On-demand section name -> time.monotonic() it was last requested
+        self._requested_sections: dict[str, float] = {}
+        # Version in which each top-level snapshot field last changed
+        self._changed: dict[str, int] = {}
+
+    @property
+    def latest(self) -> Snapshot:
+        return self._latest
+
+    @property
+    def version(self) -> int:
+        return self._latest.version
+
+    def watch_vars(self, names):
+        """Ask the telemetry loop to include raw variables in each snapshot"""
+        with self._condition:
+            self._watched_vars.update(names)
+
+    def unwatch_vars(self, names):
+        """Release variables requested with `watch_vars`"""
+        with self._condition:
+            self._watched_vars.subtract(names)
+            self._watched_vars = +self._watched_vars
+
+    def watched_vars(self) -> tuple[str, ...]:
+        """Raw variables at least one reader is watching"""
+        with self._condition:
+            return tuple(sorted(self._watched_vars))
+
+    def request_sections(self, names):
+        """
+        Ask the telemetry loop to build on-demand sections (see
+        ON_DEMAND_SECTIONS) for the next `SECTION_TTL` seconds
+        """
+        now = time.monotonic()
+        with self._condition:
+            for name in names:
+                if name in ON_DEMAND_SECTIONS:
+                    self._requested_sections[name] = now
+
+    def wait_for_sections(self, names, timeout: float = SECTION_WAIT) -> Snapshot:
+        """
+        Request on-demand sections and block until the latest snapshot has
+        all of them.  Only the first request after they went unused waits,
+        for at most a tick.
+
+        Returns:
+            The newest snapshot, which may lack sections if the timeout expired
+        """
+        self.request_sections(names)
+        with self._condition:
+            self._condition.wait_for(lambda: all(name in self._latest.data for name in names), timeout)
+            return self._latest
+
+    def requested_sections(self) -> tuple[str, ...]:
+        """On-demand sections requested within the last `SECTION_TTL` seconds"""
+        cutoff = time.monotonic() - SECTION_TTL
+        with self._condition:
+            return tuple(sorted(name for name, at in self._requested_sections.items() if at >= cutoff))
+
+    def waiter_count(self) -> int:
+        """Number of asyncio readers waiting for the next snapshot"""
+        return len(self._async_waiters)
+
+    def changed_version(self, fields: tuple[str, ...] | None = None) -> int:
+        """
+        Version in which any of `fields` last changed.
+
+        Fields are compared ignoring their `timestamp`, so a payload that is
+        rebuilt every tick only counts as changed when its data does.  With
+        no fields this is simply the latest version.
+        """
+        if fields is None:
+            return self._latest.version
+        with self._condition:
+            return max((self._changed.get(field, 0) for field in fields), default=0)
+
+    def publish(self, data: dict[str, Any]) -> Snapshot:
+        """
+        Publish a new snapshot.  Safe to call from any thread.
+
+        Args:
+            data: Snapshot payload, which must not be mutated afterwards
+
+        Returns:
+            The published snapshot
+        """
+        with self._condition:
+            snapshot = Snapshot(self._latest.version + 1, data, time.time())
+            previous = self._latest.data
+            for field, value in data.items():
+                if field not in self._changed or not _same(previous.get(field), value):
+                    self._changed[field] = snapshot.version
+            self._latest = snapshot
+            waiters, self._async_waiters = self._async_waiters, []
+            self._condition.notify_all()
+
+        for loop, future in waiters:
+            try:
+                loop.call_soon_threadsafe(_resolve, future, snapshot)
+            except RuntimeError:
+                # Event loop already closed
+                pass
+
+        return snapshot
+
+    def wait_for(self, since: int, timeout: float | None = None) -> Snapshot:
+        """
+        Block until a snapshot newer than `since` is published.
+
+        Returns:
+            The newest snapshot, which is unchanged if the timeout expired
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._latest.version > since, timeout)
+            return self._latest
+
+    async def wait_async(self, since: int, timeout: float | None = None) -> Snapshot:
+        """
+        Wait on the running event loop until a snapshot newer than `since`
+        is published.
+
+        Returns:
+            The newest snapshot, which is unchanged if the timeout expired
+        """
+        loop = asyncio.get_running_loop()
+
+        with self._condition:
+            if self._latest.version > since:
+                return self._latest
+
+            future = loop.create_future()
+            waiter = (loop, future)
+            self._async_waiters.append(waiter)
+
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return self._latest
+        finally:
+            # Timed out or cancelled: without a publish (e.g. while
+            # disconnected) nothing else would ever drop the entry
+            if not future.done() or future.cancelled():
+                with self._condition:
+                    try:
+                        self._async_waiters.remove(waiter)
+                    except ValueError:
+                        pass
+
+    async def wait_changed_async(self, fields: tuple[str, ...] | None, since: int, timeout: float) -> int:
+        """
+        Wait on the running event loop until one of `fields` changes after
+        version `since` (see `changed_version`).
+
+        Returns:
+            The change version, which is not above `since` if the timeout
+            expired first
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+
+        while True:
+            version = self.version
+            changed = self.changed_version(fields)
+            remaining = deadline - loop.time()
+            if changed > since or remaining <= 0:
+                return changed
+            await self.wait_async(version, remaining)
+
+
+_MISSING = object()
+
+
+def _same(old, new) -> bool:
+    """Compare two snapshot fields, ignoring when payloads were built"""
+    if isinstance(old, dict) and isinstance(new, dict):
+        return len(old) == len(new) and all(
+            key == 'timestamp' or old.get(key, _MISSING) == value for key, value in new.items()
+        )
+    return old == new
+
+
+def _resolve(future: asyncio.Future, snapshot: Snapshot):
+    if not future.done():
+        future.set_result(snapshot)
+
+
+def build_snapshot(ir, state, var_names: tuple[str, ...] = (), sections: tuple[str, ...] = ()) -> dict[str, Any]:
+    """
+    Build the snapshot payload for the current tick.
+
+    Called from the telemetry loop after the variable buffer is frozen.  A
+    section whose builder raises is logged and published as None, the same
+    as data that is not available, so one bad value can't stop the loop.
+
+    Args:
+        ir: TelemetryHandler with a frozen variable buffer
+        state: Current State instance
+        var_names: Raw telemetry variables to include under `vars`
+            (usually `SnapshotHub.watched_vars()`)
+        sections: On-demand sections to include (usually
+            `SnapshotHub.requested_sections()`)
+    """
+    data: dict[str, Any] = {
+        'session_time': ir['SessionTime'],
+        'driver': None,
+        'camera': None,
+        'standings': None,
+        'vars': {name: ir[name] for name in var_names},
+    }
+
+    driver = getattr(state, 'drivers', None)
+    if driver is not None and driver.UserName != 'Unknown':
+        data['driver'] = _build_section('driver', build_driver_payload, ir, driver)
+        data['standings'] = _build_section('standings', build_standings_payload, ir, state)
+
+    data['camera'] = _build_section('camera', build_camera_payload, ir, state)
+
+    for name in sections:
+        data[name] = _build_section(name, ON_DEMAND_SECTIONS[name], ir, state)
+
+    return data
+
+
+def _build_section(name: str, build: Callable, *args):
+    try:
+        return build(*args)
+    except Exception as e:
+        # Repeats every tick until the data changes; the log handlers collapse them
+        logger.error(f'Snapshot section {name} failed: {e}', extra={'section': name})
+        return None
@@ -0,0 +1,79 @@
+from .helpers import send_json_response, send_error_response
+from .context import ServerContext
+from datetime import datetime
+
+
+def car_value(values, idx: int, default=None):
+    """Read one car's value from a CarIdx telemetry array"""
+    if values is None or idx >= len(values):
+        return default
+    return values[idx]
+
+
+def build_standings_payload(ir, state) -> dict:
+    """
+    Build the standings payload from the CarIdx telemetry arrays.
+
+    Cars with an official position are ordered by it; before positions are
+    assigned (practice, race start) cars are ordered by distance covered.
+    """
+    positions = ir['CarIdxPosition']
+    class_positions = ir['CarIdxClassPosition']
+    laps = ir['CarIdxLapCompleted']
+    lap_pct = ir['CarIdxLapDistPct']
+    last_times = ir['CarIdxLastLapTime']
+    on_pit_road = ir['CarIdxOnPitRoad']
+
+    cars = []
+    for driver in state.drivers.Drivers:
+        idx = driver.CarIdx
+        if idx < 0 or driver.CarIsPaceCar or driver.IsSpectator:
+            continue
+
+        lap = car_value(laps, idx, -1)
+        pct = car_value(lap_pct, idx, -1.0)
+
+        cars.append({
+            'car_idx': idx,
+            'position': car_value(positions, idx, 0),
+            'class_position': car_value(class_positions, idx, 0),
+            'driver_name': driver.UserName,
+            'car_number': driver.CarNumber,
+            'car_class': driver.CarClassShortName,
+            'laps_completed': lap,
+            'lap_dist_pct': pct,
+            'last_lap_time': car_value(last_times, idx, -1.0),
+            'on_pit_road': bool(car_value(on_pit_road, idx, False)),
+            'distance': (lap or 0) + max(pct or 0.0, 0.0)
+        })
+
+    # Official positions first, the rest by distance covered
+    cars.sort(key=lambda car: (car['position'] <= 0, car['position'], -car['distance']))
+
+    for car in cars:
+        del car['distance']
+
+    return {
+        'standings': cars,
+        'timestamp': datetime.now().isoformat()
+    }
+
+
+def handle_standings(handler, ctx: ServerContext):
+    """Handle standings endpoint"""
+    try:
+        ir = ctx.ir
+        state = ctx.state
+
+        ctx.logger.debug('Standings endpoint called')
+
+        if not state.ir_connected:
+            ctx.logger.warning('Standings endpoint called but not connected to iRacing')
+            send_error_response(handler, 'Not connected to iRacing', 503)
+            return
+
+        send_json_response(handler, build_standings_payload(ir, state))
+
+    except Exception as e:
+        ctx.logger.error(f'Error in standings endpoint: {e}')
+        send_error_response(handler, str(e))
@@ -0,0 +1,264 @@
+"""
+Server-Sent Events stream of telemetry snapshots.
+
+`GET /api/stream` pushes each snapshot published by the telemetry loop
+instead of making overlays poll.  Query parameters:
+
+- `fields`: comma separated snapshot fields, dotted for nested values
+  (e.g. `driver,camera.current_camera`). Raw variables are `vars.<Name>`
+  and on-demand sections (`dashboard`, `diagnostics`) are built while a
+  stream asks for them. Default: everything the loop publishes anyway
+- `rate`: maximum events per second (0.1 - 60). Default: 10
+- `mode`: `full` sends every snapshot, `delta` sends only changed fields
+  after the first event (removed fields are listed by dotted path under
+  `removed`), `frames` sends sequenced delta frames with
+  periodic keyframes (see server/delta.py). Default: full
+
+Every client with the same fields (and, in delta mode, the same previous
+snapshot) receives the same bytes, which are encoded once per tick and
+cached on the snapshot.  Frames differ only in their sequence number; the
+diffs inside them are shared the same way.
+"""
+
+import asyncio
+import json
+import time
+
+from .context import ServerContext
+from .delta import DeltaEncoder
+from .snapshot import ON_DEMAND_SECTIONS, VAR_NAME, Snapshot
+
+DEFAULT_RATE = 10.0
+MAX_RATE = 60.0
+MIN_RATE = 0.1
+
+# Seconds between keep-alive comments while no snapshots are published
+KEEPALIVE_INTERVAL = 15.0
+
+MODES = ('full', 'delta', 'frames')
+
+_MISSING = object()
+
+
+def parse_stream_params(query: dict[str, list[str]]) -> tuple[tuple[str, ...] | None, float, str]:
+    """
+    Parse stream query parameters.
+
+    Args:
+        query: Query string parsed by the router
+
+    Returns:
+        Tuple of (fields, rate, mode) where fields is None for all fields
+    """
+    fields = None
+    if 'fields' in query:
+        names = {name.strip() for value in query['fields'] for name in value.split(',')}
+        fields = tuple(sorted(name for name in names if name)) or None
+
+    try:
+        rate = float(query.get('rate', [DEFAULT_RATE])[0])
+    except ValueError:
+        rate = DEFAULT_RATE
+    rate = min(MAX_RATE, max(MIN_RATE, rate))
+
+    mode = query.get('mode', ['full'])[0].lower()
+    if mode not in MODES:
+        mode = 'full'
+
+    return fields, rate, mode
+
+
+def stream_requests(fields: tuple[str, ...] | None) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    """
+    Raw variables (`vars.<Name>`) and on-demand sections named in `fields`,
+    which the telemetry loop only puts in snapshots while someone asks.
+
+    Returns:
+        Tuple of (var names, section names)
+    """
+    var_names, sections = [], []
+    for name in fields or ():
+        parts = name.split('.')
+        if parts[0] == 'vars' and len(parts) > 1 and VAR_NAME.match(parts[1]):
+            var_names.append(parts[1])
+        elif parts[0] in ON_DEMAND_SECTIONS:
+            sections.append(parts[0])
+    return tuple(dict.fromkeys(var_names)), tuple(dict.fromkeys(sections))
+
+
+def select_fields(data: dict, fields: tuple[str, ...] | None) -> dict:
+    """Pick the requested (optionally dotted) fields out of a snapshot payload"""
+    if fields is None:
+        return data
+
+    selected: dict = {}
+    for name in fields:
+        value = data
+        for part in name.split('.'):
+            value = value.get(part, _MISSING) if isinstance(value, dict) else _MISSING
+            if value is _MISSING:
+                break
+
+        if value is _MISSING:
+            continue
+
+        target = selected
+        parts = name.split('.')
+        for part in parts[:-1]:
+            target = target.setdefault(part, {})
+        target[parts[-1]] = value
+
+    return selected
+
+
+def diff_payload(previous: dict, current: dict) -> dict:
+    """
+    Return the fields of `current` that differ from `previous`.
+
+    Nested dictionaries are compared recursively; other values (including
+    lists) are replaced wholesale.  Removed fields are listed by dotted path
+    under `removed`, so a field that became None stays distinguishable.  A
+    dictionary whose only change is its `timestamp` counts as unchanged, as
+    in `SnapshotHub.changed_version`.
+    """
+    removed: list[str] = []
+    changes = _diff(previous, current, '', removed)
+    if removed:
+        changes['removed'] = removed
+    return changes
+
+
+def _diff(previous: dict, current: dict, prefix: str, removed: list[str]) -> dict:
+    changes: dict = {}
+    removed_before = len(removed)
+
+    for key, value in current.items():
+        old = previous.get(key, _MISSING)
+        if isinstance(value, dict) and isinstance(old, dict):
+            nested = _diff(old, value, f'{prefix}{key}.', removed)
+            if nested:
+                changes[key] = nested
+        elif old is _MISSING or old != value:
+            changes[key] = value
+
+    removed.extend(f'{prefix}{key}' for key in sorted(previous.keys() - current.keys()))
+
+    # Payloads are rebuilt with a new timestamp every tick
+    if changes.keys() == {'timestamp'} and len(removed) == removed_before:
+        return {}
+    return changes
+
+
+def _dumps(data) -> str:
+    return json.dumps(data, separators=(',', ':'), default=str)
+
+
+def encode_event(snapshot: Snapshot, fields: tuple[str, ...] | None, previous: Snapshot | None) -> bytes:
+    """
+    Encode a snapshot as an SSE event, once per (fields, previous) per tick.
+
+    Returns:
+        The event bytes, or empty bytes for a delta with no changes
+    """
+    key = ('sse', fields, previous.version if previous else None)
+
+    def build() -> bytes:
+        current = select_fields(snapshot.data, fields)
+
+        if previous is None:
+            event, payload = 'snapshot', current
+        else:
+            payload = diff_payload(select_fields(previous.data, fields), current)
+            if not payload:
+                return b''
+            event = 'delta'
+
+        return f'id: {snapshot.version}\nevent: {event}\ndata: {_dumps(payload)}\n\n'.encode()
+
+    return snapshot.cached(key, build)
+
+
+def encode_frame(snapshot: Snapshot, fields: tuple[str, ...] | None, encoder: DeltaEncoder) -> bytes:
+    """
+    Encode a snapshot as the next `frame` event of a frames mode stream.
+
+    Returns:
+        The event bytes, or empty bytes when nothing changed
+    """
+    selected = snapshot.cached(('fields', fields), lambda: select_fields(snapshot.data, fields))
+    body = encoder.encode(snapshot, selected)
+    if body is None:
+        return b''
+    return f'id: {snapshot.version}\nevent: frame\ndata: {{{body}}}\n\n'.encode()
+
+
+async def handle_stream(request, ctx: ServerContext):
+    """Handle the SSE telemetry stream endpoint"""
+    writer = request.writer
+    hub = ctx.snapshots
+
+    if hub is None:
+        body = b'{"error": "Streaming not available"}'
+        await request.send_head(503, {
+            'Content-Type': 'application/json',
+            'Content-Length': str(len(body)),
+            'Connection': 'close'
+        })
+        writer.write(body)
+        await writer.drain()
+        return
+
+    fields, rate, mode = parse_stream_params(request.query)
+    interval = 1.0 / rate
+    var_names, sections = stream_requests(fields)
+    encoder = DeltaEncoder(scope=('sse', fields)) if mode == 'frames' else None
+
+    ctx.logger.info(f'Stream opened: fields={fields}, rate={rate}, mode={mode}')
+
+    await request.send_head(200, {
+        'Content-Type': 'text/event-stream',
+        'Cache-Control': 'no-cache',
+        'Connection': 'keep-alive',
+        'Access-Control-Allow-Origin': '*',
+        'X-Accel-Buffering': 'no'
+    })
+    writer.write(b'retry: 2000\n\n')
+
+    previous: Snapshot | None = None
+    last_sent = 0.0
+
+    hub.watch_vars(var_names)
+    try:
+        while True:
+            # Requested sections expire after SECTION_TTL; renew them every tick
+            hub.request_sections(sections)
+            since = previous.version if previous else 0
+            snapshot = await hub.wait_async(since, KEEPALIVE_INTERVAL)
+
+            if snapshot.version <= since:
+                writer.write(b': keep-alive\n\n')
+                await writer.drain()
+                continue
+
+            # Throttle to the client's rate; snapshots published while we
+            # wait are skipped and only the newest one is sent
+            delay = last_sent + interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                snapshot = hub.latest
+
+            if encoder is not None:
+                frame = encode_frame(snapshot, fields, encoder)
+            else:
+                frame = encode_event(snapshot, fields, previous if mode == 'delta' else None)
+            previous = snapshot
+
+            if frame:
+                writer.write(frame)
+                # A slow client blocks only its own coroutine here, and the
+                # frames it misses meanwhile are never queued
+                await writer.drain()
+                last_sent = time.monotonic()
+    finally:
+        hub.unwatch_vars(var_names)
+        ctx.logger.info('Stream closed')
@@ -0,0 +1,164 @@
+from .helpers import send_json_response, send_error_response
+from .context import ServerContext
+from .router import get_query_param
+from history import DOWNSAMPLERS, window_stats
+from datetime import datetime
+
+# Points returned per variable unless ?points= asks otherwise
+DEFAULT_POINTS = 2000
+MAX_POINTS = 20000
+
+
+class QueryError(ValueError):
+    """Invalid range query parameter"""
+
+
+def parse_range_query(handler, available) -> dict:
+    """
+    Parse the `/api/telemetry` query string.
+
+    Args:
+        handler: Request handler with the router's parsed `query`
+        available: Variable names the history can return
+
+    Returns:
+        Dict with vars, start, end, last, unit, points, method and stats
+
+    Raises:
+        QueryError: If a parameter is missing or invalid
+    """
+    names = [name.strip() for name in (get_query_param(handler, 'vars') or '').split(',') if name.strip()]
+    if not names:
+        raise QueryError('Missing vars parameter (e.g. ?vars=Speed,RPM)')
+
+    available = set(available)
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise QueryError(f'Unknown or non-numeric telemetry variables: {", ".join(unknown)}')
+
+    unit = get_query_param(handler, 'unit', 'time')
+    if unit not in ('time', 'frame'):
+        raise QueryError('unit must be time or frame')
+
+    method = get_query_param(handler, 'method', 'minmax')
+    if method not in DOWNSAMPLERS:
+        raise QueryError(f'method must be one of: {", ".join(DOWNSAMPLERS)}')
+
+    try:
+        start = _optional_float(get_query_param(handler, 'from'))
+        end = _optional_float(get_query_param(handler, 'to'))
+        last = _optional_float(get_query_param(handler, 'last'))
+        points = int(get_query_param(handler, 'points') or DEFAULT_POINTS)
+    except ValueError:
+        raise QueryError('from, to, last and points must be numbers')
+
+    if last is not None and (start is not None or end is not None):
+        raise QueryError('last cannot be combined with from or to')
+
+    return {
+        'vars': list(dict.fromkeys(names)),
+        'start': start,
+        'end': end,
+        'last': last,
+        'unit': unit,
+        'points': max(2, min(points, MAX_POINTS)),
+        'method': method,
+        'stats': get_query_param(handler, 'stats', 'false').lower() == 'true',
+    }
+
+
+def _optional_float(value: str | None) -> float | None:
+    return float(value) if value not in (None, '') else None
+
+
+def build_range_payload(history, query: dict) -> dict:
+    """Read and downsample the requested columns from a history"""
+    start, end = query['start'], query['end']
+    if query.get('last') is not None:
+        # The last N seconds before the newest sample, or the last N frames
+        span = history.span(query['unit'])
+        if span is not None:
+            start = span[1] - query['last']
+            if query['unit'] == 'frame':
+                start += 1
+
+    times, columns = history.query(query['vars'], start, end, query['unit'])
+    downsample = DOWNSAMPLERS[query['method']]
+
+    data = {}
+    for name, values in columns.items():
+        sampled_times, sampled_values = downsample(times, values, query['points'])
+        data[name] = {'time': sampled_times, 'values': sampled_values}
+        if query.get('stats'):
+            # Over every sample in the range, not just the downsampled ones
+            data[name]['stats'] = window_stats(values)._asdict()
+
+    return {
+        'from': times[0] if times else None,
+        'to': times[-1] if times else None,
+        'samples': len(times),
+        'points': query['points'],
+        'method': query['method'],
+        'vars': data,
+    }
+
+
+def handle_telemetry_var(handler, ctx: ServerContext):
+    """Handle raw telemetry variable endpoint (/api/telemetry/{var})"""
+    try:
+        ir = ctx.ir
+        state = ctx.state
+        name = handler.params['var']
+
+        ctx.logger.debug(f'Telemetry endpoint called for {name}')
+
+        if not state.ir_connected:
+            ctx.logger.warning('Telemetry endpoint called but not connected to iRacing')
+            send_error_response(handler, 'Not connected to iRacing', 503)
+            return
+
+        value = ir[name]
+        if value is None:
+            send_error_response(handler, f'Unknown telemetry variable: {name}', 404)
+            return
+
+        send_json_response(handler, {
+            'name': name,
+            'value': value,
+            'timestamp': datetime.now().isoformat()
+        })
+
+    except Exception as e:
+        ctx.logger.error(f'Error in telemetry endpoint: {e}')
+        send_error_response(handler, str(e))
+
+
+def handle_telemetry_query(handler, ctx: ServerContext):
+    """Handle telemetry range endpoint (/api/telemetry?vars=Speed,RPM&from=&to=&points=)"""
+    try:
+        history = ctx.history
+
+        ctx.logger.debug('Telemetry range endpoint called')
+
+        if history is None:
+            send_error_response(handler, 'Telemetry history is not available', 503)
+            return
+
+        available = history.keys()
+        if not available:
+            send_error_response(handler, 'No telemetry recorded yet', 503)
+            return
+
+        try:
+            query = parse_range_query(handler, available)
+        except QueryError as e:
+            send_error_response(handler, str(e), 400)
+            return
+
+        payload = build_range_payload(history, query)
+        payload['timestamp'] = datetime.now().isoformat()
+        send_json_response(handler, payload)
+
+    except Exception as e:
+        ctx.logger.error(f'Error in telemetry range endpoint: {e}')
+        send_error_response(handler, str(e))
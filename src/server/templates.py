@@ -0,0 +1,55 @@
+"""
+Static HTML shells for the dashboard pages.
+
+Pages are read from `server/templates/` and rendered once when the module is
+imported, using `string.Template` placeholders (`$name`) for values fixed at
+startup.  The rendered bytes never change while the server runs, so they are
+served with long-lived cache headers and an ETag; live data is fetched by the
+page from a JSON endpoint and patched into the DOM.
+"""
+
+import hashlib
+import os
+from string import Template
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), 'templates')
+
+# Browsers may reuse a shell for a day, then revalidate it with the ETag
+CACHE_CONTROL = 'public, max-age=86400'
+
+
+class StaticPage:
+    """An HTML page rendered once and served from memory"""
+
+    def __init__(self, name: str, **values):
+        """
+        Render a template from the templates directory.
+
+        Args:
+            name: Template file name, e.g. 'dashboard.html'
+            **values: Placeholder values substituted into the template
+        """
+        with open(os.path.join(TEMPLATE_DIR, name), encoding='utf-8') as f:
+            template = Template(f.read())
+
+        self.name = name
+        self.body = template.substitute(values).encode('utf-8')
+        self.etag = '"' + hashlib.blake2b(self.body, digest_size=12).hexdigest() + '"'
+
+    def send(self, handler):
+        """Send the page, or a 304 if the client's copy is current"""
+        if handler.headers.get('If-None-Match') == self.etag:
+            handler.send_response(304)
+            handler.send_header('ETag', self.etag)
+            handler.send_header('Cache-Control', CACHE_CONTROL)
+            handler.end_headers()
+            return
+
+        handler.send_response(200)
+        handler.send_header('Content-Type', 'text/html; charset=utf-8')
+        handler.send_header('Content-Length', str(len(self.body)))
+        handler.send_header('Cache-Control', CACHE_CONTROL)
+        handler.send_header('ETag', self.etag)
+        handler.end_headers()
+        if handler.command != 'HEAD':
+            handler.wfile.write(self.body)
@@ -0,0 +1,446 @@
+"""
+WebSocket broadcaster for telemetry snapshots.
+
+Clients connect to `ws://<host>:9001/` and subscribe to channels at their own
+rate.  Connecting to `ws://<host>:9001/?mode=frames` switches updates to
+delta-encoded frames (see server/delta.py).  Every message is a JSON object
+with a `type`:
+
+Client to server:
+
+- `{"type": "subscribe", "channel": "driver", "rate": 5}`
+- `{"type": "unsubscribe", "channel": "driver"}`
+- `{"type": "camera.set", "camera_group_id": 12}`
+- `{"type": "pit_cams.toggle"}`
+- `{"type": "resync"}` asks for a keyframe (frames mode)
+
+An optional `id` is echoed back in the `ack` / `error` reply.
+
+Server to client:
+
+- `{"type": "update", "version": 42, "channels": {"driver": {...}, "var:Speed": 51.2}}`
+- `{"type": "frame", "version": 42, "seq": 7, "set": [[["var:Speed"], 51.2]]}`
+  in frames mode, with the channels as the frame's sections
+- `{"type": "ack", "id": 1, "request": "subscribe", ...}`
+- `{"type": "error", "id": 1, "error": "..."}`
+
+Channels are the snapshot sections (`driver`, `camera`, `standings`) and raw
+telemetry variables by name (`var:Speed`, `var:CarIdxLapDistPct`, ...).
+
+Each channel payload is serialized once per tick and shared by every client.
+A client that cannot keep up only ever receives the newest snapshot; frames it
+missed while its socket was busy are dropped rather than queued.
+"""
+
+import asyncio
+import json
+import time
+from urllib.parse import parse_qs, urlsplit
+
+from websockets.asyncio.server import serve, ServerConnection
+from websockets.exceptions import ConnectionClosed
+
+from .async_server import EventLoopThread
+from .context import ServerContext
+from .delta import DeltaEncoder
+from .set_camera import set_player_camera
+from .snapshot import VAR_NAME, Snapshot
+
+SECTION_CHANNELS = ('driver', 'camera', 'standings')
+VAR_PREFIX = 'var:'
+
+DEFAULT_RATE = 10.0
+MAX_RATE = 60.0
+MIN_RATE = 0.1
+MAX_SUBSCRIPTIONS = 64
+MAX_MESSAGE_SIZE = 4096
+
+_MISSING = object()
+
+
+def _dumps(data) -> str:
+    return json.dumps(data, separators=(',', ':'), default=str)
+
+
+def channel_value(snapshot: Snapshot, channel: str):
+    """Look up a channel's value in a snapshot, or _MISSING if absent"""
+    if channel.startswith(VAR_PREFIX):
+        return snapshot.data.get('vars', {}).get(channel[len(VAR_PREFIX):], _MISSING)
+    return snapshot.data.get(channel, _MISSING)
+
+
+def encode_update(snapshot: Snapshot, channels: tuple[str, ...]) -> str | None:
+    """
+    Encode an update frame for the given channels.
+
+    Each channel's JSON is cached on the snapshot, and so is the frame for each
+    distinct channel set, so clients subscribed to the same channels share the
+    same string.
+
+    Returns:
+        The frame, or None if none of the channels are in the snapshot
+    """
+    def build_frame() -> str | None:
+        parts = []
+        for channel in channels:
+            fragment = snapshot.cached(('ws', channel), lambda: _encode_channel(snapshot, channel))
+            if fragment is not None:
+                parts.append(fragment)
+
+        if not parts:
+            return None
+
+        return f'{{"type":"update","version":{snapshot.version},"channels":{{{",".join(parts)}}}}}'
+
+    return snapshot.cached(('ws-frame', channels), build_frame)
+
+
+def channel_values(snapshot: Snapshot, channels: tuple[str, ...]) -> dict:
+    """Values of the channels present in a snapshot, shared per channel set"""
+    def build() -> dict:
+        values = {}
+        for channel in channels:
+            value = channel_value(snapshot, channel)
+            if value is not _MISSING:
+                values[channel] = value
+        return values
+
+    return snapshot.cached(('ws-values', channels), build)
+
+
+def encode_frame(snapshot: Snapshot, channels: tuple[str, ...], encoder: DeltaEncoder,
+                 subscribed: tuple[str, ...], now: float) -> str | None:
+    """
+    Encode a frames mode update of the due `channels`.
+
+    Returns:
+        The frame, or None if none of the channels changed
+    """
+    body = encoder.encode(snapshot, channel_values(snapshot, subscribed), channels, now)
+    if body is None:
+        return None
+    return f'{{"type":"frame","version":{snapshot.version},{body}}}'
+
+
+def _encode_channel(snapshot: Snapshot, channel: str) -> str | None:
+    value = channel_value(snapshot, channel)
+    if value is _MISSING:
+        return None
+    return f'{_dumps(channel)}:{_dumps(value)}'
+
+
+class Subscription:
+    """A client's subscription to one channel"""
+
+    __slots__ = ('channel', 'interval', 'last_sent', 'last_version')
+
+    def __init__(self, channel: str, rate: float):
+        self.channel = channel
+        self.interval = 1.0 / rate
+        self.last_sent = 0.0
+        self.last_version = 0
+
+
+class WebSocketClient:
+    """State for one connected WebSocket client"""
+
+    def __init__(self, connection: ServerConnection, frames: bool = False):
+        self.connection = connection
+        self.subscriptions: dict[str, Subscription] = {}
+        # Set in frames mode; channel values are diffed against what this
+        # client was last sent
+        self.encoder = DeltaEncoder(scope='ws') if frames else None
+        self.wakeup = asyncio.Event()
+        self.sent = 0
+        self.dropped = 0
+
+    def due_channels(self, version: int, now: float) -> tuple[tuple[str, ...], float | None]:
+        """
+        Find the channels to send for snapshot `version` at `now`.
+
+        Returns:
+            Tuple of (channels due now, seconds until the next throttled
+            channel is due or None if there is none)
+        """
+        due = []
+        next_due = None
+
+        for channel, subscription in self.subscriptions.items():
+            if subscription.last_version >= version:
+                continue
+
+            wait = subscription.last_sent + subscription.interval - now
+            if wait <= 0:
+                due.append(channel)
+            elif next_due is None or wait < next_due:
+                next_due = wait
+
+        return tuple(sorted(due)), next_due
+
+    def encode(self, snapshot: Snapshot, channels: tuple[str, ...], now: float) -> tuple[tuple[str, ...], str | None]:
+        """
+        Encode the due channels of a snapshot for this client.
+
+        Returns:
+            Tuple of (channels sent, which is every subscribed channel for a
+            keyframe, and the frame or None)
+        """
+        if self.encoder is None:
+            return channels, encode_update(snapshot, channels)
+
+        subscribed = tuple(sorted(self.subscriptions))
+        if self.encoder.keyframe_due(now):
+            channels = subscribed
+        return channels, encode_frame(snapshot, channels, self.encoder, subscribed, now)
+
+    def mark_sent(self, channels: tuple[str, ...], version: int, now: float):
+        for channel in channels:
+            subscription = self.subscriptions.get(channel)
+            if subscription is not None:
+                subscription.last_sent = now
+                subscription.last_version = version
+
+
+class WebSocketBroadcaster:
+    """WebSocket server pushing snapshots from a SnapshotHub to subscribers"""
+
+    def __init__(self, context: ServerContext, host: str = '', port: int = 9001):
+        self.context = context
+        self.host = host
+        self.port = port
+        self.clients: set[WebSocketClient] = set()
+        self._loop_thread: EventLoopThread | None = None
+        self._server = None
+
+    @property
+    def hub(self):
+        return self.context.snapshots
+
+    # -- Lifecycle -------------------------------------------------------------
+
+    def start(self):
+        """Start listening on a background event loop thread"""
+        if self.hub is None:
+            raise ValueError('WebSocket broadcaster requires a SnapshotHub in the server context')
+
+        async def listen():
+            return await serve(self._serve, self.host or None, self.port, max_size=MAX_MESSAGE_SIZE)
+
+        self._loop_thread = EventLoopThread(name='websocket')
+        try:
+            self._server = self._loop_thread.submit(listen()).result()
+        except Exception:
+            self._loop_thread.stop()
+            self._loop_thread = None
+            raise
+
+    def shutdown(self):
+        """Close every connection and stop the event loop thread"""
+        if self._loop_thread is None:
+            return
+
+        async def close():
+            self._server.close()
+            await self._server.wait_closed()
+
+        try:
+            self._loop_thread.submit(close()).result(timeout=5)
+        except Exception:
+            pass
+        self._loop_thread.stop()
+        self._loop_thread = None
+
+    # -- Connections -----------------------------------------------------------
+
+    async def _serve(self, connection: ServerConnection):
+        client = WebSocketClient(connection, frames=_frames_mode(connection))
+        self.clients.add(client)
+        self.context.logger.info(f'WebSocket client connected: {connection.remote_address}')
+
+        pusher = asyncio.create_task(self._push(client))
+        try:
+            async for message in connection:
+                await self._handle_message(client, message)
+        except ConnectionClosed:
+            pass
+        finally:
+            pusher.cancel()
+            self.clients.discard(client)
+            self._release_vars(client.subscriptions)
+            self.context.logger.info(
+                f'WebSocket client disconnected: {connection.remote_address} '
+                f'(sent {client.sent}, dropped {client.dropped})'
+            )
+
+    async def _push(self, client: WebSocketClient):
+        """Send each new snapshot's due channels to one client"""
+        version = 0
+        timeout = None
+
+        try:
+            while True:
+                waiter = asyncio.ensure_future(self.hub.wait_async(version))
+                wakeup = asyncio.ensure_future(client.wakeup.wait())
+                await asyncio.wait((waiter, wakeup), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                wakeup.cancel()
+                waiter.cancel()
+
+                client.wakeup.clear()
+                snapshot = self.hub.latest
+                if snapshot.version == 0:
+                    continue
+
+                if version and snapshot.version > version + 1:
+                    # Snapshots published while the previous send was
+                    # blocked on a slow socket or throttled are skipped,
+                    # not queued
+                    client.dropped += snapshot.version - version - 1
+                version = snapshot.version
+
+                # Throttled channels are picked up from the newest snapshot
+                # once their interval has passed
+                now = time.monotonic()
+                channels, timeout = client.due_channels(version, now)
+                if not channels:
+                    continue
+
+                channels, frame = client.encode(snapshot, channels, now)
+                client.mark_sent(channels, version, now)
+                if frame is not None:
+                    await client.connection.send(frame)
+                    client.sent += 1
+        except (asyncio.CancelledError, ConnectionClosed):
+            pass
+
+    # -- Control messages ------------------------------------------------------
+
+    async def _handle_message(self, client: WebSocketClient, message):
+        request_id = None
+        try:
+            data = json.loads(message)
+            if not isinstance(data, dict):
+                raise ValueError('Message must be a JSON object')
+
+            request_id = data.get('id')
+            kind = data.get('type')
+
+            if kind == 'subscribe':
+                reply = self._subscribe(client, data)
+            elif kind == 'unsubscribe':
+                reply = self._unsubscribe(client, data)
+            elif kind == 'camera.set':
+                reply = await self._set_camera(data)
+            elif kind == 'pit_cams.toggle':
+                reply = await self._toggle_pit_cams()
+            elif kind == 'resync':
+                reply = self._resync(client)
+            else:
+                raise ValueError(f'Unknown message type: {kind}')
+
+            await client.connection.send(_dumps({'type': 'ack', 'id': request_id, 'request': kind, **reply}))
+
+        except ConnectionClosed:
+            raise
+        except Exception as e:
+            await client.connection.send(_dumps({'type': 'error', 'id': request_id, 'error': str(e)}))
+
+    def _subscribe(self, client: WebSocketClient, data: dict) -> dict:
+        channel = self._validate_channel(data.get('channel'))
+
+        try:
+            rate = float(data.get('rate', DEFAULT_RATE))
+        except (TypeError, ValueError):
+            raise ValueError('rate must be a number')
+        rate = min(MAX_RATE, max(MIN_RATE, rate))
+
+        if channel not in client.subscriptions:
+            if len(client.subscriptions) >= MAX_SUBSCRIPTIONS:
+                raise ValueError(f'Too many subscriptions (max {MAX_SUBSCRIPTIONS})')
+            if channel.startswith(VAR_PREFIX):
+                self.hub.watch_vars([channel[len(VAR_PREFIX):]])
+
+        client.subscriptions[channel] = Subscription(channel, rate)
+        # Send the current value right away instead of on the next tick
+        client.wakeup.set()
+
+        return {'channel': channel, 'rate': rate}
+
+    def _unsubscribe(self, client: WebSocketClient, data: dict) -> dict:
+        channel = data.get('channel')
+        subscription = client.subscriptions.pop(channel, None)
+        if subscription is not None:
+            self._release_vars({channel: subscription})
+        return {'channel': channel}
+
+    def _resync(self, client: WebSocketClient) -> dict:
+        if client.encoder is None:
+            raise ValueError('resync is only available in frames mode')
+        client.encoder.request_keyframe()
+        client.wakeup.set()
+        return {'seq': client.encoder.seq}
+
+    def _validate_channel(self, channel) -> str:
+        if channel in SECTION_CHANNELS:
+            return channel
+        if isinstance(channel, str) and channel.startswith(VAR_PREFIX) and VAR_NAME.match(channel[len(VAR_PREFIX):]):
+            return channel
+        raise ValueError(f'Unknown channel: {channel}')
+
+    def _release_vars(self, subscriptions: dict[str, Subscription]):
+        names = [channel[len(VAR_PREFIX):] for channel in subscriptions if channel.startswith(VAR_PREFIX)]
+        if names:
+            self.hub.unwatch_vars(names)
+
+    async def _set_camera(self, data: dict) -> dict:
+        try:
+            camera_group_id = int(data['camera_group_id'])
+        except KeyError:
+            raise ValueError('Missing camera_group_id parameter')
+        except (TypeError, ValueError):
+            raise ValueError('camera_group_id must be an integer')
+
+        def switch():
+            state = self.context.state
+            if not state.ir_connected:
+                raise ValueError('Not connected to iRacing')
+            return set_player_camera(self.context.ir, state, camera_group_id)
+
+        # Camera switches talk to the sim, so keep them off the event loop
+        result = await asyncio.get_running_loop().run_in_executor(None, switch)
+        if result is None:
+            raise ValueError('Driver not found')
+
+        self.context.logger.info(f'Camera set to group ID: {camera_group_id} (WebSocket)')
+        return {'success': result, 'camera_group_id': camera_group_id}
+
+    async def _toggle_pit_cams(self) -> dict:
+        new_state = self.context.state.toggle_pit_cams()
+        self.context.logger.info(f'Pit cams toggled to: {new_state} (WebSocket)')
+        return {'show_pit_cams': new_state}
+
+
+def _frames_mode(connection: ServerConnection) -> bool:
+    request = connection.request
+    if request is None:
+        return False
+    mode = parse_qs(urlsplit(request.path).query).get('mode', [''])[0]
+    return mode.lower() == 'frames'
+
+
+def start_websocket_server(context: ServerContext, port: int = 9001):
+    """
+    Start the WebSocket broadcaster.
+
+    Args:
+        context: ServerContext with a SnapshotHub in `snapshots`
+        port: Port number to listen on (default: 9001)
+
+    Returns:
+        The WebSocketBroadcaster instance
+    """
+    broadcaster = WebSocketBroadcaster(context, port=port)
+    broadcaster.start()
+
+    print(f"WebSocket server started on ws://0.0.0.0:{port}")
+    context.logger.info(f"WebSocket server started on port {port}")
+    return broadcaster
@@ -0,0 +1,256 @@
+"""
+Car setup change tracking.
+
+iRacing bumps `CarSetup.UpdateCount` whenever the setup changes (garage
+edits, in-car adjustments written back, tire readings after a stop).  The
+tracker parses `CarSetup` only when that count changes, diffs it against the
+previous setup field by field and appends the diff to a compact history,
+so "what changed between stints" is answered without re-reading YAML.
+
+Setups can also be diffed across telemetry files:
+
+    python src/setup_tracker.py stint1.ibt stint2.ibt
+"""
+
+import argparse
+from typing import NamedTuple
+
+import irsdk
+from pydantic import ValidationError
+
+from models.car_setup import CarSetup
+from models.telemetry import TelemetryHandler
+from models.units import parse_quantity
+from metrics import SESSION_INFO_REPARSES
+
+# Tire readings the sim writes into the setup after running; they change
+# without anyone touching the setup
+MEASURED_FIELDS = ('LastHotPressure', 'LastTempsOMI', 'LastTempsIMO', 'TreadRemaining')
+
+
+class SetupChange(NamedTuple):
+    """One field that differs between two setups"""
+
+    path: str
+    old: object
+    new: object
+    # new - old when both values are numbers with the same unit
+    delta: float | None
+    # A tire reading rather than a setup adjustment
+    measured: bool
+
+    def to_dict(self) -> dict:
+        return self._asdict()
+
+
+def flatten_setup(data: dict, prefix: str = '') -> dict[str, object]:
+    """Leaf values of a setup dict by dotted path ("Chassis.Rear.WingAngle")"""
+    values = {}
+    for key, value in data.items():
+        path = f'{prefix}{key}'
+        if isinstance(value, dict):
+            values.update(flatten_setup(value, f'{path}.'))
+        elif key != 'UpdateCount':
+            values[path] = value
+    return values
+
+
+def _delta(old, new) -> float | None:
+    if isinstance(old, (int, float)) and isinstance(new, (int, float)):
+        return new - old
+
+    old_quantity, new_quantity = parse_quantity(old), parse_quantity(new)
+    if old_quantity is None or new_quantity is None or old_quantity.unit != new_quantity.unit:
+        return None
+    return round(new_quantity.value - old_quantity.value, 6)
+
+
+def _change(path: str, old, new) -> SetupChange:
+    return SetupChange(path, old, new, _delta(old, new), path.rsplit('.', 1)[-1] in MEASURED_FIELDS)
+
+
+def diff_values(old: dict[str, object], new: dict[str, object]) -> list[SetupChange]:
+    """Differences between two flattened setups, in the order of the new one"""
+    changes = [_change(path, old.get(path), value) for path, value in new.items() if old.get(path) != value]
+    changes.extend(_change(path, old[path], None) for path in old.keys() - new.keys())
+    return changes
+
+
+def diff_setups(old: dict | None, new: dict) -> list[SetupChange]:
+    """Field-level differences between two raw `CarSetup` dicts"""
+    return diff_values(flatten_setup(old or {}), flatten_setup(new))
+
+
+class SetupHistory:
+    """
+    Append-only history of setup revisions.
+
+    Field paths are interned once, and each revision only stores the
+    (path index, value) pairs that changed, so a session with dozens of
+    setup updates costs little more than one setup.
+    """
+
+    def __init__(self):
+        self._paths: list[str] = []
+        self._path_index: dict[str, int] = {}
+        # (update count, session time, ((path index, value), ...))
+        self._revisions: list[tuple[int, float | None, tuple]] = []
+
+    def __len__(self) -> int:
+        return len(self._revisions)
+
+    def _intern(self, path: str) -> int:
+        index = self._path_index.get(path)
+        if index is None:
+            index = self._path_index[path] = len(self._paths)
+            self._paths.append(path)
+        return index
+
+    def append(self, update_count: int, session_time: float | None, changes: list[SetupChange]):
+        self._revisions.append((
+            update_count,
+            session_time,
+            tuple((self._intern(change.path), change.new) for change in changes),
+        ))
+
+    def setup_at(self, revision: int) -> dict[str, object]:
+        """Flattened setup after a revision, replayed from the first one"""
+        values = {}
+        for _, _, changes in self._revisions[:revision + 1]:
+            for index, value in changes:
+                if value is None:
+                    values.pop(self._paths[index], None)
+                else:
+                    values[self._paths[index]] = value
+        return values
+
+    def diff(self, start: int, end: int) -> list[SetupChange]:
+        """Changes between two revisions, e.g. between two stints"""
+        return diff_values(self.setup_at(start), self.setup_at(end))
+
+    def revisions(self, include_measured: bool = True) -> list[dict]:
+        """Every revision with the changes it made against the one before"""
+        result = []
+        values = {}
+        for update_count, session_time, changes in self._revisions:
+            entries = []
+            for index, value in changes:
+                path = self._paths[index]
+                change = _change(path, values.get(path), value)
+                values[path] = value
+                if include_measured or not change.measured:
+                    entries.append(change.to_dict())
+            result.append({'update_count': update_count, 'session_time': session_time, 'changes': entries})
+        return result
+
+
+class SetupTracker:
+    """
+    Tracks the player's car setup from the `CarSetup` session info section.
+
+    `refresh()` is cheap to call every tick: it does nothing until the
+    session info version changes, and only parses and diffs the setup when
+    its `UpdateCount` changes.
+    """
+
+    def __init__(self):
+        self.history = SetupHistory()
+        self.update_count: int | None = None
+        self.session_info_version = None
+        self.raw: dict | None = None
+        # Validated model, None when this car's setup layout does not match it
+        self.setup: CarSetup | None = None
+        self.changes: list[SetupChange] = []
+
+    def reset(self):
+        """Forget the current setup after a disconnect; the history is kept"""
+        self.update_count = None
+        self.session_info_version = None
+
+    def refresh(self, ir: TelemetryHandler) -> bool:
+        """
+        Check for a new setup.
+
+        Returns:
+            True when the setup changed and was added to the history
+        """
+        version = ir.get_session_info_version()
+        if version == self.session_info_version:
+            return False
+        self.session_info_version = version
+
+        raw = ir['CarSetup']
+        if not raw or raw.get('UpdateCount') == self.update_count:
+            return False
+
+        self.changes = diff_setups(self.raw, raw)
+        self.update_count = raw.get('UpdateCount')
+        self.raw = raw
+        SESSION_INFO_REPARSES.inc('CarSetup')
+
+        try:
+            self.setup = CarSetup.model_validate(raw)
+        except ValidationError:
+            self.setup = None
+
+        self.history.append(self.update_count, ir['SessionTime'], self.changes)
+        return True
+
+    def to_dict(self, include_measured: bool = True) -> dict:
+        return {
+            'update_count': self.update_count,
+            'setup': self.raw,
+            'revisions': self.history.revisions(include_measured),
+        }
+
+
+def read_ibt_setup(path: str) -> dict:
+    """
+    `CarSetup` session info section of a telemetry (.ibt) file.
+
+    Raises:
+        ValueError: If the file cannot be read or has no setup
+    """
+    ir = irsdk.IRSDK()
+    try:
+        if not ir.startup(test_file=path):
+            raise ValueError(f'Not a telemetry file: {path}')
+        setup = ir['CarSetup']
+    finally:
+        ir.shutdown()
+
+    if not setup:
+        raise ValueError(f'No car setup in {path}')
+    return setup
+
+
+def diff_ibt_setups(old_path: str, new_path: str) -> list[SetupChange]:
+    """Setup changes between two telemetry files"""
+    return diff_setups(read_ibt_setup(old_path), read_ibt_setup(new_path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Show car setup changes between two telemetry files')
+    parser.add_argument('old', help='Earlier .ibt file')
+    parser.add_argument('new', help='Later .ibt file')
+    parser.add_argument('--measured', action='store_true', help='Include tire readings (hot pressures, temps, tread)')
+    args = parser.parse_args()
+
+    try:
+        changes = diff_ibt_setups(args.old, args.new)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    changes = [change for change in changes if args.measured or not change.measured]
+    if not changes:
+        print('No setup changes')
+        return
+
+    width = max(len(change.path) for change in changes)
+    for change in changes:
+        delta = f'  ({change.delta:+g})' if change.delta is not None else ''
+        print(f'{change.path:<{width}}  {change.old} -> {change.new}{delta}')
+
+
+if __name__ == '__main__':
+    main()
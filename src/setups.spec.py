@@ -0,0 +1,156 @@
+"""Tests for car setup change tracking"""
+import copy
+import json
+import logging
+
+from models.telemetry import TelemetryHandler
+from server.recorder import ResponseRecorder
+from server.router import Router
+from server.setup import handle_setup
+from setup_tracker import SetupTracker, diff_setups
+
+
+def car_setup(update_count: int = 1) -> dict:
+    return {
+        'UpdateCount': update_count,
+        'TiresAero': {
+            'LeftFront': {'StartingPressure': '172.4 kPa', 'LastHotPressure': '172.4 kPa', 'TreadRemaining': '100%, 100%, 100%'},
+        },
+        'Chassis': {
+            'Rear': {'WingAngle': '8.0 deg', 'ArbBlades': 1},
+            'InCarAdjustments': {'BrakePressureBias': '54.5%'},
+            'GearsDifferential': {'GearStack': 'Short'},
+        },
+    }
+
+
+class FakeSetupSource(TelemetryHandler):
+    def __init__(self):
+        super().__init__()
+        self.version = 1
+        self.setup = car_setup()
+        self.reads = 0
+
+    def get_data(self, key):
+        if key == 'CarSetup':
+            self.reads += 1
+            return copy.deepcopy(self.setup)
+        return 120.0 if key == 'SessionTime' else None
+
+    def get_session_info_version(self):
+        return self.version
+
+    def update(self, **changes):
+        """Publish a new session info version with changed setup values"""
+        self.version += 1
+        self.setup['UpdateCount'] += 1
+        for path, value in changes.items():
+            *parents, name = path.split('.')
+            target = self.setup
+            for parent in parents:
+                target = target[parent]
+            target[name] = value
+
+
+class FakeState:
+    def __init__(self, tracker):
+        self.setup_tracker = tracker
+
+
+class FakeContext:
+    logger = logging.getLogger('setups.spec')
+
+    def __init__(self, tracker):
+        self.state = FakeState(tracker)
+
+
+class TestDiff:
+    """Test field-level setup diffs"""
+
+    def test_changed_fields_with_deltas(self):
+        new = car_setup(2)
+        new['Chassis']['Rear']['WingAngle'] = '9.5 deg'
+        new['Chassis']['Rear']['ArbBlades'] = 3
+        new['Chassis']['GearsDifferential']['GearStack'] = 'Tall'
+        new['TiresAero']['LeftFront']['LastHotPressure'] = '180.0 kPa'
+
+        changes = {change.path: change for change in diff_setups(car_setup(1), new)}
+
+        assert set(changes) == {
+            'Chassis.Rear.WingAngle', 'Chassis.Rear.ArbBlades',
+            'Chassis.GearsDifferential.GearStack', 'TiresAero.LeftFront.LastHotPressure',
+        }
+        assert changes['Chassis.Rear.WingAngle'].delta == 1.5
+        assert changes['Chassis.Rear.ArbBlades'].delta == 2
+        assert changes['Chassis.GearsDifferential.GearStack'].delta is None
+        assert changes['TiresAero.LeftFront.LastHotPressure'].measured
+        assert not changes['Chassis.Rear.WingAngle'].measured
+
+
+class TestSetupTracker:
+    """Test tracking setups on UpdateCount"""
+
+    def setup_method(self):
+        self.ir = FakeSetupSource()
+        self.tracker = SetupTracker()
+        assert self.tracker.refresh(self.ir)
+
+    def test_setup_is_read_only_when_session_info_changes(self):
+        assert not self.tracker.refresh(self.ir)
+        assert self.ir.reads == 1
+
+        # New session info, same setup
+        self.ir.version += 1
+        assert not self.tracker.refresh(self.ir)
+        assert len(self.tracker.history) == 1
+
+    def test_updates_are_diffed_and_kept(self):
+        self.ir.update(**{'Chassis.Rear.WingAngle': '9.0 deg'})
+        assert self.tracker.refresh(self.ir)
+        self.ir.update(**{'Chassis.InCarAdjustments.BrakePressureBias': '53.0%', 'Chassis.Rear.WingAngle': '10.0 deg'})
+        assert self.tracker.refresh(self.ir)
+
+        assert [change.path for change in self.tracker.changes] == [
+            'Chassis.Rear.WingAngle', 'Chassis.InCarAdjustments.BrakePressureBias',
+        ]
+        revisions = self.tracker.history.revisions()
+        assert [revision['update_count'] for revision in revisions] == [1, 2, 3]
+        assert revisions[1]['changes'] == [{
+            'path': 'Chassis.Rear.WingAngle', 'old': '8.0 deg', 'new': '9.0 deg', 'delta': 1.0, 'measured': False,
+        }]
+
+        # Across stints: first setup against the last
+        changes = {change.path: change.delta for change in self.tracker.history.diff(0, 2)}
+        assert changes == {'Chassis.Rear.WingAngle': 2.0, 'Chassis.InCarAdjustments.BrakePressureBias': -1.5}
+
+    def test_unknown_setup_layouts_are_still_tracked(self):
+        assert self.tracker.setup is None
+        assert self.tracker.raw['Chassis']['Rear']['WingAngle'] == '8.0 deg'
+
+
+class TestSetupEndpoint:
+    """Test the /api/setup handler"""
+
+    router = Router({'GET /api/setup': handle_setup})
+
+    def setup_method(self):
+        self.ir = FakeSetupSource()
+        self.tracker = SetupTracker()
+        self.tracker.refresh(self.ir)
+        self.ir.update(**{'TiresAero.LeftFront.LastHotPressure': '180.0 kPa', 'Chassis.Rear.ArbBlades': 2})
+        self.tracker.refresh(self.ir)
+
+    def get(self, target: str) -> ResponseRecorder:
+        recorder = self.router.match('GET', target).bind(ResponseRecorder('GET', target))
+        handle_setup(recorder, FakeContext(self.tracker))
+        return recorder
+
+    def test_revisions_without_tire_readings(self):
+        data = json.loads(self.get('/api/setup?measured=false').body)
+        assert data['update_count'] == 2
+        assert [change['path'] for change in data['revisions'][1]['changes']] == ['Chassis.Rear.ArbBlades']
+
+    def test_range_diff(self):
+        data = json.loads(self.get('/api/setup?from=0&to=1').body)
+        assert len(data['changes']) == 2
+        assert self.get('/api/setup?from=0&to=5').status == 400
@@ -0,0 +1,100 @@
+"""Tests for endpoints served from the loop's snapshots"""
+import json
+import logging
+import threading
+from email.message import Message
+from types import SimpleNamespace
+
+from server.dashboard import handle_dashboard_data
+from server.driver import handle_driver
+from server.recorder import ResponseRecorder
+from server.router import Router
+from server.snapshot import SnapshotHub
+
+router = Router({'/api/driver': handle_driver, '/api/dashboard': handle_dashboard_data})
+
+
+class FakeContext:
+    """Context whose telemetry source must not be touched by handlers"""
+
+    def __init__(self, hub, connected: bool = True):
+        self.snapshots = hub
+        self.state = SimpleNamespace(ir_connected=connected, drivers=SimpleNamespace(UserName='Pat', CarNumber='7'))
+        self.logger = logging.getLogger('snapshot_endpoints.spec')
+
+    def get_state(self):
+        return self.state
+
+    @property
+    def ir(self):
+        raise AssertionError('handlers must read the snapshot, not the telemetry source')
+
+
+def call(ctx, target: str) -> tuple[int, dict]:
+    match = router.match('GET', target)
+    recorder = match.bind(ResponseRecorder('GET', target, Message(), b''))
+    match.handler(recorder, ctx)
+    return recorder.status, json.loads(recorder.body)
+
+
+def driver_payload() -> dict:
+    return {
+        'driver_name': 'Pat',
+        'driver_incidents': 4,
+        'team_incidents': 6,
+        'driver_laps': 12,
+        'total_laps': 30,
+        'timestamp': '2026-10-19T12:00:00',
+    }
+
+
+class TestDriverEndpoint:
+    """Test /api/driver from the published driver payload"""
+
+    def setup_method(self):
+        self.hub = SnapshotHub()
+        self.ctx = FakeContext(self.hub)
+
+    def test_summary_is_the_snapshot_payload(self):
+        self.hub.publish({'driver': driver_payload()})
+        assert call(self.ctx, '/api/driver') == (200, driver_payload())
+
+    def test_full_response_uses_snapshot_telemetry(self):
+        self.hub.publish({'driver': driver_payload()})
+        status, body = call(self.ctx, '/api/driver?full=true')
+
+        assert status == 200
+        assert 'driver' in body
+        assert body['telemetry'] == {'player_incidents': 4, 'team_incidents': 6, 'laps_completed': 12, 'total_laps': 30}
+
+    def test_no_driver_published_yet(self):
+        self.hub.publish({'driver': None})
+        status, body = call(self.ctx, '/api/driver')
+        assert status == 503
+        assert body['error'] == 'Driver data not available'
+
+
+class TestDashboardEndpoint:
+    """Test /api/dashboard from the on-demand dashboard section"""
+
+    def test_disconnected(self):
+        status, body = call(FakeContext(SnapshotHub(), connected=False), '/api/dashboard')
+        assert status == 200
+        assert body['connected'] is False
+
+    def test_requests_section_and_waits_for_the_loop(self):
+        hub = SnapshotHub()
+        hub.publish({'driver': None})
+
+        def loop_tick():
+            # The loop builds what was requested on its next tick
+            while 'dashboard' not in hub.requested_sections():
+                threading.Event().wait(0.005)
+            hub.publish({'driver': None, 'dashboard': {'connected': True}})
+
+        thread = threading.Thread(target=loop_tick)
+        thread.start()
+        status, body = call(FakeContext(hub), '/api/dashboard')
+        thread.join()
+
+        assert (status, body) == (200, {'connected': True})
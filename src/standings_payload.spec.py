@@ -0,0 +1,68 @@
+"""Tests for building the standings payload from CarIdx arrays"""
+from types import SimpleNamespace
+
+from server.standings import build_standings_payload, car_value
+
+
+class Telemetry(dict):
+    """Unknown variables read as None, like the telemetry handlers"""
+
+    def __missing__(self, key):
+        return None
+
+
+def driver(idx: int, name: str, pace_car: bool = False, spectator: bool = False):
+    return SimpleNamespace(CarIdx=idx, UserName=name, CarNumber=str(idx), CarClassShortName='GT3',
+                           CarIsPaceCar=pace_car, IsSpectator=spectator)
+
+
+def state(*drivers):
+    return SimpleNamespace(drivers=SimpleNamespace(Drivers=list(drivers)))
+
+
+def names(payload) -> list[str]:
+    return [car['driver_name'] for car in payload['standings']]
+
+
+class TestStandings:
+    """Test standings ordering and per-car values"""
+
+    def setup_method(self):
+        self.state = state(driver(0, 'Pace', pace_car=True), driver(1, 'A'), driver(2, 'B'),
+                           driver(3, 'C'), driver(4, 'D'), driver(5, 'Watcher', spectator=True))
+        self.ir = Telemetry({
+            'CarIdxPosition': [0, 2, 1, 0, 0, 0],
+            'CarIdxClassPosition': [0, 2, 1, 0, 0, 0],
+            'CarIdxLapCompleted': [0, 5, 5, 4, 5, 0],
+            'CarIdxLapDistPct': [0.0, 0.5, 0.6, 0.9, 0.1, 0.0],
+            'CarIdxLastLapTime': [-1.0, 91.5, 90.2, 95.0, 92.0, -1.0],
+            'CarIdxOnPitRoad': [False, False, False, True, False, False],
+        })
+
+    def test_positions_first_then_distance(self):
+        payload = build_standings_payload(self.ir, self.state)
+        # B and A have official positions; C (lap 4.9) and D (lap 5.1) follow by distance
+        assert names(payload) == ['B', 'A', 'D', 'C']
+        assert 'timestamp' in payload
+
+    def test_distance_order_before_positions(self):
+        self.ir['CarIdxPosition'] = [0] * 6
+        assert names(build_standings_payload(self.ir, self.state)) == ['B', 'A', 'D', 'C']
+
+    def test_car_fields(self):
+        car = build_standings_payload(self.ir, self.state)['standings'][3]
+        assert car == {
+            'car_idx': 3, 'position': 0, 'class_position': 0, 'driver_name': 'C', 'car_number': '3',
+            'car_class': 'GT3', 'laps_completed': 4, 'lap_dist_pct': 0.9, 'last_lap_time': 95.0,
+            'on_pit_road': True,
+        }
+
+    def test_missing_arrays_use_defaults(self):
+        payload = build_standings_payload(Telemetry(), state(driver(1, 'A'), driver(2, 'B')))
+        assert [car['laps_completed'] for car in payload['standings']] == [-1, -1]
+        assert payload['standings'][0]['on_pit_road'] is False
+
+    def test_car_value_bounds(self):
+        assert car_value([1, 2], 1) == 2
+        assert car_value([1, 2], 2, 'x') == 'x'
+        assert car_value(None, 0, 0) == 0
@@ -0,0 +1,132 @@
+"""Tests for SSE stream field selection, deltas and encoding"""
+import asyncio
+import json
+import logging
+from types import SimpleNamespace
+
+from server.snapshot import Snapshot, SnapshotHub
+from server.stream import diff_payload, encode_event, handle_stream, parse_stream_params, select_fields, stream_requests
+from urllib.parse import parse_qs, urlsplit
+
+
+def query(path: str) -> dict:
+    return parse_qs(urlsplit(path).query)
+
+
+class TestStreamParams:
+    """Test query string parsing for /api/stream"""
+
+    def test_defaults(self):
+        assert parse_stream_params(query('/api/stream')) == (None, 10.0, 'full')
+
+    def test_fields_rate_and_mode(self):
+        fields, rate, mode = parse_stream_params(query('/api/stream?fields=driver, camera&rate=30&mode=delta'))
+        assert fields == ('camera', 'driver')
+        assert rate == 30.0
+        assert mode == 'delta'
+
+    def test_unknown_mode_is_full(self):
+        assert parse_stream_params(query('/api/stream?mode=FRAMES'))[2] == 'frames'
+        assert parse_stream_params(query('/api/stream?mode=zip'))[2] == 'full'
+
+    def test_rate_is_clamped(self):
+        assert parse_stream_params(query('/api/stream?rate=1000'))[1] == 60.0
+        assert parse_stream_params(query('/api/stream?rate=abc'))[1] == 10.0
+
+
+class TestStreamPayloads:
+    """Test snapshot field selection and diffs"""
+
+    data = {'driver': {'name': 'A', 'inc': 1}, 'camera': {'current': 'TV1'}, 'session_time': 12.5}
+
+    def test_select_top_level_and_dotted_fields(self):
+        assert select_fields(self.data, ('camera', 'driver.inc')) == {
+            'camera': {'current': 'TV1'},
+            'driver': {'inc': 1}
+        }
+
+    def test_select_skips_missing_fields(self):
+        assert select_fields(self.data, ('driver.missing', 'nope')) == {}
+
+    def test_diff_only_contains_changes(self):
+        current = {'driver': {'name': 'A', 'inc': 2}, 'camera': {'current': 'TV1'}}
+        assert diff_payload(self.data, current) == {'driver': {'inc': 2}, 'removed': ['session_time']}
+
+    def test_diff_separates_removed_from_none(self):
+        current = {'driver': {'name': None}, 'camera': {'current': 'TV1'}, 'session_time': 12.5}
+        assert diff_payload(self.data, current) == {'driver': {'name': None}, 'removed': ['driver.inc']}
+
+    def test_diff_ignores_timestamp_only_changes(self):
+        previous = {'driver': {'name': 'A', 'timestamp': '12:00:00'}}
+        assert diff_payload(previous, {'driver': {'name': 'A', 'timestamp': '12:00:01'}}) == {}
+        assert diff_payload(previous, {'driver': {'name': 'B', 'timestamp': '12:00:01'}}) == {
+            'driver': {'name': 'B', 'timestamp': '12:00:01'}
+        }
+
+    def test_encode_event_is_shared_per_snapshot(self):
+        first = Snapshot(1, self.data)
+        second = Snapshot(2, {**self.data, 'session_time': 13.0})
+
+        full = encode_event(second, None, None)
+        assert encode_event(second, None, None) is full
+        assert full.startswith(b'id: 2\nevent: snapshot\n')
+
+        delta = encode_event(second, None, first)
+        assert delta == b'id: 2\nevent: delta\ndata: {"session_time":13.0}\n\n'
+
+    def test_encode_event_skips_empty_delta(self):
+        first = Snapshot(1, self.data)
+        second = Snapshot(2, self.data)
+        assert encode_event(second, ('driver',), first) == b''
+
+        third = Snapshot(3, {**self.data, 'driver': {**self.data['driver'], 'timestamp': 'now'}})
+        fourth = Snapshot(4, {**self.data, 'driver': {**self.data['driver'], 'timestamp': 'later'}})
+        assert encode_event(fourth, ('driver',), third) == b''
+
+
+class FakeWriter:
+    def __init__(self):
+        self.data = b''
+
+    def write(self, data: bytes):
+        self.data += data
+
+    async def drain(self):
+        pass
+
+
+class TestStreamRequests:
+    """Test asking the loop for raw variables and on-demand sections"""
+
+    def test_vars_and_sections_from_fields(self):
+        fields = ('dashboard.fuel', 'driver', 'vars', 'vars.Speed', 'vars.Speed.x', 'vars.1bad')
+        assert stream_requests(fields) == (('Speed',), ('dashboard',))
+        assert stream_requests(None) == ((), ())
+
+    def test_var_streamed_without_websocket_clients(self):
+        hub = SnapshotHub()
+        writer = FakeWriter()
+        ctx = SimpleNamespace(snapshots=hub, logger=logging.getLogger('stream.spec'))
+
+        async def send_head(status, headers):
+            writer.write(f'HTTP/1.1 {status}\r\n\r\n'.encode())
+
+        target = '/api/stream?mode=frames&fields=vars.Speed,dashboard'
+        request = SimpleNamespace(query=query(target), writer=writer, send_head=send_head)
+
+        async def run():
+            stream = asyncio.create_task(handle_stream(request, ctx))
+            await asyncio.sleep(0.01)
+            # What the telemetry loop builds on its next tick
+            assert hub.watched_vars() == ('Speed',)
+            assert hub.requested_sections() == ('dashboard',)
+            hub.publish({'vars': {name: 51.5 for name in hub.watched_vars()}, 'dashboard': {'connected': True}})
+            await asyncio.sleep(0.01)
+            stream.cancel()
+            await asyncio.gather(stream, return_exceptions=True)
+
+        asyncio.run(run())
+
+        event = writer.data.split(b'event: frame\ndata: ')[1].split(b'\n')[0]
+        assert json.loads(event)['data'] == {'vars': {'Speed': 51.5}, 'dashboard': {'connected': True}}
+        assert hub.watched_vars() == ()
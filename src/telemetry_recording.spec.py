@@ -0,0 +1,257 @@
+"""Tests for recording live telemetry and playing it back"""
+import struct
+
+import irsdk
+import pytest
+
+import recording
+from models.telemetry import LiveTelemetryHandler, RecordedTelemetryHandler, TelemetryHandler
+from recording import RecordingReader, TelemetryRecorder
+
+
+class FakeSource(TelemetryHandler):
+    """Handler with a few scalars, a CarIdx array and session info"""
+
+    def __init__(self):
+        super().__init__()
+        self.tick = 0
+        self.version = 1
+        self.track = 'Lime Rock Park'
+
+    def get_data(self, key):
+        if key == 'SessionTime':
+            return self.tick / 60
+        if key == 'Speed':
+            return 30.0 + self.tick
+        if key == 'Gear':
+            return self.tick % 6
+        if key == 'OnPitRoad':
+            return self.tick % 2 == 0
+        if key == 'CarIdxLap':
+            return [self.tick + idx for idx in range(64)]
+        if key == 'WeekendInfo':
+            return {'TrackDisplayName': self.track, 'TrackID': 261}
+        if key == 'DriverInfo':
+            return {'DriverCarIdx': 0, 'Drivers': [{'CarIdx': 0, 'UserName': "O'Neil, Pat"}]}
+        return None
+
+    def keys(self):
+        return ['SessionTime', 'Speed', 'Gear', 'OnPitRoad', 'CarIdxLap', 'WeekendInfo']
+
+    def get_session_info_version(self):
+        return self.version
+
+
+def record(path, ticks: int, **kwargs) -> FakeSource:
+    ir = FakeSource()
+    recorder = TelemetryRecorder(str(path), **kwargs)
+    for tick in range(ticks):
+        ir.tick = tick
+        if tick == 50:
+            ir.version = 2
+            ir.track = 'Okayama'
+        recorder.record(ir)
+    recorder.stop()
+    return ir
+
+
+class TestRecorder:
+    """Test writing recordings"""
+
+    def test_round_trip(self, tmp_path):
+        path = tmp_path / 'session.irrec'
+        record(path, 120, chunk_frames=32)
+
+        reader = RecordingReader(str(path))
+        assert len(reader) == 120
+        assert len(reader.chunks) == 4
+        assert reader.keys() == ['SessionTime', 'Speed', 'Gear', 'OnPitRoad', 'CarIdxLap']
+        assert reader.get(75, 'Speed') == 105.0
+        assert reader.get(75, 'Gear') == 75 % 6
+        assert reader.get(75, 'OnPitRoad') is False
+        assert reader.get(75, 'CarIdxLap')[:3] == [75, 76, 77]
+        assert reader.get(120, 'Speed') is None
+        assert reader.get_all('Gear') == [tick % 6 for tick in range(120)]
+        reader.close()
+
+    def test_session_info_by_frame(self, tmp_path):
+        path = tmp_path / 'session.irrec'
+        record(path, 120, chunk_frames=32)
+
+        reader = RecordingReader(str(path))
+        assert reader.session_info(10)['WeekendInfo']['TrackDisplayName'] == 'Lime Rock Park'
+        assert reader.session_info(50)['WeekendInfo']['TrackDisplayName'] == 'Okayama'
+        assert reader.session_info(10)['DriverInfo']['Drivers'][0]['UserName'] == "O'Neil, Pat"
+        assert reader.session_info_version(49) == 1
+        assert reader.session_info_version(50) == 2
+        reader.close()
+
+    def test_compression(self, tmp_path):
+        record(tmp_path / 'packed.irrec', 200)
+        record(tmp_path / 'raw.irrec', 200, compress=False)
+
+        assert (tmp_path / 'packed.irrec').stat().st_size < (tmp_path / 'raw.irrec').stat().st_size / 2
+        reader = RecordingReader(str(tmp_path / 'raw.irrec'))
+        assert reader.get_all('Speed') == [30.0 + tick for tick in range(200)]
+        reader.close()
+
+    def test_buffers_reused(self, tmp_path):
+        recorder = TelemetryRecorder(str(tmp_path / 'session.irrec'), chunk_frames=8)
+        ir = FakeSource()
+        for tick in range(200):
+            ir.tick = tick
+            recorder.record(ir)
+        recorder.stop()
+
+        assert recorder.frames == 200
+        assert recorder.write_errors == 0
+        reader = RecordingReader(str(tmp_path / 'session.irrec'))
+        assert reader.get_all('SessionTime') == [tick / 60 for tick in range(200)]
+        reader.close()
+
+    def test_partial_chunk_flushed_on_interval(self, tmp_path, monkeypatch):
+        now = [0.0]
+        monkeypatch.setattr(recording.time, 'monotonic', lambda: now[0])
+        recorder = TelemetryRecorder(str(tmp_path / 'session.irrec'), flush_interval=5.0)
+        ir = FakeSource()
+        for now[0] in (0.0, 3.0, 6.0, 7.0):
+            recorder.record(ir)
+
+        # The third tick came 6s after the start: the first three frames
+        # were handed to the writer and the fourth went into a new chunk
+        assert recorder._chunk_start == 3
+        assert recorder._buffer_frames == 1
+        recorder.stop()
+        reader = RecordingReader(str(tmp_path / 'session.irrec'))
+        assert [chunk.count for chunk in reader.chunks] == [3, 1]
+        reader.close()
+
+    def test_selected_vars(self, tmp_path):
+        path = tmp_path / 'session.irrec'
+        record(path, 10, names=['SessionTime', 'CarIdxLap', 'Missing'])
+
+        reader = RecordingReader(str(path))
+        assert reader.keys() == ['SessionTime', 'CarIdxLap']
+        assert reader.frame_size == 8 + 64 * 8
+        reader.close()
+
+    def test_unknown_vars_reported(self, tmp_path):
+        recorder = TelemetryRecorder(str(tmp_path / 'session.irrec'), names=['Speed', 'Missing'])
+        recorder.start(FakeSource())
+        assert recorder.missing == ['Missing']
+        assert [var.name for var in recorder.vars] == ['Speed']
+        recorder.stop()
+
+    def test_no_known_vars(self, tmp_path):
+        path = tmp_path / 'session.irrec'
+        recorder = TelemetryRecorder(str(path), names=['Missing'])
+        recorder.open()
+        with pytest.raises(ValueError, match='unknown: Missing'):
+            recorder.start(FakeSource())
+        assert not recorder.recording
+        recorder.stop()
+        assert path.exists()
+
+    def test_bad_path_fails_on_open(self, tmp_path):
+        recorder = TelemetryRecorder(str(tmp_path / 'missing' / 'session.irrec'))
+        with pytest.raises(OSError):
+            recorder.open()
+
+    def test_truncated_file(self, tmp_path):
+        path = tmp_path / 'session.irrec'
+        record(path, 100, chunk_frames=32)
+        data = path.read_bytes()
+        path.write_bytes(data[:-10])
+
+        reader = RecordingReader(str(path))
+        assert len(reader) == 96
+        reader.close()
+
+    def test_not_a_recording(self, tmp_path):
+        path = tmp_path / 'replay.ibt'
+        path.write_bytes(b'\0' * 64)
+        with pytest.raises(ValueError):
+            RecordingReader(str(path))
+
+
+def shared_memory(path, values: dict, session_info: bytes):
+    """
+    Write an irsdk shared memory image: header, var headers, session info and
+    two var buffers holding `values` ({name: (type index, [values])}).
+    """
+    var_header_offset = 112
+    session_info_offset = var_header_offset + 144 * len(values)
+    layout, offset = {}, 0
+    for name, (type_index, items) in values.items():
+        layout[name] = offset
+        offset += struct.calcsize(irsdk.VAR_TYPE_MAP[type_index] * len(items))
+    buf_len = offset
+    buf_offset = session_info_offset + len(session_info) + 16
+
+    memory = bytearray(buf_offset + 2 * buf_len)
+    struct.pack_into('<10i', memory, 0, 2, 1, 60, 7, len(session_info), session_info_offset,
+                     len(values), var_header_offset, 2, buf_len)
+    for index in range(2):
+        struct.pack_into('<2i', memory, 48 + index * 16, 100 + index, buf_offset + index * buf_len)
+    for index, (name, (type_index, items)) in enumerate(values.items()):
+        struct.pack_into('<3i?3x32s', memory, var_header_offset + index * 144,
+                         type_index, layout[name], len(items), False, name.encode())
+        for buffer in range(2):
+            struct.pack_into(f'<{irsdk.VAR_TYPE_MAP[type_index] * len(items)}', memory,
+                             buf_offset + buffer * buf_len + layout[name], *items)
+    memory[session_info_offset:session_info_offset + len(session_info)] = session_info
+    path.write_bytes(memory)
+
+
+class TestLiveRecording:
+    """Test raw copies out of the sim's shared memory"""
+
+    def test_raw_frames(self, tmp_path):
+        memory = tmp_path / 'memory.bin'
+        shared_memory(memory, {
+            'SessionTime': (5, [1234.5]),
+            'Speed': (4, [41.25]),
+            'SessionFlags': (3, [0x80000000]),
+            'CarIdxLap': (2, list(range(64))),
+        }, b'---\nWeekendInfo:\n TrackDisplayName: Spa\n\n...\n')
+
+        ir = LiveTelemetryHandler()
+        assert ir.ir.startup(test_file=str(memory))
+
+        path = tmp_path / 'live.irrec'
+        recorder = TelemetryRecorder(str(path), names=['SessionTime', 'Speed', 'SessionFlags', 'CarIdxLap'])
+        recorder.record(ir)
+        recorder.record(ir)
+        assert recorder._runs == ((0, 0, 8 + 4 + 4 + 64 * 4),)
+        recorder.stop()
+        ir.disconnect()
+
+        replay = RecordedTelemetryHandler(str(path))
+        replay.connect()
+        assert replay.total_frames == 2
+        assert replay['SessionTime'] == 1234.5
+        assert replay['Speed'] == 41.25
+        assert replay['SessionFlags'] == 0x80000000
+        assert replay['CarIdxLap'] == list(range(64))
+        assert replay['WeekendInfo'] == {'TrackDisplayName': 'Spa'}
+        assert replay.get_session_info_version() == 7
+        replay.disconnect()
+
+
+class TestRecordedTelemetryHandler:
+    """Test playback"""
+
+    def test_playback(self, tmp_path):
+        path = tmp_path / 'session.irrec'
+        record(path, 120, chunk_frames=32)
+
+        ir = RecordedTelemetryHandler(str(path), skip_to=0.5)
+        ir.connect()
+        assert ir.connected
+        assert ir['Speed'] == 90.0
+        assert ir['WeekendInfo']['TrackDisplayName'] == 'Okayama'
+        assert ir.get_next_tick() == 61 / 60
+        assert ir.get_playback_info()['total_frames'] == 120
+        assert 'Speed' in ir.keys()
+        ir.disconnect()
+        assert ir['Speed'] is None
@@ -0,0 +1,216 @@
+"""Tests for WebSocket subscriptions, throttling and control messages"""
+import asyncio
+import json
+import logging
+
+import pytest
+
+from server import websocket
+from server.snapshot import Snapshot, SnapshotHub
+from server.websocket import MAX_SUBSCRIPTIONS, Subscription, WebSocketBroadcaster, WebSocketClient, encode_update
+
+
+class FakeConnection:
+    """Records sent messages; `gate` can hold sends to mimic a slow socket"""
+
+    remote_address = ('127.0.0.1', 50000)
+
+    def __init__(self):
+        self.sent: list[dict] = []
+        self.gate: asyncio.Event | None = None
+
+    async def send(self, message: str):
+        if self.gate is not None:
+            await self.gate.wait()
+        self.sent.append(json.loads(message))
+
+
+class FakeState:
+    def __init__(self):
+        self.ir_connected = True
+        self.show_pit_cams = False
+
+    def toggle_pit_cams(self):
+        self.show_pit_cams = not self.show_pit_cams
+        return self.show_pit_cams
+
+
+class FakeContext:
+    def __init__(self, hub):
+        self.snapshots = hub
+        self.logger = logging.getLogger('ws_broadcaster.spec')
+        self.state = FakeState()
+        self.ir = object()
+
+
+@pytest.fixture
+def broadcaster():
+    return WebSocketBroadcaster(FakeContext(SnapshotHub()))
+
+
+def client() -> WebSocketClient:
+    return WebSocketClient(FakeConnection())
+
+
+def message(broadcaster, ws_client, **data) -> dict:
+    asyncio.run(broadcaster._handle_message(ws_client, json.dumps(data)))
+    return ws_client.connection.sent.pop()
+
+
+class TestSubscriptions:
+    """Test subscribe / unsubscribe validation and var reference counts"""
+
+    def test_subscribe_and_ack(self, broadcaster):
+        ws_client = client()
+        reply = message(broadcaster, ws_client, type='subscribe', channel='driver', rate=5, id=1)
+        assert reply == {'type': 'ack', 'id': 1, 'request': 'subscribe', 'channel': 'driver', 'rate': 5.0}
+        assert ws_client.subscriptions['driver'].interval == 0.2
+        assert ws_client.wakeup.is_set()
+
+    def test_rate_is_clamped_and_validated(self, broadcaster):
+        ws_client = client()
+        assert message(broadcaster, ws_client, type='subscribe', channel='camera', rate=1000)['rate'] == 60.0
+        assert message(broadcaster, ws_client, type='subscribe', channel='camera', rate=0)['rate'] == 0.1
+        reply = message(broadcaster, ws_client, type='subscribe', channel='camera', rate='fast', id=7)
+        assert reply == {'type': 'error', 'id': 7, 'error': 'rate must be a number'}
+
+    @pytest.mark.parametrize('channel', ['laps', 'var:', 'var:Speed;drop', 'var:1Speed', None])
+    def test_unknown_channels_rejected(self, broadcaster, channel):
+        ws_client = client()
+        reply = message(broadcaster, ws_client, type='subscribe', channel=channel)
+        assert reply['type'] == 'error'
+        assert reply['error'].startswith('Unknown channel')
+        assert ws_client.subscriptions == {}
+
+    def test_bad_messages(self, broadcaster):
+        ws_client = client()
+        asyncio.run(broadcaster._handle_message(ws_client, 'not json'))
+        assert ws_client.connection.sent.pop()['type'] == 'error'
+        assert message(broadcaster, ws_client, type='dance')['error'] == 'Unknown message type: dance'
+        asyncio.run(broadcaster._handle_message(ws_client, '[1, 2]'))
+        assert ws_client.connection.sent.pop()['error'] == 'Message must be a JSON object'
+
+    def test_subscription_limit(self, broadcaster):
+        ws_client = client()
+        for index in range(MAX_SUBSCRIPTIONS):
+            message(broadcaster, ws_client, type='subscribe', channel=f'var:Var{index}')
+        reply = message(broadcaster, ws_client, type='subscribe', channel='driver')
+        assert reply['error'] == f'Too many subscriptions (max {MAX_SUBSCRIPTIONS})'
+        # Changing the rate of an existing subscription is still allowed
+        assert message(broadcaster, ws_client, type='subscribe', channel='var:Var0', rate=1)['type'] == 'ack'
+
+    def test_watched_vars_are_reference_counted(self, broadcaster):
+        hub = broadcaster.hub
+        first, second = client(), client()
+        message(broadcaster, first, type='subscribe', channel='var:Speed')
+        message(broadcaster, first, type='subscribe', channel='var:Speed', rate=30)
+        message(broadcaster, second, type='subscribe', channel='var:Speed')
+        message(broadcaster, second, type='subscribe', channel='var:RPM')
+        assert hub.watched_vars() == ('RPM', 'Speed')
+
+        assert message(broadcaster, first, type='unsubscribe', channel='var:Speed') == {
+            'type': 'ack', 'id': None, 'request': 'unsubscribe', 'channel': 'var:Speed'
+        }
+        assert hub.watched_vars() == ('RPM', 'Speed')
+
+        # Disconnecting releases everything the client still held
+        broadcaster._release_vars(second.subscriptions)
+        assert hub.watched_vars() == ()
+
+    def test_unsubscribe_unknown_channel_is_harmless(self, broadcaster):
+        ws_client = client()
+        assert message(broadcaster, ws_client, type='unsubscribe', channel='var:Speed')['type'] == 'ack'
+        assert broadcaster.hub.watched_vars() == ()
+
+
+class TestThrottling:
+    """Test which channels are due and skip-to-newest delivery"""
+
+    def test_due_channels(self):
+        ws_client = client()
+        ws_client.subscriptions = {'driver': Subscription('driver', 10), 'camera': Subscription('camera', 2)}
+
+        assert ws_client.due_channels(1, 100.0) == (('camera', 'driver'), None)
+        ws_client.mark_sent(('camera', 'driver'), 1, 100.0)
+
+        # Same version: nothing to send and nothing to wait for
+        assert ws_client.due_channels(1, 100.05) == ((), None)
+
+        channels, wait = ws_client.due_channels(2, 100.05)
+        assert channels == ()
+        assert wait == pytest.approx(0.05)
+
+        channels, wait = ws_client.due_channels(3, 100.1)
+        assert channels == ('driver',)
+        assert wait == pytest.approx(0.4)
+
+    def test_encode_update_shared_per_channel_set(self):
+        snapshot = Snapshot(3, {'driver': {'name': 'A'}, 'vars': {'Speed': 51.5}})
+        frame = encode_update(snapshot, ('driver', 'var:Speed', 'var:Missing'))
+        assert json.loads(frame) == {'type': 'update', 'version': 3, 'channels': {'driver': {'name': 'A'}, 'var:Speed': 51.5}}
+        assert encode_update(snapshot, ('driver', 'var:Speed', 'var:Missing')) is frame
+        assert encode_update(snapshot, ('var:Missing',)) is None
+
+    def test_slow_client_skips_to_newest(self, broadcaster):
+        hub = broadcaster.hub
+        ws_client = client()
+        ws_client.subscriptions = {'var:Speed': Subscription('var:Speed', websocket.MAX_RATE)}
+
+        async def run():
+            gate = ws_client.connection.gate = asyncio.Event()
+            pusher = asyncio.create_task(broadcaster._push(ws_client))
+            await asyncio.sleep(0)
+
+            hub.publish({'vars': {'Speed': 1.0}})
+            await asyncio.sleep(0.01)
+            # The first send is blocked; these pile up behind it
+            for speed in (2.0, 3.0, 4.0):
+                hub.publish({'vars': {'Speed': speed}})
+                await asyncio.sleep(0.01)
+
+            gate.set()
+            await asyncio.sleep(0.1)
+            pusher.cancel()
+            await asyncio.gather(pusher, return_exceptions=True)
+
+        asyncio.run(run())
+        assert [(sent['version'], sent['channels']['var:Speed']) for sent in ws_client.connection.sent] == [(1, 1.0), (4, 4.0)]
+        assert ws_client.dropped == 2
+        assert ws_client.sent == 2
+
+
+class TestControlMessages:
+    """Test camera.set and pit_cams.toggle"""
+
+    def test_set_camera(self, broadcaster, monkeypatch):
+        calls = []
+
+        def set_player_camera(ir, state, camera_group_id):
+            calls.append(camera_group_id)
+            return True
+
+        monkeypatch.setattr(websocket, 'set_player_camera', set_player_camera)
+        reply = message(broadcaster, client(), type='camera.set', camera_group_id='12', id=3)
+        assert reply == {'type': 'ack', 'id': 3, 'request': 'camera.set', 'success': True, 'camera_group_id': 12}
+        assert calls == [12]
+
+    def test_set_camera_errors(self, broadcaster, monkeypatch):
+        monkeypatch.setattr(websocket, 'set_player_camera', lambda ir, state, camera_group_id: None)
+        ws_client = client()
+
+        assert message(broadcaster, ws_client, type='camera.set')['error'] == 'Missing camera_group_id parameter'
+        assert message(broadcaster, ws_client, type='camera.set', camera_group_id='TV1')['error'] == \
+            'camera_group_id must be an integer'
+        assert message(broadcaster, ws_client, type='camera.set', camera_group_id=12)['error'] == 'Driver not found'
+
+        broadcaster.context.state.ir_connected = False
+        assert message(broadcaster, ws_client, type='camera.set', camera_group_id=12)['error'] == 'Not connected to iRacing'
+
+    def test_toggle_pit_cams(self, broadcaster):
+        ws_client = client()
+        assert message(broadcaster, ws_client, type='pit_cams.toggle')['show_pit_cams'] is True
+        assert message(broadcaster, ws_client, type='pit_cams.toggle')['show_pit_cams'] is False
+
+    def test_resync_needs_frames_mode(self, broadcaster):
+        reply = message(broadcaster, client(), type='resync')
+        assert reply['error'] == 'resync is only available in frames mode'
@@ -0,0 +1,156 @@
+/**
+ * Telemetry Frame Decoder
+ *
+ * Decodes the delta-encoded frames sent by /api/stream?mode=frames and by the
+ * WebSocket server at ws://<host>:9001/?mode=frames (see server/delta.py).
+ */
+
+/**
+ * @typedef {Array<string>} FramePath
+ * Keys from the top of the payload down to a value, e.g. ["vars", "Speed"]
+ */
+
+/**
+ * @typedef {Object} Frame
+ * @property {number} seq - Frame number on this stream
+ * @property {boolean} [key] - True for a keyframe
+ * @property {Object} [data] - Full payload (keyframes only)
+ * @property {Array<Array>} [set] - [path, value] pairs to replace
+ * @property {Array<Array>} [idx] - [path, [index, value, ...]] sparse list updates
+ * @property {Array<FramePath>} [del] - Removed paths
+ */
+
+/**
+ * @typedef {Object} FrameDecoder
+ * @property {function(Frame): boolean} apply - Apply a frame; false when it was
+ *     dropped because an earlier frame is missing
+ * @property {function(): Object} getData - The current payload
+ * @property {function(): boolean} isSynced - False until a keyframe arrives,
+ *     and again after a gap
+ */
+
+/**
+ * Find the object holding the last key of a path, creating missing levels
+ *
+ * @param {Object} data - The payload
+ * @param {FramePath} path - Key path
+ * @returns {Object} The parent object
+ */
+function framePathParent(data, path) {
+    let target = data;
+    for (let i = 0; i < path.length - 1; i++) {
+        if (typeof target[path[i]] !== 'object' || target[path[i]] === null) {
+            target[path[i]] = {};
+        }
+        target = target[path[i]];
+    }
+    return target;
+}
+
+/**
+ * Create a decoder that keeps the payload of one frames stream up to date
+ *
+ * @returns {FrameDecoder} The decoder
+ */
+function createFrameDecoder() {
+    let data = {};
+    let seq = null;
+
+    const apply = (frame) => {
+        if (frame.key) {
+            data = frame.data;
+            seq = frame.seq;
+            return true;
+        }
+
+        if (seq === null || frame.seq !== seq + 1) {
+            // Missed a frame: everything until the next keyframe is dropped
+            seq = null;
+            return false;
+        }
+
+        for (const [path, value] of frame.set || []) {
+            framePathParent(data, path)[path[path.length - 1]] = value;
+        }
+        for (const [path, pairs] of frame.idx || []) {
+            const target = framePathParent(data, path)[path[path.length - 1]];
+            for (let i = 0; i < pairs.length; i += 2) {
+                target[pairs[i]] = pairs[i + 1];
+            }
+        }
+        for (const path of frame.del || []) {
+            delete framePathParent(data, path)[path[path.length - 1]];
+        }
+
+        seq = frame.seq;
+        return true;
+    };
+
+    return {
+        apply,
+        getData: () => data,
+        isSynced: () => seq !== null
+    };
+}
+
+/**
+ * Subscribe to snapshot fields over /api/stream in frames mode
+ *
+ * @param {string} host - The hostname
+ * @param {number} port - The port number
+ * @param {string} fields - Comma separated snapshot fields; raw variables as
+ *     vars.<Name> (e.g. 'driver,vars.Speed,vars.CarIdxLapDistPct')
+ * @param {function(Object): void} onData - Called with the payload after every frame
+ * @param {function(Error): void} onError - Called when the stream is interrupted
+ * @param {number} [rate=10] - Maximum frames per second
+ * @returns {{stop: function(): void, isRunning: function(): boolean}} Stream control
+ */
+function startFrameStream(host, port, fields, onData, onError, rate = 10) {
+    const decoder = createFrameDecoder();
+    const source = new EventSource(
+        `http://${host}:${port}/api/stream?fields=${encodeURIComponent(fields)}&mode=frames&rate=${rate}`
+    );
+
+    source.addEventListener('frame', (event) => {
+        if (decoder.apply(JSON.parse(event.data)) && onData) {
+            onData(decoder.getData());
+        }
+    });
+
+    source.onerror = () => {
+        if (onError) {
+            onError(new Error(`Stream from ${host}:${port} interrupted, reconnecting...`));
+        }
+    };
+
+    return {
+        stop: () => source.close(),
+        isRunning: () => source.readyState !== EventSource.CLOSED
+    };
+}
+
+/*
+// Example: CarIdx positions over WebSocket, asking for a keyframe after a gap
+const socket = new WebSocket('ws://localhost:9001/?mode=frames');
+const decoder = createFrameDecoder();
+
+socket.onopen = () => {
+    socket.send(JSON.stringify({ type: 'subscribe', channel: 'var:CarIdxLapDistPct', rate: 30 }));
+};
+
+socket.onmessage = (event) => {
+    const message = JSON.parse(event.data);
+    if (message.type !== 'frame') {
+        return;
+    }
+    const wasSynced = decoder.isSynced();
+    if (!decoder.apply(message)) {
+        // Ask once; later deltas are dropped until the keyframe arrives
+        if (wasSynced) {
+            socket.send(JSON.stringify({ type: 'resync' }));
+        }
+        return;
+    }
+    console.log(decoder.getData()['var:CarIdxLapDistPct']);
+};
+*/
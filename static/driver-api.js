@@ -140,6 +140,114 @@ function startDriverPolling(host, port, onData, onError, intervalMs = 1000) {
     };
 }
 
+/**
+ * Merge changed fields into a payload (nested objects are merged)
+ *
+ * @param {Object} target - The payload to update in place
+ * @param {Object} changes - Changed fields
+ */
+function mergeStreamChanges(target, changes) {
+    for (const [key, value] of Object.entries(changes)) {
+        if (value !== null && typeof value === 'object' && !Array.isArray(value)
+            && typeof target[key] === 'object' && target[key] !== null) {
+            mergeStreamChanges(target[key], value);
+        } else {
+            target[key] = value;
+        }
+    }
+}
+
+/**
+ * Apply a delta event to the previous payload: changed fields are merged and
+ * the dotted paths listed in `removed` are deleted
+ *
+ * @param {Object} target - The payload to update in place
+ * @param {Object} changes - Data of a delta event
+ * @returns {Object} The updated payload
+ */
+function applyStreamDelta(target, changes) {
+    const { removed = [], ...fields } = changes;
+
+    for (const path of removed) {
+        const keys = path.split('.');
+        let parent = target;
+        for (const key of keys.slice(0, -1)) {
+            parent = parent !== null && typeof parent === 'object' ? parent[key] : undefined;
+        }
+        if (parent !== null && typeof parent === 'object') {
+            delete parent[keys[keys.length - 1]];
+        }
+    }
+
+    mergeStreamChanges(target, fields);
+    return target;
+}
+
+/**
+ * Subscribe to driver data pushed over the /api/stream Server-Sent Events
+ * endpoint instead of polling.  Falls back to polling when the browser has
+ * no EventSource support.
+ *
+ * @param {string} host - The hostname
+ * @param {number} port - The port number
+ * @param {OnDataCallback} onData - Callback function called with driver data on every update
+ * @param {OnErrorCallback} onError - Callback function called with error on failure
+ * @param {number} [rate=10] - Maximum updates per second
+ * @returns {PollerControl} Object with methods to control the stream
+ */
+function startDriverStream(host, port, onData, onError, rate = 10) {
+    if (typeof EventSource === 'undefined') {
+        return startDriverPolling(host, port, onData, onError, 1000 / rate);
+    }
+
+    let source = null;
+    let payload = {};
+
+    const open = (currentRate) => {
+        source = new EventSource(`http://${host}:${port}/api/stream?fields=driver&mode=delta&rate=${currentRate}`);
+
+        source.addEventListener('snapshot', (event) => {
+            payload = JSON.parse(event.data);
+            if (payload.driver && onData) {
+                onData(payload.driver);
+            }
+        });
+
+        source.addEventListener('delta', (event) => {
+            applyStreamDelta(payload, JSON.parse(event.data));
+            if (payload.driver && onData) {
+                onData(payload.driver);
+            }
+        });
+
+        source.onerror = () => {
+            if (onError) {
+                onError(new Error(`Stream from ${host}:${port} interrupted, reconnecting...`));
+            }
+        };
+    };
+
+    open(rate);
+
+    return {
+        stop: () => {
+            if (source) {
+                source.close();
+                source = null;
+            }
+        },
+
+        isRunning: () => source !== null && source.readyState !== EventSource.CLOSED,
+
+        setInterval: (newIntervalMs) => {
+            if (source) {
+                source.close();
+                open(1000 / newIntervalMs);
+            }
+        }
+    };
+}
+
 /**
  * Callback function for getDriverData
  * @callback GetDriverDataCallback
@@ -162,11 +270,105 @@ function getDriverData(host, port, callback) {
         .catch(error => callback(error, null));
 }
 
+/**
+ * Long-poll the driver API: each request waits until the driver data changes
+ *
+ * For clients that cannot use EventSource or WebSockets. Makes about one
+ * request per actual change instead of one per interval.
+ *
+ * @param {string} host - The hostname
+ * @param {number} port - The port number
+ * @param {OnDataCallback} onData - Callback function called with driver data on each change
+ * @param {OnErrorCallback} onError - Callback function called with error on failure
+ * @param {number} [timeoutSeconds=25] - Seconds the server may hold each request
+ * @returns {PollerControl} Object with methods to control the polling
+ */
+function startDriverLongPoll(host, port, onData, onError, timeoutSeconds = 25) {
+    let isRunning = true;
+    let since = 0;
+
+    const poll = async () => {
+        while (isRunning) {
+            try {
+                const url = `http://${host}:${port}/api/driver?since=${since}&timeout=${timeoutSeconds}`;
+                const response = await fetch(url, { headers: { 'Accept': 'application/json' }, mode: 'cors' });
+                since = Number(response.headers.get('X-Data-Version') || 0);
+
+                if (response.status === 204) {
+                    continue;
+                }
+
+                const data = await response.json().catch(() => ({ error: 'Unknown error' }));
+                if (!response.ok || data.error) {
+                    throw new Error(`HTTP ${response.status}: ${data.error || response.statusText}`);
+                }
+
+                if (onData) {
+                    onData(data);
+                }
+            } catch (error) {
+                if (onError) {
+                    onError(error);
+                }
+                // Back off before retrying a failed request
+                await new Promise(resolve => setTimeout(resolve, 1000));
+            }
+        }
+    };
+
+    poll();
+
+    return {
+        stop: () => {
+            isRunning = false;
+        },
+
+        isRunning: () => isRunning,
+
+        // The server decides when to answer; the interval does not apply
+        setInterval: () => {}
+    };
+}
+
+/**
+ * @typedef {Object} BatchData
+ * @property {number} version - Snapshot version all resources were built from
+ * @property {number} session_time - SessionTime of that snapshot
+ * @property {Object<string, Object>} resources - Payload per requested resource
+ * @property {Object<string, {status: number, error: string}>} errors - Resources that could not be built
+ * @property {string} timestamp - ISO 8601 timestamp of the response
+ */
+
+/**
+ * Fetch several resources from the same telemetry tick in one request
+ *
+ * @param {string} host - The hostname
+ * @param {number} port - The port number
+ * @param {string[]} resources - Resource names (e.g. ['driver', 'camera', 'standings'])
+ * @returns {Promise<BatchData>} The batch response
+ * @throws {Error} If the request fails or returns an error
+ */
+async function fetchBatch(host, port, resources) {
+    const url = `http://${host}:${port}/api/batch?resources=${encodeURIComponent(resources.join(','))}`;
+    const response = await fetch(url, { headers: { 'Accept': 'application/json' }, mode: 'cors' });
+    const data = await response.json().catch(() => ({ error: 'Unknown error' }));
+
+    if (!response.ok) {
+        throw new Error(`HTTP ${response.status}: ${data.error || response.statusText}`);
+    }
+
+    return data;
+}
+
 // Export for use in Node.js or module systems
 if (typeof module !== 'undefined' && module.exports) {
     module.exports = {
         fetchDriverData,
         startDriverPolling,
+        startDriverStream,
+        startDriverLongPoll,
+        applyStreamDelta,
+        fetchBatch,
         getDriverData
     };
 }